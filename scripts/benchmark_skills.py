@@ -0,0 +1,554 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark Skills - 跨技能效能基準測試
+
+以合成資料（scripts/synthetic_data.py）在可設定的規模下（10 ~ 100k 時間點、1 ~ 1000 資產）
+計時各技能的核心計算函數，結果寫成 JSON，並與先前儲存的基準線比較、標出退化：
+
+1. 載入：逐技能以 importlib 載入腳本（同名模組如 fetch_data.py 在技能間隔離），
+   缺少相依套件（yfinance 等）的技能記為 skipped，不影響其他案例
+2. 計時：輸入在計時外產生；先暖身一次，再重複 --repeat 次（單一案例超過 --max-seconds 即停），
+   計時期間關閉 GC 並攔截技能的輸出
+3. 比較：以最短耗時（min_sec）對照基準線；慢於 --threshold 倍且差距超過 --min-delta 秒
+   記為退化（regression），反向則記為改善（improved）
+
+結果鍵為 `技能:函數[時間點x資產數]`；單資產函數只跑 assets=1。
+
+Usage:
+    python scripts/benchmark_skills.py --list
+    python scripts/benchmark_skills.py --save-baseline
+    python scripts/benchmark_skills.py                       # 對照基準線，有退化時 exit 1
+    python scripts/benchmark_skills.py --scale large --cases protocol_signals compute_deviation_panel
+    python scripts/benchmark_skills.py --points 10 1000 100000 --assets 1 1000
+"""
+
+import argparse
+import gc
+import importlib.util
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from synthetic_data import inventory_series, ohlc_frame, oscillator_series, price_panel, price_series
+
+REPO_ROOT = Path(__file__).parent.parent
+SKILLS_DIR = REPO_ROOT / "skills"
+DEFAULT_OUTPUT_DIR = REPO_ROOT / "output" / "benchmarks"
+BASELINE_NAME = "baseline.json"
+LATEST_NAME = "latest.json"
+
+SCALES = {
+    "small": {"points": [100, 1_000], "assets": [1, 10]},
+    "medium": {"points": [1_000, 10_000], "assets": [1, 100]},
+    "large": {"points": [10, 1_000, 100_000], "assets": [1, 100, 1_000]},
+}
+DEFAULT_SCALE = "small"
+DEFAULT_REPEAT = 5
+DEFAULT_MAX_SECONDS = 10.0
+DEFAULT_THRESHOLD = 1.25
+DEFAULT_MIN_DELTA = 0.005
+# points × assets 超過此數的組合不產生（100k × 1000 的 float 面板約 800MB）
+DEFAULT_MAX_CELLS = 10_000_000
+
+
+# ============================================================================
+# 案例
+# ============================================================================
+
+@dataclass
+class BenchCase:
+    """
+    一個基準測試案例
+
+    Parameters
+    ----------
+    skill, script : str
+        技能目錄與 scripts/ 下的腳本
+    function : str
+        被計時的函數（報表標籤；call 未指定時即 getattr(module, function)）
+    build : callable
+        (points, assets, seed) -> 輸入 dict，在計時外執行
+    call : callable, optional
+        (module, inputs) -> Any；預設為 module.function(**inputs)
+    multi_asset : bool
+        是否隨資產數放大；False 時只跑 assets=1
+    min_points, max_points : int
+        適用的時間點範圍（如 O(n·m²) 的相似度搜尋限制上限）
+    """
+    skill: str
+    script: str
+    function: str
+    build: Callable[[int, int, int], Dict[str, Any]]
+    call: Optional[Callable[[Any, Dict[str, Any]], Any]] = None
+    multi_asset: bool = False
+    min_points: int = 10
+    max_points: Optional[int] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.skill}:{self.function}"
+
+    def run(self, module, inputs: Dict[str, Any]) -> Any:
+        if self.call is not None:
+            return self.call(module, inputs)
+        return getattr(module, self.function)(**inputs)
+
+
+def _rotator_inputs(points: int, assets: int, seed: int) -> Dict[str, Any]:
+    prices = price_panel(points, 2, freq="ME", seed=seed, drift=0.005, vol=0.04)
+    return {
+        "params": {},
+        "price_eq": prices.iloc[:, 0],
+        "price_bd": prices.iloc[:, 1],
+        "leading_index": oscillator_series(points, seed=seed, period=48, phase=0.8),
+        "coincident_index": oscillator_series(points, seed=seed + 1, period=48),
+    }
+
+
+def _drain_inputs(points: int, assets: int, seed: int) -> Dict[str, Any]:
+    inventory = inventory_series(points, seed=seed)
+    return {"df": pd.DataFrame({"date": inventory.index, "combined": inventory.to_numpy()})}
+
+
+def _pattern_inputs(points: int, assets: int, seed: int) -> Dict[str, Any]:
+    series = oscillator_series(points, freq="W-WED", seed=seed, period=26, amplitude=50, noise=5)
+    recent_len = max(5, min(60, points // 10))
+    return {
+        "recent": series.iloc[-recent_len:],
+        "baseline_series": series.iloc[:-recent_len],
+        "normalize_method": "zscore",
+        "similarity_weights": {"corr": 0.4, "dtw": 0.3, "shape_features": 0.3},
+    }
+
+
+def _copper_inputs(points: int, assets: int, seed: int) -> Dict[str, Any]:
+    prices = price_panel(points, 2, freq="ME", seed=seed, vol=0.05)
+    return {
+        "copper": prices.iloc[:, 0],
+        "equity": prices.iloc[:, 1],
+        "yield_series": oscillator_series(points, seed=seed, amplitude=0.5) + 3.0,
+    }
+
+
+def _lithium_regime(module, inputs: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    prices = inputs["prices"]
+    return module.classify_regime_array(
+        module.roc_array(prices, 12),
+        module.slope_array(prices, 26),
+        module.mean_deviation_array(prices, 200),
+    )
+
+
+def _cumulative_inputs(points: int, assets: int, seed: int) -> Dict[str, Any]:
+    panel = price_panel(points, assets + 1, seed=seed)
+    return {
+        "all_data": {ticker: panel[[ticker]].rename(columns={ticker: "Close"}) for ticker in panel.columns[1:]},
+        "benchmark_data": panel.iloc[:, [0]].set_axis(["Close"], axis=1),
+    }
+
+
+CASES: List[BenchCase] = [
+    BenchCase("zeberg-salomon-rotator", "rotator.py", "protocol_signals", _rotator_inputs),
+    BenchCase("detect-shanghai-silver-stock-drain", "drain_detector.py", "compute_drain_metrics", _drain_inputs),
+    BenchCase("detect-fed-unamortized-discount-pattern", "pattern_detector.py", "find_best_match",
+              _pattern_inputs, min_points=50, max_points=20_000),
+    BenchCase("analyze-copper-stock-resilience-dependency", "copper_stock_analyzer.py",
+              "calculate_rolling_betas", _copper_inputs, min_points=30),
+    BenchCase("detect-palladium-lead-silver-turns", "palladium_lead_silver.py", "detect_pivots",
+              lambda n, a, s: {"prices": price_series(n, seed=s)}),
+    BenchCase("detect-atr-squeeze-regime", "atr_squeeze.py", "calculate_atr",
+              lambda n, a, s: {"df": ohlc_frame(n, seed=s), "smoothing": "wilder"}),
+    BenchCase("evaluate-exponential-trend-deviation-regimes", "trend_engine.py", "compute_deviation_panel",
+              lambda n, a, s: {"prices": price_panel(n, a, freq="ME", seed=s, drift=0.005, vol=0.04)},
+              multi_asset=True),
+    BenchCase("lithium-supply-demand-gap-radar", "classify_regime.py", "classify_regime_array",
+              lambda n, a, s: {"prices": price_panel(n, a, freq="W-FRI", seed=s, vol=0.03).to_numpy()},
+              call=_lithium_regime, multi_asset=True),
+    BenchCase("track-equity-cumulative-return", "cumulative_return_analyzer.py", "create_cumulative_dataframe",
+              _cumulative_inputs, multi_asset=True),
+]
+
+
+def select_cases(names: Optional[List[str]]) -> List[BenchCase]:
+    """依技能名、函數名或 `技能:函數` 篩選案例"""
+    if not names:
+        return list(CASES)
+    selected = [c for c in CASES if {c.skill, c.function, c.name} & set(names)]
+    unknown = [n for n in names if not any(n in (c.skill, c.function, c.name) for c in CASES)]
+    if unknown:
+        raise ValueError(f"未知的案例: {', '.join(unknown)}")
+    return selected
+
+
+# ============================================================================
+# 計時
+# ============================================================================
+
+@dataclass
+class BenchResult:
+    """單一案例、單一規模的計時結果"""
+    case: str
+    skill: str
+    function: str
+    points: int
+    assets: int
+    status: str                      # ok / skipped / failed
+    runs: int = 0
+    first_sec: Optional[float] = None
+    min_sec: Optional[float] = None
+    median_sec: Optional[float] = None
+    mean_sec: Optional[float] = None
+    build_sec: Optional[float] = None
+    error: Optional[str] = None
+    samples: List[float] = field(default_factory=list)
+
+    @property
+    def key(self) -> str:
+        return result_key(self.case, self.points, self.assets)
+
+
+def result_key(case: str, points: int, assets: int) -> str:
+    return f"{case}[{points}x{assets}]"
+
+
+def time_call(fn: Callable[[], Any], repeat: int, max_seconds: float) -> Dict[str, Any]:
+    """
+    計時 fn：第一次呼叫為暖身（另記 first_sec），之後重複 repeat 次；
+    累計超過 max_seconds 即停止，暖身本身就超過時以暖身時間為唯一樣本
+    """
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        t0 = time.perf_counter()
+        fn()
+        first = time.perf_counter() - t0
+        samples = []
+        if first <= max_seconds:
+            budget_start = time.perf_counter()
+            for _ in range(max(1, repeat)):
+                t0 = time.perf_counter()
+                fn()
+                samples.append(time.perf_counter() - t0)
+                if time.perf_counter() - budget_start > max_seconds:
+                    break
+    finally:
+        if gc_enabled:
+            gc.enable()
+    samples = samples or [first]
+    return {
+        "runs": len(samples),
+        "first_sec": round(first, 6),
+        "min_sec": round(min(samples), 6),
+        "median_sec": round(statistics.median(samples), 6),
+        "mean_sec": round(statistics.fmean(samples), 6),
+        "samples": [round(s, 6) for s in samples],
+    }
+
+
+def _load_skill_module(script: Path, skill: str):
+    name = "_bench_" + skill.replace("-", "_") + "_" + script.stem
+    spec = importlib.util.spec_from_file_location(name, script)
+    module = importlib.util.module_from_spec(spec)
+    # 先登錄再執行：dataclass 解析延後求值的型別註記（from __future__ import annotations）
+    # 需要 sys.modules 中的模組；結束後由 _purge_skill_modules 清除
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+def _purge_skill_modules(before: set, skill_root: Path) -> None:
+    root = str(skill_root.resolve())
+    for name in set(sys.modules) - before:
+        path = getattr(sys.modules.get(name), "__file__", None)
+        if path and str(Path(path).resolve()).startswith(root):
+            del sys.modules[name]
+
+
+def iter_scales(case: BenchCase, points: List[int], assets: List[int], max_cells: int):
+    """案例適用的 (points, assets, 略過原因)"""
+    for n in points:
+        for a in (assets if case.multi_asset else [1]):
+            reason = None
+            if n < case.min_points:
+                reason = f"points < {case.min_points}"
+            elif case.max_points is not None and n > case.max_points:
+                reason = f"points > {case.max_points}"
+            elif n * a > max_cells:
+                reason = f"points×assets > {max_cells}"
+            yield n, a, reason
+
+
+def run_benchmarks(
+    cases: List[BenchCase],
+    points: List[int],
+    assets: List[int],
+    repeat: int = DEFAULT_REPEAT,
+    max_seconds: float = DEFAULT_MAX_SECONDS,
+    max_cells: int = DEFAULT_MAX_CELLS,
+    seed: int = 0,
+    progress: bool = True,
+) -> List[BenchResult]:
+    """逐技能載入模組並計時所有規模；單一案例失敗不影響其他案例"""
+    results: List[BenchResult] = []
+    # 輸出先交給 sink，避免技能的進度訊息混入報表
+    sink = io.StringIO()
+
+    for case in cases:
+        skill_root = SKILLS_DIR / case.skill
+        script = skill_root / "scripts" / case.script
+        scales = list(dict.fromkeys(iter_scales(case, points, assets, max_cells)))
+
+        def _record(n, a, status, **kwargs):
+            results.append(BenchResult(case.name, case.skill, case.function, n, a, status, **kwargs))
+            if progress:
+                r = results[-1]
+                detail = f"{r.min_sec * 1000:10.2f} ms" if r.status == "ok" else f"{r.status}: {r.error}"
+                print(f"  {r.key:<90} {detail}", file=sys.stderr)
+
+        saved_path, saved_cwd, saved_modules = sys.path[:], os.getcwd(), set(sys.modules)
+        try:
+            sys.path.insert(0, str(script.parent))
+            os.chdir(skill_root)
+            try:
+                with redirect_stdout(sink), redirect_stderr(sink):
+                    module = _load_skill_module(script, case.skill)
+            except ImportError as e:
+                for n, a, _ in scales:
+                    _record(n, a, "skipped", error=f"缺少相依套件: {e}")
+                continue
+            except Exception as e:
+                for n, a, _ in scales:
+                    _record(n, a, "failed", error=f"載入失敗: {type(e).__name__}: {e}")
+                continue
+
+            for n, a, reason in scales:
+                if reason:
+                    _record(n, a, "skipped", error=reason)
+                    continue
+                try:
+                    t0 = time.perf_counter()
+                    inputs = case.build(n, a, seed)
+                    build_sec = round(time.perf_counter() - t0, 6)
+                    with redirect_stdout(sink), redirect_stderr(sink):
+                        timing = time_call(lambda: case.run(module, inputs), repeat, max_seconds)
+                except Exception as e:
+                    _record(n, a, "failed", error=f"{type(e).__name__}: {e}")
+                    traceback.print_exc(file=sink)
+                    continue
+                _record(n, a, "ok", build_sec=build_sec, **timing)
+                sink.seek(0)
+                sink.truncate()
+        finally:
+            sys.path[:] = saved_path
+            os.chdir(saved_cwd)
+            _purge_skill_modules(saved_modules, skill_root)
+
+    return results
+
+
+# ============================================================================
+# 基準線
+# ============================================================================
+
+def environment_info() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def build_report(results: List[BenchResult], settings: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "environment": environment_info(),
+        "settings": settings,
+        "results": {r.key: asdict(r) for r in results},
+    }
+
+
+def load_report(path: Path) -> Optional[Dict[str, Any]]:
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_report(report: Dict[str, Any], path: Path, merge: bool = False) -> None:
+    """寫入報告；merge=True 時保留舊檔中本次未跑到的結果（部分重跑不會清掉基準線）"""
+    if merge:
+        previous = load_report(path)
+        if previous:
+            report = {**report, "results": {**previous.get("results", {}), **report["results"]}}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+def compare_to_baseline(
+    results: List[BenchResult],
+    baseline: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+    min_delta: float = DEFAULT_MIN_DELTA,
+) -> List[Dict[str, Any]]:
+    """
+    以 min_sec 對照基準線
+
+    Returns
+    -------
+    list of dict
+        每個雙方皆成功的結果一筆：key / baseline_sec / current_sec / ratio /
+        verdict（regression / improved / unchanged）
+    """
+    rows = []
+    base_results = baseline.get("results", {})
+    for r in results:
+        base = base_results.get(r.key)
+        if r.status != "ok" or not base or base.get("status") != "ok":
+            continue
+        base_sec, cur_sec = base["min_sec"], r.min_sec
+        ratio = cur_sec / base_sec if base_sec > 0 else float("inf")
+        verdict = "unchanged"
+        if ratio > threshold and cur_sec - base_sec > min_delta:
+            verdict = "regression"
+        elif ratio < 1 / threshold and base_sec - cur_sec > min_delta:
+            verdict = "improved"
+        rows.append({
+            "key": r.key,
+            "baseline_sec": base_sec,
+            "current_sec": cur_sec,
+            "ratio": round(ratio, 3),
+            "verdict": verdict,
+        })
+    return rows
+
+
+def print_summary(results: List[BenchResult], comparison: Optional[List[Dict[str, Any]]]) -> None:
+    compared = {row["key"]: row for row in comparison or []}
+    print(f"\n{'案例':<92} {'min (ms)':>10} {'median (ms)':>12} {'基準 (ms)':>10} {'倍數':>7}")
+    for r in results:
+        if r.status != "ok":
+            print(f"{r.key:<92} {r.status:>10}  {r.error or ''}")
+            continue
+        row = compared.get(r.key)
+        base = f"{row['baseline_sec'] * 1000:10.2f}" if row else f"{'-':>10}"
+        ratio = f"{row['ratio']:7.2f}" if row else f"{'-':>7}"
+        flag = {"regression": "  ▲ 退化", "improved": "  ▼ 改善"}.get(row["verdict"], "") if row else ""
+        print(f"{r.key:<92} {r.min_sec * 1000:10.2f} {r.median_sec * 1000:12.2f} {base} {ratio}{flag}")
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="跨技能效能基準測試（合成資料）")
+    parser.add_argument("--cases", nargs="+", help="只跑指定案例（技能名、函數名或 技能:函數）")
+    parser.add_argument("--scale", choices=sorted(SCALES), default=DEFAULT_SCALE,
+                        help=f"規模預設組（預設 {DEFAULT_SCALE}）")
+    parser.add_argument("--points", type=int, nargs="+", help="時間點數（覆寫 --scale）")
+    parser.add_argument("--assets", type=int, nargs="+", help="資產數（覆寫 --scale；只影響多資產案例）")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help=f"暖身後重複次數（預設 {DEFAULT_REPEAT}）")
+    parser.add_argument("--max-seconds", type=float, default=DEFAULT_MAX_SECONDS,
+                        help=f"單一案例的計時預算秒數（預設 {DEFAULT_MAX_SECONDS:g}）")
+    parser.add_argument("--max-cells", type=int, default=DEFAULT_MAX_CELLS,
+                        help=f"points×assets 上限（預設 {DEFAULT_MAX_CELLS}）")
+    parser.add_argument("--seed", type=int, default=0, help="合成資料亂數種子")
+    parser.add_argument("--output-dir", type=str, help=f"輸出目錄（預設 {DEFAULT_OUTPUT_DIR}）")
+    parser.add_argument("--baseline", type=str, help="基準線 JSON（預設 {output-dir}/baseline.json）")
+    parser.add_argument("--save-baseline", action="store_true", help="將本次結果合併寫入基準線")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"退化倍數門檻（預設 {DEFAULT_THRESHOLD}）")
+    parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA,
+                        help=f"退化的最小絕對差距秒數，過濾計時雜訊（預設 {DEFAULT_MIN_DELTA}）")
+    parser.add_argument("--list", action="store_true", help="列出案例後結束")
+
+    args = parser.parse_args()
+    if args.threshold <= 1:
+        parser.error("--threshold 必須大於 1")
+
+    try:
+        cases = select_cases(args.cases)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.list:
+        for case in cases:
+            kind = "多資產" if case.multi_asset else "單資產"
+            print(f"{case.name:<80} {kind}  {case.script}")
+        return
+
+    points = args.points or SCALES[args.scale]["points"]
+    assets = args.assets or SCALES[args.scale]["assets"]
+    output_dir = Path(args.output_dir) if args.output_dir else DEFAULT_OUTPUT_DIR
+    baseline_path = Path(args.baseline) if args.baseline else output_dir / BASELINE_NAME
+    settings = {
+        "points": points,
+        "assets": assets,
+        "repeat": args.repeat,
+        "max_seconds": args.max_seconds,
+        "seed": args.seed,
+    }
+
+    print(f"基準測試：{len(cases)} 個案例，points={points}，assets={assets}", file=sys.stderr)
+    results = run_benchmarks(cases, points, assets, repeat=args.repeat, max_seconds=args.max_seconds,
+                             max_cells=args.max_cells, seed=args.seed)
+    report = build_report(results, settings)
+
+    baseline = load_report(baseline_path)
+    comparison = None
+    if baseline is not None:
+        comparison = compare_to_baseline(results, baseline, args.threshold, args.min_delta)
+        report["comparison"] = {
+            "baseline": str(baseline_path),
+            "baseline_created_at": baseline.get("created_at"),
+            "threshold": args.threshold,
+            "min_delta": args.min_delta,
+            "rows": comparison,
+        }
+        if baseline.get("environment") != report["environment"]:
+            print("[Warning] 基準線的執行環境與本次不同，比較結果僅供參考", file=sys.stderr)
+
+    save_report(report, output_dir / LATEST_NAME)
+    print_summary(results, comparison)
+
+    if args.save_baseline:
+        save_report(build_report(results, settings), baseline_path, merge=True)
+        print(f"\n基準線已更新: {baseline_path}")
+
+    failed = [r for r in results if r.status == "failed"]
+    regressions = [row for row in comparison or [] if row["verdict"] == "regression"]
+    print(f"\n完成：成功 {sum(r.status == 'ok' for r in results)}、略過 "
+          f"{sum(r.status == 'skipped' for r in results)}、失敗 {len(failed)}"
+          + (f"，退化 {len(regressions)}" if comparison is not None else "，無基準線可比較"))
+    print(f"結果: {output_dir / LATEST_NAME}")
+
+    if failed or (regressions and not args.save_baseline):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Run Portfolio - 全技能批次執行器
+
+在少數幾個 worker 程序內，以「匯入模組、呼叫 main()」的方式執行 portfolio_registry.json
+列出的技能，取代逐一啟動數十個 Python 程序：
+
+1. 解析需求：registry 宣告的 needs + 上次執行學到的呼叫（data plane 的 needs.json）
+2. 預抓：同一序列（^GSPC、DGS10、GC=F ...）跨技能合併時間窗後只抓一次
+3. 執行：各技能分派到 worker 平行執行；worker 內攔截 yfinance / FRED 抓取，改由共用 store 供應
+4. 輸出：每個技能的結果 JSON、執行日誌，以及含逐技能耗時的 portfolio_summary.json
+
+同一 worker 內的技能依序執行，每次執行前後還原 sys.argv / sys.path / cwd，
+並移除該技能目錄下的模組（各技能都有 fetch_data.py 等同名模組）。
+
+Usage:
+    python scripts/run_portfolio.py
+    python scripts/run_portfolio.py --skills zeberg-salomon-rotator us-cpi-pce-comparator
+    python scripts/run_portfolio.py --workers 4 --include-browser
+    python scripts/run_portfolio.py --plan
+"""
+
+import argparse
+import importlib.util
+import io
+import json
+import logging
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stderr, redirect_stdout
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from skill_data_plane import DEFAULT_MAX_AGE_HOURS, DataPlane, parse_need_spec, plan_needs
+
+REPO_ROOT = Path(__file__).parent.parent
+SKILLS_DIR = REPO_ROOT / "skills"
+REGISTRY_PATH = Path(__file__).parent / "portfolio_registry.json"
+DEFAULT_OUTPUT_DIR = REPO_ROOT / "output" / "portfolio"
+SUMMARY_NAME = "portfolio_summary.json"
+
+
+@dataclass
+class SkillSpec:
+    """registry 中的一個技能"""
+    skill: str
+    script: str
+    args: List[str] = field(default_factory=list)
+    result: Optional[str] = None
+    entry: str = "main"
+    needs: List[str] = field(default_factory=list)
+    tags: List[str] = field(default_factory=list)
+
+
+@dataclass
+class SkillRun:
+    """單一技能的執行結果"""
+    skill: str
+    status: str                     # ok / failed
+    seconds: float
+    exit_code: Optional[int] = None
+    result_file: Optional[str] = None
+    log_file: Optional[str] = None
+    error: Optional[str] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+    needs: List[Dict[str, Any]] = field(default_factory=list)
+    new_entries: Dict[str, Any] = field(default_factory=dict)
+
+
+def load_registry(path: Path = REGISTRY_PATH) -> List[SkillSpec]:
+    with open(path, "r", encoding="utf-8") as f:
+        registry = json.load(f)
+    return [SkillSpec(**entry) for entry in registry["skills"]]
+
+
+def select_specs(specs: List[SkillSpec], names: Optional[List[str]], include_browser: bool) -> List[SkillSpec]:
+    """依名稱與 tag 篩選；明確指定名稱時不因 browser tag 排除"""
+    if names:
+        known = {s.skill for s in specs}
+        unknown = [n for n in names if n not in known]
+        if unknown:
+            raise ValueError(f"registry 中沒有這些技能: {', '.join(unknown)}")
+        return [s for s in specs if s.skill in names]
+    return [s for s in specs if include_browser or "browser" not in s.tags]
+
+
+# ============================================================================
+# Worker
+# ============================================================================
+
+_PLANE: Optional[DataPlane] = None
+
+
+def _init_worker(cache_dir: str, max_age_hours: float) -> None:
+    global _PLANE
+    _PLANE = DataPlane(cache_dir, max_age_hours=max_age_hours)
+    _PLANE.install()
+
+
+def extract_json(text: str) -> Optional[Any]:
+    """從技能的 stdout 取出 JSON（技能常在結果前後印出進度訊息；取最長的一段）"""
+    decoder = json.JSONDecoder()
+    best, best_len = None, 0
+    pos = 0
+    for line in text.splitlines(keepends=True):
+        if line.lstrip().startswith(("{", "[")):
+            start = pos + len(line) - len(line.lstrip())
+            try:
+                obj, end = decoder.raw_decode(text, start)
+            except json.JSONDecodeError:
+                pass
+            else:
+                if end - start > best_len:
+                    best, best_len = obj, end - start
+        pos += len(line)
+    return best
+
+
+def _load_skill_module(script: Path, skill: str):
+    name = "_portfolio_" + skill.replace("-", "_") + "_" + script.stem
+    spec = importlib.util.spec_from_file_location(name, script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _purge_skill_modules(before: set, skill_root: Path) -> None:
+    """移除該技能匯入的本地模組（第三方套件保留給下一個技能共用）"""
+    root = str(skill_root.resolve())
+    for name in set(sys.modules) - before:
+        path = getattr(sys.modules.get(name), "__file__", None)
+        if path and str(Path(path).resolve()).startswith(root):
+            del sys.modules[name]
+
+
+def run_skill(spec: SkillSpec, output_dir: str) -> SkillRun:
+    """在目前程序內執行一個技能（呼叫其 CLI main()，攔截輸出）"""
+    output_dir = Path(output_dir)
+    skill_root = SKILLS_DIR / spec.skill
+    script = skill_root / "scripts" / spec.script
+    workdir = output_dir / "work" / spec.skill
+    workdir.mkdir(parents=True, exist_ok=True)
+    (output_dir / "logs").mkdir(parents=True, exist_ok=True)
+    (output_dir / "results").mkdir(parents=True, exist_ok=True)
+
+    raw_output = workdir / "output.json"
+    if raw_output.exists():
+        raw_output.unlink()
+    fill = {"{output}": str(raw_output), "{workdir}": str(workdir)}
+
+    def _fill(text: str) -> str:
+        for token, value in fill.items():
+            text = text.replace(token, value)
+        return text
+
+    argv = [_fill(a) for a in spec.args]
+    result_path = Path(_fill(spec.result)) if spec.result else (raw_output if any("{output}" in a for a in spec.args) else None)
+    log_path = output_dir / "logs" / f"{spec.skill}.log"
+
+    saved_argv, saved_path, saved_cwd = sys.argv[:], sys.path[:], os.getcwd()
+    saved_modules = set(sys.modules)
+    root_logger = logging.getLogger()
+    saved_handlers, saved_level = root_logger.handlers[:], root_logger.level
+
+    if _PLANE is not None:
+        _PLANE.begin_skill(spec.skill)
+
+    # 技能可能寫入 sys.stdout.buffer，因此用帶 buffer 的 TextIOWrapper
+    captured = io.TextIOWrapper(io.BytesIO(), encoding="utf-8", write_through=True)
+    exit_code, error = 0, None
+    start = time.perf_counter()
+    try:
+        sys.argv = [str(script), *argv]
+        sys.path.insert(0, str(script.parent))
+        os.chdir(skill_root)
+        with redirect_stdout(captured), redirect_stderr(captured):
+            module = _load_skill_module(script, spec.skill)
+            getattr(module, spec.entry)()
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        if exit_code:
+            error = f"SystemExit({e.code})"
+    except BaseException as e:
+        if isinstance(e, KeyboardInterrupt):
+            raise
+        exit_code, error = 1, f"{type(e).__name__}: {e}"
+        traceback.print_exc(file=captured)
+    finally:
+        seconds = time.perf_counter() - start
+        sys.argv, sys.path[:] = saved_argv, saved_path
+        os.chdir(saved_cwd)
+        root_logger.handlers[:] = saved_handlers
+        root_logger.setLevel(saved_level)
+        _purge_skill_modules(saved_modules, skill_root)
+
+    plane_info = _PLANE.end_skill() if _PLANE is not None else {"stats": {}, "needs": [], "new_entries": {}}
+    log_text = captured.buffer.getvalue().decode("utf-8", errors="replace")
+    log_path.write_text(log_text, encoding="utf-8")
+
+    result = None
+    if result_path is not None and result_path.exists():
+        try:
+            result = json.loads(result_path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError as e:
+            error = error or f"結果檔不是 JSON: {e}"
+    elif not error:
+        result = extract_json(log_text)
+
+    result_file = None
+    if result is not None:
+        result_file = output_dir / "results" / f"{spec.skill}.json"
+        with open(result_file, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False, default=str)
+    elif not error:
+        error = "找不到結果 JSON"
+
+    return SkillRun(
+        skill=spec.skill,
+        status="ok" if error is None else "failed",
+        seconds=round(seconds, 3),
+        exit_code=exit_code,
+        result_file=str(result_file) if result_file else None,
+        log_file=str(log_path),
+        error=error,
+        data=plane_info["stats"],
+        needs=plane_info["needs"],
+        new_entries=plane_info["new_entries"],
+    )
+
+
+# ============================================================================
+# Orchestrator
+# ============================================================================
+
+def resolve_needs(specs: List[SkillSpec], plane: DataPlane) -> Dict[str, List[Dict[str, Any]]]:
+    """{skill: [need, ...]}：宣告的 needs 加上次學到的呼叫"""
+    learned = plane.load_learned_needs()
+    resolved = {}
+    for spec in specs:
+        declared = [n for n in (parse_need_spec(s) for s in spec.needs) if n is not None]
+        resolved[spec.skill] = declared + learned.get(spec.skill, [])
+    return resolved
+
+
+def shared_series(needs_by_skill: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[str]]:
+    """被兩個以上技能使用的序列 {source:id: [skill, ...]}"""
+    users: Dict[str, set] = {}
+    for skill, needs in needs_by_skill.items():
+        for need in needs:
+            label = f"{need['source']}:{need.get('id') or need.get('tickers')}"
+            users.setdefault(label, set()).add(skill)
+    return {label: sorted(skills) for label, skills in sorted(users.items()) if len(skills) > 1}
+
+
+def _previous_seconds(output_dir: Path) -> Dict[str, float]:
+    path = output_dir / SUMMARY_NAME
+    if not path.exists():
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return {s["skill"]: s["seconds"] for s in json.load(f).get("skills", [])}
+    except (OSError, json.JSONDecodeError, KeyError):
+        return {}
+
+
+def run_portfolio(
+    specs: List[SkillSpec],
+    output_dir: Path,
+    cache_dir: Path,
+    workers: Optional[int] = None,
+    prefetch: bool = True,
+    prefetch_workers: int = 8,
+    max_age_hours: float = DEFAULT_MAX_AGE_HOURS,
+    verbose: bool = True
+) -> Dict[str, Any]:
+    """
+    批次執行技能
+
+    Returns
+    -------
+    dict
+        portfolio summary（同時寫入 {output_dir}/portfolio_summary.json）
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    plane = DataPlane(cache_dir, max_age_hours=max_age_hours)
+    total_start = time.perf_counter()
+
+    needs_by_skill = resolve_needs(specs, plane)
+    prefetch_summary = None
+    if prefetch:
+        all_needs = [n for needs in needs_by_skill.values() for n in needs]
+        if verbose:
+            print(f"[1/2] 預抓共用資料（{len(plan_needs(all_needs))} 條合併後的序列）")
+        prefetch_summary = plane.prefetch(all_needs, workers=prefetch_workers, verbose=verbose)
+        if verbose:
+            print(f"  已快取 {prefetch_summary['cached']}、新抓 {prefetch_summary['fetched']}、"
+                  f"失敗 {len(prefetch_summary['failed'])}（{prefetch_summary['seconds']:.1f}s）")
+
+    # 上次較慢的技能先送出，縮短整體完成時間
+    previous = _previous_seconds(output_dir)
+    ordered = sorted(specs, key=lambda s: -previous.get(s.skill, float("inf")))
+    workers = workers or min(len(ordered), os.cpu_count() or 1)
+
+    if verbose:
+        print(f"[2/2] 執行 {len(ordered)} 個技能（workers={workers}）")
+
+    runs: List[SkillRun] = []
+
+    def _report(run: SkillRun):
+        runs.append(run)
+        if verbose:
+            mark = "✓" if run.status == "ok" else "✗"
+            hits, misses = run.data.get("hits", 0), run.data.get("misses", 0)
+            print(f"  {mark} {run.skill:<66} {run.seconds:7.1f}s  資料 命中 {hits} / 抓取 {misses}"
+                  + (f"  {run.error}" if run.error else ""))
+
+    if workers <= 1:
+        _init_worker(str(cache_dir), max_age_hours)
+        try:
+            for spec in ordered:
+                _report(run_skill(spec, str(output_dir)))
+        finally:
+            _PLANE.uninstall()
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(str(cache_dir), max_age_hours),
+        ) as executor:
+            futures = {executor.submit(run_skill, spec, str(output_dir)): spec for spec in ordered}
+            for future in as_completed(futures):
+                spec = futures[future]
+                try:
+                    _report(future.result())
+                except Exception as e:
+                    _report(SkillRun(skill=spec.skill, status="failed", seconds=0.0, error=f"worker 失敗: {e}"))
+
+    for run in runs:
+        plane.merge_entries(run.new_entries)
+    plane.save_index()
+    plane.save_learned_needs({run.skill: run.needs for run in runs})
+
+    learned = {run.skill: run.needs for run in runs if run.needs}
+    order = {spec.skill: i for i, spec in enumerate(specs)}
+    runs.sort(key=lambda r: order[r.skill])
+
+    summary = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "workers": workers,
+        "total_seconds": round(time.perf_counter() - total_start, 3),
+        "prefetch": prefetch_summary,
+        "data_plane": {
+            "hits": sum(r.data.get("hits", 0) for r in runs),
+            "misses": sum(r.data.get("misses", 0) for r in runs),
+            "shared_series": shared_series({**needs_by_skill, **learned}),
+        },
+        "counts": {
+            "ok": sum(r.status == "ok" for r in runs),
+            "failed": sum(r.status == "failed" for r in runs),
+        },
+        "skills": [
+            {k: v for k, v in asdict(r).items() if k not in ("needs", "new_entries")}
+            for r in runs
+        ],
+    }
+    with open(output_dir / SUMMARY_NAME, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    return summary
+
+
+def print_plan(specs: List[SkillSpec], cache_dir: Path) -> None:
+    """顯示需求合併計畫（不執行）"""
+    plane = DataPlane(cache_dir)
+    needs_by_skill = resolve_needs(specs, plane)
+    all_needs = [n for needs in needs_by_skill.values() for n in needs]
+    plan = plan_needs(all_needs)
+
+    print(f"技能 {len(specs)} 個，宣告/學到的需求 {len(all_needs)} 筆，合併後可預抓 {len(plan)} 條")
+    for key, need in sorted(plan.items()):
+        label = need.get("id") or need.get("tickers")
+        window = f"{need.get('start') or '…'} → {need.get('end') or 'latest'}"
+        print(f"  {need['source']:<6} {label:<24} {need.get('form', ''):<9} {window}")
+
+    shared = shared_series(needs_by_skill)
+    if shared:
+        print("\n跨技能共用的序列:")
+        for label, skills in shared.items():
+            print(f"  {label:<28} × {len(skills)}  ({', '.join(skills)})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="全技能批次執行器（共用資料平面）")
+    parser.add_argument("--skills", nargs="+", help="只執行指定技能（預設 registry 全部）")
+    parser.add_argument("--include-browser", action="store_true", help="包含需要 Chrome CDP 的技能")
+    parser.add_argument("--workers", type=int, default=None, help="worker 程序數（預設依 CPU 數；1 = 依序）")
+    parser.add_argument("--prefetch-workers", type=int, default=8, help="預抓執行緒數（預設 8）")
+    parser.add_argument("--no-prefetch", action="store_true", help="不預抓，只在執行時共用")
+    parser.add_argument("--max-age-hours", type=float, default=DEFAULT_MAX_AGE_HOURS,
+                        help=f"共用資料的有效時間（預設 {DEFAULT_MAX_AGE_HOURS:g} 小時）")
+    parser.add_argument("--output-dir", type=str, help=f"輸出目錄（預設 {DEFAULT_OUTPUT_DIR}）")
+    parser.add_argument("--cache-dir", type=str, help="資料平面 store 目錄（預設 {output-dir}/data_plane）")
+    parser.add_argument("--registry", type=str, default=str(REGISTRY_PATH), help="技能清單 JSON")
+    parser.add_argument("--list", action="store_true", help="列出 registry 技能後結束")
+    parser.add_argument("--plan", action="store_true", help="顯示資料需求合併計畫後結束")
+
+    args = parser.parse_args()
+
+    specs = load_registry(Path(args.registry))
+    if args.list:
+        for spec in specs:
+            tags = f" [{', '.join(spec.tags)}]" if spec.tags else ""
+            print(f"{spec.skill:<68} {spec.script}{tags}")
+        return
+
+    try:
+        specs = select_specs(specs, args.skills, args.include_browser)
+    except ValueError as e:
+        parser.error(str(e))
+
+    output_dir = Path(args.output_dir) if args.output_dir else DEFAULT_OUTPUT_DIR
+    cache_dir = Path(args.cache_dir) if args.cache_dir else output_dir / "data_plane"
+
+    if args.plan:
+        print_plan(specs, cache_dir)
+        return
+
+    summary = run_portfolio(
+        specs,
+        output_dir=output_dir,
+        cache_dir=cache_dir,
+        workers=args.workers,
+        prefetch=not args.no_prefetch,
+        prefetch_workers=args.prefetch_workers,
+        max_age_hours=args.max_age_hours,
+    )
+
+    counts = summary["counts"]
+    print(f"\n完成：成功 {counts['ok']}、失敗 {counts['failed']}，"
+          f"資料命中 {summary['data_plane']['hits']} / 抓取 {summary['data_plane']['misses']}，"
+          f"總耗時 {summary['total_seconds']:.1f}s")
+    print(f"摘要: {output_dir / SUMMARY_NAME}")
+
+    if counts["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
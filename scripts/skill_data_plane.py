@@ -0,0 +1,563 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Skill Data Plane - 跨技能共用的資料平面
+
+批次執行多個技能時，同一條序列（^GSPC、DGS10、GC=F ...）常被不同技能重複下載。
+資料平面在「函式庫邊界」攔截抓取呼叫，技能程式碼不需修改：
+
+- Yahoo Finance：`yfinance.download`、`yfinance.Ticker.history`
+- FRED：`fredgraph.csv` 的 HTTP 請求（`requests` 與 `pandas.read_csv(url)` 兩種寫法）
+
+抓取結果存放在共用 store（pickle + index.json），以「呼叫形狀」為鍵：
+
+- FRED：以 series id（與 cosd/coed 以外的參數）為鍵，一律抓完整歷史，
+  回應時再依 cosd/coed 篩選列，與直接請求的結果相同。
+- Yahoo：以（呼叫方式、代碼、interval、其餘參數）為鍵，保存涵蓋過的最大區間，
+  落在區間內的請求直接切片回傳（end 為不含端點，同 yfinance）；
+  使用 period 或未指定 start 的呼叫只在參數完全相同時共用。
+
+每個技能執行期間的請求都會記錄成 need，供下次批次執行時預先合併抓取。
+
+Usage:
+    from skill_data_plane import DataPlane
+
+    plane = DataPlane(cache_dir)
+    plane.prefetch(needs, workers=8)     # 主程序：合併需求、平行預抓
+    with plane.installed():              # worker：攔截技能內的抓取
+        plane.begin_skill("zeberg-salomon-rotator")
+        ...
+        stats = plane.end_skill()
+"""
+
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import pandas as pd
+
+try:
+    import requests
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+
+FRED_CSV_URL = "https://fred.stlouisfed.org/graph/fredgraph.csv"
+FRED_WINDOW_PARAMS = ("cosd", "coed")
+# 不影響回傳內容的 yfinance 參數（不納入鍵）
+YAHOO_IGNORED_KWARGS = {"progress", "threads", "timeout", "session", "proxy"}
+DEFAULT_MAX_AGE_HOURS = 12.0
+
+
+# ============================================================================
+# 需求（need）與鍵
+# ============================================================================
+
+def need_key(need: Dict[str, Any]) -> str:
+    """need 去掉時間窗後的正規化鍵（JSON 字串）"""
+    return json.dumps({k: v for k, v in need.items() if k not in ("start", "end")},
+                      sort_keys=True, ensure_ascii=False)
+
+
+def parse_need_spec(spec: str) -> Optional[Dict[str, Any]]:
+    """
+    解析 registry 的簡寫需求
+
+    "fred:DGS10" → {"source": "fred", "id": "DGS10", "params": {}}
+    "yahoo:^GSPC" → {"source": "yahoo", "tickers": "^GSPC"}（只宣告代碼，呼叫形狀由學習得到）
+    """
+    source, _, ident = spec.partition(":")
+    if source == "fred" and ident:
+        return {"source": "fred", "id": ident, "params": {}}
+    if source == "yahoo" and ident:
+        return {"source": "yahoo", "tickers": ident}
+    return None
+
+
+def _to_date_str(value: Any) -> Optional[str]:
+    if value is None or value == "":
+        return None
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+def _window_covers(outer: Tuple[Optional[str], Optional[str]],
+                   inner: Tuple[Optional[str], Optional[str]]) -> bool:
+    """outer 區間 [start, end) 是否涵蓋 inner（None end = 抓到最新）"""
+    o_start, o_end = outer
+    i_start, i_end = inner
+    if o_start is not None and (i_start is None or i_start < o_start):
+        return False
+    if o_end is not None and (i_end is None or i_end > o_end):
+        return False
+    return True
+
+
+def merge_windows(windows: Iterable[Tuple[Optional[str], Optional[str]]]) -> Tuple[Optional[str], Optional[str]]:
+    """多個時間窗的聯集（最早 start、最晚 end；任一為 None 即為 None）"""
+    starts, ends = zip(*windows)
+    start = None if any(s is None for s in starts) else min(starts)
+    end = None if any(e is None for e in ends) else max(ends)
+    return start, end
+
+
+def plan_needs(needs: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    合併同鍵需求，回傳 {key: need（時間窗為聯集）}
+
+    只有代碼、沒有呼叫形狀的 Yahoo 宣告（registry 簡寫）無法預抓，會被略過。
+    """
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    for need in needs:
+        if need.get("source") == "yahoo" and "form" not in need:
+            continue
+        grouped.setdefault(need_key(need), []).append(need)
+
+    plan = {}
+    for key, group in grouped.items():
+        start, end = merge_windows((n.get("start"), n.get("end")) for n in group)
+        plan[key] = {**group[0], "start": start, "end": end}
+    return plan
+
+
+# ============================================================================
+# FRED CSV
+# ============================================================================
+
+def _fred_request_parts(url: str, params: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """拆出 fredgraph 請求的 (身分參數, 時間窗參數)"""
+    query = dict(parse_qsl(urlsplit(url).query))
+    query.update({k: str(v) for k, v in (params or {}).items() if v is not None})
+    window = {k: query.pop(k) for k in FRED_WINDOW_PARAMS if k in query}
+    return query, window
+
+
+def filter_fred_csv(text: str, cosd: Optional[str] = None, coed: Optional[str] = None) -> str:
+    """依日期篩選 fredgraph CSV 的資料列（第一欄為 ISO 日期）"""
+    if cosd is None and coed is None:
+        return text
+    lines = text.splitlines()
+    if not lines:
+        return text
+    kept = [lines[0]]
+    for line in lines[1:]:
+        day = line.split(",", 1)[0]
+        if cosd is not None and day < cosd:
+            continue
+        if coed is not None and day > coed:
+            continue
+        kept.append(line)
+    return "\n".join(kept) + "\n"
+
+
+# ============================================================================
+# Yahoo Finance
+# ============================================================================
+
+def slice_frame(df: pd.DataFrame, start: Optional[str], end: Optional[str]) -> pd.DataFrame:
+    """依 [start, end) 切片（時區感知索引以該時區解讀日期）"""
+    if df is None or df.empty or not isinstance(df.index, pd.DatetimeIndex):
+        return df
+    mask = pd.Series(True, index=df.index)
+    tz = df.index.tz
+    if start is not None:
+        ts = pd.Timestamp(start)
+        mask &= df.index >= (ts.tz_localize(tz) if tz is not None else ts)
+    if end is not None:
+        ts = pd.Timestamp(end)
+        mask &= df.index < (ts.tz_localize(tz) if tz is not None else ts)
+    return df.loc[mask.values].copy()
+
+
+def _yahoo_options(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in sorted(kwargs.items())
+            if k not in YAHOO_IGNORED_KWARGS and isinstance(v, (str, int, float, bool, type(None)))}
+
+
+def _normalize_tickers(tickers: Any) -> str:
+    if isinstance(tickers, (list, tuple, set)):
+        return " ".join(sorted(str(t) for t in tickers))
+    return " ".join(sorted(str(tickers).replace(",", " ").split()))
+
+
+# ============================================================================
+# DataPlane
+# ============================================================================
+
+class DataPlane:
+    """
+    共用資料平面
+
+    Parameters
+    ----------
+    cache_dir : str or Path
+        store 目錄（`index.json` + `*.pkl`）
+    max_age_hours : float
+        store 項目的有效時間；超過即視為過期重新抓取
+    """
+
+    def __init__(self, cache_dir, max_age_hours: float = DEFAULT_MAX_AGE_HOURS):
+        self.cache_dir = Path(cache_dir)
+        self.store_dir = self.cache_dir / "store"
+        self.index_path = self.cache_dir / "index.json"
+        self.needs_path = self.cache_dir / "needs.json"
+        self.max_age_hours = max_age_hours
+
+        self._lock = threading.Lock()
+        self._index: Dict[str, Dict[str, Any]] = self._load_json(self.index_path, {})
+        self._memory: Dict[str, Any] = {}
+        self._originals: Dict[str, Any] = {}
+        self._skill: Optional[str] = None
+        self._reset_stats()
+
+    # ------------------------------------------------------------------
+    # store
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _load_json(path: Path, default):
+        if path.exists():
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (OSError, json.JSONDecodeError):
+                pass
+        return default
+
+    def _is_fresh(self, entry: Dict[str, Any]) -> bool:
+        age_hours = (time.time() - entry.get("fetched_at", 0)) / 3600
+        return age_hours <= self.max_age_hours and (self.store_dir / entry["file"]).exists()
+
+    def _lookup(self, key: str, window: Tuple[Optional[str], Optional[str]]):
+        """store 內涵蓋 window 的項目（記憶體優先），找不到回傳 None"""
+        entry = self._index.get(key)
+        if entry is None or not self._is_fresh(entry):
+            return None
+        if not _window_covers((entry.get("start"), entry.get("end")), window):
+            return None
+        if key not in self._memory:
+            self._memory[key] = pd.read_pickle(self.store_dir / entry["file"])
+        return self._memory[key]
+
+    def _store(self, key: str, window: Tuple[Optional[str], Optional[str]], value: Any, elapsed: float) -> Dict[str, Any]:
+        """寫入 store（檔名含時間窗，不同程序同時寫入也不會互相覆蓋）"""
+        digest = hashlib.sha1(f"{key}|{window}".encode("utf-8")).hexdigest()[:20]
+        entry = {
+            "file": f"{digest}.pkl",
+            "start": window[0],
+            "end": window[1],
+            "fetched_at": time.time(),
+            "fetch_seconds": round(elapsed, 3),
+        }
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.store_dir / f"{entry['file']}.{os.getpid()}.tmp"
+        pd.to_pickle(value, tmp_path)
+        os.replace(tmp_path, self.store_dir / entry["file"])
+        with self._lock:
+            self._index[key] = entry
+            self._memory[key] = value
+            self._new_entries[key] = entry
+        return entry
+
+    def save_index(self) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, indent=2, ensure_ascii=False)
+
+    def merge_entries(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        """併入 worker 新抓取的項目（時間窗較大者優先）"""
+        for key, entry in entries.items():
+            current = self._index.get(key)
+            if current is None or _window_covers((entry["start"], entry["end"]), (current["start"], current["end"])):
+                self._index[key] = entry
+
+    # ------------------------------------------------------------------
+    # 需求紀錄
+    # ------------------------------------------------------------------
+
+    def load_learned_needs(self) -> Dict[str, List[Dict[str, Any]]]:
+        """上次批次記錄的 {skill: [need, ...]}"""
+        return self._load_json(self.needs_path, {})
+
+    def save_learned_needs(self, needs_by_skill: Dict[str, List[Dict[str, Any]]]) -> None:
+        learned = self.load_learned_needs()
+        learned.update({skill: needs for skill, needs in needs_by_skill.items() if needs})
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.needs_path, "w", encoding="utf-8") as f:
+            json.dump(learned, f, indent=2, ensure_ascii=False)
+
+    def _reset_stats(self) -> None:
+        self._stats = {"hits": 0, "misses": 0, "fetch_seconds": 0.0}
+        self._needs: Dict[str, Dict[str, Any]] = {}
+        self._new_entries: Dict[str, Dict[str, Any]] = {}
+
+    def begin_skill(self, skill: str) -> None:
+        self._skill = skill
+        self._reset_stats()
+
+    def end_skill(self) -> Dict[str, Any]:
+        """結束技能，回傳 {stats, needs, new_entries}"""
+        result = {
+            "stats": {**self._stats, "fetch_seconds": round(self._stats["fetch_seconds"], 3)},
+            "needs": list(self._needs.values()),
+            "new_entries": dict(self._new_entries),
+        }
+        self._skill = None
+        self._reset_stats()
+        return result
+
+    def _record(self, need: Dict[str, Any]) -> None:
+        # end 到今天（或之後）代表「抓到最新」，記成開放區間，隔天的預抓才涵蓋得到
+        if need.get("end") is not None and need["end"] >= date.today().isoformat():
+            need = {**need, "end": None}
+        key = need_key(need)
+        window = (need.get("start"), need.get("end"))
+        if key in self._needs:
+            prev = self._needs[key]
+            window = merge_windows([(prev.get("start"), prev.get("end")), window])
+        self._needs[key] = {**need, "start": window[0], "end": window[1]}
+
+    # ------------------------------------------------------------------
+    # 抓取
+    # ------------------------------------------------------------------
+
+    def _fetch_fred_text(self, ident: Dict[str, str], session=None) -> str:
+        request = self._originals.get("requests.Session.request")
+        if HAS_REQUESTS:
+            session = session or requests.Session()
+            if request is not None:
+                response = request(session, "GET", FRED_CSV_URL, params=ident, timeout=30)
+            else:
+                response = session.get(FRED_CSV_URL, params=ident, timeout=30)
+            response.raise_for_status()
+            return response.text
+        from urllib.parse import urlencode
+        from urllib.request import urlopen
+        with urlopen(f"{FRED_CSV_URL}?{urlencode(ident)}", timeout=30) as resp:
+            return resp.read().decode("utf-8")
+
+    def fred_csv(self, url: str, params: Optional[Dict[str, Any]] = None, session=None) -> str:
+        """fredgraph CSV（完整歷史共用，依 cosd/coed 篩選回傳）"""
+        ident, window = _fred_request_parts(url, params)
+        need = {"source": "fred", "id": ident.pop("id", ""), "params": ident}
+        key = need_key(need)
+        if self._skill is not None:
+            self._record(need)
+
+        text = self._lookup(key, (None, None))
+        if text is not None:
+            self._stats["hits"] += 1
+        else:
+            self._stats["misses"] += 1
+            t0 = time.perf_counter()
+            text = self._fetch_fred_text({"id": need["id"], **need["params"]}, session=session)
+            elapsed = time.perf_counter() - t0
+            self._stats["fetch_seconds"] += elapsed
+            self._store(key, (None, None), text, elapsed)
+        return filter_fred_csv(text, window.get("cosd"), window.get("coed"))
+
+    def _call_yahoo(self, need: Dict[str, Any]) -> pd.DataFrame:
+        import yfinance as yf
+
+        kwargs = dict(need.get("options", {}))
+        if need.get("interval"):
+            kwargs["interval"] = need["interval"]
+        if need.get("start") is not None:
+            kwargs["start"] = need["start"]
+        if need.get("end") is not None:
+            kwargs["end"] = need["end"]
+
+        if need["form"] == "download":
+            download = self._originals.get("yfinance.download", yf.download)
+            return download(need["tickers"], progress=False, **kwargs)
+        history = self._originals.get("yfinance.Ticker.history", yf.Ticker.history)
+        return history(yf.Ticker(need["tickers"]), **kwargs)
+
+    def yahoo(self, need: Dict[str, Any], fetch=None) -> pd.DataFrame:
+        """
+        Yahoo 歷史（同鍵且時間窗被涵蓋時直接切片）
+
+        need 的 "exact" 為 True 時（period 或未指定 start 的呼叫）不切片，只共用完全相同的呼叫。
+        """
+        key = need_key(need)
+        window = (need.get("start"), need.get("end"))
+        if self._skill is not None:
+            self._record(need)
+
+        cached = self._lookup(key, window)
+        if cached is not None:
+            self._stats["hits"] += 1
+            return cached.copy() if need.get("exact") else slice_frame(cached, *window)
+
+        self._stats["misses"] += 1
+        t0 = time.perf_counter()
+        df = fetch() if fetch is not None else self._call_yahoo(need)
+        elapsed = time.perf_counter() - t0
+        self._stats["fetch_seconds"] += elapsed
+        if isinstance(df, pd.DataFrame) and not df.empty:
+            self._store(key, window, df, elapsed)
+        return df
+
+    # ------------------------------------------------------------------
+    # 預抓
+    # ------------------------------------------------------------------
+
+    def prefetch(self, needs: Iterable[Dict[str, Any]], workers: int = 8, verbose: bool = True) -> Dict[str, Any]:
+        """
+        合併需求並以執行緒平行預抓（已在 store 且新鮮者略過）
+
+        Returns
+        -------
+        dict
+            {"planned", "cached", "fetched", "failed", "seconds"}
+        """
+        plan = plan_needs(needs)
+        todo = {key: need for key, need in plan.items()
+                if self._lookup(key, (need.get("start"), need.get("end"))) is None}
+
+        summary = {"planned": len(plan), "cached": len(plan) - len(todo), "fetched": 0, "failed": [], "seconds": 0.0}
+        if not todo:
+            return summary
+
+        def _fetch(need):
+            if need["source"] == "fred":
+                return self.fred_csv(FRED_CSV_URL, {"id": need["id"], **need.get("params", {})})
+            return self.yahoo(need)
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = {executor.submit(_fetch, need): key for key, need in todo.items()}
+            for future in as_completed(futures):
+                need = todo[futures[future]]
+                label = need.get("id") or need.get("tickers")
+                try:
+                    future.result()
+                    summary["fetched"] += 1
+                    if verbose:
+                        print(f"  [prefetch] {need['source']}:{label}")
+                except Exception as e:
+                    summary["failed"].append({"need": need, "error": str(e)})
+                    if verbose:
+                        print(f"  [prefetch] {need['source']}:{label} 失敗: {e}")
+        summary["seconds"] = round(time.perf_counter() - t0, 3)
+        self.save_index()
+        return summary
+
+    # ------------------------------------------------------------------
+    # 攔截
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def installed(self):
+        """在 with 範圍內攔截 yfinance / FRED 抓取"""
+        self.install()
+        try:
+            yield self
+        finally:
+            self.uninstall()
+
+    def install(self) -> None:
+        if self._originals:
+            return
+        plane = self
+
+        original_read_csv = pd.read_csv
+        self._originals["pandas.read_csv"] = original_read_csv
+
+        def read_csv(filepath_or_buffer, *args, **kwargs):
+            if isinstance(filepath_or_buffer, str) and "fredgraph.csv" in filepath_or_buffer:
+                text = plane.fred_csv(filepath_or_buffer)
+                return original_read_csv(io.StringIO(text), *args, **kwargs)
+            return original_read_csv(filepath_or_buffer, *args, **kwargs)
+
+        pd.read_csv = read_csv
+
+        if HAS_REQUESTS:
+            original_request = requests.Session.request
+            self._originals["requests.Session.request"] = original_request
+
+            def request(session, method, url, *args, **kwargs):
+                if str(method).upper() == "GET" and "fredgraph.csv" in str(url):
+                    try:
+                        text = plane.fred_csv(str(url), kwargs.get("params"), session=session)
+                    except Exception:
+                        return original_request(session, method, url, *args, **kwargs)
+                    return _make_response(str(url), text)
+                return original_request(session, method, url, *args, **kwargs)
+
+            requests.Session.request = request
+
+        try:
+            import yfinance as yf
+        except ImportError:
+            return
+
+        original_download = yf.download
+        original_history = yf.Ticker.history
+        self._originals["yfinance.download"] = original_download
+        self._originals["yfinance.Ticker.history"] = original_history
+
+        def download(tickers, *args, **kwargs):
+            if args:
+                return original_download(tickers, *args, **kwargs)
+            need = _yahoo_need("download", tickers, kwargs)
+            return plane.yahoo(need, fetch=lambda: original_download(tickers, **kwargs))
+
+        def history(ticker_obj, *args, **kwargs):
+            if args:
+                return original_history(ticker_obj, *args, **kwargs)
+            need = _yahoo_need("history", ticker_obj.ticker, kwargs)
+            return plane.yahoo(need, fetch=lambda: original_history(ticker_obj, **kwargs))
+
+        yf.download = download
+        yf.Ticker.history = history
+
+    def uninstall(self) -> None:
+        if "pandas.read_csv" in self._originals:
+            pd.read_csv = self._originals["pandas.read_csv"]
+        if HAS_REQUESTS and "requests.Session.request" in self._originals:
+            requests.Session.request = self._originals["requests.Session.request"]
+        if "yfinance.download" in self._originals:
+            import yfinance as yf
+            yf.download = self._originals["yfinance.download"]
+            yf.Ticker.history = self._originals["yfinance.Ticker.history"]
+        self._originals = {}
+
+
+def _yahoo_need(form: str, tickers: Any, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """把 yfinance 呼叫轉成 need（period 或缺 start 的呼叫標記為 exact）"""
+    options = _yahoo_options({k: v for k, v in kwargs.items() if k not in ("start", "end", "interval")})
+    need = {
+        "source": "yahoo",
+        "form": form,
+        "tickers": _normalize_tickers(tickers),
+        "interval": kwargs.get("interval", "1d"),
+        "options": options,
+        "start": _to_date_str(kwargs.get("start")),
+        "end": _to_date_str(kwargs.get("end")),
+    }
+    if need["start"] is None or "period" in options:
+        need["exact"] = True
+        need["options"] = {**options, "start": need["start"], "end": need["end"]}
+    return need
+
+
+def _make_response(url: str, text: str):
+    """以快取內容組成 requests.Response"""
+    response = requests.models.Response()
+    response.status_code = 200
+    response.url = url
+    response.encoding = "utf-8"
+    response._content = text.encode("utf-8")
+    response.headers["Content-Type"] = "text/csv"
+    response.reason = "OK"
+    return response
+
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Startup Budget - 技能 CLI 啟動時間預算
+
+agent 常以 `--quick` / `--help` 反覆呼叫技能腳本，每次都要付一次 import 成本
+（pandas 約 0.5 秒、scipy.stats 約 1.4 秒、matplotlib 約 0.9 秒）。本工具在乾淨的
+子程序中量測每個 CLI 的啟動成本，與預算比較：
+
+1. 匯入：`python -X importtime` 匯入腳本模組，取該模組的累計匯入時間（不含直譯器本身
+   啟動），並列出最重的直接相依；缺少相依套件（loguru 等）的腳本記為 skipped
+2. --help：量測 `python script --help` 的牆鐘時間（含直譯器啟動，另列出空直譯器基準）
+3. 預算：匯入時間超過案例預算即記為 over_budget，exit 1
+
+各取 --repeat 次的最小值以過濾雜訊。`--all` 額外掃描所有具 `__main__` 入口的技能腳本，
+只列出匯入時間（不設預算），用來找出下一個該延遲匯入的腳本。
+
+Usage:
+    python scripts/startup_budget.py
+    python scripts/startup_budget.py --cases drain_detector valuation_percentile
+    python scripts/startup_budget.py --all --top 5
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+REPO_ROOT = Path(__file__).parent.parent
+SKILLS_DIR = REPO_ROOT / "skills"
+DEFAULT_OUTPUT_DIR = REPO_ROOT / "output" / "benchmarks"
+REPORT_NAME = "startup.json"
+DEFAULT_REPEAT = 3
+DEFAULT_TOP = 3
+DEFAULT_TIMEOUT = 120.0
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( +)(\S+)\s*$")
+MISSING_MODULE = re.compile(r"No module named '([^']+)'")
+
+
+# ============================================================================
+# 案例
+# ============================================================================
+
+@dataclass
+class StartupCase:
+    """
+    一個 CLI 的啟動預算
+
+    Parameters
+    ----------
+    skill, script : str
+        技能目錄與 scripts/ 下的腳本
+    budget_ms : float
+        模組匯入時間上限（毫秒）
+    help : bool
+        是否量測 `--help`（無 argparse 的腳本設 False）
+    note : str
+        預算依據（例：quick 快照命中時不需 pandas）
+    """
+    skill: str
+    script: str
+    budget_ms: float
+    help: bool = True
+    note: str = ""
+
+    @property
+    def name(self) -> str:
+        return f"{self.skill}:{Path(self.script).stem}"
+
+    @property
+    def path(self) -> Path:
+        return SKILLS_DIR / self.skill / "scripts" / self.script
+
+
+# 預算以「只匯入標準庫即可回應」為目標；需要 numpy 的純計算 CLI 放寬到 numpy 的匯入成本
+CASES: List[StartupCase] = [
+    StartupCase("detect-us-equity-valuation-percentile-extreme", "valuation_percentile.py", 200,
+                note="--quick 快照命中時不匯入 pandas / yfinance / requests"),
+    StartupCase("detect-shanghai-silver-stock-drain", "drain_detector.py", 200,
+                note="--quick 快照命中時不匯入 pandas"),
+    StartupCase("cost-density-net-rr-calculator", "cost_density.py", 100, help=False,
+                note="純標準庫計算"),
+    StartupCase("cost-density-net-rr-calculator", "scenario_grid.py", 300,
+                note="numpy 必要；pandas 只在寫出 Parquet 時載入"),
+    StartupCase("google-trends-ath-detector", "trend_fetcher.py", 200,
+                note="selenium / bs4 只在實際爬取時載入，--csv 不需要"),
+]
+
+
+def select_cases(names: Optional[List[str]]) -> List[StartupCase]:
+    """依技能名、腳本名（含或不含 .py）或 技能:腳本 篩選"""
+    if not names:
+        return list(CASES)
+    selected = []
+    for name in names:
+        matched = [
+            c for c in CASES
+            if name in (c.name, c.skill, c.script, Path(c.script).stem)
+        ]
+        if not matched:
+            raise ValueError(f"未知案例: {name}（可用: {', '.join(c.name for c in CASES)}）")
+        selected.extend(c for c in matched if c not in selected)
+    return selected
+
+
+def discover_scripts() -> List[StartupCase]:
+    """所有具 `__main__` 入口的技能腳本（不含 tests/），預算為 0 表示只報告不檢查"""
+    found = []
+    for path in sorted(SKILLS_DIR.glob("*/scripts/*.py")):
+        try:
+            text = path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            continue
+        if "__main__" not in text:
+            continue
+        found.append(StartupCase(path.parent.parent.name, path.name, 0, help="argparse" in text))
+    return found
+
+
+# ============================================================================
+# 量測
+# ============================================================================
+
+@dataclass
+class StartupResult:
+    """單一 CLI 的量測結果"""
+    case: str
+    script: str
+    status: str                      # ok | over_budget | skipped | failed | report
+    budget_ms: Optional[float] = None
+    import_ms: Optional[float] = None
+    help_ms: Optional[float] = None
+    heaviest: List[Dict[str, Any]] = field(default_factory=list)
+    note: str = ""
+    error: Optional[str] = None
+
+
+def parse_importtime(stderr: str, module: str) -> Tuple[Optional[float], List[Dict[str, Any]]]:
+    """
+    解析 `-X importtime` 輸出
+
+    輸出為後序（子模組先於父模組），因此目標模組之前、直到上一個頂層匯入為止的
+    第一層項目即為它的直接相依。
+
+    Returns
+    -------
+    (累計毫秒, [{"module", "cumulative_ms"}...] 依耗時遞減)
+    """
+    rows = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            depth = (len(match.group(3)) - 1) // 2
+            rows.append((match.group(4), depth, int(match.group(2))))
+
+    for i in range(len(rows) - 1, -1, -1):
+        name, depth, cumulative = rows[i]
+        if name == module and depth == 0:
+            children = []
+            for child, child_depth, child_cum in reversed(rows[:i]):
+                if child_depth == 0:
+                    break
+                if child_depth == 1:
+                    children.append({"module": child, "cumulative_ms": round(child_cum / 1000, 1)})
+            children.sort(key=lambda c: c["cumulative_ms"], reverse=True)
+            return cumulative / 1000, children
+    return None, []
+
+
+def _error_summary(stderr: str) -> str:
+    lines = [ln for ln in stderr.strip().splitlines() if not ln.startswith("import time:")]
+    return lines[-1] if lines else "未知錯誤"
+
+
+def measure_import(path: Path, repeat: int, timeout: float) -> Dict[str, Any]:
+    """在子程序中匯入腳本模組 repeat 次，取累計匯入時間最小的一次"""
+    code = f"import sys; sys.path.insert(0, {str(path.parent)!r}); import {path.stem}"
+    best: Optional[Tuple[float, List[Dict[str, Any]]]] = None
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=REPO_ROOT, capture_output=True, text=True, timeout=timeout,
+        )
+        if proc.returncode != 0:
+            error = _error_summary(proc.stderr)
+            missing = MISSING_MODULE.search(error)
+            return {"status": "skipped" if missing else "failed", "error": error}
+        total, children = parse_importtime(proc.stderr, path.stem)
+        if total is None:
+            return {"status": "failed", "error": "importtime 輸出中找不到模組"}
+        if best is None or total < best[0]:
+            best = (total, children)
+    return {"status": "ok", "import_ms": round(best[0], 1), "heaviest": best[1]}
+
+
+def measure_command(args: List[str], repeat: int, timeout: float) -> Optional[float]:
+    """命令的最短牆鐘時間（毫秒）；失敗回傳 None"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, *args],
+            cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=timeout,
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+        if proc.returncode != 0:
+            return None
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best, 1)
+
+
+def run_case(case: StartupCase, repeat: int, top: int, timeout: float) -> StartupResult:
+    result = StartupResult(case=case.name, script=str(case.path.relative_to(REPO_ROOT)),
+                           status="report", budget_ms=case.budget_ms or None, note=case.note)
+    if not case.path.exists():
+        result.status, result.error = "failed", "腳本不存在"
+        return result
+
+    try:
+        measured = measure_import(case.path, repeat, timeout)
+    except subprocess.TimeoutExpired:
+        result.status, result.error = "failed", f"匯入超過 {timeout:g} 秒"
+        return result
+    if measured["status"] != "ok":
+        result.status, result.error = measured["status"], measured["error"]
+        return result
+
+    result.import_ms = measured["import_ms"]
+    result.heaviest = measured["heaviest"][:top]
+    if case.help:
+        try:
+            result.help_ms = measure_command([str(case.path), "--help"], repeat, timeout)
+        except subprocess.TimeoutExpired:
+            result.help_ms = None
+    if case.budget_ms:
+        result.status = "over_budget" if result.import_ms > case.budget_ms else "ok"
+    return result
+
+
+# ============================================================================
+# 報告
+# ============================================================================
+
+def environment_info(interpreter_ms: Optional[float]) -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "interpreter_ms": interpreter_ms,
+    }
+
+
+def print_summary(results: List[StartupResult], interpreter_ms: Optional[float]) -> None:
+    print(f"\n空直譯器啟動: {interpreter_ms} ms")
+    print(f"\n{'案例':<72} {'匯入 (ms)':>10} {'預算 (ms)':>10} {'--help (ms)':>12}  最重的相依")
+    for r in results:
+        if r.import_ms is None:
+            print(f"{r.case:<72} {r.status:>10}  {r.error or ''}")
+            continue
+        budget = f"{r.budget_ms:10.0f}" if r.budget_ms else f"{'-':>10}"
+        help_ms = f"{r.help_ms:12.1f}" if r.help_ms is not None else f"{'-':>12}"
+        heaviest = ", ".join(f"{h['module']} {h['cumulative_ms']:.0f}" for h in r.heaviest)
+        flag = "  ▲ 超出預算" if r.status == "over_budget" else ""
+        print(f"{r.case:<72} {r.import_ms:10.1f} {budget} {help_ms}  {heaviest}{flag}")
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="技能 CLI 啟動時間預算")
+    parser.add_argument("--cases", nargs="+", help="只跑指定案例（技能名、腳本名或 技能:腳本）")
+    parser.add_argument("--all", action="store_true", help="另外掃描所有技能腳本（只報告，不檢查預算）")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help=f"重複次數，取最小值（預設 {DEFAULT_REPEAT}）")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help=f"列出最重的直接相依數（預設 {DEFAULT_TOP}）")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help=f"單一子程序逾時秒數（預設 {DEFAULT_TIMEOUT:g}）")
+    parser.add_argument("--output-dir", type=str, help=f"輸出目錄（預設 {DEFAULT_OUTPUT_DIR}）")
+    parser.add_argument("--list", action="store_true", help="列出案例後結束")
+
+    args = parser.parse_args()
+
+    try:
+        cases = select_cases(args.cases)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.all:
+        budgeted = {c.path for c in cases}
+        cases += [c for c in discover_scripts() if c.path not in budgeted]
+
+    if args.list:
+        for case in cases:
+            budget = f"{case.budget_ms:g} ms" if case.budget_ms else "-"
+            print(f"{case.name:<72} {budget:>8}  {case.note}")
+        return
+
+    print(f"啟動預算：{len(cases)} 個腳本，repeat={args.repeat}", file=sys.stderr)
+    interpreter_ms = measure_command(["-c", "pass"], args.repeat, args.timeout)
+    results = [run_case(case, args.repeat, args.top, args.timeout) for case in cases]
+
+    output_dir = Path(args.output_dir) if args.output_dir else DEFAULT_OUTPUT_DIR
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "environment": environment_info(interpreter_ms),
+        "settings": {"repeat": args.repeat, "all": args.all},
+        "results": {r.case: asdict(r) for r in results},
+    }
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open(output_dir / REPORT_NAME, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print_summary(results, interpreter_ms)
+
+    over = [r for r in results if r.status == "over_budget"]
+    failed = [r for r in results if r.status == "failed" and r.budget_ms]
+    print(f"\n完成：符合預算 {sum(r.status == 'ok' for r in results)}、超出 {len(over)}、"
+          f"略過 {sum(r.status == 'skipped' for r in results)}、失敗 {len(failed)}")
+    print(f"結果: {output_dir / REPORT_NAME}")
+
+    if over or failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
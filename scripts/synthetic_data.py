@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Synthetic Data - 基準測試用的合成時間序列
+
+各技能內建的模擬資料（`generate_mock_holdings`、`_generate_mock_data` 等）長度固定、
+只為單一技能服務；基準測試需要「任意長度 × 任意資產數」且可重現的輸入，
+因此集中在這裡產生：
+
+- 價格：幾何隨機漫步（points × assets），欄名 A000、A001 ...
+- OHLC：由收盤價加上日內振幅推出 Open / High / Low / Close / Volume
+- 振盪指標：正弦循環 + AR(1) 雜訊，模擬領先 / 同時指標、Z 分數類序列
+- 庫存：緩慢下滑的正值水位，模擬交易所 / ETF 庫存
+
+同一 (seed, points, assets) 產生的資料完全相同。
+
+Usage:
+    from synthetic_data import price_panel, price_series, ohlc_frame
+
+    panel = price_panel(10_000, assets=100, seed=0)
+    close = price_series(2_500, freq="W-FRI")
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_START = "1700-01-01"
+# 日期上限：超過 datetime64[ns]（2262 年）的日期在部分技能的 .date() / strftime 會失敗
+MAX_YEAR = 2200
+
+
+def synthetic_index(points: int, freq: str = "B", start: str = DEFAULT_START) -> pd.DatetimeIndex:
+    """
+    產生 points 個日期；週 / 月頻率在 10 萬點時會超過 MAX_YEAR，
+    此時改用日頻（只影響日期標籤，不影響計算量）
+    """
+    try:
+        index = pd.date_range(start=start, periods=points, freq=freq)
+        if points == 0 or index[-1].year <= MAX_YEAR:
+            return index
+    except (OverflowError, pd.errors.OutOfBoundsDatetime):
+        pass
+    return pd.date_range(start=start, periods=points, freq="D")
+
+
+def _rng(seed: int) -> np.random.Generator:
+    return np.random.default_rng(seed)
+
+
+def price_panel(
+    points: int,
+    assets: int = 1,
+    freq: str = "B",
+    seed: int = 0,
+    start_price: float = 100.0,
+    drift: float = 0.0002,
+    vol: float = 0.01,
+) -> pd.DataFrame:
+    """
+    幾何隨機漫步價格面板
+
+    Parameters
+    ----------
+    points : int
+        時間點數
+    assets : int
+        資產數（欄數）
+    freq : str
+        日期頻率
+    seed : int
+        亂數種子
+    start_price, drift, vol : float
+        起始價格、每期漂移與波動度；各資產的波動度在 0.5x-1.5x 間分散
+
+    Returns
+    -------
+    pd.DataFrame
+        points × assets 價格
+    """
+    rng = _rng(seed)
+    scale = vol * rng.uniform(0.5, 1.5, size=assets)
+    log_ret = drift + rng.standard_normal((points, assets)) * scale
+    log_ret[0] = 0.0
+    prices = start_price * np.exp(np.cumsum(log_ret, axis=0))
+    columns = [f"A{i:03d}" for i in range(assets)]
+    return pd.DataFrame(prices, index=synthetic_index(points, freq), columns=columns)
+
+
+def price_series(points: int, freq: str = "B", seed: int = 0, **kwargs) -> pd.Series:
+    """單一資產價格（price_panel 的第一欄）"""
+    series = price_panel(points, 1, freq=freq, seed=seed, **kwargs).iloc[:, 0]
+    series.name = "price"
+    return series
+
+
+def ohlc_frame(points: int, freq: str = "B", seed: int = 0, **kwargs) -> pd.DataFrame:
+    """OHLCV：收盤價為隨機漫步，高低點為收盤價加減隨機日內振幅"""
+    rng = _rng(seed + 1)
+    close = price_series(points, freq=freq, seed=seed, **kwargs).to_numpy()
+    open_ = np.concatenate([[close[0]], close[:-1]]) * (1 + rng.normal(0, 0.002, points))
+    span = np.abs(rng.normal(0, 0.008, points)) * close
+    high = np.maximum(open_, close) + span * rng.uniform(0, 1, points)
+    low = np.minimum(open_, close) - span * rng.uniform(0, 1, points)
+    volume = rng.integers(1_000, 100_000, points).astype(float)
+    return pd.DataFrame(
+        {"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume},
+        index=synthetic_index(points, freq),
+    )
+
+
+def oscillator_series(
+    points: int,
+    freq: str = "ME",
+    seed: int = 0,
+    period: float = 60.0,
+    amplitude: float = 1.0,
+    noise: float = 0.3,
+    phase: float = 0.0,
+    name: Optional[str] = None,
+) -> pd.Series:
+    """
+    正弦循環 + AR(1) 雜訊，平均約 0、振幅約 amplitude
+
+    用來模擬領先 / 同時指標：兩條序列給相同 period、不同 phase 即有領先落後關係。
+    """
+    rng = _rng(seed)
+    t = np.arange(points)
+    shocks = rng.standard_normal(points) * noise
+    ar = np.empty(points)
+    level = 0.0
+    for i in range(points):
+        level = 0.7 * level + shocks[i]
+        ar[i] = level
+    values = amplitude * np.sin(2 * np.pi * t / period + phase) + ar
+    return pd.Series(values, index=synthetic_index(points, freq), name=name)
+
+
+def inventory_series(
+    points: int,
+    freq: str = "W-FRI",
+    seed: int = 0,
+    base: float = 1_000_000.0,
+    trend: float = -0.3,
+    vol: float = 0.02,
+) -> pd.Series:
+    """正值庫存水位：對數隨機漫步加上整段 trend 的線性下滑"""
+    rng = _rng(seed)
+    log_level = np.log(base) + np.cumsum(rng.normal(0, vol, points)) + np.linspace(0, trend, points)
+    return pd.Series(np.exp(log_level), index=synthetic_index(points, freq), name="inventory")
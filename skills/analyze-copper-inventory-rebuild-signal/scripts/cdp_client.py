@@ -0,0 +1,768 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共用 Chrome DevTools Protocol (CDP) 客戶端
+
+每個分頁（target）只維持一條持久 WebSocket，以遞增的 request id 多工收發，
+背景執行緒負責把回應分派給等待中的呼叫、把事件分派給訂閱者。
+頁面就緒改為事件驅動：
+
+- Page.loadEventFired / Page.domContentEventFired（導航完成）
+- Network.requestWillBeSent / loadingFinished / loadingFailed（網路閒置）
+- Highcharts 探針（圖表已有資料且點數穩定）
+
+CDPTabPool 在同一個 Chrome 開多個分頁平行處理，並限制每個網域的並行數。
+
+取代各爬蟲中「每次呼叫開一條新 WebSocket + 固定 time.sleep」的寫法。
+本檔在各 skill 的 scripts/ 中保持相同內容（skill 以目錄為單位獨立打包）。
+
+Usage:
+    from cdp_client import CDPBrowser, CDPTabPool
+
+    browser = CDPBrowser(port=9222)
+    session = browser.attach("tradingeconomics")
+    session.navigate("https://tradingeconomics.com/commodity/urea")
+    session.wait_for_highcharts(timeout=25)
+    charts = session.evaluate(EXTRACT_HIGHCHARTS_JS)
+
+    # 多分頁平行：每完成一頁即回呼
+    with CDPTabPool(browser, size=4, per_domain=4) as pool:
+        pool.map(fetch_one, symbols, url_of=symbol_url, on_result=save)
+
+    # 相容舊介面
+    from cdp_client import get_cdp_ws_url, cdp_execute_js
+    result = cdp_execute_js(get_cdp_ws_url(9222, "macromicro"), "1 + 1")
+
+Dependencies:
+    pip install websocket-client requests
+"""
+
+import atexit
+import itertools
+import json
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import websocket
+except ImportError:
+    websocket = None
+
+DEFAULT_PORT = 9222
+DEFAULT_TIMEOUT = 30.0
+POLL_INTERVAL = 0.2
+
+# 網路閒置判定：進行中請求數 <= NETWORK_IDLE_MAX_INFLIGHT 持續 NETWORK_IDLE_SECONDS
+# （允許長連線/輪詢請求存在，類似 networkidle2）
+NETWORK_IDLE_SECONDS = 0.5
+NETWORK_IDLE_MAX_INFLIGHT = 2
+
+# 回傳頁面上所有 Highcharts series 中最長的資料點數（無圖表時為 0）
+HIGHCHARTS_POINTS_JS = '''
+(function() {
+    if (typeof Highcharts === 'undefined' || !Highcharts.charts) return 0;
+    var n = 0;
+    Highcharts.charts.forEach(function(c) {
+        if (!c || !c.series) return;
+        c.series.forEach(function(s) {
+            var len = (s.xData && s.xData.length) || (s.data && s.data.length) || 0;
+            if (len > n) n = len;
+        });
+    });
+    return n;
+})()
+'''
+
+# 最長 series 的「點數:首個 x:最後 x」，用來偵測切換 1Y/5Y 後資料是否已更新
+HIGHCHARTS_SIGNATURE_JS = '''
+(function() {
+    if (typeof Highcharts === 'undefined' || !Highcharts.charts) return '';
+    var best = null, n = -1;
+    Highcharts.charts.forEach(function(c) {
+        if (!c || !c.series) return;
+        c.series.forEach(function(s) {
+            var len = (s.xData && s.xData.length) || 0;
+            if (len > n) { n = len; best = s; }
+        });
+    });
+    if (!best || n <= 0) return '';
+    return n + ':' + best.xData[0] + ':' + best.xData[n - 1];
+})()
+'''
+
+
+class CDPError(RuntimeError):
+    """CDP 指令失敗或連線中斷"""
+
+
+class CDPTimeout(CDPError):
+    """等待回應或事件逾時"""
+
+
+class _EventWaiter:
+    """先訂閱、後等待，避免事件在送出指令與開始等待之間遺失"""
+
+    def __init__(self, session: "CDPSession", method: str, predicate: Optional[Callable[[Dict], bool]] = None):
+        self._session = session
+        self._method = method
+        self._predicate = predicate
+        self._queue: "queue.Queue[Dict]" = queue.Queue()
+        session.on(method, self._on_event)
+
+    def _on_event(self, params: Dict) -> None:
+        if self._predicate is None or self._predicate(params):
+            self._queue.put(params)
+
+    def wait(self, timeout: Optional[float] = None) -> Dict:
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            raise CDPTimeout(f"等待事件 {self._method} 逾時 ({timeout}s)")
+        finally:
+            self.cancel()
+
+    def cancel(self) -> None:
+        self._session.off(self._method, self._on_event)
+
+
+class CDPSession:
+    """
+    單一分頁的持久 CDP 連線
+
+    Parameters
+    ----------
+    ws_url : str
+        分頁的 webSocketDebuggerUrl
+    timeout : float
+        指令預設逾時秒數
+    """
+
+    def __init__(self, ws_url: str, timeout: float = DEFAULT_TIMEOUT):
+        if websocket is None:
+            raise ImportError("websocket-client not installed. Run: pip install websocket-client")
+
+        self.ws_url = ws_url
+        self.timeout = timeout
+        self._ws = websocket.create_connection(ws_url, timeout=timeout, suppress_origin=True)
+        self._ws.settimeout(1.0)  # 讓讀取執行緒可週期性檢查關閉旗標
+
+        self._ids = itertools.count(1)
+        self._send_lock = threading.Lock()
+        self._pending: Dict[int, "queue.Queue[Dict]"] = {}
+        self._pending_lock = threading.Lock()
+        self._listeners: Dict[str, List[Callable[[Dict], None]]] = {}
+        self._listeners_lock = threading.Lock()
+        self._enabled: set = set()
+        self._inflight: set = set()
+        self._last_network_activity = time.monotonic()
+        self._closed = False
+        self._error: Optional[BaseException] = None
+
+        self._reader = threading.Thread(target=self._read_loop, name="cdp-reader", daemon=True)
+        self._reader.start()
+
+    # ------------------------------------------------------------------
+    # 連線與分派
+    # ------------------------------------------------------------------
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def _read_loop(self) -> None:
+        while not self._closed:
+            try:
+                raw = self._ws.recv()
+            except websocket.WebSocketTimeoutException:
+                continue
+            except Exception as e:
+                if not self._closed:
+                    self._fail(e)
+                return
+            if not raw:
+                continue
+
+            # 壞掉的訊息框也要讓等待中的 send() 立即失敗，而非各自等到逾時
+            try:
+                msg = json.loads(raw)
+                if "id" in msg:
+                    with self._pending_lock:
+                        slot = self._pending.pop(msg["id"], None)
+                    if slot is not None:
+                        slot.put(msg)
+                elif "method" in msg:
+                    self._dispatch(msg["method"], msg.get("params", {}))
+            except Exception as e:
+                self._fail(e)
+                return
+
+    def _fail(self, error: BaseException) -> None:
+        self._error = error
+        self._closed = True
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for slot in pending.values():
+            slot.put({"error": {"message": f"connection closed: {error}"}})
+
+    def _dispatch(self, method: str, params: Dict) -> None:
+        if method == "Inspector.detached":
+            self._fail(CDPError(params.get("reason", "detached")))
+            return
+        with self._listeners_lock:
+            callbacks = list(self._listeners.get(method, ()))
+        for callback in callbacks:
+            try:
+                callback(params)
+            except Exception:
+                pass
+
+    def on(self, method: str, callback: Callable[[Dict], None]) -> None:
+        """訂閱事件（callback 在讀取執行緒中執行，須保持輕量）"""
+        with self._listeners_lock:
+            self._listeners.setdefault(method, []).append(callback)
+
+    def off(self, method: str, callback: Callable[[Dict], None]) -> None:
+        """取消訂閱"""
+        with self._listeners_lock:
+            callbacks = self._listeners.get(method, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def expect(self, method: str, predicate: Optional[Callable[[Dict], bool]] = None) -> _EventWaiter:
+        """在觸發動作之前建立事件等待器"""
+        return _EventWaiter(self, method, predicate)
+
+    # ------------------------------------------------------------------
+    # 指令
+    # ------------------------------------------------------------------
+
+    def send_raw(self, method: str, params: Optional[Dict] = None, timeout: Optional[float] = None) -> Dict:
+        """送出指令並回傳完整回應訊息（含 id / result / error）"""
+        if self._closed:
+            raise CDPError(f"CDP session closed: {self._error}")
+
+        msg_id = next(self._ids)
+        slot: "queue.Queue[Dict]" = queue.Queue(maxsize=1)
+        with self._pending_lock:
+            self._pending[msg_id] = slot
+
+        payload = {"id": msg_id, "method": method}
+        if params:
+            payload["params"] = params
+        with self._send_lock:
+            self._ws.send(json.dumps(payload))
+
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return slot.get(timeout=timeout)
+        except queue.Empty:
+            with self._pending_lock:
+                self._pending.pop(msg_id, None)
+            raise CDPTimeout(f"{method} 逾時 ({timeout}s)")
+
+    def send(self, method: str, params: Optional[Dict] = None, timeout: Optional[float] = None) -> Dict:
+        """送出指令並回傳 result；失敗時拋出 CDPError"""
+        msg = self.send_raw(method, params, timeout)
+        if "error" in msg:
+            raise CDPError(f"{method}: {msg['error'].get('message', msg['error'])}")
+        return msg.get("result", {})
+
+    def enable(self, *domains: str) -> None:
+        """啟用 domain 事件（每個 domain 只啟用一次）"""
+        for domain in domains:
+            if domain in self._enabled:
+                continue
+            if domain == "Network":
+                self.on("Network.requestWillBeSent", self._on_request_start)
+                self.on("Network.loadingFinished", self._on_request_end)
+                self.on("Network.loadingFailed", self._on_request_end)
+            self.send(f"{domain}.enable")
+            self._enabled.add(domain)
+
+    def evaluate(self, expression: str, timeout: Optional[float] = None, await_promise: bool = False) -> Any:
+        """執行 JavaScript 並回傳值（returnByValue）"""
+        result = self.send(
+            "Runtime.evaluate",
+            {"expression": expression, "returnByValue": True, "awaitPromise": await_promise},
+            timeout,
+        )
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            text = details.get("exception", {}).get("description") or details.get("text")
+            raise CDPError(f"JavaScript 例外: {text}")
+        return result.get("result", {}).get("value")
+
+    # ------------------------------------------------------------------
+    # 就緒判定
+    # ------------------------------------------------------------------
+
+    def _on_request_start(self, params: Dict) -> None:
+        self._inflight.add(params.get("requestId"))
+        self._last_network_activity = time.monotonic()
+
+    def _on_request_end(self, params: Dict) -> None:
+        self._inflight.discard(params.get("requestId"))
+        self._last_network_activity = time.monotonic()
+
+    def navigate(
+        self,
+        url: str,
+        wait_until: Optional[str] = "load",
+        timeout: Optional[float] = None,
+    ) -> Dict:
+        """
+        導航並等待頁面事件
+
+        Parameters
+        ----------
+        url : str
+            目標 URL
+        wait_until : str or None
+            "load"（Page.loadEventFired）、"domcontentloaded" 或 None（不等待）
+        timeout : float
+            等待逾時秒數
+        """
+        self.enable("Page", "Network")
+        self._inflight.clear()
+
+        event = {
+            "load": "Page.loadEventFired",
+            "domcontentloaded": "Page.domContentEventFired",
+        }.get(wait_until or "")
+        waiter = self.expect(event) if event else None
+
+        try:
+            result = self.send("Page.navigate", {"url": url}, timeout)
+            if result.get("errorText"):
+                raise CDPError(f"導航失敗: {result['errorText']}")
+            if waiter:
+                waiter.wait(self.timeout if timeout is None else timeout)
+        finally:
+            if waiter:
+                waiter.cancel()
+        return result
+
+    def wait_for_network_idle(
+        self,
+        idle_seconds: float = NETWORK_IDLE_SECONDS,
+        max_inflight: int = NETWORK_IDLE_MAX_INFLIGHT,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """等待網路閒置；逾時回傳 False（不拋例外）"""
+        self.enable("Network")
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        while time.monotonic() < deadline:
+            quiet = time.monotonic() - self._last_network_activity
+            if len(self._inflight) <= max_inflight and quiet >= idle_seconds:
+                return True
+            time.sleep(POLL_INTERVAL / 2)
+        return False
+
+    def wait_for(
+        self,
+        expression: str,
+        timeout: Optional[float] = None,
+        interval: float = POLL_INTERVAL,
+    ) -> Any:
+        """輪詢 JavaScript 探針直到回傳 truthy 值，逾時拋出 CDPTimeout"""
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                value = self.evaluate(expression)
+            except CDPError:
+                # 導航中 execution context 可能暫時不存在
+                if self._closed:
+                    raise
+                value = None
+            if value:
+                return value
+            if time.monotonic() >= deadline:
+                raise CDPTimeout(f"等待頁面條件逾時 ({timeout}s)")
+            time.sleep(interval)
+
+    def wait_for_highcharts(
+        self,
+        min_points: int = 1,
+        timeout: Optional[float] = None,
+        stable_polls: int = 2,
+    ) -> int:
+        """
+        等待 Highcharts 出現資料且點數不再增加
+
+        Returns
+        -------
+        int
+            最長 series 的點數
+        """
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        self.wait_for(f"({HIGHCHARTS_POINTS_JS}) >= {int(min_points)}", timeout=timeout)
+
+        last, stable = -1, 0
+        while stable < stable_polls and time.monotonic() < deadline:
+            points = self.evaluate(HIGHCHARTS_POINTS_JS) or 0
+            stable = stable + 1 if points == last else 0
+            last = points
+            if stable < stable_polls:
+                time.sleep(POLL_INTERVAL)
+        return last
+
+    def highcharts_signature(self) -> str:
+        """最長 series 的簽章（點數:首個 x:最後 x）"""
+        return self.evaluate(HIGHCHARTS_SIGNATURE_JS) or ""
+
+    def click_and_wait_for_chart(
+        self,
+        click_js: str,
+        timeout: Optional[float] = None,
+    ) -> Tuple[Dict, bool]:
+        """
+        執行點擊腳本（回傳 JSON 字串），並等待圖表資料改變
+
+        Returns
+        -------
+        (click_result, changed)
+            click_result 為點擊腳本的解析結果；changed 表示圖表簽章是否在逾時前改變
+        """
+        before = self.highcharts_signature()
+        value = self.evaluate(click_js)
+        click_result = json.loads(value) if value else {}
+        if not click_result.get("success"):
+            return click_result, False
+
+        expr = f"(function() {{ var s = {HIGHCHARTS_SIGNATURE_JS}; return s !== '' && s !== {json.dumps(before)}; }})()"
+        try:
+            self.wait_for(expr, timeout=timeout)
+        except CDPTimeout:
+            return click_result, False
+        self.wait_for_highcharts(timeout=timeout)
+        return click_result, True
+
+    # ------------------------------------------------------------------
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._ws.close()
+        except Exception:
+            pass
+
+    def __enter__(self) -> "CDPSession":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class CDPBrowser:
+    """
+    Chrome 調試端口（/json HTTP 端點）與分頁管理
+
+    同一分頁重複 attach 會取得同一條 CDPSession。
+
+    Parameters
+    ----------
+    port : int
+        Chrome 調試端口
+    host : str
+        主機位址
+    timeout : float
+        指令預設逾時秒數
+    """
+
+    def __init__(self, port: int = DEFAULT_PORT, host: str = "127.0.0.1", timeout: float = DEFAULT_TIMEOUT):
+        self.port = port
+        self.host = host
+        self.timeout = timeout
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def _http(self, path: str, method: str = "GET", timeout: float = 5) -> Any:
+        import requests
+
+        resp = requests.request(method, f"{self.base_url}{path}", timeout=timeout)
+        resp.raise_for_status()
+        try:
+            return resp.json()
+        except ValueError:
+            return resp.text
+
+    def is_running(self) -> bool:
+        try:
+            self._http("/json/version", timeout=2)
+            return True
+        except Exception:
+            return False
+
+    def pages(self) -> List[Dict]:
+        """目前所有 page 類型分頁"""
+        return [p for p in self._http("/json") if p.get("type", "page") == "page"]
+
+    def find_page(self, url_keyword: Optional[str] = None, prefer: Optional[str] = None) -> Optional[Dict]:
+        """依 URL 關鍵字尋找分頁；找不到時回傳第一個分頁"""
+        pages = self.pages()
+        for keyword in (url_keyword, prefer):
+            if not keyword:
+                continue
+            for page in pages:
+                if keyword.lower() in page.get("url", "").lower():
+                    return page
+        return pages[0] if pages else None
+
+    def attach(self, url_keyword: Optional[str] = None, prefer: Optional[str] = None) -> CDPSession:
+        """連接到既有分頁（沿用已開啟的 WebSocket）"""
+        page = self.find_page(url_keyword, prefer)
+        if not page or not page.get("webSocketDebuggerUrl"):
+            raise CDPError(f"找不到可連接的分頁 (port {self.port})")
+        return get_session(page["webSocketDebuggerUrl"], self.timeout)
+
+    def new_tab(self, url: str = "about:blank") -> CDPSession:
+        """開新分頁並連接"""
+        try:
+            page = self._http(f"/json/new?{url}", method="PUT")
+        except Exception:
+            page = self._http(f"/json/new?{url}")  # 舊版 Chrome 只接受 GET
+        session = get_session(page["webSocketDebuggerUrl"], self.timeout)
+        session.target_id = page.get("id")
+        return session
+
+    def close_tab(self, session: CDPSession) -> None:
+        """關閉分頁與其連線"""
+        target_id = getattr(session, "target_id", None) or session.ws_url.rsplit("/", 1)[-1]
+        release_session(session.ws_url)
+        try:
+            self._http(f"/json/close/{target_id}")
+        except Exception:
+            pass
+
+
+class CDPTabPool:
+    """
+    同一個 Chrome 內的多分頁排程器
+
+    每個工作執行緒一次佔用一個分頁；同一網域同時最多 per_domain 個分頁在工作，
+    避免對單一站點同時發出過多頁面載入。分頁依需要建立，結束時一併關閉。
+    Chrome 由呼叫端剛啟動時以 adopt_existing=True 沿用其初始分頁，避免每次啟動多留一個分頁。
+
+    Parameters
+    ----------
+    browser : CDPBrowser
+        Chrome 調試端口
+    size : int
+        最多同時開啟的分頁數
+    per_domain : int
+        同一網域的並行上限
+    adopt_existing : bool
+        第一個分頁沿用 Chrome 既有的分頁（本程式剛啟動的 Chrome 的初始分頁），
+        不另開新分頁；該分頁結束時一併關閉
+    """
+
+    def __init__(self, browser: CDPBrowser, size: int = 4, per_domain: int = 4, adopt_existing: bool = False):
+        self.browser = browser
+        self.size = max(1, size)
+        self.per_domain = max(1, per_domain)
+        self._adopt_existing = adopt_existing
+        self._idle: "queue.Queue[CDPSession]" = queue.Queue()
+        self._tabs: List[CDPSession] = []
+        self._tabs_lock = threading.Lock()
+        self._domain_slots: Dict[str, threading.BoundedSemaphore] = {}
+
+    def _domain_slot(self, url: str) -> threading.BoundedSemaphore:
+        from urllib.parse import urlparse
+
+        domain = urlparse(url).netloc.lower()
+        with self._tabs_lock:
+            if domain not in self._domain_slots:
+                self._domain_slots[domain] = threading.BoundedSemaphore(self.per_domain)
+            return self._domain_slots[domain]
+
+    def _open_tab(self) -> CDPSession:
+        if self._adopt_existing:
+            self._adopt_existing = False
+            page = self.browser.find_page()
+            if page and page.get("webSocketDebuggerUrl"):
+                session = get_session(page["webSocketDebuggerUrl"], self.browser.timeout)
+                session.target_id = page.get("id")
+                return session
+        return self.browser.new_tab()
+
+    def _acquire_tab(self) -> CDPSession:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._tabs_lock:
+            if len(self._tabs) < self.size:
+                session = self._open_tab()
+                self._tabs.append(session)
+                # 背景分頁的計時器會被節流；模擬焦點讓每個分頁都以前景速度渲染
+                try:
+                    session.send("Emulation.setFocusEmulationEnabled", {"enabled": True})
+                except CDPError:
+                    pass
+                return session
+        return self._idle.get()
+
+    def _run_one(self, fn: Callable[[CDPSession, Any], Any], item: Any, url: str) -> Any:
+        with self._domain_slot(url):
+            session = self._acquire_tab()
+            try:
+                return fn(session, item)
+            finally:
+                self._idle.put(session)
+
+    def map(
+        self,
+        fn: Callable[[CDPSession, Any], Any],
+        items: List[Any],
+        url_of: Callable[[Any], str],
+        on_result: Optional[Callable[[Any, Any, Optional[BaseException]], None]] = None,
+    ) -> Dict[Any, Any]:
+        """
+        以分頁池平行處理 items
+
+        Parameters
+        ----------
+        fn : callable
+            fn(session, item) -> result，在分配到的分頁上執行
+        items : list
+            工作項目
+        url_of : callable
+            item -> URL（用於網域並行限制）
+        on_result : callable, optional
+            每完成一項即呼叫 on_result(item, result, error)（於呼叫端執行緒）
+
+        Returns
+        -------
+        Dict[Any, Any]
+            {item: result}；失敗項目為 None
+        """
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        results: Dict[Any, Any] = {}
+        workers = min(self.size, len(items)) or 1
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cdp-tab") as pool:
+            futures = {pool.submit(self._run_one, fn, item, url_of(item)): item for item in items}
+            for future in as_completed(futures):
+                item = futures[future]
+                error = future.exception()
+                results[item] = None if error else future.result()
+                if on_result:
+                    on_result(item, results[item], error)
+        return results
+
+    def close(self) -> None:
+        """關閉本池建立（或沿用）的所有分頁"""
+        with self._tabs_lock:
+            tabs, self._tabs = self._tabs, []
+        for session in tabs:
+            self.browser.close_tab(session)
+
+    def __enter__(self) -> "CDPTabPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# ============================================================================
+# 連線池與相容舊介面
+# ============================================================================
+
+_SESSIONS: Dict[str, CDPSession] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def get_session(ws_url: str, timeout: float = DEFAULT_TIMEOUT) -> CDPSession:
+    """取得（或建立）ws_url 對應的持久連線"""
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(ws_url)
+        if session is None or session.closed:
+            session = CDPSession(ws_url, timeout=timeout)
+            _SESSIONS[ws_url] = session
+        return session
+
+
+def release_session(ws_url: str) -> None:
+    """關閉並移除 ws_url 對應的連線"""
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.pop(ws_url, None)
+    if session:
+        session.close()
+
+
+@atexit.register
+def close_all_sessions() -> None:
+    """關閉所有持久連線"""
+    with _SESSIONS_LOCK:
+        sessions = list(_SESSIONS.values())
+        _SESSIONS.clear()
+    for session in sessions:
+        session.close()
+
+
+def get_cdp_ws_url(
+    port: int = DEFAULT_PORT,
+    url_keyword: Optional[str] = None,
+    prefer: Optional[str] = None,
+) -> Optional[str]:
+    """
+    取得目標頁面的 WebSocket URL
+
+    Parameters
+    ----------
+    port : int
+        Chrome 調試端口
+    url_keyword : str
+        URL 關鍵字（優先）
+    prefer : str
+        找不到 url_keyword 時的次要關鍵字
+
+    Returns
+    -------
+    str or None
+        WebSocket URL，若無法連接則返回 None
+    """
+    try:
+        page = CDPBrowser(port).find_page(url_keyword, prefer)
+        return page.get("webSocketDebuggerUrl") if page else None
+    except Exception as e:
+        print(f"[CDP] 無法連接到 Chrome (port {port}): {e}")
+        return None
+
+
+def cdp_execute_js(ws_url: str, js_code: str, timeout: int = 30) -> Any:
+    """
+    透過 CDP 執行 JavaScript（沿用該分頁的持久連線）
+
+    回傳完整 CDP 回應，與舊版相同：result['result']['result']['value']
+    """
+    session = get_session(ws_url, timeout)
+    return session.send_raw(
+        "Runtime.evaluate",
+        {"expression": js_code, "returnByValue": True},
+        timeout,
+    )
+
+
+def navigate_to_url(
+    port: int,
+    url: str,
+    url_keyword: Optional[str] = None,
+    wait_until: Optional[str] = "domcontentloaded",
+    timeout: float = DEFAULT_TIMEOUT,
+) -> bool:
+    """導航目前分頁到 url 並等待 DOMContentLoaded（圖表就緒另以 wait_for_highcharts 判定）"""
+    try:
+        session = CDPBrowser(port, timeout=timeout).attach(url_keyword)
+        session.navigate(url, wait_until=wait_until, timeout=timeout)
+        return True
+    except Exception as e:
+        print(f"[CDP] 導航失敗: {e}")
+        return False
@@ -26,10 +26,13 @@ import time
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Optional, List
 
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).parent))
+from cdp_client import CDPBrowser, CDPSession, CDPTabPool, cdp_execute_js, get_cdp_ws_url as _get_cdp_ws_url, navigate_to_url
+
 try:
     import yfinance as yf
     HAS_YFINANCE = True
@@ -161,6 +164,10 @@ def start_chrome_debug(url: str, port: int = CDP_PORT) -> Optional[subprocess.Po
         f"--user-data-dir={user_data_dir}",
         "--no-first-run",
         "--no-default-browser-check",
+        # 多分頁平行抓取時，避免背景分頁被節流
+        "--disable-background-timer-throttling",
+        "--disable-renderer-backgrounding",
+        "--disable-backgrounding-occluded-windows",
         url
     ]
 
@@ -210,79 +217,19 @@ def close_chrome_debug(proc: subprocess.Popen):
             proc.kill()
 
 
-def navigate_to_url(port: int, url: str) -> bool:
-    """導航到指定 URL"""
-    import requests
-    import websocket
-
-    try:
-        # 獲取當前頁面
-        resp = requests.get(f'http://127.0.0.1:{port}/json', timeout=5)
-        pages = resp.json()
-        if not pages:
-            return False
-
-        ws_url = pages[0].get('webSocketDebuggerUrl')
-        if not ws_url:
-            return False
-
-        # 導航
-        ws = websocket.create_connection(ws_url, timeout=30)
-        cmd = {
-            "id": 1,
-            "method": "Page.navigate",
-            "params": {"url": url}
-        }
-        ws.send(json.dumps(cmd))
-        ws.recv()
-        ws.close()
-        return True
-
-    except Exception as e:
-        print(f"[CDP] 導航失敗: {e}")
-        return False
-
-
 # ==================== CDP 數據抓取 ====================
 
 def get_cdp_ws_url(port: int = CDP_PORT, url_keyword: str = 'macromicro') -> Optional[str]:
     """取得目標頁面的 WebSocket URL"""
-    import requests
-
-    try:
-        resp = requests.get(f'http://127.0.0.1:{port}/json', timeout=5)
-        pages = resp.json()
+    return _get_cdp_ws_url(port, url_keyword)
 
-        for page in pages:
-            if url_keyword.lower() in page.get('url', '').lower():
-                return page.get('webSocketDebuggerUrl')
-
-        return pages[0].get('webSocketDebuggerUrl') if pages else None
-
-    except Exception as e:
-        print(f"[CDP] 無法連接到 Chrome (port {port}): {e}")
-        return None
-
-
-def cdp_execute_js(ws_url: str, js_code: str, timeout: int = 30) -> Any:
-    """透過 CDP 執行 JavaScript"""
-    import websocket
-
-    ws = websocket.create_connection(ws_url, timeout=timeout)
-
-    cmd = {
-        "id": 1,
-        "method": "Runtime.evaluate",
-        "params": {
-            "expression": js_code,
-            "returnByValue": True
-        }
-    }
-    ws.send(json.dumps(cmd))
-    result = json.loads(ws.recv())
-    ws.close()
 
-    return result
+def wait_for_chart_ready(port: int, wait_seconds: int, url_keyword: str = 'macromicro') -> int:
+    """等待 Highcharts 出現資料且點數穩定（wait_seconds 為上限）"""
+    started = time.monotonic()
+    points = CDPBrowser(port).attach(url_keyword).wait_for_highcharts(timeout=wait_seconds)
+    print(f"[CDP] 圖表就緒：{points} 點（{time.monotonic() - started:.1f} 秒）")
+    return points
 
 
 def fetch_inventory_via_cdp(
@@ -336,8 +283,8 @@ def fetch_inventory_via_cdp(
             navigate_to_url(port, url)
 
         # 等待頁面載入（Highcharts 渲染需要時間）
-        print(f"[CDP] 等待 {source_name} 頁面載入 ({wait_seconds} 秒)...")
-        time.sleep(wait_seconds)
+        print(f"[CDP] 等待 {source_name} 圖表就緒（最多 {wait_seconds} 秒）...")
+        wait_for_chart_ready(port, wait_seconds)
 
         # 連接並提取數據
         ws_url = get_cdp_ws_url(port)
@@ -370,21 +317,66 @@ def fetch_inventory_via_cdp(
         raise
 
 
+def fetch_inventory_on_session(
+    session: CDPSession,
+    url: str,
+    source_name: str,
+    wait_seconds: int = PAGE_LOAD_WAIT_SECONDS
+) -> Dict[str, Any]:
+    """
+    在指定分頁上導航並提取庫存圖表（供分頁池平行呼叫）
+
+    Returns
+    -------
+    Dict[str, Any]
+        與 fetch_inventory_via_cdp 相同格式的字典
+    """
+    print(f"[CDP] 導航到 {source_name} 頁面...")
+    session.navigate(url, wait_until="domcontentloaded", timeout=wait_seconds)
+    points = session.wait_for_highcharts(timeout=wait_seconds)
+    print(f"[CDP] {source_name} 圖表就緒：{points} 點")
+
+    value = session.evaluate(EXTRACT_HIGHCHARTS_JS)
+    if not value:
+        raise ValueError(f"{source_name} 無法取得數據")
+
+    data = json.loads(value)
+    if isinstance(data, dict) and 'error' in data:
+        raise ValueError(f"提取失敗: {data['error']}")
+
+    print(f"[CDP] 成功提取 {source_name} 數據，共 {len(data)} 個圖表!")
+
+    return {
+        "source": f"MacroMicro (CDP Auto) - {source_name}",
+        "url": url,
+        "charts": data,
+        "fetched_at": datetime.now().isoformat()
+    }
+
+
 def fetch_all_inventories(
     fetch_shfe: bool = True,
     fetch_comex: bool = True,
     port: int = CDP_PORT,
-    wait_seconds: int = PAGE_LOAD_WAIT_SECONDS
+    wait_seconds: int = PAGE_LOAD_WAIT_SECONDS,
+    tabs: int = 2,
+    on_result: Optional[Callable[[str, Dict[str, Any]], None]] = None
 ) -> Dict[str, Dict[str, Any]]:
     """
     全自動抓取所有庫存數據
 
+    tabs > 1 且兩個來源都要抓時，SHFE 與 COMEX 在同一個 Chrome 的兩個分頁平行載入。
+
     Parameters
     ----------
     fetch_shfe : bool
         是否抓取 SHFE 數據
     fetch_comex : bool
         是否抓取 COMEX 數據
+    tabs : int
+        同時開啟的分頁數（1 = 依序抓取）
+    on_result : callable, optional
+        每完成一個來源即呼叫 on_result(key, data)（可用於即時寫入快取）
 
     Returns
     -------
@@ -410,6 +402,23 @@ def fetch_all_inventories(
             if not wait_for_chrome_ready(port, timeout=30):
                 raise RuntimeError("Chrome 啟動超時")
 
+        if tabs > 1 and fetch_shfe and fetch_comex:
+            sources = {'shfe': (SHFE_INVENTORY_URL, "SHFE"), 'comex': (COMEX_INVENTORY_URL, "COMEX")}
+
+            def _done(key: str, data: Optional[Dict[str, Any]], error: Optional[BaseException]):
+                if error is not None:
+                    print(f"[Warning] {sources[key][1]} 數據抓取失敗: {error}")
+                elif on_result:
+                    on_result(key, data)
+
+            with CDPTabPool(CDPBrowser(port), size=tabs, adopt_existing=we_started_chrome) as pool:
+                return pool.map(
+                    lambda session, key: fetch_inventory_on_session(session, *sources[key], wait_seconds),
+                    list(sources),
+                    url_of=lambda key: sources[key][0],
+                    on_result=_done
+                )
+
         # 抓取 SHFE
         if fetch_shfe:
             try:
@@ -421,6 +430,8 @@ def fetch_all_inventories(
                     chrome_proc=chrome_proc,
                     we_started_chrome=we_started_chrome
                 )
+                if on_result:
+                    on_result('shfe', results['shfe'])
             except Exception as e:
                 print(f"[Warning] SHFE 數據抓取失敗: {e}")
                 results['shfe'] = None
@@ -428,20 +439,17 @@ def fetch_all_inventories(
         # 抓取 COMEX
         if fetch_comex:
             try:
-                # 導航到 COMEX 頁面
-                if fetch_shfe:
-                    print("[CDP] 導航到 COMEX 頁面...")
-                    navigate_to_url(port, COMEX_INVENTORY_URL)
-                    time.sleep(wait_seconds)  # 等待新頁面載入
-
+                # Chrome 已在運行，fetch_inventory_via_cdp 會自行導航並等待圖表就緒
                 results['comex'] = fetch_inventory_via_cdp(
                     url=COMEX_INVENTORY_URL,
                     source_name="COMEX",
                     port=port,
-                    wait_seconds=wait_seconds if not fetch_shfe else 0,  # 如果已經等過了就不用再等
+                    wait_seconds=wait_seconds,
                     chrome_proc=chrome_proc,
                     we_started_chrome=we_started_chrome
                 )
+                if on_result:
+                    on_result('comex', results['comex'])
             except Exception as e:
                 print(f"[Warning] COMEX 數據抓取失敗: {e}")
                 results['comex'] = None
@@ -621,7 +629,8 @@ def fetch_copper_data(
     fetch_comex: bool = True,
     fetch_price: bool = True,
     price_start_date: str = "2010-01-01",
-    cdp_port: int = CDP_PORT
+    cdp_port: int = CDP_PORT,
+    tabs: int = 2
 ) -> Dict[str, pd.DataFrame]:
     """
     獲取所有銅相關數據（全自動）
@@ -642,6 +651,8 @@ def fetch_copper_data(
         價格數據起始日期
     cdp_port : int
         CDP 調試端口
+    tabs : int
+        庫存頁面同時開啟的分頁數（1 = 依序抓取）
 
     Returns
     -------
@@ -681,22 +692,21 @@ def fetch_copper_data(
     # 抓取庫存數據
     if need_fetch_shfe or need_fetch_comex:
         print("[Fetch] 開始全自動抓取庫存數據...")
-        inventory_data = fetch_all_inventories(
+
+        # 每個來源完成即寫入快取
+        def _store(key: str, data: Dict[str, Any]):
+            df = extract_inventory_data(data, key.upper())
+            cache.save_inventory(f'{key}_inventory', data, df)
+            results[f'{key}_inventory'] = df
+
+        fetch_all_inventories(
             fetch_shfe=need_fetch_shfe,
             fetch_comex=need_fetch_comex,
-            port=cdp_port
+            port=cdp_port,
+            tabs=tabs,
+            on_result=_store
         )
 
-        if need_fetch_shfe and inventory_data.get('shfe'):
-            df = extract_inventory_data(inventory_data['shfe'], 'SHFE')
-            cache.save_inventory('shfe_inventory', inventory_data['shfe'], df)
-            results['shfe_inventory'] = df
-
-        if need_fetch_comex and inventory_data.get('comex'):
-            df = extract_inventory_data(inventory_data['comex'], 'COMEX')
-            cache.save_inventory('comex_inventory', inventory_data['comex'], df)
-            results['comex_inventory'] = df
-
     # 抓取價格數據
     if need_fetch_price:
         try:
@@ -737,6 +747,12 @@ def main():
         default="2010-01-01",
         help="價格數據起始日期 (預設: 2010-01-01)"
     )
+    parser.add_argument(
+        "--tabs",
+        type=int,
+        default=2,
+        help="SHFE/COMEX 同時開啟的分頁數 (預設: 2，1 = 依序抓取)"
+    )
 
     args = parser.parse_args()
 
@@ -752,7 +768,8 @@ def main():
             fetch_shfe=fetch_shfe,
             fetch_comex=fetch_comex,
             fetch_price=fetch_price,
-            price_start_date=args.price_start
+            price_start_date=args.price_start,
+            tabs=args.tabs
         )
 
         # 顯示摘要
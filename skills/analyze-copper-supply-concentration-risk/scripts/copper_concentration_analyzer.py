@@ -18,10 +18,14 @@ Usage:
 
     # 輸出完整報告
     python copper_concentration_analyzer.py --full-report --output markdown
+
+    # 所有產銅國的結構斷點（最多 2 個斷點）
+    python copper_concentration_analyzer.py --breaks --max-breaks 2
 """
 
 import argparse
 import json
+import sys
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional
@@ -29,6 +33,9 @@ from typing import Dict, Any, Optional
 import numpy as np
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).parent))
+from segmented_regression import breaks_to_records, detect_breaks, rolling_slope_matrix, series_break
+
 
 # ==================== 集中度計算 ====================
 
@@ -143,54 +150,81 @@ def analyze_concentration_trend(df: pd.DataFrame, start_year: int, end_year: int
 
 def rolling_slope(series: pd.Series, window: int = 10) -> pd.Series:
     """計算滾動線性回歸斜率"""
-    slopes = []
-    years = series.index.values
-
-    for i in range(window - 1, len(series)):
-        y = series.values[i - window + 1:i + 1]
-        x = years[i - window + 1:i + 1]
-        coeffs = np.polyfit(x, y, 1)
-        slopes.append(coeffs[0])
-
-    result = [np.nan] * (window - 1) + slopes
-    return pd.Series(result, index=series.index)
+    slopes = rolling_slope_matrix(series.to_numpy(dtype=float)[None, :], series.index.values, window)[0]
+    return pd.Series(slopes, index=series.index)
 
 
 def find_breakpoint_simple(series: pd.Series, min_segment: int = 5) -> dict:
-    """簡易結構斷點偵測"""
-    years = series.index.values
-    values = series.values
-    n = len(series)
-
-    if n < min_segment * 2:
+    """簡易結構斷點偵測（單一斷點，附 Chow 型 F 檢定信心水準）"""
+    if len(series) < min_segment * 2:
         return {"detected": False, "reason": "數據長度不足"}
 
-    best_mse = float('inf')
-    best_break = None
-
-    for i in range(min_segment, n - min_segment):
-        # 前段回歸
-        x1, y1 = years[:i], values[:i]
-        p1 = np.polyfit(x1, y1, 1)
-        mse1 = np.mean((y1 - np.polyval(p1, x1)) ** 2)
+    found = series_break(series, min_segment)
+    if found is None:
+        return {"detected": False, "reason": "無可用斷點候選"}
 
-        # 後段回歸
-        x2, y2 = years[i:], values[i:]
-        p2 = np.polyfit(x2, y2, 1)
-        mse2 = np.mean((y2 - np.polyval(p2, x2)) ** 2)
+    return {
+        "detected": True,
+        "break_year": found["break_year"],
+        "pre_slope": round(found["pre_slope"], 0),
+        "post_slope": round(found["post_slope"], 0),
+        "f_stat": round(found["f_stat"], 2) if found["f_stat"] is not None else None,
+        "confidence": round(found["confidence"], 4) if found["confidence"] is not None else None
+    }
 
-        total_mse = mse1 * len(x1) + mse2 * len(x2)
 
-        if total_mse < best_mse:
-            best_mse = total_mse
-            best_break = {
-                "detected": True,
-                "break_year": int(years[i]),
-                "pre_slope": round(p1[0], 0),
-                "post_slope": round(p2[0], 0)
-            }
+def production_panel(df: pd.DataFrame) -> pd.DataFrame:
+    """長表 (year, country, production) → 國家 × 年份 面板（不含 World）"""
+    producers = df[df.country != "World"]
+    return producers.pivot_table(index="country", columns="year", values="production", aggfunc="sum")
+
+
+def analyze_country_breaks(
+    df: pd.DataFrame,
+    min_segment: int = 5,
+    max_breaks: int = 1,
+    min_share: float = 0.01
+) -> dict:
+    """
+    所有產銅國的結構斷點（一次向量化計算）
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        長表 (year, country, production)
+    min_segment : int
+        每段最少年數
+    max_breaks : int
+        每國最多斷點數（> 1 時以 BIC 選擇）
+    min_share : float
+        最新年度份額門檻，過濾微小產國
+    """
+    panel = production_panel(df)
+    latest_year = panel.columns.max()
+    latest = panel[latest_year]
+    share = latest / latest.sum()
+    panel = panel[(share >= min_share) & (panel.notna().sum(axis=1) >= 2 * min_segment)]
+    if panel.empty:
+        return {"error": "無足夠長度的國家序列"}
+
+    breaks = detect_breaks(panel, min_segment=min_segment, max_breaks=max_breaks)
+    breaks["latest_share"] = share.reindex(breaks.index)
+    breaks = breaks.sort_values("latest_share", ascending=False)
+
+    records = breaks_to_records(breaks)
+    for record in records:
+        for key in ("pre_slope", "post_slope"):
+            if record[key] is not None:
+                record[key] = round(record[key], 0)
+        record["segment_slopes"] = [round(v, 0) for v in record["segment_slopes"]]
 
-    return best_break
+    return {
+        "latest_year": int(latest_year),
+        "min_segment": min_segment,
+        "max_breaks": max_breaks,
+        "n_countries": len(records),
+        "countries": records
+    }
 
 
 def analyze_chile_trend(df: pd.DataFrame, window: int = 10) -> dict:
@@ -382,6 +416,11 @@ class CopperConcentrationAnalyzer:
         chile_decline = chile_trend["rolling_slope_t_per_year"] * horizon
         return analyze_replacement(df, chile_decline, horizon)
 
+    def analyze_breaks(self, min_segment: int = 5, max_breaks: int = 1) -> dict:
+        """執行全體產銅國斷點分析"""
+        df = self.load_data()
+        return analyze_country_breaks(df, min_segment, max_breaks)
+
     def generate_full_report(self, start_year: int = 1970, end_year: int = None) -> dict:
         """生成完整報告"""
         df = self.load_data()
@@ -513,6 +552,9 @@ def main():
     parser.add_argument("--window", type=int, default=10, help="滾動斜率窗口 (預設: 10)")
     parser.add_argument("--replacement", action="store_true", help="替代依賴度分析")
     parser.add_argument("--horizon", type=int, default=10, help="替代分析年限 (預設: 10)")
+    parser.add_argument("--breaks", action="store_true", help="全體產銅國結構斷點分析")
+    parser.add_argument("--max-breaks", type=int, default=1, help="每國最多斷點數 (預設: 1)")
+    parser.add_argument("--min-segment", type=int, default=5, help="每段最少年數 (預設: 5)")
     parser.add_argument("--full-report", action="store_true", help="完整報告")
     parser.add_argument("--output", choices=["json", "markdown"], default="json", help="輸出格式")
     parser.add_argument("--cache-dir", type=str, default="cache", help="快取目錄")
@@ -528,6 +570,8 @@ def main():
             result = analyzer.analyze_chile_trend(window=args.window)
         elif args.replacement:
             result = analyzer.analyze_replacement(horizon=args.horizon)
+        elif args.breaks:
+            result = analyzer.analyze_breaks(min_segment=args.min_segment, max_breaks=args.max_breaks)
         elif args.full_report:
             result = analyzer.generate_full_report(start_year=args.start, end_year=args.end)
         else:
@@ -22,6 +22,9 @@ from typing import Dict, Any, Optional, List
 
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).parent))
+from cdp_client import CDPBrowser, cdp_execute_js, get_cdp_ws_url as _get_cdp_ws_url
+
 # ========== 配置區域 ==========
 COPPER_PRODUCTION_URL = "https://en.macromicro.me/charts/91500/wbms-copper-mine-production-total-world"
 CDP_PORT = 9222
@@ -208,42 +211,16 @@ def close_chrome_debug(proc: subprocess.Popen):
 
 def get_cdp_ws_url(port: int = CDP_PORT, url_keyword: str = 'macromicro') -> Optional[str]:
     """取得目標頁面的 WebSocket URL"""
-    import requests
-
-    try:
-        resp = requests.get(f'http://127.0.0.1:{port}/json', timeout=5)
-        pages = resp.json()
-
-        for page in pages:
-            if url_keyword.lower() in page.get('url', '').lower():
-                return page.get('webSocketDebuggerUrl')
-
-        return pages[0].get('webSocketDebuggerUrl') if pages else None
-
-    except Exception as e:
-        print(f"[CDP] 無法連接到 Chrome (port {port}): {e}")
-        return None
-
-
-def cdp_execute_js(ws_url: str, js_code: str, timeout: int = 30) -> Any:
-    """透過 CDP 執行 JavaScript"""
-    import websocket
+    return _get_cdp_ws_url(port, url_keyword)
 
-    ws = websocket.create_connection(ws_url, timeout=timeout)
-
-    cmd = {
-        "id": 1,
-        "method": "Runtime.evaluate",
-        "params": {
-            "expression": js_code,
-            "returnByValue": True
-        }
-    }
-    ws.send(json.dumps(cmd))
-    result = json.loads(ws.recv())
-    ws.close()
 
-    return result
+def wait_for_chart_ready(port: int, wait_seconds: int, url_keyword: str = 'macromicro') -> int:
+    """等待 Highcharts 出現資料且點數穩定（wait_seconds 為上限）"""
+    print(f"[CDP] 等待圖表就緒（最多 {wait_seconds} 秒）...")
+    started = time.monotonic()
+    points = CDPBrowser(port).attach(url_keyword).wait_for_highcharts(timeout=wait_seconds)
+    print(f"[CDP] 圖表就緒：{points} 點（{time.monotonic() - started:.1f} 秒）")
+    return points
 
 
 def fetch_via_cdp_auto(port: int = CDP_PORT, wait_seconds: int = PAGE_LOAD_WAIT_SECONDS) -> Dict[str, Any]:
@@ -274,9 +251,8 @@ def fetch_via_cdp_auto(port: int = CDP_PORT, wait_seconds: int = PAGE_LOAD_WAIT_
             if not wait_for_chrome_ready(port, timeout=30):
                 raise RuntimeError("Chrome 啟動超時")
 
-        # 等待頁面載入（Highcharts 渲染需要時間）
-        print(f"[CDP] 等待頁面載入 ({wait_seconds} 秒)...")
-        time.sleep(wait_seconds)
+        # 等待頁面載入（以 Highcharts 探針判定，而非固定秒數）
+        wait_for_chart_ready(port, wait_seconds)
 
         # 連接並提取數據
         ws_url = get_cdp_ws_url(port)
@@ -18,6 +18,9 @@ Usage:
 
     # 強制更新（忽略快取）
     python fetch_te_data.py --symbol natural-gas --force-refresh
+
+    # 多分頁平行抓取（同一個 Chrome 開 6 個分頁）
+    python fetch_te_data.py --symbol natural-gas --symbol urea --symbol dap --tabs 6
 """
 
 import argparse
@@ -27,10 +30,20 @@ import sys
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).parent))
+from cdp_client import (
+    CDPBrowser,
+    CDPSession,
+    CDPTabPool,
+    close_all_sessions,
+    get_cdp_ws_url as _get_cdp_ws_url,
+    release_session,
+)
+
 # ============================================================================
 # 配置
 # ============================================================================
@@ -38,7 +51,10 @@ import pandas as pd
 TE_BASE_URL = "https://tradingeconomics.com/commodity"
 CDP_PORT = 9222
 CACHE_MAX_AGE_HOURS = 12
-PAGE_LOAD_WAIT_SECONDS = 25  # TradingEconomics 載入較快
+PAGE_LOAD_WAIT_SECONDS = 25  # 頁面就緒等待上限（事件驅動，通常遠低於此值）
+CHART_UPDATE_TIMEOUT = 8  # 點擊 1Y/5Y 後等待圖表更新的上限
+DEFAULT_TABS = 4  # 多商品抓取時同時開啟的分頁數
+DEFAULT_PER_DOMAIN = 4  # 同一網域同時載入的分頁上限
 
 # Chrome 路徑（按優先順序嘗試）
 CHROME_PATHS = [
@@ -210,6 +226,10 @@ def start_chrome_debug(url: str, port: int = CDP_PORT) -> Optional[subprocess.Po
         f"--user-data-dir={user_data_dir}",
         "--no-first-run",
         "--no-default-browser-check",
+        # 多分頁平行抓取時，避免背景分頁被節流
+        "--disable-background-timer-throttling",
+        "--disable-renderer-backgrounding",
+        "--disable-backgrounding-occluded-windows",
         url
     ]
 
@@ -259,97 +279,122 @@ def close_chrome_debug(proc: subprocess.Popen):
             proc.kill()
 
 
-def navigate_to_url(port: int, url: str) -> bool:
-    """導航到指定 URL"""
-    import requests
-    import websocket
+# ============================================================================
+# CDP 數據抓取
+# ============================================================================
 
-    try:
-        # 獲取當前頁面
-        resp = requests.get(f'http://127.0.0.1:{port}/json', timeout=5)
-        pages = resp.json()
-        if not pages:
-            return False
+def get_cdp_ws_url(port: int = CDP_PORT, url_keyword: Optional[str] = None) -> Optional[str]:
+    """取得目標頁面的 WebSocket URL（找不到關鍵字時優先 tradingeconomics 頁面）"""
+    return _get_cdp_ws_url(port, url_keyword, prefer='tradingeconomics')
 
-        ws_url = pages[0].get('webSocketDebuggerUrl')
-        if not ws_url:
-            return False
 
-        # 導航
-        ws = websocket.create_connection(ws_url, timeout=30)
-        cmd = {
-            "id": 1,
-            "method": "Page.navigate",
-            "params": {"url": url}
-        }
-        ws.send(json.dumps(cmd))
-        ws.recv()
-        ws.close()
-        return True
+def symbol_url(symbol: str) -> str:
+    """商品頁面 URL"""
+    symbol_info = SYMBOL_MAP.get(symbol, {"slug": symbol})
+    return symbol_info.get('url', f"{TE_BASE_URL}/{symbol_info['slug']}")
 
-    except Exception as e:
-        print(f"[CDP] 導航失敗: {e}")
-        return False
 
+def extract_charts(session: CDPSession) -> Any:
+    """在分頁上執行 EXTRACT_HIGHCHARTS_JS 並解析結果"""
+    value = session.evaluate(EXTRACT_HIGHCHARTS_JS)
+    return json.loads(value) if value else None
 
-# ============================================================================
-# CDP 數據抓取
-# ============================================================================
 
-def get_cdp_ws_url(port: int = CDP_PORT, url_keyword: Optional[str] = None) -> Optional[str]:
-    """取得目標頁面的 WebSocket URL"""
-    import requests
+def ensure_chrome(port: int, first_url: str) -> Optional[subprocess.Popen]:
+    """
+    確保 Chrome 調試實例存在
 
-    try:
-        resp = requests.get(f'http://127.0.0.1:{port}/json', timeout=5)
-        pages = resp.json()
+    Returns
+    -------
+    subprocess.Popen or None
+        由本函數啟動的 Chrome 進程；沿用既有 Chrome 時為 None
+    """
+    if is_chrome_debug_running(port):
+        return None
 
-        # 優先找包含關鍵字的頁面
-        if url_keyword:
-            for page in pages:
-                if url_keyword.lower() in page.get('url', '').lower():
-                    return page.get('webSocketDebuggerUrl')
+    chrome_proc = start_chrome_debug(first_url, port)
+    if not chrome_proc:
+        raise RuntimeError("無法啟動 Chrome")
 
-        # 優先找 tradingeconomics 頁面
-        for page in pages:
-            if 'tradingeconomics' in page.get('url', '').lower():
-                return page.get('webSocketDebuggerUrl')
+    print("[CDP] 等待 Chrome 啟動...")
+    if not wait_for_chrome_ready(port, timeout=30):
+        close_chrome_debug(chrome_proc)
+        raise RuntimeError("Chrome 啟動超時")
+    return chrome_proc
 
-        # 沒找到就返回第一個頁面
-        return pages[0].get('webSocketDebuggerUrl') if pages else None
 
-    except Exception as e:
-        print(f"[CDP] 無法連接到 Chrome (port {port}): {e}")
-        return None
+def fetch_symbol_on_session(
+    session: CDPSession,
+    symbol: str,
+    wait_seconds: int = PAGE_LOAD_WAIT_SECONDS,
+    navigate: bool = True
+) -> Dict[str, Any]:
+    """
+    在指定分頁上抓取單一商品（1Y 日頻 + 5Y 週頻）
 
+    以事件判定就緒：導航等 DOMContentLoaded，接著等 Highcharts 出現資料且點數穩定；
+    點擊 1Y/5Y 後等圖表簽章改變。wait_seconds 只是上限，不是固定等待。
 
-def cdp_execute_js(ws_url: str, js_code: str, timeout: int = 30) -> Any:
-    """透過 CDP 執行 JavaScript"""
-    import websocket
+    Parameters
+    ----------
+    session : CDPSession
+        分頁連線
+    symbol : str
+        商品代碼
+    wait_seconds : int
+        頁面就緒等待上限（秒）
+    navigate : bool
+        是否先導航（分頁已在目標頁時可設 False）
 
-    ws = websocket.create_connection(ws_url, timeout=timeout)
+    Returns
+    -------
+    Dict[str, Any]
+        {symbol, source, url, unit, charts_1y, charts_5y, fetched_at}
+    """
+    symbol_info = SYMBOL_MAP.get(symbol, {"slug": symbol, "unit": "unknown", "name": symbol})
+    target_url = symbol_url(symbol)
 
-    cmd = {
-        "id": 1,
-        "method": "Runtime.evaluate",
-        "params": {
-            "expression": js_code,
-            "returnByValue": True
-        }
-    }
-    ws.send(json.dumps(cmd))
-    result = json.loads(ws.recv())
-    ws.close()
+    if navigate:
+        print(f"[CDP] 導航到 {symbol} 頁面...")
+        session.navigate(target_url, wait_until="domcontentloaded", timeout=wait_seconds)
+
+    started = time.monotonic()
+    points = session.wait_for_highcharts(timeout=wait_seconds)
+    print(f"[CDP] {symbol} 圖表就緒（{points} 點，{time.monotonic() - started:.1f} 秒）")
 
-    return result
+    # ===== Step 1: 抓取 1Y 日頻數據 =====
+    click_data, changed = session.click_and_wait_for_chart(CLICK_1Y_BUTTON_JS, timeout=CHART_UPDATE_TIMEOUT)
+    if click_data.get('success'):
+        print(f"[CDP] {symbol} 成功: {click_data.get('clicked')}" + ("" if changed else "（圖表未變化）"))
+    else:
+        print(f"[CDP] {symbol} 1Y 按鈕未找到")
+    data_1y = extract_charts(session)
+
+    # ===== Step 2: 抓取 5Y 週頻數據 =====
+    click_data, changed = session.click_and_wait_for_chart(CLICK_5Y_BUTTON_JS, timeout=CHART_UPDATE_TIMEOUT)
+    if click_data.get('success'):
+        print(f"[CDP] {symbol} 成功: {click_data.get('clicked')}" + ("" if changed else "（圖表未變化）"))
+    else:
+        print(f"[CDP] {symbol} 5Y 按鈕未找到")
+    data_5y = extract_charts(session)
+
+    # 合併數據（1Y daily 優先，5Y weekly 補充舊數據）
+    return {
+        "symbol": symbol,
+        "source": "TradingEconomics (CDP Auto - 1Y+5Y merged)",
+        "url": f"{TE_BASE_URL}/{symbol_info['slug']}",
+        "unit": symbol_info['unit'],
+        "charts_1y": data_1y,
+        "charts_5y": data_5y,
+        "fetched_at": datetime.now().isoformat()
+    }
 
 
 def fetch_symbol_via_cdp(
     symbol: str,
     port: int = CDP_PORT,
     wait_seconds: int = PAGE_LOAD_WAIT_SECONDS,
-    chrome_proc: Optional[subprocess.Popen] = None,
-    we_started_chrome: bool = False
+    chrome_proc: Optional[subprocess.Popen] = None
 ) -> Dict[str, Any]:
     """
     透過 CDP 抓取單一商品數據
@@ -361,11 +406,10 @@ def fetch_symbol_via_cdp(
     port : int
         CDP 端口
     wait_seconds : int
-        等待頁面載入秒數
+        頁面就緒等待上限（秒）
     chrome_proc : subprocess.Popen
-        已存在的 Chrome 進程（可選）
-    we_started_chrome : bool
-        是否由本函數啟動 Chrome
+        呼叫端管理的 Chrome 進程（可選）；未提供且需要時由本函數啟動，
+        結束時關閉連線並終止本函數啟動的 Chrome
 
     Returns
     -------
@@ -373,44 +417,25 @@ def fetch_symbol_via_cdp(
         包含圖表數據的字典
     """
     symbol_info = SYMBOL_MAP.get(symbol, {"slug": symbol, "unit": "unknown", "name": symbol})
-    target_url = f"{TE_BASE_URL}/{symbol_info['slug']}"
+    target_url = symbol_url(symbol)
 
+    launched = None
+    session = None
     try:
-        # 檢查是否已有 Chrome 調試實例
-        if not is_chrome_debug_running(port):
-            if chrome_proc is None:
-                # 啟動 Chrome
-                chrome_proc = start_chrome_debug(target_url, port)
-                if not chrome_proc:
-                    raise RuntimeError("無法啟動 Chrome")
-                we_started_chrome = True
-
-                # 等待 Chrome 準備好
-                print("[CDP] 等待 Chrome 啟動...")
-                if not wait_for_chrome_ready(port, timeout=30):
-                    raise RuntimeError("Chrome 啟動超時")
-        else:
-            # 已有 Chrome，導航到目標 URL
-            print(f"[CDP] 發現已運行的 Chrome，導航到 {symbol} 頁面...")
-            navigate_to_url(port, target_url)
+        launched = ensure_chrome(port, target_url) if chrome_proc is None else None
 
-        # 等待頁面載入（Highcharts 渲染需要時間）
-        print(f"[CDP] 等待 {symbol} 頁面載入 ({wait_seconds} 秒)...")
-        time.sleep(wait_seconds)
+        session = CDPBrowser(port).attach(symbol_info['slug'], prefer='tradingeconomics')
+        if launched is None:
+            print(f"[CDP] 發現已運行的 Chrome，導航到 {symbol} 頁面...")
+            session.navigate(target_url, wait_until="domcontentloaded", timeout=wait_seconds)
 
-        # 連接並提取數據
-        ws_url = get_cdp_ws_url(port, symbol_info['slug'])
-        if not ws_url:
-            raise RuntimeError("無法取得 WebSocket URL")
+        print(f"[CDP] 等待 {symbol} 圖表就緒（最多 {wait_seconds} 秒）...")
+        session.wait_for_highcharts(timeout=wait_seconds)
 
         print(f"[CDP] 提取 {symbol} Highcharts 數據...")
-        result = cdp_execute_js(ws_url, EXTRACT_HIGHCHARTS_JS)
-
-        value = result.get('result', {}).get('result', {}).get('value')
-        if not value:
-            raise ValueError(f"無法取得數據: {result}")
-
-        data = json.loads(value)
+        data = extract_charts(session)
+        if not data:
+            raise ValueError("無法取得數據")
 
         if isinstance(data, dict) and 'error' in data:
             raise ValueError(f"提取失敗: {data['error']}")
@@ -430,15 +455,28 @@ def fetch_symbol_via_cdp(
         print(f"[CDP] {symbol} 數據抓取失敗: {e}")
         raise
 
+    finally:
+        if session is not None:
+            release_session(session.ws_url)
+        if launched is not None:
+            print("[Chrome] 關閉 Chrome...")
+            close_chrome_debug(launched)
+
 
 def fetch_multiple_symbols(
     symbols: List[str],
     port: int = CDP_PORT,
-    wait_seconds: int = PAGE_LOAD_WAIT_SECONDS
+    wait_seconds: int = PAGE_LOAD_WAIT_SECONDS,
+    tabs: int = DEFAULT_TABS,
+    per_domain: int = DEFAULT_PER_DOMAIN,
+    on_result: Optional[Callable[[str, Dict[str, Any]], None]] = None
 ) -> Dict[str, Dict[str, Any]]:
     """
     全自動抓取多個商品數據
 
+    tabs > 1 時在同一個 Chrome 開多個分頁，各分頁平行導航/提取，
+    總耗時約為最慢的單頁，而非所有頁面的總和。
+
     Parameters
     ----------
     symbols : List[str]
@@ -446,7 +484,13 @@ def fetch_multiple_symbols(
     port : int
         CDP 端口
     wait_seconds : int
-        每個頁面等待秒數
+        每個頁面就緒等待上限（秒）
+    tabs : int
+        同時開啟的分頁數（1 = 單分頁依序抓取）
+    per_domain : int
+        同一網域同時載入的分頁上限
+    on_result : callable, optional
+        每完成一個商品即呼叫 on_result(symbol, chart_data)（可用於即時寫入快取）
 
     Returns
     -------
@@ -455,98 +499,53 @@ def fetch_multiple_symbols(
     """
     results = {}
     chrome_proc = None
-    we_started_chrome = False
+
+    def _done(symbol: str, chart_data: Optional[Dict[str, Any]], error: Optional[BaseException]):
+        if error is not None:
+            print(f"[Warning] {symbol} 數據抓取失敗: {error}")
+            return
+        print(f"[CDP] 成功提取 {symbol} (1Y + 5Y)!")
+        if on_result:
+            on_result(symbol, chart_data)
 
     try:
-        # 確定第一個 URL
-        first_symbol = symbols[0]
-        first_info = SYMBOL_MAP.get(first_symbol, {"slug": first_symbol})
-        first_url = first_info.get('url', f"{TE_BASE_URL}/{first_info['slug']}")
-
-        # 檢查是否需要啟動 Chrome
-        if not is_chrome_debug_running(port):
-            chrome_proc = start_chrome_debug(first_url, port)
-            if not chrome_proc:
-                raise RuntimeError("無法啟動 Chrome")
-            we_started_chrome = True
-
-            print("[CDP] 等待 Chrome 啟動...")
-            if not wait_for_chrome_ready(port, timeout=30):
-                raise RuntimeError("Chrome 啟動超時")
-
-            # 等待第一個頁面載入
-            print(f"[CDP] 等待 {first_symbol} 頁面載入 ({wait_seconds} 秒)...")
-            time.sleep(wait_seconds)
-
-        # 抓取每個商品（雙重抓取：1Y daily + 5Y weekly）
+        # 檢查是否需要啟動 Chrome（新啟動時第一個頁面已在載入中）
+        chrome_proc = ensure_chrome(port, symbol_url(symbols[0]))
+        browser = CDPBrowser(port)
+
+        if tabs > 1 and len(symbols) > 1:
+            print(f"[CDP] 以 {min(tabs, len(symbols))} 個分頁平行抓取 {len(symbols)} 個商品...")
+            with CDPTabPool(browser, size=tabs, per_domain=per_domain,
+                            adopt_existing=chrome_proc is not None) as pool:
+                return pool.map(
+                    lambda session, symbol: fetch_symbol_on_session(session, symbol, wait_seconds),
+                    symbols,
+                    url_of=symbol_url,
+                    on_result=_done
+                )
+
+        # 單分頁：抓取每個商品（雙重抓取：1Y daily + 5Y weekly），沿用同一條連線
+        session = browser.attach(prefer='tradingeconomics')
         for i, symbol in enumerate(symbols):
             try:
-                if i > 0:
-                    # 導航到下一個頁面
-                    symbol_info = SYMBOL_MAP.get(symbol, {"slug": symbol})
-                    target_url = symbol_info.get('url', f"{TE_BASE_URL}/{symbol_info['slug']}")
-                    print(f"[CDP] 導航到 {symbol} 頁面...")
-                    navigate_to_url(port, target_url)
-                    time.sleep(wait_seconds)
-
-                ws_url = get_cdp_ws_url(port)
-                if not ws_url:
-                    raise RuntimeError("無法取得 WebSocket URL")
-
-                # ===== Step 1: 抓取 1Y 日頻數據 =====
-                print(f"[CDP] 點擊 1Y 按鈕（日頻數據）...")
-                click_result = cdp_execute_js(ws_url, CLICK_1Y_BUTTON_JS)
-                click_value = click_result.get('result', {}).get('result', {}).get('value', '{}')
-                click_data = json.loads(click_value) if click_value else {}
-                if click_data.get('success'):
-                    print(f"[CDP] 成功: {click_data.get('clicked')}")
-                    time.sleep(6)
-                else:
-                    print(f"[CDP] 1Y 按鈕未找到")
-
-                print(f"[CDP] 提取 {symbol} 1Y 數據...")
-                result_1y = cdp_execute_js(ws_url, EXTRACT_HIGHCHARTS_JS)
-                value_1y = result_1y.get('result', {}).get('result', {}).get('value')
-                data_1y = json.loads(value_1y) if value_1y else None
-
-                # ===== Step 2: 抓取 5Y 週頻數據 =====
-                print(f"[CDP] 點擊 5Y 按鈕（週頻數據）...")
-                click_result = cdp_execute_js(ws_url, CLICK_5Y_BUTTON_JS)
-                click_value = click_result.get('result', {}).get('result', {}).get('value', '{}')
-                click_data = json.loads(click_value) if click_value else {}
-                if click_data.get('success'):
-                    print(f"[CDP] 成功: {click_data.get('clicked')}")
-                    time.sleep(6)
-                else:
-                    print(f"[CDP] 5Y 按鈕未找到")
-
-                print(f"[CDP] 提取 {symbol} 5Y 數據...")
-                result_5y = cdp_execute_js(ws_url, EXTRACT_HIGHCHARTS_JS)
-                value_5y = result_5y.get('result', {}).get('result', {}).get('value')
-                data_5y = json.loads(value_5y) if value_5y else None
-
-                # 合併數據（1Y daily 優先，5Y weekly 補充舊數據）
-                symbol_info = SYMBOL_MAP.get(symbol, {"slug": symbol, "unit": "unknown", "name": symbol})
-                results[symbol] = {
-                    "symbol": symbol,
-                    "source": "TradingEconomics (CDP Auto - 1Y+5Y merged)",
-                    "url": f"{TE_BASE_URL}/{symbol_info['slug']}",
-                    "unit": symbol_info['unit'],
-                    "charts_1y": data_1y,
-                    "charts_5y": data_5y,
-                    "fetched_at": datetime.now().isoformat()
-                }
-                print(f"[CDP] 成功提取 {symbol} (1Y + 5Y)!")
+                results[symbol] = fetch_symbol_on_session(
+                    session,
+                    symbol,
+                    wait_seconds=wait_seconds,
+                    navigate=not (i == 0 and chrome_proc is not None)
+                )
+                _done(symbol, results[symbol], None)
 
             except Exception as e:
-                print(f"[Warning] {symbol} 數據抓取失敗: {e}")
+                _done(symbol, None, e)
                 results[symbol] = None
 
         return results
 
     finally:
         # 關閉我們啟動的 Chrome
-        if we_started_chrome and chrome_proc:
+        if chrome_proc:
+            close_all_sessions()
             print("[Chrome] 關閉 Chrome...")
             close_chrome_debug(chrome_proc)
 
@@ -779,11 +778,15 @@ def fetch_te_commodities(
     symbols: List[str],
     cache_dir: Optional[str] = None,
     force_refresh: bool = False,
-    cdp_port: int = CDP_PORT
+    cdp_port: int = CDP_PORT,
+    tabs: int = DEFAULT_TABS,
+    per_domain: int = DEFAULT_PER_DOMAIN
 ) -> Dict[str, pd.DataFrame]:
     """
     獲取多個 TradingEconomics 商品價格數據（全自動）
 
+    各商品完成時即寫入快取，不必等全部抓完。
+
     Parameters
     ----------
     symbols : List[str]
@@ -794,6 +797,10 @@ def fetch_te_commodities(
         是否強制重新抓取
     cdp_port : int
         CDP 調試端口
+    tabs : int
+        同時開啟的分頁數
+    per_domain : int
+        同一網域同時載入的分頁上限
 
     Returns
     -------
@@ -821,15 +828,21 @@ def fetch_te_commodities(
     # 抓取需要更新的商品
     if symbols_to_fetch:
         print(f"[Fetch] 全自動抓取: {', '.join(symbols_to_fetch)}")
-        fetched = fetch_multiple_symbols(symbols_to_fetch, port=cdp_port)
 
-        for symbol, chart_data in fetched.items():
-            if chart_data:
-                cache.set_raw(symbol, chart_data)
-                df = extract_price_series(chart_data)
-                if df is not None:
-                    cache.set_csv(symbol, df)
-                    results[symbol] = df
+        def _store(symbol: str, chart_data: Dict[str, Any]):
+            cache.set_raw(symbol, chart_data)
+            df = extract_price_series(chart_data)
+            if df is not None:
+                cache.set_csv(symbol, df)
+                results[symbol] = df
+
+        fetch_multiple_symbols(
+            symbols_to_fetch,
+            port=cdp_port,
+            tabs=tabs,
+            per_domain=per_domain,
+            on_result=_store
+        )
 
     return results
 
@@ -854,6 +867,9 @@ def main():
   # 強制更新（忽略快取）
   python fetch_te_data.py --symbol urea --force-refresh
 
+  # 多分頁平行抓取
+  python fetch_te_data.py --symbol natural-gas --symbol urea --symbol dap --tabs 6
+
 可用商品代碼：
   natural-gas, eu-natural-gas, uk-natural-gas, urea, dap, fertilizers
 """
@@ -888,6 +904,18 @@ def main():
         default=None,
         help="輸出 CSV 檔案路徑（僅適用於單一商品）"
     )
+    parser.add_argument(
+        "--tabs",
+        type=int,
+        default=DEFAULT_TABS,
+        help=f"多商品時同時開啟的分頁數 (預設: {DEFAULT_TABS}，1 = 依序抓取)"
+    )
+    parser.add_argument(
+        "--per-domain",
+        type=int,
+        default=DEFAULT_PER_DOMAIN,
+        help=f"同一網域同時載入的分頁上限 (預設: {DEFAULT_PER_DOMAIN})"
+    )
 
     args = parser.parse_args()
 
@@ -921,7 +949,9 @@ def main():
                 symbols=args.symbol,
                 cache_dir=args.cache_dir,
                 force_refresh=args.force_refresh,
-                cdp_port=args.cdp_port
+                cdp_port=args.cdp_port,
+                tabs=args.tabs,
+                per_domain=args.per_domain
             )
 
             print(f"\n{'=' * 60}")
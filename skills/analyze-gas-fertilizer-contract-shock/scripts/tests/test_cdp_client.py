@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+CDP Client Tests
+
+以本機 HTML fixture + 本機 headless Chrome 驗證 cdp_client：
+1. 同一分頁重複 attach 沿用同一條連線
+2. 事件驅動導航與 Highcharts 就緒探針
+3. 點擊 1Y/5Y 後等待圖表簽章改變
+4. 多工：同一連線上並行送出的指令各自取得正確回應
+
+找不到 Chrome 時略過（可用 CHROME_PATH 指定）。
+
+Usage:
+    cd skills/analyze-gas-fertilizer-contract-shock/scripts/tests
+    python -m pytest -q test_cdp_client.py
+"""
+
+import functools
+import http.server
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+# Add scripts directory to path (tests is inside scripts/)
+scripts_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(scripts_dir))
+
+pytest.importorskip("websocket")
+
+from cdp_client import CDPBrowser  # noqa: E402
+from fetch_te_data import CHROME_PATHS, CLICK_1Y_BUTTON_JS, CLICK_5Y_BUTTON_JS, EXTRACT_HIGHCHARTS_JS  # noqa: E402
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _find_chrome():
+    candidates = [os.environ.get("CHROME_PATH")] + CHROME_PATHS + [
+        shutil.which("google-chrome"), shutil.which("chromium"), shutil.which("chromium-browser"),
+    ]
+    for path in candidates:
+        if path and Path(path).exists():
+            return path
+    return None
+
+
+@pytest.fixture(scope="module")
+def fixture_url():
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(FIXTURES_DIR))
+    handler.log_message = lambda *args: None
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", _free_port()), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/highcharts_fixture.html"
+    server.shutdown()
+
+
+@pytest.fixture(scope="module")
+def browser():
+    chrome = _find_chrome()
+    if not chrome:
+        pytest.skip("Chrome not found (set CHROME_PATH)")
+
+    port = _free_port()
+    profile = tempfile.mkdtemp(prefix="cdp-test-")
+    proc = subprocess.Popen(
+        [chrome, "--headless=new", f"--remote-debugging-port={port}", "--remote-allow-origins=*",
+         f"--user-data-dir={profile}", "--no-first-run", "--no-sandbox", "about:blank"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    browser = CDPBrowser(port, timeout=15)
+    deadline = time.time() + 15
+    while not browser.is_running() and time.time() < deadline:
+        time.sleep(0.2)
+    if not browser.is_running():
+        proc.kill()
+        pytest.skip("Chrome DevTools endpoint did not start")
+
+    yield browser
+
+    proc.terminate()
+    proc.wait(timeout=10)
+    shutil.rmtree(profile, ignore_errors=True)
+
+
+def test_attach_reuses_session(browser, fixture_url):
+    session = browser.new_tab(fixture_url)
+    try:
+        assert browser.attach("highcharts_fixture") is session
+    finally:
+        browser.close_tab(session)
+
+
+def test_navigate_and_wait_for_highcharts(browser, fixture_url):
+    session = browser.new_tab()
+    try:
+        started = time.monotonic()
+        session.navigate(fixture_url, wait_until="load", timeout=10)
+        points = session.wait_for_highcharts(timeout=10)
+        elapsed = time.monotonic() - started
+
+        assert points == 120
+        assert elapsed < 5, "readiness should track the page, not a fixed sleep"
+    finally:
+        browser.close_tab(session)
+
+
+def test_click_waits_for_chart_update(browser, fixture_url):
+    session = browser.new_tab()
+    try:
+        session.navigate(fixture_url, timeout=10)
+        session.wait_for_highcharts(timeout=10)
+
+        clicked, changed = session.click_and_wait_for_chart(CLICK_1Y_BUTTON_JS, timeout=5)
+        assert clicked["success"] and changed
+        charts = json.loads(session.evaluate(EXTRACT_HIGHCHARTS_JS))
+        assert charts[0]["title"] == "1Y"
+        assert charts[0]["series"][0]["dataLength"] == 250
+
+        clicked, changed = session.click_and_wait_for_chart(CLICK_5Y_BUTTON_JS, timeout=5)
+        assert changed
+        assert json.loads(session.evaluate(EXTRACT_HIGHCHARTS_JS))[0]["title"] == "5Y"
+    finally:
+        browser.close_tab(session)
+
+
+def test_concurrent_commands_are_multiplexed(browser, fixture_url):
+    session = browser.new_tab(fixture_url)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            values = list(pool.map(lambda i: session.evaluate(f"{i} * 2"), range(32)))
+        assert values == [i * 2 for i in range(32)]
+    finally:
+        browser.close_tab(session)
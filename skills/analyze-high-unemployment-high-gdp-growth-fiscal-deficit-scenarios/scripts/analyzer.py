@@ -6,11 +6,13 @@
 分析「失業率走高／勞動市場轉弱」但「GDP 仍維持高位」的情境下，
 財政赤字占 GDP 可能擴張的區間，並生成對長天期美債的風險解讀。
 
-支援視覺化輸出（三軸圖表）。
+支援視覺化輸出（三軸圖表）。分析所用的 FRED 序列與結果會寫成分析產物
+（data/bundle/fiscal_deficit.arrow + .json），視覺化直接讀取、不重新抓取。
 """
 
 import argparse
 import json
+import sys
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
@@ -18,20 +20,12 @@ from typing import Dict, List, Optional, Tuple
 import numpy as np
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).parent))
+
 # 導入數據抓取模組
 from fetch_data import fetch_multiple_series, validate_data
 
-# 嘗試導入視覺化模組（可選）
-try:
-    from visualizer import (
-        plot_gromen_style_chart,
-        identify_crossover_events,
-        generate_scenario_projection,
-        generate_summary_stats
-    )
-    HAS_VISUALIZER = True
-except ImportError:
-    HAS_VISUALIZER = False
+# 視覺化模組（matplotlib）只在 --visualize 時才載入，純分析不需繪圖相依
 
 
 # ============================================================
@@ -47,11 +41,23 @@ DEFAULT_CONFIG = {
     "labor_soft_percentile_threshold": 0.80,
     "sahm_threshold": 0.5,
     "delta_ur_threshold": 1.0,
+    "epsilon": 0.10,
     "model": "event_study_banding"
 }
 
+# 敏感度曲面的預設網格
+SENSITIVITY_GRID = {
+    "labor_soft_percentile_thresholds": [0.60, 0.70, 0.80, 0.90],
+    "horizons_quarters": [4, 6, 8, 12],
+    "epsilons": [0.05, 0.10, 0.15, 0.20]
+}
+
 REQUIRED_SERIES = ["UNRATE", "UNEMPLOY", "JTSJOL", "GDP", "GDPC1", "FYFSGDA188S"]
 
+# 分析產物（供視覺化離線繪圖）
+BUNDLE_NAME = "fiscal_deficit"
+DEFAULT_BUNDLE_DIR = Path(__file__).parent.parent / "data" / "bundle"
+
 
 # ============================================================
 # 數據處理函數
@@ -99,6 +105,23 @@ def compute_percentile_rank(series: pd.Series) -> pd.Series:
 # 事件識別函數
 # ============================================================
 
+def labor_soft_mask(
+    data: pd.DataFrame,
+    ujo_threshold_pctl: float = 0.80,
+    sahm_threshold: float = 0.5,
+    delta_ur_threshold: float = 1.0,
+    ujo_pctl: Optional[pd.Series] = None
+) -> pd.Series:
+    """勞動轉弱條件（任一觸發即為 True）；ujo_pctl 可傳入預先計算的分位數"""
+    if ujo_pctl is None:
+        ujo_pctl = compute_percentile_rank(data["UJO"])
+    return (
+        (ujo_pctl >= ujo_threshold_pctl) |
+        (data["SAHM"] >= sahm_threshold) |
+        (data["DELTA_UR_6M"] >= delta_ur_threshold)
+    )
+
+
 def identify_labor_softening_events(
     data: pd.DataFrame,
     ujo_threshold_pctl: float = 0.80,
@@ -127,50 +150,90 @@ def identify_labor_softening_events(
     list
         事件列表
     """
-    # 計算 UJO 分位數
-    ujo_pctl = compute_percentile_rank(data["UJO"])
+    labor_soft = labor_soft_mask(data, ujo_threshold_pctl, sahm_threshold, delta_ur_threshold)
+    return segment_events(labor_soft, data, min_duration)
+
+
+def _run_bounds(mask: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    找出布林序列中 True 區段的起訖位置（run-length）
+
+    Returns
+    -------
+    tuple
+        (starts, ends)：ends 為區段結束後第一個 False 的位置；
+        延續到序列尾端、尚未結束的區段不計入
+    """
+    flags = mask.to_numpy(dtype=bool)
+    edges = np.diff(np.concatenate(([False], flags)).astype(np.int8))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return starts[:len(ends)], ends
 
-    # 定義轉弱條件
-    labor_soft = (
-        (ujo_pctl >= ujo_threshold_pctl) |
-        (data["SAHM"] >= sahm_threshold) |
-        (data["DELTA_UR_6M"] >= delta_ur_threshold)
-    )
 
-    # 識別連續事件
-    events = []
-    in_event = False
-    event_start = None
-
-    for i, (date, is_soft) in enumerate(labor_soft.items()):
-        if is_soft and not in_event:
-            in_event = True
-            event_start = date
-        elif not is_soft and in_event:
-            duration = (date - event_start).days // 90  # 約季度數
-            if duration >= min_duration:
-                events.append({
-                    "start_date": event_start,
-                    "end_date": date,
-                    "duration_quarters": duration,
-                    "ujo_at_start": data.loc[event_start, "UJO"] if "UJO" in data.columns else None,
-                    "sahm_at_start": data.loc[event_start, "SAHM"] if "SAHM" in data.columns else None,
-                    "delta_ur_at_start": data.loc[event_start, "DELTA_UR_6M"] if "DELTA_UR_6M" in data.columns else None
-                })
-            in_event = False
-
-    return events
+def segment_events(
+    labor_soft: pd.Series,
+    data: pd.DataFrame,
+    min_duration: int = 2
+) -> List[Dict]:
+    """
+    將轉弱旗標切分為事件區段
+
+    Parameters
+    ----------
+    labor_soft : pd.Series
+        布林序列（True = 勞動轉弱）
+    data : pd.DataFrame
+        用於取事件起點的 UJO / SAHM / DELTA_UR_6M
+    min_duration : int
+        最小持續期數（約季度數）
+
+    Returns
+    -------
+    list
+        事件列表
+    """
+    starts, ends = _run_bounds(labor_soft)
+    index = labor_soft.index
+    start_dates = index[starts]
+    end_dates = index[ends]
+    durations = (end_dates - start_dates).days // 90  # 約季度數
+    keep = np.asarray(durations >= min_duration)
+
+    start_dates, end_dates = start_dates[keep], end_dates[keep]
+    durations = np.asarray(durations)[keep]
+
+    def _at_start(col: str) -> List:
+        if col not in data.columns:
+            return [None] * len(start_dates)
+        return data[col].reindex(start_dates).tolist()
+
+    ujo, sahm, delta_ur = _at_start("UJO"), _at_start("SAHM"), _at_start("DELTA_UR_6M")
+
+    return [
+        {
+            "start_date": start_dates[i],
+            "end_date": end_dates[i],
+            "duration_quarters": int(durations[i]),
+            "ujo_at_start": ujo[i],
+            "sahm_at_start": sahm[i],
+            "delta_ur_at_start": delta_ur[i]
+        }
+        for i in range(len(start_dates))
+    ]
 
 
 def filter_high_gdp_events(
     events: List[Dict],
     data: pd.DataFrame,
-    gdp_threshold_pctl: float = 0.70
+    gdp_threshold_pctl: float = 0.70,
+    gdp_pctl: Optional[pd.Series] = None
 ) -> List[Dict]:
     """
     篩選高 GDP 條件下的事件
     """
-    gdp_pctl = compute_percentile_rank(data["GDP"])
+    if gdp_pctl is None:
+        gdp_pctl = compute_percentile_rank(data["GDP"])
 
     filtered = []
     for event in events:
@@ -188,6 +251,45 @@ def filter_high_gdp_events(
 # 分析模型
 # ============================================================
 
+def _horizon_dates(dates: pd.DatetimeIndex, horizon_quarters: int) -> pd.DatetimeIndex:
+    """dates 往後 horizon_quarters 季（與 pd.DateOffset 相同的月底處理）"""
+    return pd.DatetimeIndex(dates) + pd.DateOffset(months=horizon_quarters * 3)
+
+
+def forward_deficit_asof(
+    dates: pd.DatetimeIndex,
+    deficit_gdp: pd.Series,
+    horizon_quarters: int = 8
+) -> np.ndarray:
+    """
+    各日期 horizon 後「最近一筆已公布」的赤字/GDP（as-of join）
+
+    等同逐一呼叫 deficit_gdp.loc[:future_date].iloc[-1]，但以 searchsorted 一次完成。
+    超出資料尾端或之前沒有資料的日期回傳 NaN。
+    """
+    future = _horizon_dates(dates, horizon_quarters)
+    values = deficit_gdp.to_numpy(dtype=float)
+    pos = deficit_gdp.index.searchsorted(future, side="right") - 1
+    valid = (future <= deficit_gdp.index.max()) & (pos >= 0)
+    out = np.full(len(future), np.nan)
+    out[valid] = values[pos[valid]]
+    return out
+
+
+def forward_deficit_peak(
+    starts: pd.DatetimeIndex,
+    deficit_gdp: pd.Series,
+    horizon_quarters: int = 8
+) -> np.ndarray:
+    """各事件起點至 horizon 內的赤字/GDP 最大值；窗口內無資料時為 NaN"""
+    starts = pd.DatetimeIndex(starts)
+    index = deficit_gdp.index
+    lo = index.searchsorted(starts, side="left")
+    hi = index.searchsorted(_horizon_dates(starts, horizon_quarters), side="right")
+    values = deficit_gdp.to_numpy(dtype=float)
+    return np.array([values[i:j].max() if j > i else np.nan for i, j in zip(lo, hi)])
+
+
 def event_study_banding(
     events: List[Dict],
     deficit_gdp: pd.Series,
@@ -210,21 +312,15 @@ def event_study_banding(
     dict
         分析結果
     """
-    forward_deficits = []
+    starts = pd.DatetimeIndex([e["start_date"] for e in events])
+    peaks = forward_deficit_peak(starts, deficit_gdp, horizon_quarters)
 
-    for event in events:
-        start = event["start_date"]
-        end_date = start + pd.DateOffset(months=horizon_quarters * 3)
-
-        # 取事件後的赤字峰值
-        mask = (deficit_gdp.index >= start) & (deficit_gdp.index <= end_date)
-        if mask.any():
-            peak_deficit = deficit_gdp[mask].max()
-            forward_deficits.append({
-                "start": start,
-                "deficit_peak": abs(peak_deficit),  # FRED 數據為負數表示赤字
-                **event
-            })
+    # 取事件後的赤字峰值（FRED 數據為負數表示赤字）
+    forward_deficits = [
+        {"start": event["start_date"], "deficit_peak": abs(peak), **event}
+        for event, peak in zip(events, peaks)
+        if not np.isnan(peak)
+    ]
 
     if not forward_deficits:
         return {"error": "無有效事件樣本"}
@@ -257,17 +353,13 @@ def quantile_mapping(
 
     # 找出相似時期
     all_pctl = compute_percentile_rank(slack_series)
-    similar_mask = abs(all_pctl - current_pctl) < epsilon
+    similar_mask = (abs(all_pctl - current_pctl) < epsilon).to_numpy()
 
     # 取這些時期的後續赤字
-    forward_deficits = []
-    for date in slack_series.index[similar_mask]:
-        future_date = date + pd.DateOffset(months=horizon_quarters * 3)
-        if future_date <= deficit_gdp.index.max():
-            future_deficit = deficit_gdp.loc[:future_date].iloc[-1]
-            forward_deficits.append(abs(future_deficit))
+    forward = forward_deficit_asof(slack_series.index[similar_mask], deficit_gdp, horizon_quarters)
+    forward_deficits = np.abs(forward[~np.isnan(forward)])
 
-    if not forward_deficits:
+    if len(forward_deficits) == 0:
         return {"error": "無相似時期樣本"}
 
     return {
@@ -279,6 +371,148 @@ def quantile_mapping(
     }
 
 
+# ============================================================
+# 敏感度曲面
+# ============================================================
+
+def _band_stats(values: np.ndarray) -> Dict:
+    """樣本的 p25/p50/p75 與數量（空樣本回傳 NaN）"""
+    if len(values) == 0:
+        return {"n": 0, "p25": np.nan, "p50": np.nan, "p75": np.nan}
+    p25, p50, p75 = np.percentile(values, [25, 50, 75])
+    return {"n": len(values), "p25": p25, "p50": p50, "p75": p75}
+
+
+def event_study_surface(
+    data: pd.DataFrame,
+    deficit_gdp: pd.Series,
+    thresholds: List[float],
+    horizons: List[int],
+    cfg: Dict = None
+) -> pd.DataFrame:
+    """
+    事件分組區間法的 UJO 門檻 × 觀察期 曲面
+
+    分位數只計算一次；每個門檻切一次事件，每個觀察期做一次 searchsorted。
+
+    Returns
+    -------
+    pd.DataFrame
+        欄位：threshold, horizon_quarters, n, p25, p50, p75
+    """
+    cfg = {**DEFAULT_CONFIG, **(cfg or {})}
+    ujo_pctl = compute_percentile_rank(data["UJO"])
+    gdp_pctl = compute_percentile_rank(data["GDP"])
+
+    rows = []
+    for threshold in thresholds:
+        mask = labor_soft_mask(
+            data, threshold, cfg["sahm_threshold"], cfg["delta_ur_threshold"], ujo_pctl=ujo_pctl
+        )
+        events = filter_high_gdp_events(
+            segment_events(mask, data),
+            data,
+            gdp_threshold_pctl=cfg["high_gdp_percentile_threshold"],
+            gdp_pctl=gdp_pctl
+        )
+        starts = pd.DatetimeIndex([e["start_date"] for e in events])
+        for horizon in horizons:
+            peaks = np.abs(forward_deficit_peak(starts, deficit_gdp, horizon))
+            rows.append({
+                "threshold": threshold,
+                "horizon_quarters": horizon,
+                **_band_stats(peaks[~np.isnan(peaks)])
+            })
+    return pd.DataFrame(rows)
+
+
+def quantile_mapping_surface(
+    current_slack: float,
+    slack_series: pd.Series,
+    deficit_gdp: pd.Series,
+    epsilons: List[float],
+    horizons: List[int]
+) -> pd.DataFrame:
+    """
+    分位數映射法的 ε × 觀察期 曲面
+
+    每個觀察期只做一次全樣本 as-of join，ε 只改變取樣遮罩。
+
+    Returns
+    -------
+    pd.DataFrame
+        欄位：epsilon, horizon_quarters, n, p25, p50, p75
+    """
+    current_pctl = (slack_series < current_slack).mean()
+    distance = np.abs(compute_percentile_rank(slack_series).to_numpy() - current_pctl)
+    forward = {
+        h: np.abs(forward_deficit_asof(slack_series.index, deficit_gdp, h))
+        for h in horizons
+    }
+
+    rows = []
+    for epsilon in epsilons:
+        similar = distance < epsilon
+        for horizon in horizons:
+            values = forward[horizon][similar]
+            rows.append({
+                "epsilon": epsilon,
+                "horizon_quarters": horizon,
+                **_band_stats(values[~np.isnan(values)])
+            })
+    return pd.DataFrame(rows)
+
+
+def build_sensitivity_surface(
+    data: pd.DataFrame,
+    deficit_gdp: pd.Series,
+    grid: Dict = None,
+    cfg: Dict = None
+) -> Dict:
+    """
+    兩種模型在參數網格上的赤字區間（JSON 友善格式，赤字以百分比表示）
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        季度指標（UJO, SAHM, DELTA_UR_6M, GDP）
+    deficit_gdp : pd.Series
+        赤字/GDP 時間序列
+    grid : dict, optional
+        覆寫 SENSITIVITY_GRID 的網格
+    cfg : dict, optional
+        其餘門檻（預設 DEFAULT_CONFIG）
+    """
+    grid = {**SENSITIVITY_GRID, **(grid or {})}
+    slack = data["UJO"].dropna()
+
+    event_surface = event_study_surface(
+        data, deficit_gdp,
+        grid["labor_soft_percentile_thresholds"], grid["horizons_quarters"], cfg
+    )
+    qm_surface = quantile_mapping_surface(
+        slack.iloc[-1], slack, deficit_gdp,
+        grid["epsilons"], grid["horizons_quarters"]
+    )
+
+    def _records(df: pd.DataFrame) -> List[Dict]:
+        return json.loads(df.round(4).to_json(orient="records"))
+
+    return {
+        "grid": grid,
+        "event_study_banding": _records(event_surface),
+        "quantile_mapping": _records(qm_surface),
+        "p50_range": {
+            "event_study_banding": [
+                float(event_surface["p50"].min()), float(event_surface["p50"].max())
+            ] if event_surface["p50"].notna().any() else None,
+            "quantile_mapping": [
+                float(qm_surface["p50"].min()), float(qm_surface["p50"].max())
+            ] if qm_surface["p50"].notna().any() else None
+        }
+    }
+
+
 # ============================================================
 # 主分析函數
 # ============================================================
@@ -337,7 +571,8 @@ def run_analysis(config: Dict = None) -> Dict:
     # 篩選高 GDP 事件
     high_gdp_events = filter_high_gdp_events(
         events, data,
-        gdp_threshold_pctl=cfg["high_gdp_percentile_threshold"]
+        gdp_threshold_pctl=cfg["high_gdp_percentile_threshold"],
+        gdp_pctl=gdp_pctl
     )
 
     print(f"  找到 {len(events)} 個勞動轉弱事件")
@@ -361,11 +596,20 @@ def run_analysis(config: Dict = None) -> Dict:
             current_ujo,
             data["UJO"].dropna(),
             deficit_gdp,
+            epsilon=cfg["epsilon"],
             horizon_quarters=cfg["horizon_quarters"]
         )
     else:
         projection = {"error": f"未知模型: {cfg['model']}"}
 
+    # Step 5b: 敏感度曲面（門檻/ε × 觀察期）
+    sensitivity = None
+    if cfg.get("sensitivity"):
+        print("Step 5b: 計算敏感度曲面...")
+        sensitivity = build_sensitivity_surface(
+            data, deficit_gdp, grid=cfg.get("sensitivity_grid"), cfg=cfg
+        )
+
     # Step 6: 構建輸出
     print("Step 6: 構建輸出結果...")
 
@@ -433,6 +677,7 @@ def run_analysis(config: Dict = None) -> Dict:
                 for e in projection.get("episodes", [])
             ]
         },
+        "sensitivity_surface": sensitivity,
         "interpretation": generate_interpretation(
             projection, baseline_deficit, triggered, latest_gdp_pctl
         ),
@@ -446,9 +691,35 @@ def run_analysis(config: Dict = None) -> Dict:
         }
     }
 
+    if cfg.get("bundle_dir"):
+        write_analysis_bundle(cfg["bundle_dir"], raw_data, result, cfg)
+
     return result
 
 
+def write_analysis_bundle(
+    bundle_dir,
+    raw_data: pd.DataFrame,
+    result: Dict,
+    cfg: Dict
+) -> None:
+    """
+    寫出分析產物：原始 FRED 序列 + 結果 JSON
+
+    另以 GDPC1 推導年化季增率，欄名沿用 FRED 的 A191RL1Q225SBEA
+    （定義相同），讓視覺化的 GDP 成長率軸不需額外抓取。
+    """
+    from analysis_bundle import write_bundle
+
+    series = {col: raw_data[col] for col in raw_data.columns}
+    if "GDPC1" in raw_data.columns:
+        gdpc1 = raw_data["GDPC1"].dropna()
+        series["A191RL1Q225SBEA"] = ((gdpc1 / gdpc1.shift(1)) ** 4 - 1).dropna() * 100
+
+    meta = {"config": {k: v for k, v in cfg.items() if k != "bundle_dir"}}
+    write_bundle(bundle_dir, BUNDLE_NAME, series, result, meta=meta)
+
+
 def generate_interpretation(
     projection: Dict,
     baseline: float,
@@ -504,9 +775,9 @@ def generate_interpretation(
     }
 
 
-def run_quick_diagnosis() -> Dict:
+def run_quick_diagnosis(config: Dict = None) -> Dict:
     """執行快速診斷（簡化輸出）"""
-    result = run_analysis()
+    result = run_analysis(config)
 
     return {
         "skill": result["skill"],
@@ -563,6 +834,17 @@ def main():
         choices=["event_study_banding", "quantile_mapping"],
         help="分析模型 (預設: event_study_banding)"
     )
+    parser.add_argument(
+        "--epsilon",
+        type=float,
+        default=0.10,
+        help="quantile_mapping 的分位數鄰域 ε (預設: 0.10)"
+    )
+    parser.add_argument(
+        "--sensitivity",
+        action="store_true",
+        help="輸出 門檻/ε × 觀察期 的敏感度曲面"
+    )
     parser.add_argument(
         "--scenario",
         type=str,
@@ -603,6 +885,12 @@ def main():
         action="store_true",
         help="不顯示圖表（僅保存）"
     )
+    parser.add_argument(
+        "--bundle-dir",
+        type=str,
+        default=str(DEFAULT_BUNDLE_DIR),
+        help="分析產物目錄（空字串表示不寫出）"
+    )
 
     args = parser.parse_args()
 
@@ -610,7 +898,10 @@ def main():
     config = {
         "lookback_years": args.lookback,
         "horizon_quarters": args.horizon,
-        "model": args.model
+        "epsilon": args.epsilon,
+        "sensitivity": args.sensitivity,
+        "model": args.model,
+        "bundle_dir": args.bundle_dir or None
     }
 
     if args.scenario:
@@ -619,7 +910,7 @@ def main():
 
     # 執行分析
     if args.quick:
-        result = run_quick_diagnosis()
+        result = run_quick_diagnosis(config)
     else:
         result = run_analysis(config)
 
@@ -636,21 +927,30 @@ def main():
 
     # 視覺化
     if args.visualize:
-        if not HAS_VISUALIZER:
+        try:
+            from visualizer import (
+                plot_gromen_style_chart,
+                identify_crossover_events,
+                generate_scenario_projection
+            )
+            import matplotlib.pyplot as plt
+        except ImportError:
             print("\n警告：視覺化模組不可用，請確認 matplotlib 已安裝")
             print("      pip install matplotlib")
             return
 
-        import matplotlib.pyplot as plt
-
         print("\n" + "=" * 60)
         print("生成視覺化圖表...")
 
-        # 重新抓取完整數據用於視覺化
-        vis_data = fetch_multiple_series(
-            ['UNRATE', 'UNEMPLOY', 'JTSJOL', 'FYFSGDA188S'],
-            years=args.lookback
-        )
+        # 使用分析實際用到的數據（分析產物），未寫出時才重新抓取
+        if args.bundle_dir:
+            from analysis_bundle import read_bundle
+            vis_data = read_bundle(args.bundle_dir, BUNDLE_NAME).frame
+        else:
+            vis_data = fetch_multiple_series(
+                ['UNRATE', 'UNEMPLOY', 'JTSJOL', 'FYFSGDA188S'],
+                years=args.lookback
+            )
 
         # 識別 crossover 事件
         events = identify_crossover_events(
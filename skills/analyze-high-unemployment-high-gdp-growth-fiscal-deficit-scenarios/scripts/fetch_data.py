@@ -9,6 +9,7 @@ FRED 數據抓取工具
 
 import argparse
 import json
+import sys
 from datetime import datetime, timedelta
 from io import StringIO
 from pathlib import Path
@@ -17,6 +18,9 @@ from typing import Dict, List, Optional, Union
 import pandas as pd
 import requests
 
+sys.path.insert(0, str(Path(__file__).parent))
+import http_client
+
 # 預設數據系列配置
 DEFAULT_SERIES = {
     "labor": ["UNRATE", "UNEMPLOY", "JTSJOL", "ICSA"],
@@ -71,7 +75,7 @@ def fetch_fred_csv(
 
     # 請求數據
     try:
-        response = requests.get(url, timeout=30)
+        response = http_client.get(url, timeout=30)
         response.raise_for_status()
     except requests.RequestException as e:
         raise RuntimeError(f"FRED 請求失敗 ({series_id}): {e}")
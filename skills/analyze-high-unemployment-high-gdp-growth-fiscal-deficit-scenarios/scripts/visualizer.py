@@ -9,10 +9,14 @@
 - 財政赤字/GDP - 綠色 (右軸)
 
 並加入情境模擬（高失業 + 高 GDP 情境下的赤字推演）
+
+預設讀取 analyzer.py 寫出的分析產物（data/bundle/fiscal_deficit.arrow），
+圖表與分析使用相同數據且可離線繪製；產物不存在時才從 FRED 抓取。
 """
 
 import argparse
 import json
+import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
@@ -26,6 +30,8 @@ from matplotlib.lines import Line2D
 import numpy as np
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).parent))
+
 # 導入數據抓取模組
 from fetch_data import fetch_multiple_series
 
@@ -71,6 +77,33 @@ def fetch_visualization_data(years: int = 30) -> pd.DataFrame:
     return data
 
 
+def load_visualization_data(bundle_dir, years: Optional[int] = None) -> Optional[pd.DataFrame]:
+    """
+    從分析產物載入視覺化數據（欄位與 fetch_visualization_data 相同）
+
+    Parameters
+    ----------
+    bundle_dir : str or Path
+        分析產物目錄
+    years : int, optional
+        只保留最近 N 年
+
+    Returns
+    -------
+    pd.DataFrame or None
+        產物不存在時回傳 None
+    """
+    from analysis_bundle import bundle_exists, read_bundle
+
+    if not bundle_exists(bundle_dir, "fiscal_deficit"):
+        return None
+
+    data = read_bundle(bundle_dir, "fiscal_deficit").frame
+    if years is not None:
+        data = data[data.index >= datetime.now() - timedelta(days=years * 365)]
+    return data
+
+
 def identify_crossover_events(
     unemploy: pd.Series,
     jolts: pd.Series,
@@ -1036,12 +1069,22 @@ def main():
         default=None,
         help='輸出 JSON 摘要檔案路徑'
     )
+    parser.add_argument(
+        '--bundle',
+        type=str,
+        default=str(Path(__file__).parent.parent / 'data' / 'bundle'),
+        help='分析產物目錄（analyzer.py 輸出；空字串表示直接抓取 FRED）'
+    )
 
     args = parser.parse_args()
 
-    # 抓取數據
-    print("正在抓取數據...")
-    data = fetch_visualization_data(years=args.years)
+    # 優先使用分析產物，不存在時才抓取
+    data = load_visualization_data(args.bundle, years=args.years) if args.bundle else None
+    if data is not None:
+        print(f"已載入分析產物: {args.bundle}")
+    else:
+        print("正在抓取數據...")
+        data = fetch_visualization_data(years=args.years)
 
     # 識別 crossover 事件
     print("識別歷史事件...")
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Investment Clock - 時鐘狀態快取
+投資時鐘歷史的持久化與增量更新
+
+每組「獲利 × 金融環境」定義（ClockDefinition）各自保存：
+- 計算時使用的原始序列（earnings / fci）
+- 完整的時鐘歷史（x / y / angle / hour / quadrant）
+
+新數據到來時，比對新舊原始序列找出最早變動的日期（新增一季、或舊值被修正），
+只取該日期前一段足夠計算滾動統計（yoy、Z-score、平滑）的回溯資料重算尾段，
+再接回未受影響的舊歷史；結果與全量重算一致。
+
+Usage:
+    from clock_state import ClockDefinition, ClockStateStore
+
+    store = ClockStateStore()
+    definition = ClockDefinition(earnings_id="CP", fci_id="NFCI")
+    history, stats = store.update(definition, {"earnings": earnings, "fci": fci})
+"""
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from investment_clock import compute_clock_frame
+
+DEFAULT_STATE_DIR = Path(__file__).parent.parent / "data" / "clock_state"
+
+
+@dataclass(frozen=True)
+class ClockDefinition:
+    """一組時鐘定義：序列來源與計算參數"""
+
+    earnings_id: str = "CP"
+    fci_id: str = "NFCI"
+    earnings_periods: int = 4
+    z_window: int = 52
+    invert_fci: bool = True
+    smoothing_window: Optional[int] = None
+    data_start: str = "2010-01-01"
+
+    @property
+    def label(self) -> str:
+        return f"{self.earnings_id} x {self.fci_id}"
+
+    @property
+    def key(self) -> str:
+        payload = json.dumps(asdict(self), sort_keys=True)
+        digest = hashlib.sha1(payload.encode("utf-8")).hexdigest()[:10]
+        return f"{self.earnings_id}_{self.fci_id}_{digest}"
+
+    def compute(self, earnings: pd.Series, fci: pd.Series) -> pd.DataFrame:
+        return compute_clock_frame(
+            earnings,
+            fci,
+            earnings_periods=self.earnings_periods,
+            z_window=self.z_window,
+            invert_fci=self.invert_fci,
+            smoothing_window=self.smoothing_window,
+        )
+
+
+def first_changed_date(old: pd.Series, new: pd.Series) -> Optional[pd.Timestamp]:
+    """
+    找出兩版序列最早不同的日期（新增、刪除或數值修正）
+
+    Args:
+        old: 舊序列
+        new: 新序列
+
+    Returns:
+        最早變動日期；完全相同時為 None
+    """
+    union = old.index.union(new.index)
+    a = old.reindex(union)
+    b = new.reindex(union)
+    changed = ~((a == b) | (a.isna() & b.isna()))
+    changed |= union.isin(old.index) != union.isin(new.index)
+    if not changed.any():
+        return None
+    return union[changed.to_numpy().argmax()]
+
+
+def _tail(series: pd.Series, since: pd.Timestamp, lookback: int) -> pd.Series:
+    """since 之後的資料，加上 since 之前 lookback 筆回溯資料"""
+    pos = series.index.searchsorted(since)
+    return series.iloc[max(0, pos - lookback):]
+
+
+def update_clock_history(
+    definition: ClockDefinition,
+    history: pd.DataFrame,
+    old_data: Dict[str, pd.Series],
+    new_data: Dict[str, pd.Series],
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    以新原始序列增量更新時鐘歷史
+
+    Args:
+        definition: 時鐘定義
+        history: 舊時鐘歷史
+        old_data: 計算舊歷史時的 {"earnings", "fci"}
+        new_data: 最新的 {"earnings", "fci"}
+
+    Returns:
+        (更新後歷史, 更新統計)
+    """
+    changes = [
+        first_changed_date(old_data[name], new_data[name])
+        for name in ("earnings", "fci")
+    ]
+    changes = [d for d in changes if d is not None]
+    if not changes:
+        return history, {"mode": "unchanged", "recomputed_points": 0, "since": None}
+
+    since = min(changes)
+    smoothing = definition.smoothing_window or 0
+    # 回溯筆數：滾動視窗 + 平滑視窗，取兩倍確保對齊後的前向填充也落在正確值上
+    fci_lookback = 2 * (definition.z_window + smoothing) + 2
+    earnings_lookback = 2 * (definition.earnings_periods + smoothing) + 2
+
+    fresh = definition.compute(
+        _tail(new_data["earnings"], since, earnings_lookback),
+        _tail(new_data["fci"], since, fci_lookback),
+    )
+    fresh = fresh[fresh.index >= since]
+    updated = pd.concat([history[history.index < since], fresh])
+
+    return updated, {
+        "mode": "incremental",
+        "recomputed_points": len(fresh),
+        "since": str(since.date()),
+    }
+
+
+class ClockStateStore:
+    """每組時鐘定義一個 pickle 檔：原始序列 + 時鐘歷史"""
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_STATE_DIR
+
+    def _path(self, definition: ClockDefinition) -> Path:
+        return self.cache_dir / f"{definition.key}.pkl"
+
+    def load(self, definition: ClockDefinition) -> Optional[Dict[str, Any]]:
+        path = self._path(definition)
+        if not path.exists():
+            return None
+        try:
+            state = pd.read_pickle(path)
+        except Exception:
+            return None
+        if state.get("definition") != asdict(definition):
+            return None
+        return state
+
+    def save(self, definition: ClockDefinition, state: Dict[str, Any]) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(definition)
+        tmp = path.with_suffix(".tmp")
+        pd.to_pickle(state, tmp)
+        tmp.replace(path)
+
+    def cached_series(self, definitions: List[ClockDefinition]) -> Dict[str, pd.Series]:
+        """從已保存的狀態收集各 FRED ID 最近一次抓到的原始序列（供增量抓取）"""
+        series: Dict[str, pd.Series] = {}
+        for definition in definitions:
+            state = self.load(definition)
+            if state is None:
+                continue
+            series.setdefault(definition.earnings_id, state["earnings"])
+            series.setdefault(definition.fci_id, state["fci"])
+        return series
+
+    def update(
+        self,
+        definition: ClockDefinition,
+        data: Dict[str, pd.Series],
+        rebuild: bool = False,
+    ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        依最新原始序列更新並保存時鐘歷史
+
+        Args:
+            definition: 時鐘定義
+            data: 最新的 {"earnings", "fci"}
+            rebuild: 忽略既有狀態、全量重算
+
+        Returns:
+            (時鐘歷史, 更新統計)
+        """
+        state = None if rebuild else self.load(definition)
+
+        if state is None or state["history"].empty:
+            history = definition.compute(data["earnings"], data["fci"])
+            stats = {"mode": "full", "recomputed_points": len(history), "since": None}
+        else:
+            history, stats = update_clock_history(
+                definition,
+                state["history"],
+                {"earnings": state["earnings"], "fci": state["fci"]},
+                data,
+            )
+
+        stats["total_points"] = len(history)
+        if stats["mode"] != "unchanged":
+            self.save(definition, {
+                "definition": asdict(definition),
+                "earnings": data["earnings"],
+                "fci": data["fci"],
+                "history": history,
+                "updated_at": datetime.now().isoformat(),
+            })
+        return history, stats
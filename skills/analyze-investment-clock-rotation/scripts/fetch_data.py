@@ -7,12 +7,16 @@ Investment Clock - Data Fetcher
 import argparse
 import json
 import sys
-from datetime import datetime
+from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Dict, Optional
 
 import pandas as pd
 import requests
 
+sys.path.insert(0, str(Path(__file__).parent))
+import http_client
+
 
 # ============================================================================
 # FRED 資料抓取
@@ -43,15 +47,14 @@ def fetch_fred_csv(
     }
 
     try:
-        response = requests.get(url, params=params, timeout=30)
+        response = http_client.get(url, params=params, timeout=30)
         response.raise_for_status()
 
         # 解析 CSV
         from io import StringIO
 
-        df = pd.read_csv(
-            StringIO(response.text), parse_dates=["DATE"], index_col="DATE"
-        )
+        # 日期欄名稱因 FRED 版本而異（DATE / observation_date），一律取第一欄
+        df = pd.read_csv(StringIO(response.text), index_col=0, parse_dates=True)
 
         # 處理缺失值標記
         df = df.replace(".", pd.NA)
@@ -67,11 +70,49 @@ def fetch_fred_csv(
         return pd.Series(dtype=float, name=series_id)
 
 
+def fetch_fred_incremental(
+    series_id: str,
+    start_date: str,
+    end_date: str,
+    cached: Optional[pd.Series] = None,
+    revision_days: int = 400,
+) -> pd.Series:
+    """
+    增量抓取 FRED 序列：只重抓快取最後日期前 revision_days 起的區段
+
+    獲利等季度數據會在發布後修正，因此重疊區段以新值覆蓋舊值。
+
+    Args:
+        series_id: FRED 系列 ID
+        start_date: 起始日期
+        end_date: 結束日期
+        cached: 先前抓取的序列（None 或空序列時全量抓取）
+        revision_days: 重抓的修正回溯天數
+
+    Returns:
+        合併後的時間序列
+    """
+    if cached is None or cached.empty or str(cached.index[0].date()) > start_date:
+        return fetch_fred_csv(series_id, start_date, end_date)
+
+    refetch_from = (cached.index[-1] - timedelta(days=revision_days)).strftime("%Y-%m-%d")
+    recent = fetch_fred_csv(series_id, max(refetch_from, start_date), end_date)
+    if recent.empty:
+        # 抓取失敗時沿用快取
+        return cached.loc[start_date:end_date]
+
+    merged = pd.concat([cached[cached.index < recent.index[0]], recent])
+    merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+    merged.name = series_id
+    return merged.loc[start_date:end_date]
+
+
 def fetch_all_data(
     start_date: str,
     end_date: str,
     earnings_id: str = "CP",
     fci_id: str = "NFCI",
+    cached: Optional[Dict[str, pd.Series]] = None,
 ) -> Dict[str, pd.Series]:
     """
     抓取所有需要的數據
@@ -81,15 +122,20 @@ def fetch_all_data(
         end_date: 結束日期
         earnings_id: 獲利指標 FRED ID
         fci_id: 金融環境指標 FRED ID
+        cached: 先前抓取的 {"earnings", "fci"} 序列；提供時只增量抓取
 
     Returns:
         包含各序列的字典
     """
+    cached = cached or {}
+
     print(f"Fetching {earnings_id}...", file=sys.stderr)
-    earnings = fetch_fred_csv(earnings_id, start_date, end_date)
+    earnings = fetch_fred_incremental(
+        earnings_id, start_date, end_date, cached.get("earnings")
+    )
 
     print(f"Fetching {fci_id}...", file=sys.stderr)
-    fci = fetch_fred_csv(fci_id, start_date, end_date)
+    fci = fetch_fred_incremental(fci_id, start_date, end_date, cached.get("fci"))
 
     return {
         "earnings": earnings,
@@ -17,7 +17,7 @@ from typing import Any, Dict, List, Optional, Tuple
 import numpy as np
 import pandas as pd
 
-from fetch_data import fetch_all_data
+from fetch_data import fetch_fred_incremental
 
 
 # ============================================================================
@@ -177,6 +177,88 @@ def angle_from_coordinates(x: float, y: float) -> float:
     return np.arctan2(y, x)
 
 
+def clock_hours_from_angles(theta_rad: np.ndarray) -> np.ndarray:
+    """
+    向量化版 clock_hour_from_angle
+
+    Args:
+        theta_rad: 角度陣列（弧度）
+
+    Returns:
+        時鐘點位陣列（1-12）
+    """
+    theta = (np.pi / 2 - np.asarray(theta_rad, dtype=float)) % (2 * np.pi)
+    hours = ((theta / (2 * np.pi)) * 12).astype(int)
+    return np.where(hours == 0, 12, hours)
+
+
+def quadrants_from_coordinates(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    向量化版 calculate_quadrant
+
+    Args:
+        x: X 軸值陣列（金融環境）
+        y: Y 軸值陣列（獲利成長）
+
+    Returns:
+        象限代碼陣列
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    return np.select(
+        [(y >= 0) & (x <= 0), (y >= 0) & (x > 0), (y < 0) & (x <= 0)],
+        ["Q1_ideal", "Q2_mixed", "Q3_recovery"],
+        default="Q4_worst",
+    ).astype(object)
+
+
+def compute_clock_frame(
+    earnings: pd.Series,
+    fci: pd.Series,
+    earnings_periods: int = 4,
+    z_window: int = 52,
+    invert_fci: bool = True,
+    smoothing_window: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    計算完整的時鐘座標歷史（獲利成長、金融環境 Z-score、角度、點位、象限）
+
+    Args:
+        earnings: 獲利原始序列
+        fci: 金融環境原始序列
+        earnings_periods: 獲利成長計算期數
+        z_window: Z-score 視窗
+        invert_fci: 是否反轉 FCI
+        smoothing_window: 平滑視窗（None 表示不平滑）
+
+    Returns:
+        以日期為索引的 DataFrame，欄位 x / y / angle / hour / quadrant
+    """
+    earnings_growth = yoy_growth(earnings, periods=earnings_periods)
+    fci_z = zscore(fci, window=z_window)
+    if invert_fci:
+        fci_z = -fci_z
+
+    df = align_series(earnings_growth, fci_z)
+    if smoothing_window:
+        df = df.rolling(smoothing_window).mean().dropna()
+
+    x = df["fci"].to_numpy(dtype=float)
+    y = df["earnings"].to_numpy(dtype=float)
+    angles = np.arctan2(y, x)
+
+    return pd.DataFrame(
+        {
+            "x": x,
+            "y": y,
+            "angle": angles,
+            "hour": clock_hours_from_angles(angles),
+            "quadrant": quadrants_from_coordinates(x, y),
+        },
+        index=df.index,
+    )
+
+
 # ============================================================================
 # 旋轉分析
 # ============================================================================
@@ -257,7 +339,7 @@ def get_magnitude_note(degrees: float) -> str:
 
 
 def analyze_investment_clock(
-    data: Dict[str, pd.Series],
+    data: Optional[Dict[str, pd.Series]],
     start_date: str,
     end_date: str,
     earnings_growth_method: str = "yoy",
@@ -265,6 +347,7 @@ def analyze_investment_clock(
     z_window: int = 52,
     invert_fci: bool = True,
     smoothing_window: Optional[int] = None,
+    history: Optional[pd.DataFrame] = None,
 ) -> Dict[str, Any]:
     """
     執行投資時鐘分析
@@ -278,49 +361,36 @@ def analyze_investment_clock(
         z_window: Z-score 視窗
         invert_fci: 是否反轉 FCI（讓負值=支持性）
         smoothing_window: 平滑視窗（None 表示不平滑）
+        history: 已計算的時鐘歷史（compute_clock_frame 格式，通常來自
+            clock_state 快取）；提供時不再重算，data 可為 None
 
     Returns:
         分析結果字典
     """
-    earnings = data["earnings"].copy()
-    fci = data["fci"].copy()
-
-    # 計算獲利成長
-    if earnings_growth_method == "yoy":
-        earnings_growth = yoy_growth(earnings, periods=earnings_periods)
-    else:
-        earnings_growth = yoy_growth(earnings, periods=earnings_periods)
-
-    # 計算金融環境 Z-score
-    fci_z = zscore(fci, window=z_window)
-
-    # 反轉金融環境（若需要）
-    if invert_fci:
-        fci_z = -fci_z
-
-    # 對齊序列
-    df = align_series(earnings_growth, fci_z)
+    # 計算（或沿用快取的）時鐘歷史；目前僅支援 yoy 成長率
+    if history is None:
+        history = compute_clock_frame(
+            data["earnings"],
+            data["fci"],
+            earnings_periods=earnings_periods,
+            z_window=z_window,
+            invert_fci=invert_fci,
+            smoothing_window=smoothing_window,
+        )
 
     # 篩選日期範圍
-    df = df.loc[start_date:end_date]
+    df = history.loc[start_date:end_date]
 
     if df.empty:
         return {"error": "No data in specified date range"}
 
-    # 平滑（可選）
-    if smoothing_window:
-        df["earnings"] = df["earnings"].rolling(smoothing_window).mean()
-        df["fci"] = df["fci"].rolling(smoothing_window).mean()
-        df = df.dropna()
-
-    # 計算座標、角度、象限
-    x_values = df["fci"].values
-    y_values = df["earnings"].values
+    x_values = df["x"].to_numpy()
+    y_values = df["y"].to_numpy()
     dates = df.index
 
-    angles = [angle_from_coordinates(x, y) for x, y in zip(x_values, y_values)]
-    hours = [clock_hour_from_angle(a) for a in angles]
-    quadrants = [calculate_quadrant(x, y) for x, y in zip(x_values, y_values)]
+    angles = df["angle"].to_numpy()
+    hours = [int(h) for h in df["hour"]]
+    quadrants = list(df["quadrant"])
 
     # 分析旋轉
     rotation = analyze_rotation(angles)
@@ -383,8 +453,8 @@ def analyze_investment_clock(
         },
         "time_series": {
             "dates": [str(d.date()) for d in dates],
-            "x": [round(v, 4) for v in x_values],
-            "y": [round(v, 4) for v in y_values],
+            "x": [round(float(v), 4) for v in x_values],
+            "y": [round(float(v), 4) for v in y_values],
             "hours": hours,
             "quadrants": quadrants,
         },
@@ -401,9 +471,10 @@ def analyze_investment_clock(
 
 
 def get_quick_status(
-    data: Dict[str, pd.Series],
+    data: Optional[Dict[str, pd.Series]],
     z_window: int = 52,
     invert_fci: bool = True,
+    history: Optional[pd.DataFrame] = None,
 ) -> Dict[str, Any]:
     """
     快速檢查當前狀態
@@ -412,33 +483,27 @@ def get_quick_status(
         data: 數據字典
         z_window: Z-score 視窗
         invert_fci: 是否反轉 FCI
+        history: 已計算的時鐘歷史（提供時直接取最新一點）
 
     Returns:
         快速狀態
     """
-    earnings = data["earnings"]
-    fci = data["fci"]
-
-    # 計算獲利成長（假設季度數據）
-    earnings_growth = yoy_growth(earnings, periods=4)
-
-    # 計算金融環境 Z-score
-    fci_z = zscore(fci, window=z_window)
-    if invert_fci:
-        fci_z = -fci_z
-
-    # 對齊並取最新值
-    df = align_series(earnings_growth, fci_z).dropna()
+    if history is None:
+        # 獲利成長假設為季度數據
+        history = compute_clock_frame(
+            data["earnings"], data["fci"], earnings_periods=4,
+            z_window=z_window, invert_fci=invert_fci,
+        )
+    df = history
 
     if df.empty:
         return {"error": "No data available"}
 
     latest = df.iloc[-1]
-    current_x = float(latest["fci"])
-    current_y = float(latest["earnings"])
-    angle = angle_from_coordinates(current_x, current_y)
-    hour = clock_hour_from_angle(angle)
-    quadrant = calculate_quadrant(current_x, current_y)
+    current_x = float(latest["x"])
+    current_y = float(latest["y"])
+    hour = int(latest["hour"])
+    quadrant = latest["quadrant"]
 
     return {
         "skill": "analyze-investment-clock-rotation",
@@ -454,6 +519,44 @@ def get_quick_status(
     }
 
 
+def compare_definitions(
+    histories: Dict[str, pd.DataFrame],
+    start_date: str,
+    end_date: str,
+) -> List[Dict[str, Any]]:
+    """
+    並列比較多組獲利 / 金融環境定義的時鐘狀態
+
+    Args:
+        histories: {定義名稱: 時鐘歷史}
+        start_date: 分析起始日期
+        end_date: 分析結束日期
+
+    Returns:
+        每組定義的當前點位、象限與旋轉摘要
+    """
+    rows = []
+    for label, history in histories.items():
+        df = history.loc[start_date:end_date]
+        if df.empty:
+            rows.append({"definition": label, "error": "No data in specified date range"})
+            continue
+        rotation = analyze_rotation(df["angle"].to_numpy())
+        quadrant = df["quadrant"].iloc[-1]
+        rows.append({
+            "definition": label,
+            "as_of": str(df.index[-1].date()),
+            "clock_hour": int(df["hour"].iloc[-1]),
+            "quadrant": quadrant,
+            "quadrant_name": QUADRANT_NAMES[quadrant],
+            "x_value": round(float(df["x"].iloc[-1]), 4),
+            "y_value": round(float(df["y"].iloc[-1]), 4),
+            "direction": rotation["direction"],
+            "magnitude_degrees": rotation["magnitude_degrees"],
+        })
+    return rows
+
+
 # ============================================================================
 # 主入口
 # ============================================================================
@@ -484,13 +587,13 @@ def main():
         "--earnings",
         type=str,
         default="CP",
-        help="FRED series ID for earnings",
+        help="FRED series ID for earnings (comma-separated to compare definitions)",
     )
     parser.add_argument(
         "--fci",
         type=str,
         default="NFCI",
-        help="FRED series ID for financial conditions",
+        help="FRED series ID for financial conditions (comma-separated to compare definitions)",
     )
     parser.add_argument(
         "--z-window",
@@ -523,35 +626,87 @@ def main():
         default=None,
         help="Output file path",
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Clock state cache directory (default: data/clock_state)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the clock state cache",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Ignore cached clock state and recompute the full history",
+    )
 
     args = parser.parse_args()
 
+    from clock_state import ClockDefinition, ClockStateStore
+
     end_date = args.end or datetime.now().strftime("%Y-%m-%d")
     invert_fci = not args.no_invert_fci
 
-    # 抓取數據（需要較長的歷史以計算 Z-score）
-    data_start = "2010-01-01"  # 確保有足夠歷史數據
+    # 每個「獲利 × 金融環境」組合一組定義；第一組為主要分析
+    # data_start 需要較長的歷史以計算 Z-score
+    definitions = [
+        ClockDefinition(
+            earnings_id=e.strip(),
+            fci_id=f.strip(),
+            z_window=args.z_window,
+            invert_fci=invert_fci,
+            smoothing_window=args.smoothing,
+            data_start="2010-01-01",
+        )
+        for e in args.earnings.split(",")
+        for f in args.fci.split(",")
+    ]
+    store = None if args.no_cache else ClockStateStore(args.cache_dir)
+
+    # 每個 FRED 序列只抓一次；有快取時只增量抓取尾段
     print("Fetching data...", file=sys.stderr)
-    data = fetch_all_data(
-        start_date=data_start,
-        end_date=end_date,
-        earnings_id=args.earnings,
-        fci_id=args.fci,
+    cached = store.cached_series(definitions) if store and not args.rebuild else {}
+    series_ids = dict.fromkeys(
+        sid for d in definitions for sid in (d.earnings_id, d.fci_id)
     )
+    series = {}
+    for sid in series_ids:
+        print(f"Fetching {sid}...", file=sys.stderr)
+        series[sid] = fetch_fred_incremental(
+            sid, definitions[0].data_start, end_date, cached.get(sid)
+        )
+
+    histories = {}
+    state_updates = {}
+    for definition in definitions:
+        data = {"earnings": series[definition.earnings_id], "fci": series[definition.fci_id]}
+        if store:
+            histories[definition], stats = store.update(definition, data, rebuild=args.rebuild)
+        else:
+            histories[definition] = definition.compute(data["earnings"], data["fci"])
+            stats = {"mode": "full", "recomputed_points": len(histories[definition])}
+        state_updates[definition.label] = stats
+
+    primary = definitions[0]
+    history = histories[primary]
 
     if args.quick:
         # 快速模式
-        result = get_quick_status(data, z_window=args.z_window, invert_fci=invert_fci)
+        result = get_quick_status(None, history=history)
     else:
         # 完整分析
         print("Analyzing investment clock...", file=sys.stderr)
         result = analyze_investment_clock(
-            data=data,
+            data=None,
             start_date=args.start,
             end_date=end_date,
             z_window=args.z_window,
             invert_fci=invert_fci,
             smoothing_window=args.smoothing,
+            history=history,
         )
 
         # 循環比較（若有指定）
@@ -559,12 +714,13 @@ def main():
             prev_start, prev_end = args.compare_cycle
             print(f"Comparing with cycle {prev_start} to {prev_end}...", file=sys.stderr)
             prev_result = analyze_investment_clock(
-                data=data,
+                data=None,
                 start_date=prev_start,
                 end_date=prev_end,
                 z_window=args.z_window,
                 invert_fci=invert_fci,
                 smoothing_window=args.smoothing,
+                history=history,
             )
 
             # 加入比較結果
@@ -593,6 +749,16 @@ def main():
                 },
             }
 
+    # 多組定義並列比較
+    if len(definitions) > 1 and "error" not in result:
+        result["definition_comparison"] = compare_definitions(
+            {d.label: histories[d] for d in definitions},
+            start_date=args.start,
+            end_date=end_date,
+        )
+    if "metadata" in result:
+        result["metadata"]["state_updates"] = state_updates
+
     # 輸出
     if args.output:
         with open(args.output, "w", encoding="utf-8") as f:
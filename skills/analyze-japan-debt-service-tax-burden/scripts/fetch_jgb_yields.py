@@ -16,15 +16,20 @@ JGB 殖利率資料抓取模組
 
 import json
 import random
+import sys
 import time
 from datetime import datetime, timedelta
 from io import StringIO
 from pathlib import Path
 from typing import Any, Dict, Optional
+from urllib.parse import urlparse
 
 import pandas as pd
 import requests
 
+sys.path.insert(0, str(Path(__file__).parent))
+import http_client
+
 # FRED 系列代碼對照表
 FRED_JGB_SERIES = {
     "10Y": "IRLTLT01JPM156N",  # 日本長期利率（10Y 月度）
@@ -66,11 +71,8 @@ class JGBYieldFetcher:
         else:
             self.cache_dir = Path(__file__).parent.parent / "data" / "cache"
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-
-    def _random_delay(self, min_sec: float = 0.3, max_sec: float = 1.0):
-        """模擬人類行為的隨機延遲"""
-        delay = random.uniform(min_sec, max_sec)
-        time.sleep(delay)
+        # 連續請求同一主機的隨機間隔（由共用 HTTP 客戶端負責，第一次請求不等待）
+        http_client.limit_host(urlparse(self.FRED_BASE_URL).netloc, min_interval=0.3, max_interval=1.0)
 
     def _get_headers(self) -> Dict[str, str]:
         """取得隨機 headers"""
@@ -78,8 +80,6 @@ class JGBYieldFetcher:
             "User-Agent": random.choice(self.USER_AGENTS),
             "Accept": "text/csv,text/html,application/xhtml+xml",
             "Accept-Language": "en-US,en;q=0.9",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Connection": "keep-alive",
         }
 
     def _get_cache_path(self, tenor: str) -> Path:
@@ -137,10 +137,8 @@ class JGBYieldFetcher:
         params = {"id": series_id, "cosd": start_date, "coed": end_date}
         url = f"{self.FRED_BASE_URL}?{'&'.join(f'{k}={v}' for k, v in params.items())}"
 
-        self._random_delay()
-
         try:
-            response = requests.get(url, headers=self._get_headers(), timeout=30)
+            response = http_client.get(url, headers=self._get_headers(), timeout=30)
             response.raise_for_status()
 
             df = pd.read_csv(
@@ -17,13 +17,18 @@ TIC（美國財政部國際資本）資料抓取模組
 import json
 import random
 import re
+import sys
 import time
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, Optional
+from urllib.parse import urlparse
 
 import requests
 
+sys.path.insert(0, str(Path(__file__).parent))
+import http_client
+
 # TIC 數據 URL
 TIC_MFH_URL = "https://ticdata.treasury.gov/resource-center/data-chart-center/tic/Documents/mfh.txt"
 
@@ -55,11 +60,8 @@ class TICHoldingsFetcher:
         else:
             self.cache_dir = Path(__file__).parent.parent / "data" / "cache"
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-
-    def _random_delay(self, min_sec: float = 0.5, max_sec: float = 1.5):
-        """模擬人類行為的隨機延遲"""
-        delay = random.uniform(min_sec, max_sec)
-        time.sleep(delay)
+        # 連續請求同一主機的隨機間隔（由共用 HTTP 客戶端負責，第一次請求不等待）
+        http_client.limit_host(urlparse(TIC_MFH_URL).netloc, min_interval=0.5, max_interval=1.5)
 
     def _get_headers(self) -> Dict[str, str]:
         """取得隨機 headers"""
@@ -67,8 +69,6 @@ class TICHoldingsFetcher:
             "User-Agent": random.choice(self.USER_AGENTS),
             "Accept": "text/plain,text/html,application/xhtml+xml",
             "Accept-Language": "en-US,en;q=0.9",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Connection": "keep-alive",
         }
 
     def _get_cache_path(self) -> Path:
@@ -225,10 +225,8 @@ class TICHoldingsFetcher:
                 return cached_data
 
         # 從 TIC 網站抓取
-        self._random_delay()
-
         try:
-            response = requests.get(TIC_MFH_URL, headers=self._get_headers(), timeout=30)
+            response = http_client.get(TIC_MFH_URL, headers=self._get_headers(), timeout=30)
             response.raise_for_status()
 
             result = self._parse_mfh_text(response.text)
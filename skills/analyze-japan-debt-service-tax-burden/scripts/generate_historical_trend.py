@@ -237,6 +237,20 @@ def generate_trend_chart(df: pd.DataFrame, output_path: Path):
     plt.close()
 
 
+def render_trend_from_config(
+    output_path: Path,
+    config_path: Path,
+    start_year: int = 2015,
+    end_year: int = 2025
+) -> Path:
+    """由財政數據配置直接生成歷史趨勢圖表（供 render_charts.py 批次渲染）"""
+    df = prepare_historical_dataframe(load_fiscal_data(Path(config_path)), start_year, end_year)
+    if df.empty:
+        raise ValueError(f"{config_path} 中沒有 FY{start_year}-FY{end_year} 的數據")
+    generate_trend_chart(df, Path(output_path))
+    return Path(output_path)
+
+
 def print_summary_table(df: pd.DataFrame):
     """列印摘要表格"""
 
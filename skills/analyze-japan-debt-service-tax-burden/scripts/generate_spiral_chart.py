@@ -396,6 +396,7 @@ def generate_spiral_dashboard(
     years: int = 10,
     custom_scenarios: Optional[List[Dict]] = None,
     show: bool = False,
+    fiscal: Optional[Dict[str, float]] = None,
 ) -> str:
     """
     生成債務螺旋模擬 Dashboard
@@ -405,12 +406,13 @@ def generate_spiral_dashboard(
         years: 模擬年數
         custom_scenarios: 自定義情境（如果為 None，使用預設情境）
         show: 是否顯示圖表
+        fiscal: 財政數據（兆日圓；None 時呼叫 get_fiscal_data()）
 
     Returns:
         輸出檔案路徑
     """
     # 獲取財政數據
-    fiscal = get_fiscal_data()
+    fiscal = fiscal or get_fiscal_data()
 
     # 定義情境
     if custom_scenarios is None:
@@ -515,6 +517,7 @@ def generate_single_stress_chart(
     output_path: Optional[str] = None,
     years: int = 10,
     show: bool = False,
+    fiscal: Optional[Dict[str, float]] = None,
 ) -> str:
     """
     生成單一壓力情境的詳細圖表
@@ -524,11 +527,12 @@ def generate_single_stress_chart(
         output_path: 輸出路徑
         years: 模擬年數
         show: 是否顯示
+        fiscal: 財政數據（兆日圓；None 時呼叫 get_fiscal_data()）
 
     Returns:
         輸出檔案路徑
     """
-    fiscal = get_fiscal_data()
+    fiscal = fiscal or get_fiscal_data()
 
     # 基準 vs 壓力情境
     scenarios = [
@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Japan Debt Service - Monte Carlo Stress Engine
+
+以向量化方式模擬數萬條殖利率路徑、再定價（pass-through）排程與稅收衝擊，
+輸出多年期 interest/tax ratio 的分布、尾部分位數，以及跨越各 RISK_BANDS
+邊界的機率。
+
+模型（每條路徑、每一年 k = 1..H）：
+    Δy_k      = 年度殖利率累積變化（相對起點，小數）
+    p_k       = 當年再定價比例（抽樣自 [pt_min, pt_max]）
+    g_k       = 當年稅收成長衝擊（常態）
+
+    additional_interest_T = debt × Σ_{k≤T} p_k × Δy_k
+    tax_T                 = tax × Π_{k≤T} (1 + g_k)
+    ratio_T               = (interest + additional_interest_T) / tax_T
+
+當 Δy 固定、p 固定、g = 0 時，與 stress_interest_tax_ratio 的確定性壓測一致。
+
+殖利率衝擊以 analyze_yield_stats 相同視窗的歷史日變化校準：
+    - normal:    年度變化 ~ N(252·μ, √252·σ)
+    - bootstrap: 從歷史「重疊 252 日變化」中重抽樣
+
+Usage:
+    python monte_carlo_stress.py                          # 20,000 路徑、5 年
+    python monte_carlo_stress.py --paths 50000 --horizon 10
+    python monte_carlo_stress.py --method bootstrap --seed 42 --format json
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# 嘗試導入本地模組
+try:
+    from japan_debt_analyzer import (
+        DEFAULT_ANALYSIS_WINDOW,
+        DEFAULT_PASS_THROUGH,
+        RISK_BANDS,
+        SAMPLE_DATA,
+        get_risk_band,
+        get_risk_band_emoji,
+    )
+    from data_manager import JapanDebtDataManager
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from japan_debt_analyzer import (
+        DEFAULT_ANALYSIS_WINDOW,
+        DEFAULT_PASS_THROUGH,
+        RISK_BANDS,
+        SAMPLE_DATA,
+        get_risk_band,
+        get_risk_band_emoji,
+    )
+    from data_manager import JapanDebtDataManager
+
+
+# ============================================================================
+# 常數與預設值
+# ============================================================================
+
+TRADING_DAYS_PER_YEAR = 252
+MIN_CALIBRATION_POINTS = 30        # 少於此數則改用預設波動度
+FALLBACK_ANNUAL_VOL_BP = 50.0      # 歷史不足時的年化殖利率波動（bp）
+DEFAULT_N_PATHS = 20_000
+DEFAULT_HORIZON_YEARS = 5
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95, 99)
+
+DEFAULT_MC_CONFIG = {
+    "n_paths": DEFAULT_N_PATHS,
+    "horizon_years": DEFAULT_HORIZON_YEARS,
+    "method": "normal",            # normal | bootstrap
+    "drift": False,                # 是否保留歷史漂移
+    "vol_multiplier": 1.0,         # 波動度放大倍數（壓力情境）
+    "pass_through_min": DEFAULT_PASS_THROUGH - 0.05,
+    "pass_through_max": DEFAULT_PASS_THROUGH + 0.05,
+    "tax_growth_mean": 0.0,
+    "tax_growth_std": 0.04,
+    "yield_floor_pct": -0.5,       # 殖利率下限（%）
+    "seed": None,
+}
+
+
+# ============================================================================
+# 校準
+# ============================================================================
+
+def calibrate_yield_shocks(
+    yield_history: List[float],
+    window_days: int = DEFAULT_ANALYSIS_WINDOW,
+) -> Dict[str, Any]:
+    """
+    從殖利率歷史（%）校準日變化分布
+
+    使用與 analyze_yield_stats 相同的觀察視窗。
+
+    Returns:
+        {
+            "daily_mean_bp", "daily_std_bp", "annual_vol_bp",
+            "annual_changes_bp": 重疊 252 日變化（bootstrap 用）,
+            "n_obs", "source"
+        }
+    """
+    series = np.asarray(yield_history[-window_days:], dtype=np.float64)
+    series = series[np.isfinite(series)]
+
+    if series.size < MIN_CALIBRATION_POINTS:
+        daily_std = FALLBACK_ANNUAL_VOL_BP / np.sqrt(TRADING_DAYS_PER_YEAR)
+        return {
+            "daily_mean_bp": 0.0,
+            "daily_std_bp": float(daily_std),
+            "annual_vol_bp": FALLBACK_ANNUAL_VOL_BP,
+            "annual_changes_bp": np.empty(0),
+            "n_obs": int(series.size),
+            "source": "fallback",
+        }
+
+    diffs_bp = np.diff(series) * 100.0
+    daily_std = float(diffs_bp.std(ddof=1))
+
+    # 重疊年度變化：以位移相減一次算出所有 252 日視窗
+    annual_changes = np.empty(0)
+    if series.size > TRADING_DAYS_PER_YEAR:
+        annual_changes = (series[TRADING_DAYS_PER_YEAR:] - series[:-TRADING_DAYS_PER_YEAR]) * 100.0
+
+    return {
+        "daily_mean_bp": float(diffs_bp.mean()),
+        "daily_std_bp": daily_std,
+        "annual_vol_bp": daily_std * float(np.sqrt(TRADING_DAYS_PER_YEAR)),
+        "annual_changes_bp": annual_changes,
+        "n_obs": int(series.size),
+        "source": "history",
+    }
+
+
+# ============================================================================
+# 模擬
+# ============================================================================
+
+def simulate_yield_changes(
+    calibration: Dict[str, Any],
+    n_paths: int,
+    horizon_years: int,
+    rng: np.random.Generator,
+    method: str = "normal",
+    drift: bool = False,
+    vol_multiplier: float = 1.0,
+) -> np.ndarray:
+    """
+    模擬年度殖利率衝擊並累積
+
+    Returns:
+        shape (n_paths, horizon_years)，每年底相對起點的累積變化（bp）
+    """
+    if method == "bootstrap" and calibration["annual_changes_bp"].size > 0:
+        pool = calibration["annual_changes_bp"]
+        if not drift:
+            pool = pool - pool.mean()
+        annual = rng.choice(pool, size=(n_paths, horizon_years), replace=True)
+        annual = annual * vol_multiplier
+    else:
+        mu = calibration["daily_mean_bp"] * TRADING_DAYS_PER_YEAR if drift else 0.0
+        sigma = calibration["annual_vol_bp"] * vol_multiplier
+        annual = rng.normal(mu, sigma, size=(n_paths, horizon_years))
+
+    return np.cumsum(annual, axis=1)
+
+
+def simulate_interest_tax_paths(
+    interest_payments: float,
+    tax_revenue: float,
+    debt_stock: float,
+    yield_changes_bp: np.ndarray,
+    pass_through: np.ndarray,
+    tax_growth: np.ndarray,
+) -> np.ndarray:
+    """
+    由殖利率、再定價與稅收路徑計算 interest/tax ratio（全向量化）
+
+    Args:
+        yield_changes_bp: (n_paths, H) 累積殖利率變化（bp）
+        pass_through: (n_paths, H) 每年再定價比例
+        tax_growth: (n_paths, H) 每年稅收成長率
+
+    Returns:
+        (n_paths, H) interest/tax ratio
+    """
+    # 累積再定價比例不超過 100%
+    cum_pt = np.minimum(np.cumsum(pass_through, axis=1), 1.0)
+    effective_pt = np.diff(cum_pt, axis=1, prepend=0.0)
+
+    repriced = effective_pt * (yield_changes_bp / 10000.0)
+    additional_interest = debt_stock * np.cumsum(repriced, axis=1)
+    stressed_tax = tax_revenue * np.cumprod(1.0 + tax_growth, axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = (interest_payments + additional_interest) / stressed_tax
+    return np.where(stressed_tax < 1e-12, np.inf, ratio)
+
+
+def _band_boundaries() -> List[Dict[str, Any]]:
+    """RISK_BANDS 中每個非零下界"""
+    return [
+        {"band": band, "threshold": low}
+        for band, (low, _high) in RISK_BANDS.items()
+        if low > 0
+    ]
+
+
+def summarize_ratio_paths(
+    ratio: np.ndarray,
+    percentiles=DEFAULT_PERCENTILES,
+) -> Dict[str, Any]:
+    """
+    彙整 ratio 路徑：逐年分位數、尾部 ES、分級分布與跨越機率
+    """
+    n_paths, horizon = ratio.shape
+    pct_values = np.percentile(ratio, percentiles, axis=0)  # (n_pct, H)
+
+    p95 = np.percentile(ratio, 95, axis=0)
+    tail_mask = ratio >= p95
+    expected_shortfall = np.where(
+        tail_mask.any(axis=0),
+        np.sum(np.where(tail_mask, ratio, 0.0), axis=0) / np.maximum(tail_mask.sum(axis=0), 1),
+        np.nan,
+    )
+
+    # 分級分布：依下界排序後 searchsorted
+    band_names = list(RISK_BANDS.keys())
+    lows = np.array([RISK_BANDS[b][0] for b in band_names])
+    order = np.argsort(lows)
+    band_idx = np.searchsorted(lows[order], ratio, side="right") - 1
+    band_idx = np.clip(band_idx, 0, len(band_names) - 1)
+    band_share = np.stack([(band_idx == i).mean(axis=0) for i in range(len(band_names))])
+
+    # 跨越機率：期末高於門檻 / 期間內曾經高於門檻
+    running_max = np.maximum.accumulate(ratio, axis=1)
+    crossing = []
+    for b in _band_boundaries():
+        thr = b["threshold"]
+        crossing.append({
+            "band": b["band"],
+            "threshold": thr,
+            "prob_above_by_year": [round(float(v), 4) for v in (ratio >= thr).mean(axis=0)],
+            "prob_ever_crossed_by_year": [round(float(v), 4) for v in (running_max >= thr).mean(axis=0)],
+        })
+
+    by_year = []
+    for t in range(horizon):
+        by_year.append({
+            "year": t + 1,
+            "mean": round(float(ratio[:, t].mean()), 4),
+            "percentiles": {
+                f"p{p}": round(float(pct_values[i, t]), 4)
+                for i, p in enumerate(percentiles)
+            },
+            "expected_shortfall_95": round(float(expected_shortfall[t]), 4),
+            "median_risk_band": get_risk_band(float(np.median(ratio[:, t]))),
+            "risk_band_distribution": {
+                band_names[order[i]]: round(float(band_share[i, t]), 4)
+                for i in range(len(band_names))
+            },
+        })
+
+    return {
+        "n_paths": int(n_paths),
+        "horizon_years": int(horizon),
+        "by_year": by_year,
+        "band_crossing": crossing,
+    }
+
+
+def run_monte_carlo_stress(
+    interest_payments: float,
+    tax_revenue: float,
+    debt_stock: float,
+    yield_history: List[float],
+    config: Optional[Dict[str, Any]] = None,
+    return_paths: bool = False,
+) -> Dict[str, Any]:
+    """
+    執行蒙地卡羅壓力測試
+
+    Args:
+        interest_payments: 當前利息支出
+        tax_revenue: 當前稅收
+        debt_stock: 債務存量
+        yield_history: 10Y 殖利率歷史（%）
+        config: 覆寫 DEFAULT_MC_CONFIG 的參數
+        return_paths: 是否在結果中附上原始 ratio 陣列（key: "paths"）
+
+    Returns:
+        分布摘要字典
+    """
+    cfg = {**DEFAULT_MC_CONFIG, **(config or {})}
+    n_paths = int(cfg["n_paths"])
+    horizon = int(cfg["horizon_years"])
+    if n_paths < 1 or horizon < 1:
+        raise ValueError("n_paths and horizon_years must be positive")
+    if not 0.0 <= cfg["pass_through_min"] <= cfg["pass_through_max"] <= 1.0:
+        raise ValueError("pass-through bounds must satisfy 0 <= min <= max <= 1")
+
+    t0 = time.perf_counter()
+    rng = np.random.default_rng(cfg["seed"])
+
+    calibration = calibrate_yield_shocks(yield_history)
+    yield_changes = simulate_yield_changes(
+        calibration,
+        n_paths,
+        horizon,
+        rng,
+        method=cfg["method"],
+        drift=cfg["drift"],
+        vol_multiplier=cfg["vol_multiplier"],
+    )
+
+    # 殖利率下限：累積變化不得使殖利率低於 floor
+    latest_yield = float(yield_history[-1]) if len(yield_history) else 0.0
+    min_change_bp = (cfg["yield_floor_pct"] - latest_yield) * 100.0
+    yield_changes = np.maximum(yield_changes, min_change_bp)
+
+    pass_through = rng.uniform(
+        cfg["pass_through_min"], cfg["pass_through_max"], size=(n_paths, horizon)
+    )
+    tax_growth = rng.normal(
+        cfg["tax_growth_mean"], cfg["tax_growth_std"], size=(n_paths, horizon)
+    )
+    tax_growth = np.maximum(tax_growth, -0.99)
+
+    ratio = simulate_interest_tax_paths(
+        interest_payments,
+        tax_revenue,
+        debt_stock,
+        yield_changes,
+        pass_through,
+        tax_growth,
+    )
+
+    summary = summarize_ratio_paths(ratio)
+    yield_pct = np.percentile(yield_changes[:, -1], DEFAULT_PERCENTILES)
+    elapsed = time.perf_counter() - t0
+
+    result = {
+        "config": dict(cfg),
+        "calibration": {
+            "source": calibration["source"],
+            "n_obs": calibration["n_obs"],
+            "daily_std_bp": round(calibration["daily_std_bp"], 3),
+            "annual_vol_bp": round(calibration["annual_vol_bp"], 2),
+            "latest_yield_pct": latest_yield,
+        },
+        "baseline_ratio": round(interest_payments / tax_revenue, 4) if tax_revenue > 1e-12 else None,
+        "terminal_yield_change_bp": {
+            f"p{p}": round(float(v), 1) for p, v in zip(DEFAULT_PERCENTILES, yield_pct)
+        },
+        **summary,
+        "elapsed_seconds": round(elapsed, 3),
+    }
+
+    if return_paths:
+        result["paths"] = ratio
+
+    return result
+
+
+# ============================================================================
+# 輸出格式化
+# ============================================================================
+
+def format_markdown(result: Dict) -> str:
+    """格式化為 Markdown 報告"""
+    lines = []
+    lines.append("# 日本債務利息負擔 - 蒙地卡羅壓力測試")
+    lines.append(f"\n> 分析日期：{result.get('as_of', 'N/A')}")
+    lines.append(
+        f"> 路徑數：{result['n_paths']:,}，期間：{result['horizon_years']} 年，"
+        f"耗時 {result['elapsed_seconds']:.2f} 秒"
+    )
+    cal = result["calibration"]
+    lines.append(
+        f"> 殖利率年化波動：{cal['annual_vol_bp']:.0f}bp（{cal['source']}，{cal['n_obs']} 筆）\n"
+    )
+
+    lines.append("## Interest/Tax Ratio 分布\n")
+    lines.append("| 年 | P5 | P50 | P95 | P99 | ES95 | 中位分級 |")
+    lines.append("|----|----|-----|-----|-----|------|----------|")
+    for y in result["by_year"]:
+        p = y["percentiles"]
+        band = y["median_risk_band"]
+        lines.append(
+            f"| {y['year']} | {p['p5']:.1%} | {p['p50']:.1%} | {p['p95']:.1%} | "
+            f"{p['p99']:.1%} | {y['expected_shortfall_95']:.1%} | "
+            f"{get_risk_band_emoji(band)} {band.upper()} |"
+        )
+    lines.append("")
+
+    lines.append("## 跨越風險分級邊界機率（期間內曾跨越）\n")
+    header = "| 邊界 | " + " | ".join(f"Y{y['year']}" for y in result["by_year"]) + " |"
+    lines.append(header)
+    lines.append("|" + "------|" * (len(result["by_year"]) + 1))
+    for c in result["band_crossing"]:
+        probs = " | ".join(f"{p:.1%}" for p in c["prob_ever_crossed_by_year"])
+        lines.append(f"| {get_risk_band_emoji(c['band'])} ≥ {c['threshold']:.2f} | {probs} |")
+    lines.append("")
+
+    return "\n".join(lines)
+
+
+# ============================================================================
+# CLI 入口
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Japan Debt Service Monte Carlo Stress Engine"
+    )
+    parser.add_argument("--paths", type=int, default=DEFAULT_N_PATHS, help="模擬路徑數")
+    parser.add_argument("--horizon", type=int, default=DEFAULT_HORIZON_YEARS, help="模擬年數")
+    parser.add_argument(
+        "--method", choices=["normal", "bootstrap"], default="normal",
+        help="殖利率衝擊抽樣方式"
+    )
+    parser.add_argument("--drift", action="store_true", help="保留歷史漂移")
+    parser.add_argument("--vol-mult", type=float, default=1.0, help="波動度放大倍數")
+    parser.add_argument(
+        "--pt-min", type=float, default=DEFAULT_MC_CONFIG["pass_through_min"],
+        help="年度再定價比例下限"
+    )
+    parser.add_argument(
+        "--pt-max", type=float, default=DEFAULT_MC_CONFIG["pass_through_max"],
+        help="年度再定價比例上限"
+    )
+    parser.add_argument("--tax-mean", type=float, default=0.0, help="年度稅收成長平均")
+    parser.add_argument("--tax-std", type=float, default=0.04, help="年度稅收成長標準差")
+    parser.add_argument("--seed", type=int, default=None, help="隨機種子")
+    parser.add_argument(
+        "--format", choices=["json", "markdown"], default="markdown",
+        help="輸出格式（預設 markdown）"
+    )
+    parser.add_argument("--refresh", action="store_true", help="強制刷新數據（忽略緩存）")
+    parser.add_argument("--cache-dir", type=str, metavar="DIR", help="指定緩存目錄")
+    parser.add_argument("--offline", action="store_true", help="使用內建範例數據")
+
+    args = parser.parse_args()
+
+    if args.offline:
+        data = SAMPLE_DATA
+    else:
+        try:
+            manager = JapanDebtDataManager(cache_dir=args.cache_dir)
+            data = manager.get_all_data(force_refresh=args.refresh, include_tic=False)
+        except Exception as e:
+            print(f"數據管理器錯誤: {e}，改用範例數據", file=sys.stderr)
+            data = SAMPLE_DATA
+
+    fiscal = data["fiscal"]
+    result = run_monte_carlo_stress(
+        fiscal["interest_payments_jpy"],
+        fiscal["tax_revenue_jpy"],
+        fiscal["debt_stock_jpy"],
+        data["jgb_10y"]["history"],
+        config={
+            "n_paths": args.paths,
+            "horizon_years": args.horizon,
+            "method": args.method,
+            "drift": args.drift,
+            "vol_multiplier": args.vol_mult,
+            "pass_through_min": args.pt_min,
+            "pass_through_max": args.pt_max,
+            "tax_growth_mean": args.tax_mean,
+            "tax_growth_std": args.tax_std,
+            "seed": args.seed,
+        },
+    )
+    result["as_of"] = datetime.now().strftime("%Y-%m-%d")
+
+    if args.format == "json":
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print(format_markdown(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Japan Debt Charts - 批次平行渲染
+
+一次生成本 skill 的所有圖表（Dashboard、債務螺旋、各壓力情境、歷史趨勢），
+透過 render_pool 分派到多個 worker 平行渲染；輸入未變更的圖表直接跳過。
+
+分析只在主程序執行一次，結果以參數傳給各圖表函數，主程序本身不載入 matplotlib。
+
+Usage:
+    python render_charts.py --output-dir ../../output
+    python render_charts.py --stress 100 200 300 --workers 4
+    python render_charts.py --data-file result.json --force
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from render_pool import ChartJob, render_charts
+
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "fiscal_data.json"
+DEFAULT_OUTPUT_DIR = Path(__file__).parent.parent.parent.parent.parent / "output"
+DEFAULT_STRESS_BP = [100, 200, 300]
+
+
+def load_analysis_data(data_file: str = None, refresh: bool = False) -> Dict[str, Any]:
+    """取得 Dashboard 所需的分析結果（同 generate_charts.py 的預設流程）"""
+    if data_file:
+        with open(data_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    from japan_debt_analyzer import run_quick_check, run_full_analysis
+
+    quick_data = run_quick_check(force_refresh=refresh)
+    full_data = run_full_analysis(force_refresh=False)
+    return {**quick_data, "stress_tests": full_data.get("stress_tests")}
+
+
+def spiral_fiscal_inputs(data: Dict[str, Any]) -> Optional[Dict[str, float]]:
+    """把分析結果的財政數據轉成螺旋模擬使用的兆日圓單位（同 get_fiscal_data）"""
+    fiscal = data.get("fiscal", {})
+    try:
+        return {
+            "interest": fiscal["interest_payments_jpy"] / 1e12,
+            "tax": fiscal["tax_revenue_jpy"] / 1e12,
+            "debt_stock": fiscal["debt_stock_jpy"] / 1e12,
+        }
+    except KeyError:
+        return None
+
+
+def build_jobs(
+    data: Dict[str, Any],
+    output_dir: Path,
+    stress_bps: List[int],
+    years: int,
+    start_year: int,
+    end_year: int
+) -> List[ChartJob]:
+    """組裝所有圖表工作（檔名與各腳本單獨執行時一致）"""
+    today = datetime.now()
+    fiscal = spiral_fiscal_inputs(data)
+
+    jobs = [
+        ChartJob(
+            "dashboard", "generate_charts:generate_dashboard",
+            str(output_dir / f"japan_debt_dashboard_{today.strftime('%Y%m%d')}.png"),
+            kwargs={"data": data},
+        ),
+        ChartJob(
+            "spiral", "generate_spiral_chart:generate_spiral_dashboard",
+            str(output_dir / f"japan_debt_spiral_{today.strftime('%Y-%m-%d')}.png"),
+            kwargs={"years": years, "fiscal": fiscal},
+        ),
+        ChartJob(
+            "historical_trend", "generate_historical_trend:render_trend_from_config",
+            str(output_dir / f"japan_debt_trend_{today.strftime('%Y%m%d')}.png"),
+            kwargs={"config_path": str(CONFIG_PATH), "start_year": start_year, "end_year": end_year},
+            inputs=[str(CONFIG_PATH)],
+        ),
+    ]
+    for bp in stress_bps:
+        jobs.append(ChartJob(
+            f"stress_{bp}bp", "generate_spiral_chart:generate_single_stress_chart",
+            str(output_dir / f"japan_debt_stress_{bp}bp_{today.strftime('%Y-%m-%d')}.png"),
+            kwargs={"delta_yield_bp": bp, "years": years, "fiscal": fiscal},
+        ))
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Japan Debt Charts - 批次平行渲染")
+    parser.add_argument("--output-dir", type=str, help="輸出目錄")
+    parser.add_argument("--data-file", type=str, help="從 JSON 檔案載入分析結果")
+    parser.add_argument("--stress", type=int, nargs="*", default=DEFAULT_STRESS_BP, metavar="BP",
+                        help=f"壓力情境（bp，預設 {DEFAULT_STRESS_BP}）")
+    parser.add_argument("--years", type=int, default=10, help="螺旋模擬年數（預設 10）")
+    parser.add_argument("--start-year", type=int, default=2015, help="歷史趨勢起始年度")
+    parser.add_argument("--end-year", type=int, default=2025, help="歷史趨勢結束年度")
+    parser.add_argument("--workers", type=int, default=None, help="worker 數（預設依 CPU 數；1 = 依序）")
+    parser.add_argument("--force", action="store_true", help="忽略輸入雜湊，全部重繪")
+    parser.add_argument("--refresh", action="store_true", help="強制刷新數據")
+
+    args = parser.parse_args()
+
+    output_dir = Path(args.output_dir) if args.output_dir else DEFAULT_OUTPUT_DIR
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    print("取得分析數據...")
+    data = load_analysis_data(args.data_file, refresh=args.refresh)
+
+    jobs = build_jobs(data, output_dir, args.stress, args.years, args.start_year, args.end_year)
+
+    print(f"\n渲染 {len(jobs)} 張圖表...")
+    start = time.perf_counter()
+    results = render_charts(jobs, workers=args.workers, force=args.force)
+    elapsed = time.perf_counter() - start
+
+    counts = {status: sum(r.status == status for r in results) for status in ("rendered", "skipped", "failed")}
+    print(f"\n完成：渲染 {counts['rendered']}、跳過 {counts['skipped']}、失敗 {counts['failed']}（{elapsed:.1f}s）")
+    for r in results:
+        if r.status == "failed":
+            print(f"  {r.name}: {r.error}")
+
+    if counts["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+圖表批次渲染池
+
+把多張圖表的繪製工作（圖表函數 + 輸入資料）分派到 process pool 平行渲染：
+- 每個 worker 只初始化一次 matplotlib（Agg 後端、圖表模組、字型快取），之後重複使用
+- 各圖表模組在 import 時設定的 rcParams 會被記錄下來，渲染時以 rc_context 套用，
+  不同腳本的字型/風格設定不會互相污染
+- 以輸入雜湊（函數、參數、輸入檔內容、圖表模組原始碼）判斷是否需要重繪，未變更則跳過
+- 本模組不在頂層 import matplotlib；只做分析的流程不會載入繪圖相依
+
+圖表函數需接受 `output_path` 關鍵字參數並自行存檔，例如：
+    generate_spiral_chart.generate_single_stress_chart(delta_yield_bp, output_path, ...)
+
+Usage:
+    from render_pool import ChartJob, render_charts
+
+    jobs = [
+        ChartJob("stress_200", "generate_spiral_chart:generate_single_stress_chart",
+                 output_path="output/stress_200bp.png",
+                 kwargs={"delta_yield_bp": 200, "fiscal": fiscal}),
+    ]
+    for r in render_charts(jobs, workers=4):
+        print(r.name, r.status, r.seconds)
+"""
+
+import hashlib
+import importlib
+import importlib.util
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+MANIFEST_NAME = ".render_manifest.json"
+
+# 暖機時繪製的文字（涵蓋中英數字，觸發 CJK 字型載入）
+WARMUP_TEXT = "暖機 Warm-up 0123456789 %"
+
+
+@dataclass
+class ChartJob:
+    """
+    單一圖表工作
+
+    Attributes
+    ----------
+    name : str
+        工作名稱（報告用）
+    func : str
+        圖表函數，格式 "module:function"（module 需在 search_paths 中可 import）
+    output_path : str
+        輸出檔路徑（以 output_path= 傳給圖表函數）
+    kwargs : dict
+        其餘關鍵字參數（須可 pickle；DataFrame/ndarray/dict 皆可，會納入輸入雜湊）
+    inputs : list
+        額外的輸入檔（例如 config JSON、分析產物），其內容納入輸入雜湊
+    """
+    name: str
+    func: str
+    output_path: str
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    inputs: List[str] = field(default_factory=list)
+
+    @property
+    def module(self) -> str:
+        return self.func.split(":", 1)[0]
+
+
+@dataclass
+class RenderResult:
+    """渲染結果（status: rendered / skipped / failed）"""
+    name: str
+    output_path: str
+    status: str
+    seconds: float = 0.0
+    input_hash: str = ""
+    error: Optional[str] = None
+
+
+# ============================================================================
+# 輸入雜湊
+# ============================================================================
+
+def _feed(h, obj: Any) -> None:
+    """把物件以穩定的位元組表示餵入雜湊器"""
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        h.update(repr((type(obj).__name__, obj)).encode("utf-8"))
+    elif isinstance(obj, dict):
+        h.update(b"{")
+        for key in sorted(obj, key=str):
+            _feed(h, str(key))
+            _feed(h, obj[key])
+        h.update(b"}")
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"[")
+        for item in obj:
+            _feed(h, item)
+        h.update(b"]")
+    elif isinstance(obj, (pd.DataFrame, pd.Series)):
+        h.update(repr(getattr(obj, "columns", obj.name)).encode("utf-8"))
+        h.update(pd.util.hash_pandas_object(obj, index=True).values.tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(f"{obj.dtype}{obj.shape}".encode("utf-8"))
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, np.generic):
+        _feed(h, obj.item())
+    elif isinstance(obj, Path):
+        _feed(h, str(obj))
+    else:
+        h.update(repr(obj).encode("utf-8"))
+
+
+def _feed_file(h, path: Path) -> None:
+    if not path.exists():
+        h.update(b"<missing>")
+        return
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+
+
+def job_hash(job: ChartJob) -> str:
+    """
+    計算工作的輸入雜湊
+
+    涵蓋函數名稱、關鍵字參數、inputs 檔案內容，以及圖表模組的原始碼
+    （改了繪圖程式也會觸發重繪）。
+    """
+    h = hashlib.sha256()
+    _feed(h, job.func)
+    _feed(h, job.kwargs)
+    for path in job.inputs:
+        _feed(h, str(path))
+        _feed_file(h, Path(path))
+
+    spec = importlib.util.find_spec(job.module)
+    if spec is not None and spec.origin and os.path.exists(spec.origin):
+        _feed_file(h, Path(spec.origin))
+
+    return h.hexdigest()
+
+
+class RenderManifest:
+    """
+    輸出目錄中的渲染紀錄（{output_dir}/.render_manifest.json）
+
+    記錄每個輸出檔對應的輸入雜湊，用於判斷是否可以跳過重繪。
+    """
+
+    def __init__(self, output_dir: Path):
+        self.path = Path(output_dir) / MANIFEST_NAME
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def is_fresh(self, output_path: Path, digest: str) -> bool:
+        entry = self.entries.get(output_path.name)
+        return bool(entry) and entry.get("hash") == digest and output_path.exists()
+
+    def record(self, output_path: Path, digest: str, seconds: float) -> None:
+        self.entries[output_path.name] = {
+            "hash": digest,
+            "rendered_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seconds": round(seconds, 3),
+        }
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2)
+
+
+# ============================================================================
+# Worker（每個 process 初始化一次）
+# ============================================================================
+
+_BASE_RC: Optional[Dict[str, Any]] = None
+_MODULE_RC: Dict[str, Dict[str, Any]] = {}
+
+
+def _rc_diff(base: Dict[str, Any], current) -> Dict[str, Any]:
+    diff = {}
+    for key, value in current.items():
+        try:
+            changed = bool(base.get(key) != value)
+        except (TypeError, ValueError):
+            changed = True
+        if changed:
+            diff[key] = value
+    return diff
+
+
+def _prepare_module(module_name: str) -> None:
+    """import 圖表模組並記錄其 import 時設定的 rcParams，再以該設定暖機字型"""
+    global _BASE_RC
+    import matplotlib
+
+    if _BASE_RC is None:
+        matplotlib.use("Agg")
+        import matplotlib.pyplot  # noqa: F401  (載入 pyplot 與字型管理器)
+        _BASE_RC = dict(matplotlib.rcParams)
+
+    if module_name in _MODULE_RC:
+        return
+
+    with matplotlib.rc_context():
+        matplotlib.rcParams.update(_BASE_RC)
+        importlib.import_module(module_name)
+        _MODULE_RC[module_name] = _rc_diff(_BASE_RC, matplotlib.rcParams)
+        _warm_fonts()
+
+
+def _warm_fonts() -> None:
+    """在目前 rc 下繪製一張小圖，讓字型搜尋與 glyph 快取在正式渲染前就緒"""
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(figsize=(1, 1), dpi=50)
+    fig.text(0.5, 0.5, WARMUP_TEXT, fontweight="bold")
+    fig.text(0.5, 0.2, WARMUP_TEXT)
+    fig.canvas.draw()
+    plt.close(fig)
+
+
+def _init_worker(search_paths: List[str], modules: List[str]) -> None:
+    """ProcessPoolExecutor initializer"""
+    import logging
+    import warnings
+
+    for path in reversed(search_paths):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    # 找不到候選字型時 matplotlib 會大量警告；這裡只影響 worker 的輸出
+    logging.getLogger("matplotlib.font_manager").setLevel(logging.ERROR)
+    warnings.filterwarnings("ignore", message="Glyph .* missing from font")
+
+    for module_name in modules:
+        _prepare_module(module_name)
+
+
+def _render_one(func: str, output_path: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """在 worker 中渲染一張圖表"""
+    import matplotlib
+    import matplotlib.pyplot as plt
+
+    module_name, func_name = func.split(":", 1)
+    _prepare_module(module_name)
+    fn = getattr(importlib.import_module(module_name), func_name)
+
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    try:
+        with matplotlib.rc_context(_MODULE_RC.get(module_name, {})):
+            fn(output_path=output_path, **kwargs)
+    finally:
+        plt.close("all")
+    return {"seconds": time.perf_counter() - start, "pid": os.getpid()}
+
+
+# ============================================================================
+# 主入口
+# ============================================================================
+
+def render_charts(
+    jobs: Iterable[ChartJob],
+    workers: Optional[int] = None,
+    force: bool = False,
+    search_paths: Optional[List[str]] = None,
+    verbose: bool = True
+) -> List[RenderResult]:
+    """
+    平行渲染一批圖表
+
+    Parameters
+    ----------
+    jobs : iterable of ChartJob
+        圖表工作
+    workers : int, optional
+        worker 數（預設 min(待渲染數, CPU 數)）；1 表示在目前 process 內依序渲染
+    force : bool
+        忽略輸入雜湊，全部重繪
+    search_paths : list, optional
+        圖表模組所在目錄（預設為本檔所在目錄）
+    verbose : bool
+        是否列印進度
+
+    Returns
+    -------
+    list of RenderResult
+        與 jobs 同序
+    """
+    jobs = list(jobs)
+    search_paths = [str(Path(p).resolve()) for p in (search_paths or [Path(__file__).parent])]
+    for path in reversed(search_paths):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    manifests: Dict[Path, RenderManifest] = {}
+    results: List[Optional[RenderResult]] = [None] * len(jobs)
+    pending = []
+
+    for i, job in enumerate(jobs):
+        output_path = Path(job.output_path)
+        digest = job_hash(job)
+        manifest = manifests.setdefault(output_path.parent, RenderManifest(output_path.parent))
+        if not force and manifest.is_fresh(output_path, digest):
+            results[i] = RenderResult(job.name, str(output_path), "skipped", input_hash=digest)
+            if verbose:
+                print(f"[Render] {job.name}: 輸入未變更，跳過")
+        else:
+            pending.append((i, job, digest))
+
+    def _finish(i: int, job: ChartJob, digest: str, outcome: Dict[str, Any] = None, error: Exception = None):
+        output_path = Path(job.output_path)
+        if error is None:
+            manifests[output_path.parent].record(output_path, digest, outcome["seconds"])
+            results[i] = RenderResult(job.name, str(output_path), "rendered",
+                                      outcome["seconds"], digest)
+            if verbose:
+                print(f"[Render] {job.name}: {outcome['seconds']:.2f}s → {output_path}")
+        else:
+            results[i] = RenderResult(job.name, str(output_path), "failed",
+                                      input_hash=digest, error=f"{type(error).__name__}: {error}")
+            if verbose:
+                print(f"[Render] {job.name}: 失敗 - {error}")
+
+    if pending:
+        n_workers = workers or min(len(pending), os.cpu_count() or 1)
+        n_workers = max(1, min(n_workers, len(pending)))
+        modules = sorted({job.module for _, job, _ in pending})
+
+        if n_workers == 1:
+            _init_worker(search_paths, modules)
+            for i, job, digest in pending:
+                try:
+                    _finish(i, job, digest, _render_one(job.func, job.output_path, job.kwargs))
+                except Exception as e:
+                    _finish(i, job, digest, error=e)
+        else:
+            with ProcessPoolExecutor(
+                max_workers=n_workers,
+                initializer=_init_worker,
+                initargs=(search_paths, modules)
+            ) as pool:
+                futures = {
+                    pool.submit(_render_one, job.func, job.output_path, job.kwargs): (i, job, digest)
+                    for i, job, digest in pending
+                }
+                for future in as_completed(futures):
+                    i, job, digest = futures[future]
+                    try:
+                        _finish(i, job, digest, future.result())
+                    except Exception as e:
+                        _finish(i, job, digest, error=e)
+
+    for manifest in manifests.values():
+        manifest.save()
+
+    return results
@@ -10,6 +10,7 @@ JSDA 數據抓取腳本
 import argparse
 import json
 import re
+import sys
 from datetime import datetime
 from io import BytesIO
 from pathlib import Path
@@ -18,6 +19,9 @@ from typing import Dict, List, Optional
 import pandas as pd
 import requests
 
+sys.path.insert(0, str(Path(__file__).parent))
+import http_client
+
 # 專案路徑設定
 SCRIPT_DIR = Path(__file__).parent
 SKILL_DIR = SCRIPT_DIR.parent
@@ -52,7 +56,7 @@ CACHE_TTL = 7 * 24 * 60 * 60  # 7 天
 def fetch_jsda_page() -> str:
     """抓取 JSDA 統計頁面 HTML"""
     try:
-        response = requests.get(JSDA_STATS_URL, headers=HEADERS, timeout=30)
+        response = http_client.get(JSDA_STATS_URL, headers=HEADERS, timeout=30)
         response.raise_for_status()
         return response.text
     except requests.RequestException as e:
@@ -88,7 +92,7 @@ def find_xls_url(html: str) -> Optional[str]:
 def download_xls(url: str) -> Optional[bytes]:
     """下載 XLS 檔案"""
     try:
-        response = requests.get(url, headers=HEADERS, timeout=60)
+        response = http_client.get(url, headers=HEADERS, timeout=60)
         response.raise_for_status()
         return response.content
     except requests.RequestException as e:
@@ -18,12 +18,13 @@ import sys
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
-import urllib.request
-import ssl
 
 import numpy as np
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).parent))
+import http_client
+
 # 專案路徑設定
 SCRIPT_DIR = Path(__file__).parent
 SKILL_DIR = SCRIPT_DIR.parent
@@ -75,20 +76,17 @@ def download_jsda_file(url: str, local_path: Path, force: bool = False) -> bool:
             return True
 
     try:
-        # 建立 SSL context（部分環境需要）
-        ctx = ssl.create_default_context()
-        ctx.check_hostname = False
-        ctx.verify_mode = ssl.CERT_NONE
-
         print(f"下載中: {url}", file=sys.stderr)
 
-        req = urllib.request.Request(
+        # 不驗證憑證（部分環境需要）
+        response = http_client.get(
             url,
-            headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+            headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'},
+            verify=False,
+            timeout=30
         )
-
-        with urllib.request.urlopen(req, context=ctx, timeout=30) as response:
-            data = response.read()
+        response.raise_for_status()
+        data = response.content
 
         if len(data) < 50000:
             print(f"警告: 檔案太小，可能下載失敗: {len(data)} bytes", file=sys.stderr)
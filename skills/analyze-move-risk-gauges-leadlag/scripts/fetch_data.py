@@ -45,10 +45,11 @@ except ImportError:
     yf = None
     print("Warning: yfinance not installed, VIX from Yahoo will not be available")
 
-try:
-    import websocket
-except ImportError:
-    websocket = None
+sys.path.insert(0, str(Path(__file__).parent))
+from cdp_client import CDPError, cdp_execute_js, get_cdp_ws_url as _get_cdp_ws_url, get_session, websocket
+import http_client
+
+if websocket is None:
     print("Warning: websocket-client not installed, CDP method will not be available")
 
 # =============================================================================
@@ -57,6 +58,7 @@ except ImportError:
 
 FRED_CSV_URL = "https://fred.stlouisfed.org/graph/fredgraph.csv"
 CDP_PORT = 9222
+CHART_READY_TIMEOUT = 30  # 等待圖表就緒的上限（秒）
 CACHE_DIR = Path(__file__).parent.parent / "cache"
 CACHE_MAX_AGE = timedelta(hours=12)
 
@@ -189,62 +191,7 @@ def get_cdp_ws_url(port: int = CDP_PORT, url_keyword: str = None) -> Optional[st
     str or None
         WebSocket URL，若無法連接則返回 None
     """
-    try:
-        resp = requests.get(f'http://127.0.0.1:{port}/json', timeout=5)
-        pages = resp.json()
-
-        # 優先找包含關鍵字的頁面
-        if url_keyword:
-            for page in pages:
-                if url_keyword.lower() in page.get('url', '').lower():
-                    return page.get('webSocketDebuggerUrl')
-
-        # 沒找到就返回第一個頁面
-        return pages[0].get('webSocketDebuggerUrl') if pages else None
-
-    except requests.exceptions.ConnectionError:
-        return None
-    except Exception as e:
-        print(f"[CDP] Error getting WS URL: {e}")
-        return None
-
-
-def cdp_execute_js(ws_url: str, js_code: str, timeout: int = 30) -> Any:
-    """
-    透過 CDP 執行 JavaScript
-
-    Parameters
-    ----------
-    ws_url : str
-        WebSocket URL
-    js_code : str
-        要執行的 JavaScript 代碼
-    timeout : int
-        連線超時秒數
-
-    Returns
-    -------
-    Any
-        JavaScript 執行結果
-    """
-    if websocket is None:
-        raise ImportError("websocket-client not installed. Run: pip install websocket-client")
-
-    ws = websocket.create_connection(ws_url, timeout=timeout)
-
-    cmd = {
-        "id": 1,
-        "method": "Runtime.evaluate",
-        "params": {
-            "expression": js_code,
-            "returnByValue": True
-        }
-    }
-    ws.send(json.dumps(cmd))
-    result = json.loads(ws.recv())
-    ws.close()
-
-    return result
+    return _get_cdp_ws_url(port, url_keyword)
 
 
 def get_all_cdp_pages(port: int = CDP_PORT) -> List[Dict]:
@@ -323,6 +270,12 @@ def fetch_macromicro_via_cdp(
             f"並等待圖表完全載入"
         )
 
+    # 頁面可能仍在載入：等 Highcharts 出現資料且點數穩定
+    try:
+        get_session(ws_url).wait_for_highcharts(timeout=CHART_READY_TIMEOUT)
+    except CDPError as e:
+        print(f"[CDP] {indicator} 圖表尚未就緒（{e}），仍嘗試提取...")
+
     print(f"[CDP] 已連接，正在提取 {indicator} 數據...")
     result = cdp_execute_js(ws_url, EXTRACT_HIGHCHARTS_JS)
 
@@ -411,7 +364,7 @@ def fetch_fred_series(series_id: str, start_date: str, end_date: str) -> pd.Seri
     }
 
     try:
-        response = requests.get(FRED_CSV_URL, params=params, timeout=30)
+        response = http_client.get(FRED_CSV_URL, params=params, timeout=30)
         response.raise_for_status()
 
         df = pd.read_csv(StringIO(response.text))
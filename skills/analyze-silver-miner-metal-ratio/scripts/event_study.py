@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+向量化事件研究引擎
+
+輸入事件位置陣列與價格矩陣，一次計算所有事件 × 所有前瞻期的：
+- 前瞻報酬（終點 / 起點 - 1）
+- 期間最大回撤（相對期間內滾動高點）
+- MAE / MFE（相對起點的最大不利 / 有利偏移）
+
+做法是以 sliding_window_view 取出每個事件起點之後的價格路徑（strided view，不複製），
+沿路徑做 fmax / fmin 累積，再以各前瞻期的終點位移一次取值，取代逐事件、逐前瞻期的迴圈。
+統計量的 bootstrap 信賴區間亦以 (重抽樣次數 × 樣本數) 的索引矩陣一次計算。
+
+Usage:
+    from event_study import event_study, row_offsets, summarize_event_study
+
+    start, end = row_offsets(index, event_dates, [52, 104, 156])
+    study = event_study(prices, start, end)
+    stats = summarize_event_study(study, n_bootstrap=2000)
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+@dataclass
+class EventStudy:
+    """事件研究結果；各陣列形狀為 (事件數, 前瞻期數[, 資產數])，無效處為 NaN"""
+
+    forward_return: np.ndarray
+    max_drawdown: np.ndarray
+    mae: np.ndarray
+    mfe: np.ndarray
+    valid: np.ndarray
+
+
+def row_offsets(
+    index: pd.DatetimeIndex,
+    event_dates: Iterable,
+    horizons: Sequence[int],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    以「列數」定義前瞻期：終點 = 事件所在列 + H
+
+    不在索引內的事件日期會被略過。
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        (起點位置 (E,), 終點位置 (E, H))
+    """
+    pos = index.get_indexer(pd.DatetimeIndex(list(event_dates)))
+    start = pos[pos >= 0]
+    end = start[:, None] + np.asarray(horizons, dtype=np.int64)[None, :]
+    return start, end
+
+
+def calendar_offsets(
+    index: pd.DatetimeIndex,
+    event_dates: Iterable,
+    days: Sequence[int],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    以「日曆日」定義前瞻期：起點 / 終點皆取該日或之後的第一個交易日
+
+    晚於最後交易日的事件會被略過；找不到終點的 (事件, 前瞻期) 終點記為 -1。
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        (起點位置 (E,), 終點位置 (E, H))
+    """
+    events = pd.DatetimeIndex(list(event_dates))
+    start = index.searchsorted(events, side="left")
+    start = start[start < len(index)]
+    targets = index[start].values[:, None] + np.asarray(days, dtype="timedelta64[D]")[None, :]
+    end = index.searchsorted(targets.ravel(), side="left").reshape(targets.shape)
+    end = np.where(end < len(index), end, -1)
+    return start, end
+
+
+def forward_paths(prices: np.ndarray, start: np.ndarray, length: int) -> np.ndarray:
+    """
+    取出每個事件起點之後 length 列的價格路徑
+
+    Parameters
+    ----------
+    prices : np.ndarray
+        (T, N) 價格矩陣
+    start : np.ndarray
+        (E,) 起點位置
+    length : int
+        路徑長度（含起點）
+
+    Returns
+    -------
+    np.ndarray
+        (E, length, N)；超出序列尾端的部分為 NaN
+    """
+    rows, cols = prices.shape
+    padded = np.vstack([prices, np.full((length - 1, cols), np.nan)]) if length > 1 else prices
+    # (T, N, length) 的 strided view，只對事件起點取值
+    windows = sliding_window_view(padded, length, axis=0)
+    return np.moveaxis(windows[start], -1, 1)
+
+
+def event_study(
+    prices,
+    start: np.ndarray,
+    end: np.ndarray,
+) -> EventStudy:
+    """
+    一次計算所有事件與前瞻期的報酬、回撤與 MAE / MFE
+
+    Parameters
+    ----------
+    prices : array-like
+        (T,) 或 (T, N) 價格
+    start : np.ndarray
+        (E,) 事件起點位置
+    end : np.ndarray
+        (E, H) 前瞻期終點位置（-1 或超出序列表示無效）
+
+    Returns
+    -------
+    EventStudy
+        1 維價格輸入時陣列為 (E, H)，否則為 (E, H, N)
+    """
+    values = np.asarray(prices, dtype=np.float64)
+    squeeze = values.ndim == 1
+    if squeeze:
+        values = values[:, None]
+    rows = values.shape[0]
+
+    start = np.asarray(start, dtype=np.int64)
+    end = np.asarray(end, dtype=np.int64).reshape(len(start), -1)
+    steps = end - start[:, None]
+    valid = (end >= 0) & (end < rows) & (steps >= 0)
+
+    length = int(steps[valid].max()) + 1 if valid.any() else 1
+    paths = forward_paths(values, start, length)          # (E, L, N)
+    base = paths[:, :1, :]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rel = paths / base - 1.0
+        running_peak = np.fmax.accumulate(paths, axis=1)
+        drawdown = np.fmin.accumulate(paths / running_peak - 1.0, axis=1)
+    mfe = np.fmax.accumulate(rel, axis=1)
+    mae = np.fmin.accumulate(rel, axis=1)
+
+    take = np.where(valid, steps, 0)[:, :, None]
+
+    def _at(arr):
+        out = np.take_along_axis(arr, take, axis=1)
+        out[~valid] = np.nan
+        return out[..., 0] if squeeze else out
+
+    return EventStudy(
+        forward_return=_at(rel),
+        max_drawdown=_at(drawdown),
+        mae=_at(mae),
+        mfe=_at(mfe),
+        valid=valid,
+    )
+
+
+def bootstrap_ci(
+    values: np.ndarray,
+    statistic: Callable[..., np.ndarray] = np.median,
+    n_resamples: int = 2000,
+    confidence: float = 0.90,
+    seed: Optional[int] = 0,
+) -> Optional[List[float]]:
+    """
+    統計量的 percentile bootstrap 信賴區間
+
+    Parameters
+    ----------
+    values : np.ndarray
+        樣本（NaN 會被忽略）
+    statistic : callable
+        接受 axis 參數的統計函數（如 np.median, np.mean）
+    n_resamples : int
+        重抽樣次數
+    confidence : float
+        信賴水準
+    seed : int, optional
+        亂數種子（固定以確保輸出可重現）
+
+    Returns
+    -------
+    List[float] or None
+        [下界, 上界]；樣本數不足 2 時為 None
+    """
+    sample = np.asarray(values, dtype=np.float64)
+    sample = sample[np.isfinite(sample)]
+    if len(sample) < 2 or n_resamples <= 0:
+        return None
+    rng = np.random.default_rng(seed)
+    draws = sample[rng.integers(0, len(sample), size=(n_resamples, len(sample)))]
+    stats = statistic(draws, axis=1)
+    alpha = (1.0 - confidence) / 2.0
+    lo, hi = np.quantile(stats, [alpha, 1.0 - alpha])
+    return [float(lo), float(hi)]
+
+
+def _win_rate(x: np.ndarray, axis: int = -1) -> np.ndarray:
+    return np.mean(x > 0, axis=axis)
+
+
+def summarize_event_study(
+    study: EventStudy,
+    n_bootstrap: int = 0,
+    confidence: float = 0.90,
+    seed: Optional[int] = 0,
+) -> List[Dict[str, Any]]:
+    """
+    逐前瞻期彙總（1 維價格輸入的 EventStudy）
+
+    Returns
+    -------
+    List[Dict]
+        每個前瞻期一筆：count / median / mean / std / win_rate / best / worst、
+        最大回撤與 MAE / MFE 中位數；n_bootstrap > 0 時附 median_ci / win_rate_ci
+    """
+    summaries = []
+    for h in range(study.forward_return.shape[1]):
+        rets = study.forward_return[:, h]
+        rets = rets[np.isfinite(rets)]
+        if len(rets) == 0:
+            summaries.append({"count": 0})
+            continue
+        dd = study.max_drawdown[:, h]
+        mae = study.mae[:, h]
+        mfe = study.mfe[:, h]
+        summary = {
+            "count": int(len(rets)),
+            "median": float(np.median(rets)),
+            "mean": float(np.mean(rets)),
+            "std": float(np.std(rets)) if len(rets) > 1 else 0.0,
+            "win_rate": float(np.mean(rets > 0)),
+            "best": float(np.max(rets)),
+            "worst": float(np.min(rets)),
+            "max_drawdown_median": float(np.nanmedian(dd)),
+            "mae_median": float(np.nanmedian(mae)),
+            "mfe_median": float(np.nanmedian(mfe)),
+        }
+        if n_bootstrap > 0:
+            summary["median_ci"] = bootstrap_ci(rets, np.median, n_bootstrap, confidence, seed)
+            summary["win_rate_ci"] = bootstrap_ci(rets, _win_rate, n_bootstrap, confidence, seed)
+        summaries.append(summary)
+    return summaries
@@ -15,11 +15,14 @@ import argparse
 import json
 import sys
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
 
-import numpy as np
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).parent))
+from event_study import event_study, row_offsets, summarize_event_study
+
 try:
     import yfinance as yf
 except ImportError:
@@ -106,6 +109,12 @@ def parse_args() -> argparse.Namespace:
         default="52,104,156",
         help="前瞻期（逗號分隔，週頻下預設：52,104,156 對應 1/2/3 年）"
     )
+    parser.add_argument(
+        "--bootstrap",
+        type=int,
+        default=2000,
+        help="前瞻報酬中位數 / 勝率 bootstrap 信賴區間重抽樣次數（預設：2000，0 表示不計算）"
+    )
     parser.add_argument(
         "--scenario-target",
         type=str,
@@ -327,29 +336,31 @@ def detect_bottom_events(
 def calculate_forward_returns(
     metal: pd.Series,
     event_dates: List[datetime],
-    forward_horizons: List[int]
+    forward_horizons: List[int],
+    n_bootstrap: int = 0
 ) -> Dict[int, Dict[str, Any]]:
     """
     計算事件後的前瞻報酬
 
+    所有事件與前瞻期由 event_study 一次向量化計算，並附期間最大回撤與 MAE / MFE。
+
+    Parameters
+    ----------
+    n_bootstrap : int
+        中位數與勝率 bootstrap 信賴區間的重抽樣次數（0 表示不計算）
+
     Returns
     -------
     Dict[int, Dict]
         各前瞻期的統計資料
     """
-    results = {}
+    start, end = row_offsets(metal.index, event_dates, forward_horizons)
+    study = event_study(metal.to_numpy(), start, end)
+    summaries = summarize_event_study(study, n_bootstrap=n_bootstrap)
 
-    for H in forward_horizons:
-        rets = []
-        for d in event_dates:
-            if d in metal.index:
-                i = metal.index.get_loc(d)
-                j = i + H
-                if j < len(metal):
-                    ret = float(metal.iloc[j] / metal.iloc[i] - 1)
-                    rets.append(ret)
-
-        if rets:
+    results = {}
+    for H, summary in zip(forward_horizons, summaries):
+        if summary["count"]:
             # 根據 H 的大小判斷是週頻還是日頻
             # 週頻：52 週 = 1 年；日頻：252 日 = 1 年
             if H <= 156:  # 週頻 (52*3=156)
@@ -360,13 +371,7 @@ def calculate_forward_returns(
                 period_label = "days" if H < 252 else "year"
             results[H] = {
                 "horizon_label": f"{horizon_years:.0f} year" if horizon_years >= 1 else f"{H} {period_label}",
-                "count": len(rets),
-                "median": float(np.median(rets)),
-                "mean": float(np.mean(rets)),
-                "std": float(np.std(rets)) if len(rets) > 1 else 0.0,
-                "win_rate": float(np.mean([r > 0 for r in rets])),
-                "best": float(np.max(rets)),
-                "worst": float(np.min(rets))
+                **summary
             }
         else:
             results[H] = {
@@ -491,7 +496,8 @@ def analyze_silver_miner_metal_ratio(
     min_separation_days: int = 180,
     forward_horizons: List[int] = None,
     scenario_target: str = "return_to_top",
-    verbose: bool = False
+    verbose: bool = False,
+    n_bootstrap: int = 0
 ) -> Dict[str, Any]:
     """
     主分析函數
@@ -522,6 +528,8 @@ def analyze_silver_miner_metal_ratio(
         情境推演目標
     verbose : bool
         是否顯示詳細輸出
+    n_bootstrap : int
+        前瞻報酬 bootstrap 信賴區間重抽樣次數（0 表示不計算）
 
     Returns
     -------
@@ -576,7 +584,9 @@ def analyze_silver_miner_metal_ratio(
         print("\n=== Step 6: 計算前瞻報酬 ===")
     # 需要用原始頻率的金屬數據來計算前瞻報酬
     metal_for_fwd = metal.loc[ratio.index]
-    forward_returns = calculate_forward_returns(metal_for_fwd, bottom_events, forward_horizons)
+    forward_returns = calculate_forward_returns(
+        metal_for_fwd, bottom_events, forward_horizons, n_bootstrap=n_bootstrap
+    )
 
     # Step 7: 情境推演
     if verbose:
@@ -680,7 +690,8 @@ def main():
         min_separation_days=args.min_separation_days,
         forward_horizons=forward_horizons,
         scenario_target=args.scenario_target,
-        verbose=args.verbose
+        verbose=args.verbose,
+        n_bootstrap=args.bootstrap
     )
 
     # 輸出結果
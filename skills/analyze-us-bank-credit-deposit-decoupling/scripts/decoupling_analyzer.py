@@ -9,6 +9,7 @@ Usage:
     python decoupling_analyzer.py --quick
     python decoupling_analyzer.py --start 2022-06-01 --end 2026-01-23
     python decoupling_analyzer.py --start 2022-06-01 --output result.json
+    python decoupling_analyzer.py --panel --start 2022-06-01 --top 10
 
 Data Sources (Public FRED CSV):
     - TOTLL: Loans and Leases in Bank Credit, All Commercial Banks
@@ -28,8 +29,11 @@ from io import StringIO
 import numpy as np
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).parent))
+
 try:
     import requests
+    import http_client
     HAS_REQUESTS = True
 except ImportError:
     HAS_REQUESTS = False
@@ -75,6 +79,9 @@ CONFIG = {
 # Data Fetching (Public FRED CSV - No API Key Required)
 # ============================================================================
 
+FRED_CSV_URL = "https://fred.stlouisfed.org/graph/fredgraph.csv?id={series_id}"
+
+
 def fetch_fred_csv(series_key: str) -> pd.Series:
     """
     Fetch data from FRED public CSV endpoint.
@@ -85,19 +92,40 @@ def fetch_fred_csv(series_key: str) -> pd.Series:
     Returns:
         pandas Series with datetime index
     """
+    series_info = CONFIG["series"][series_key]
+    return fetch_fred_series(series_info["id"], series_info["name"], series_info["url"])
+
+
+def fetch_fred_series(
+    series_id: str,
+    name: str = "",
+    url: Optional[str] = None,
+    verbose: bool = True
+) -> pd.Series:
+    """
+    Fetch any FRED series by ID from the public CSV endpoint.
+
+    Args:
+        series_id: FRED series ID (e.g., "TOTLL")
+        name: Human-readable name for logging
+        url: Override URL (default: fredgraph CSV for series_id)
+        verbose: Print progress
+
+    Returns:
+        pandas Series with datetime index (empty on failure)
+    """
     if not HAS_REQUESTS:
         print("Error: requests library required. Run: pip install requests")
         sys.exit(1)
 
-    series_info = CONFIG["series"][series_key]
-    url = series_info["url"]
-    series_id = series_info["id"]
+    url = url or FRED_CSV_URL.format(series_id=series_id)
 
-    print(f"Fetching {series_id} ({series_info['name']})...")
-    print(f"  URL: {url}")
+    if verbose:
+        print(f"Fetching {series_id} ({name or series_id})...")
+        print(f"  URL: {url}")
 
     try:
-        response = requests.get(url, timeout=30)
+        response = http_client.get(url, timeout=30)
         response.raise_for_status()
 
         # Parse CSV
@@ -113,17 +141,18 @@ def fetch_fred_csv(series_key: str) -> pd.Series:
         series = df["VALUE"]
         series.name = series_id
 
-        print(f"  Downloaded {len(series)} data points")
-        print(f"  Date range: {series.index.min().date()} to {series.index.max().date()}")
+        if verbose:
+            print(f"  Downloaded {len(series)} data points")
+            print(f"  Date range: {series.index.min().date()} to {series.index.max().date()}")
 
         return series
 
     except requests.exceptions.RequestException as e:
         print(f"Error fetching {series_id}: {e}")
-        return pd.Series()
+        return pd.Series(dtype=float)
     except Exception as e:
         print(f"Error parsing {series_id} data: {e}")
-        return pd.Series()
+        return pd.Series(dtype=float)
 
 
 def load_cached_data(series_key: str) -> Optional[pd.Series]:
@@ -654,9 +683,31 @@ def main():
         action="store_true",
         help="不使用快取數據，強制從 FRED 重新下載"
     )
+    parser.add_argument(
+        "--panel",
+        action="store_true",
+        help="面板模式：分析所有 H.8 銀行類別的貸款/存款配對並依緊縮訊號排序"
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        help="面板模式只輸出前 N 個配對"
+    )
 
     args = parser.parse_args()
 
+    if args.panel:
+        from h8_panel import run_panel_analysis
+
+        run_panel_analysis(
+            start_date=args.start,
+            end_date=args.end,
+            output_file=args.output,
+            use_cache=not args.no_cache,
+            top=args.top
+        )
+        return
+
     run_analysis(
         start_date=args.start,
         end_date=args.end,
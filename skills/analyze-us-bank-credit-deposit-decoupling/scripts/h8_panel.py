@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+H.8 面板脫鉤分析
+
+把單一「貸款 vs 存款」配對的脫鉤分析擴展到整個 H.8 家族：
+大型/小型國內銀行、外資銀行，以及 C&I、CRE、消費貸款與各類存款，
+一次計算所有配對的累積變化與脫鉤指標，並依緊縮訊號強度排序。
+
+- 序列以欄式 Parquet 快取（日期 × 序列 ID 寬表），每條序列各自記錄抓取時間，
+  只重抓過期或缺少的序列
+- 序列以執行緒池平行下載
+- 指標以 (日期 × 配對) 矩陣向量化計算，與 calculate_decoupling_metrics 結果一致
+
+Usage:
+    python h8_panel.py --start 2022-06-01
+    python h8_panel.py --start 2022-06-01 --top 10 --output panel.json
+    python decoupling_analyzer.py --panel --start 2022-06-01
+
+Dependencies:
+    pip install pandas pyarrow requests
+"""
+
+import argparse
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+from decoupling_analyzer import CONFIG, assess_tightening, fetch_fred_series
+
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+# H.8 週資料（季調），單位皆為 Billions of U.S. Dollars
+# side: loans / deposits；group: 銀行類別；category: 貸款或存款細項
+H8_SERIES = {
+    # --- 貸款總量 ---
+    "TOTLL": {"side": "loans", "group": "all", "category": "total",
+              "name": "Loans and Leases in Bank Credit, All Commercial Banks"},
+    "LLBLCBW027SBOG": {"side": "loans", "group": "large", "category": "total",
+                       "name": "Loans and Leases in Bank Credit, Large Domestically Chartered Banks"},
+    "LLBSCBW027SBOG": {"side": "loans", "group": "small", "category": "total",
+                       "name": "Loans and Leases in Bank Credit, Small Domestically Chartered Banks"},
+    "LLBFRIW027SBOG": {"side": "loans", "group": "foreign", "category": "total",
+                       "name": "Loans and Leases in Bank Credit, Foreign-Related Institutions"},
+    # --- C&I ---
+    "TOTCI": {"side": "loans", "group": "all", "category": "ci",
+              "name": "Commercial and Industrial Loans, All Commercial Banks"},
+    "CIBLCBW027SBOG": {"side": "loans", "group": "large", "category": "ci",
+                       "name": "Commercial and Industrial Loans, Large Domestically Chartered Banks"},
+    "CIBSCBW027SBOG": {"side": "loans", "group": "small", "category": "ci",
+                       "name": "Commercial and Industrial Loans, Small Domestically Chartered Banks"},
+    # --- CRE ---
+    "CREACBW027SBOG": {"side": "loans", "group": "all", "category": "cre",
+                       "name": "Commercial Real Estate Loans, All Commercial Banks"},
+    "CRELCBW027SBOG": {"side": "loans", "group": "large", "category": "cre",
+                       "name": "Commercial Real Estate Loans, Large Domestically Chartered Banks"},
+    "CRESCBW027SBOG": {"side": "loans", "group": "small", "category": "cre",
+                       "name": "Commercial Real Estate Loans, Small Domestically Chartered Banks"},
+    # --- 消費貸款 ---
+    "CLSACBW027SBOG": {"side": "loans", "group": "all", "category": "consumer",
+                       "name": "Consumer Loans, All Commercial Banks"},
+    "CLSLCBW027SBOG": {"side": "loans", "group": "large", "category": "consumer",
+                       "name": "Consumer Loans, Large Domestically Chartered Banks"},
+    "CLSSCBW027SBOG": {"side": "loans", "group": "small", "category": "consumer",
+                       "name": "Consumer Loans, Small Domestically Chartered Banks"},
+    # --- 存款 ---
+    "DPSACBW027SBOG": {"side": "deposits", "group": "all", "category": "total",
+                       "name": "Deposits, All Commercial Banks"},
+    "DPSLCBW027SBOG": {"side": "deposits", "group": "large", "category": "total",
+                       "name": "Deposits, Large Domestically Chartered Banks"},
+    "DPSSCBW027SBOG": {"side": "deposits", "group": "small", "category": "total",
+                       "name": "Deposits, Small Domestically Chartered Banks"},
+    "DPSFRIW027SBOG": {"side": "deposits", "group": "foreign", "category": "total",
+                       "name": "Deposits, Foreign-Related Institutions"},
+    "LTDACBW027SBOG": {"side": "deposits", "group": "all", "category": "large_time",
+                       "name": "Large Time Deposits, All Commercial Banks"},
+    "ODSACBW027SBOG": {"side": "deposits", "group": "all", "category": "other",
+                       "name": "Other Deposits, All Commercial Banks"},
+}
+
+PANEL_FILE = "h8_panel.parquet"
+PANEL_META_FILE = "h8_panel_meta.json"
+DEFAULT_MAX_WORKERS = 6
+
+# 緊縮訊號排序：判定類型的嚴重度
+TIGHTENING_SEVERITY = {
+    "severe_decoupling": 4,
+    "moderate_decoupling": 3,
+    "mild_decoupling": 2,
+    "deposit_contraction": 1,
+    "neutral": 0,
+}
+
+
+def build_pairings(series: Optional[Dict[str, Dict[str, str]]] = None) -> List[Tuple[str, str]]:
+    """
+    Build the loan/deposit pairings analysed in panel mode.
+
+    - Every loan series vs. total deposits of the same bank group
+    - Total loans of all banks vs. every deposit class of all banks
+
+    Returns:
+        List of (loan_series_id, deposit_series_id)
+    """
+    series = series or H8_SERIES
+    loans = [k for k, v in series.items() if v["side"] == "loans"]
+    deposits = [k for k, v in series.items() if v["side"] == "deposits"]
+
+    pairings = []
+    for loan_id in loans:
+        group = series[loan_id]["group"]
+        for dep_id in deposits:
+            dep = series[dep_id]
+            if dep["group"] == group and dep["category"] == "total":
+                pairings.append((loan_id, dep_id))
+
+    total_loans = [k for k in loans if series[k]["group"] == "all" and series[k]["category"] == "total"]
+    for loan_id in total_loans:
+        for dep_id in deposits:
+            dep = series[dep_id]
+            if dep["group"] == "all" and dep["category"] != "total":
+                pairings.append((loan_id, dep_id))
+
+    return pairings
+
+
+# ============================================================================
+# Columnar Cache
+# ============================================================================
+
+class H8PanelCache:
+    """
+    Wide Parquet cache (date x series ID) of H.8 weekly series.
+
+    Each series keeps its own fetch timestamp in a JSON sidecar, so only
+    expired or missing series are re-downloaded.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_age_hours: Optional[float] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        offline: bool = False,
+    ):
+        """
+        Parameters:
+            cache_dir: Cache directory (default: CONFIG["cache_dir"])
+            max_age_hours: Series older than this are re-fetched
+            max_workers: Concurrent FRED downloads
+            offline: Serve from cache only, never hit the network
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else CONFIG["cache_dir"]
+        self.max_age = timedelta(
+            hours=max_age_hours if max_age_hours is not None else CONFIG["cache_max_age_hours"]
+        )
+        self.max_workers = max_workers
+        self.offline = offline
+        self.last_stats: Dict[str, Any] = {}
+
+    @property
+    def panel_path(self) -> Path:
+        return self.cache_dir / PANEL_FILE
+
+    @property
+    def meta_path(self) -> Path:
+        return self.cache_dir / PANEL_META_FILE
+
+    def _load_meta(self) -> Dict[str, str]:
+        if not self.meta_path.exists():
+            return {}
+        with open(self.meta_path, "r") as f:
+            return json.load(f).get("fetched_at", {})
+
+    def load(self) -> pd.DataFrame:
+        """Load the cached wide panel (empty DataFrame if none)."""
+        if not self.panel_path.exists():
+            return pd.DataFrame()
+        return pd.read_parquet(self.panel_path)
+
+    def stale_series(
+        self,
+        series_ids: List[str],
+        panel: Optional[pd.DataFrame] = None,
+    ) -> List[str]:
+        """Series that are missing from the cache or older than max_age."""
+        fetched_at = self._load_meta()
+        cached_cols = set((self.load() if panel is None else panel).columns)
+        now = datetime.now()
+
+        stale = []
+        for sid in series_ids:
+            ts = fetched_at.get(sid)
+            if sid not in cached_cols or ts is None:
+                stale.append(sid)
+            elif now - datetime.fromisoformat(ts) > self.max_age:
+                stale.append(sid)
+        return stale
+
+    def _save(self, panel: pd.DataFrame, fetched_at: Dict[str, str]) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        panel.sort_index().to_parquet(self.panel_path, compression="zstd")
+        with open(self.meta_path, "w") as f:
+            json.dump({"fetched_at": fetched_at}, f, indent=2)
+
+    def get_panel(
+        self,
+        series_ids: List[str],
+        force_refresh: bool = False,
+    ) -> pd.DataFrame:
+        """
+        Return the panel for series_ids, refreshing stale series concurrently.
+
+        Series that fail to download fall back to cached values (if any).
+        """
+        panel = self.load()
+        fetched_at = self._load_meta()
+
+        to_fetch = list(series_ids) if force_refresh else self.stale_series(series_ids, panel)
+        if self.offline:
+            to_fetch = []
+
+        fetched: Dict[str, pd.Series] = {}
+        failed: List[str] = []
+        if to_fetch:
+            print(f"Fetching {len(to_fetch)} H.8 series from FRED ({self.max_workers} workers)...")
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {
+                    pool.submit(fetch_fred_series, sid, H8_SERIES.get(sid, {}).get("name", ""), None, False): sid
+                    for sid in to_fetch
+                }
+                for future in as_completed(futures):
+                    sid = futures[future]
+                    series = future.result()
+                    if series.empty:
+                        failed.append(sid)
+                    else:
+                        fetched[sid] = series
+
+        if fetched:
+            new_cols = pd.DataFrame(fetched)
+            panel = panel.drop(columns=[c for c in fetched if c in panel.columns])
+            panel = panel.join(new_cols, how="outer") if not panel.empty else new_cols
+            now = datetime.now().isoformat()
+            fetched_at.update({sid: now for sid in fetched})
+            self._save(panel, fetched_at)
+
+        missing = [sid for sid in series_ids if sid not in panel.columns]
+        self.last_stats = {
+            "requested": len(series_ids),
+            "fetched": sorted(fetched),
+            "failed": sorted(failed),
+            "from_cache": len(series_ids) - len(fetched) - len(missing),
+            "missing": missing,
+        }
+        if failed:
+            print(f"Warning: failed to fetch {', '.join(sorted(failed))} (using cache if available)")
+
+        available = [sid for sid in series_ids if sid in panel.columns]
+        return panel[available].sort_index()
+
+
+# ============================================================================
+# Vectorized Panel Metrics
+# ============================================================================
+
+def compute_panel_metrics(
+    panel: pd.DataFrame,
+    pairings: List[Tuple[str, str]],
+) -> pd.DataFrame:
+    """
+    Compute decoupling metrics for every pairing at once.
+
+    Per pairing the base date is the first date where both series are
+    observed, so the result for (TOTLL, DPSACBW027SBOG) equals
+    calculate_decoupling_metrics on the aligned pair.
+
+    Args:
+        panel: Wide panel (date x series ID), already filtered to the window
+        pairings: List of (loan_series_id, deposit_series_id)
+
+    Returns:
+        DataFrame indexed by (loan_id, deposit_id) with latest metrics
+    """
+    pairings = [(l, d) for l, d in pairings if l in panel.columns and d in panel.columns]
+    if not pairings or panel.empty:
+        return pd.DataFrame()
+
+    loan_ids = [l for l, _ in pairings]
+    dep_ids = [d for _, d in pairings]
+    L = panel[loan_ids].to_numpy(dtype=float)  # (T, P)
+    D = panel[dep_ids].to_numpy(dtype=float)
+    valid = ~np.isnan(L) & ~np.isnan(D)
+    has_data = valid.any(axis=0)
+
+    T, P = L.shape
+    cols = np.arange(P)
+    base = np.argmax(valid, axis=0)
+    last = T - 1 - np.argmax(valid[::-1], axis=0)
+
+    # 累積變化（只保留共同觀測日）
+    loan_change = np.where(valid, L - L[base, cols], np.nan)
+    deposit_change = np.where(valid, D - D[base, cols], np.nan)
+    gap = loan_change - deposit_change
+
+    latest_loan = loan_change[last, cols]
+    latest_dep = deposit_change[last, cols]
+    latest_gap = gap[last, cols]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        latest_stress = latest_gap / latest_loan
+    latest_stress = np.where(np.isfinite(latest_stress), latest_stress, 0.0)
+
+    # 存款最大回撤與回升
+    dep_filled = np.where(valid, deposit_change, np.inf)
+    trough_pos = np.argmin(dep_filled, axis=0)
+    trough = deposit_change[trough_pos, cols]
+    recovery = latest_dep - trough
+    with np.errstate(divide="ignore", invalid="ignore"):
+        recovery_ratio = np.where(trough < 0, recovery / np.abs(trough), 0.0)
+
+    phase = np.select(
+        [
+            (latest_dep < 0) & (latest_dep <= trough * 0.9),
+            latest_dep < 0,
+            recovery_ratio > 1.5,
+            recovery_ratio > 1.0,
+        ],
+        ["contraction_deepening", "contraction_stabilizing", "strong_recovery", "recovery_but_lagging"],
+        default="partial_recovery",
+    )
+
+    base_deposits = D[base, cols]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gap_pct = latest_gap / base_deposits
+
+    index = panel.index
+    frame = pd.DataFrame({
+        "loan_id": loan_ids,
+        "deposit_id": dep_ids,
+        "loan_group": [H8_SERIES.get(l, {}).get("group") for l in loan_ids],
+        "loan_category": [H8_SERIES.get(l, {}).get("category") for l in loan_ids],
+        "deposit_category": [H8_SERIES.get(d, {}).get("category") for d in dep_ids],
+        "base_date": index[base],
+        "end_date": index[last],
+        "observations": valid.sum(axis=0),
+        "latest_loan_change": latest_loan,
+        "latest_deposit_change": latest_dep,
+        "latest_gap": latest_gap,
+        "latest_stress_ratio": latest_stress,
+        "gap_pct_of_base_deposits": gap_pct,
+        "deposit_max_drawdown": trough,
+        "deposit_max_drawdown_date": index[trough_pos],
+        "recovery_from_trough": recovery,
+        "recovery_ratio": recovery_ratio,
+        "phase": phase,
+    })
+    return frame[has_data].reset_index(drop=True)
+
+
+def rank_pairings(metrics: pd.DataFrame) -> pd.DataFrame:
+    """
+    Assess every pairing and rank by tightening signal.
+
+    Order: tightening severity (assess_tightening), then stress ratio,
+    then gap as a share of base deposits.
+    """
+    if metrics.empty:
+        return metrics
+
+    assessments = [
+        assess_tightening({
+            "latest_stress_ratio": row.latest_stress_ratio,
+            "latest_gap": row.latest_gap,
+            "latest_loan_change": row.latest_loan_change,
+            "latest_deposit_change": row.latest_deposit_change,
+        })
+        for row in metrics.itertuples()
+    ]
+    ranked = metrics.assign(
+        stress_level=[a["stress_level"] for a in assessments],
+        tightening_type=[a["tightening_type"] for a in assessments],
+        tightening_label=[a["tightening_label"] for a in assessments],
+    )
+    ranked["severity"] = ranked["tightening_type"].map(TIGHTENING_SEVERITY).fillna(0).astype(int)
+    ranked = ranked.sort_values(
+        ["severity", "latest_stress_ratio", "gap_pct_of_base_deposits"],
+        ascending=False,
+    ).reset_index(drop=True)
+    ranked.insert(0, "rank", np.arange(1, len(ranked) + 1))
+    return ranked
+
+
+# ============================================================================
+# Output
+# ============================================================================
+
+def _pairing_record(row: pd.Series) -> Dict[str, Any]:
+    return {
+        "rank": int(row["rank"]),
+        "loans": {"series_id": row["loan_id"], "group": row["loan_group"], "category": row["loan_category"]},
+        "deposits": {"series_id": row["deposit_id"], "category": row["deposit_category"]},
+        "base_date": str(row["base_date"].date()),
+        "end_date": str(row["end_date"].date()),
+        "loans_change_billion_usd": round(float(row["latest_loan_change"]), 2),
+        "deposits_change_billion_usd": round(float(row["latest_deposit_change"]), 2),
+        "gap_billion_usd": round(float(row["latest_gap"]), 2),
+        "gap_pct_of_base_deposits": round(float(row["gap_pct_of_base_deposits"]), 4),
+        "deposit_stress_ratio": round(float(row["latest_stress_ratio"]), 3),
+        "deposit_max_drawdown_billion_usd": round(float(row["deposit_max_drawdown"]), 2),
+        "deposit_max_drawdown_date": str(row["deposit_max_drawdown_date"].date()),
+        "recovery_ratio": round(float(row["recovery_ratio"]), 2),
+        "phase": row["phase"],
+        "stress_level": row["stress_level"],
+        "tightening_type": row["tightening_type"],
+        "tightening_label": row["tightening_label"],
+    }
+
+
+def run_panel_analysis(
+    start_date: str,
+    end_date: str,
+    output_file: Optional[str] = None,
+    use_cache: bool = True,
+    offline: bool = False,
+    top: Optional[int] = None,
+    cache: Optional[H8PanelCache] = None,
+) -> Dict[str, Any]:
+    """Run the H.8 panel decoupling analysis."""
+    print(f"\n{'='*60}")
+    print("  H.8 面板脫鉤分析（所有銀行類別 × 貸款/存款配對）")
+    print(f"{'='*60}")
+    print(f"分析期間: {start_date} 至 {end_date}\n")
+
+    cache = cache or H8PanelCache(offline=offline)
+    pairings = build_pairings()
+    series_ids = sorted({sid for pair in pairings for sid in pair})
+
+    panel = cache.get_panel(series_ids, force_refresh=not use_cache)
+    if panel.empty:
+        print("Error: No H.8 data available")
+        return {"status": "error", "message": "No H.8 data available"}
+
+    start, end = pd.to_datetime(start_date), pd.to_datetime(end_date)
+    panel = panel.loc[(panel.index >= start) & (panel.index <= end)]
+
+    ranked = rank_pairings(compute_panel_metrics(panel, pairings))
+    if ranked.empty:
+        return {"status": "error", "message": "No overlapping loan/deposit observations"}
+
+    shown = ranked.head(top) if top else ranked
+    print(f"{'─'*60}")
+    print(f"{'#':>3} {'Loans':<16} {'Deposits':<16} {'Gap':>10} {'Stress':>8}  判定")
+    for row in shown.itertuples():
+        print(
+            f"{row.rank:>3} {row.loan_id:<16} {row.deposit_id:<16} "
+            f"{row.latest_gap:>10,.1f} {row.latest_stress_ratio:>8.1%}  {row.tightening_label}"
+        )
+    print(f"{'─'*60}\n")
+
+    result = {
+        "skill": "analyze_bank_credit_deposit_decoupling",
+        "mode": "panel",
+        "version": "2.0.0",
+        "generated_at": datetime.now().isoformat(),
+        "status": "success",
+        "analysis_period": {
+            "requested_start": start_date,
+            "requested_end": end_date,
+            "frequency": CONFIG["default_frequency"],
+        },
+        "pairing_count": len(ranked),
+        "pairings": [_pairing_record(row) for _, row in shown.iterrows()],
+        "data_notes": {
+            "series": {sid: H8_SERIES[sid]["name"] for sid in series_ids if sid in H8_SERIES},
+            "missing_series": cache.last_stats.get("missing", []),
+            "cache": cache.last_stats,
+        },
+        "caveats": [
+            "各配對以雙方首個共同觀測日為基準計算累積變化",
+            "銀行類別間存在併購重分類，長期比較需留意 H.8 的 break 調整",
+            "壓力比率在貸款累積變化接近 0 時不穩定",
+        ],
+    }
+
+    output_json = json.dumps(result, ensure_ascii=False, indent=2)
+    print(output_json)
+
+    if output_file:
+        Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write(output_json)
+        print(f"\n結果已存儲至: {output_file}")
+
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="H.8 面板脫鉤分析（所有銀行類別與貸款/存款配對）")
+    parser.add_argument("--start", "-s", default=CONFIG["default_start"], help="分析起始日期")
+    parser.add_argument("--end", "-e", default=datetime.now().strftime("%Y-%m-%d"), help="分析結束日期")
+    parser.add_argument("--output", "-o", help="輸出檔案路徑 (JSON)")
+    parser.add_argument("--top", type=int, help="只輸出前 N 個配對")
+    parser.add_argument("--no-cache", action="store_true", help="強制重新下載所有序列")
+    parser.add_argument("--offline", action="store_true", help="只使用快取，不連網")
+    args = parser.parse_args()
+
+    run_panel_analysis(
+        start_date=args.start,
+        end_date=args.end,
+        output_file=args.output,
+        use_cache=not args.no_cache,
+        offline=args.offline,
+        top=args.top,
+    )
+
+
+if __name__ == "__main__":
+    main()
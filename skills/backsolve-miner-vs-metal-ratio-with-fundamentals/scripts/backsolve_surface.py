@@ -0,0 +1,338 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+向量化反推曲面
+
+在「金屬價格 × AISC 通膨 × 估值倍數」的密集網格上，對每一檔持股計算因子，
+得到整個比率倍數曲面（數十萬個點一次以陣列計算），並解析求出等比率曲線與最小變動解。
+
+模型（逐持股加總）：
+
+    V_i(s, a, m) = m × M_i × (1 - L_i) × C_i(s, a) × D_i
+    C_i(s, a)    = 1 - a × AISC_i / (s × S)
+    比率倍數      = Σ w_i V_i(s, a, m) / Σ w_i V_i(1, 1, 1)
+
+s、a、m 分別為金屬價格、AISC、倍數相對當前的倍數。令 A = Σ w_i M_i (1-L_i) D_i、
+B = Σ w_i M_i (1-L_i) D_i AISC_i，則 Σ w_i V_i = m × (A - a × B / (s × S))，
+因此等比率曲面（達到目標倍數 r）有封閉解：
+
+    m*(s, a) = r × V_now / (A - a × B / (s × S))
+    s*(a, m) = a × B / (S × (A - r × V_now / m))
+
+Usage:
+    from backsolve_surface import compute_backsolve_surface, summarize_surface
+
+    surface = compute_backsolve_surface(fundamentals_list, weights, S_now, ratio_mult=1.5)
+    surface["achieved"]          # (金屬, AISC, 倍數) 比率倍數曲面
+    surface["multiple_needed"]   # (金屬, AISC) 達標所需倍數
+    summarize_surface(surface)["minimal_moves"]
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+FUNDAMENTAL_FIELDS = ("aisc", "total_debt", "cash", "market_cap", "ebitda", "shares", "shares_base")
+
+# (起, 迄, 點數)；預設 151 × 71 × 61 ≈ 65 萬點
+DEFAULT_METAL_RANGE = (0.5, 2.0, 151)
+DEFAULT_AISC_RANGE = (0.8, 1.5, 71)
+DEFAULT_MULTIPLE_RANGE = (0.5, 3.0, 61)
+
+
+# =============================================================================
+# 因子（陣列版 compute_factors）
+# =============================================================================
+
+def holdings_arrays(fundamentals_list: Sequence[dict]) -> Dict[str, np.ndarray]:
+    """
+    將持股基本面轉為欄位陣列
+
+    Parameters
+    ----------
+    fundamentals_list : Sequence[dict]
+        各持股基本面（get_fundamentals 格式）
+
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        每個欄位一個 (持股數,) 陣列；缺 shares_base 時以 shares 代替
+    """
+    arrays = {
+        name: np.array([f.get(name, 0) for f in fundamentals_list], dtype=np.float64)
+        for name in FUNDAMENTAL_FIELDS
+    }
+    arrays["shares_base"] = np.array(
+        [f.get("shares_base", f.get("shares", 0)) for f in fundamentals_list], dtype=np.float64
+    )
+    return arrays
+
+
+def compute_factor_arrays(holdings: Dict[str, np.ndarray], metal_price) -> Dict[str, np.ndarray]:
+    """
+    compute_factors 的陣列版本，與逐檔計算結果一致
+
+    Parameters
+    ----------
+    holdings : Dict[str, np.ndarray]
+        holdings_arrays 的輸出
+    metal_price : float or np.ndarray
+        金屬價格；陣列時須可與持股軸（最後一軸）廣播
+
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        與 compute_factors 相同的鍵
+    """
+    S = np.asarray(metal_price, dtype=np.float64)
+    aisc = holdings["aisc"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        C = np.where(S > 0, 1 - aisc / S, 0.0)
+
+        net_debt = holdings["total_debt"] - holdings["cash"]
+        ev = holdings["market_cap"] + net_debt
+        L = np.where(ev > 0, net_debt / ev, 0.0)
+
+        ebitda = holdings["ebitda"]
+        M = np.where(ebitda > 0, ev / ebitda, 0.0)
+
+        shares = holdings["shares"]
+        shares_base = holdings["shares_base"]
+        D = np.where(shares > 0, shares_base / shares, 1.0)
+        shares_yoy = np.where(shares_base > 0, shares / shares_base - 1, 0.0)
+
+    return {
+        "aisc": aisc,
+        "C": C,
+        "net_debt": net_debt,
+        "ev": ev,
+        "L": L,
+        "one_minus_L": 1 - L,
+        "ebitda": ebitda,
+        "M": M,
+        "shares": shares,
+        "shares_base": shares_base,
+        "D": D,
+        "shares_yoy": shares_yoy,
+    }
+
+
+def _axis(spec: Tuple[float, float, int]) -> np.ndarray:
+    start, stop, num = spec
+    return np.linspace(start, stop, int(num))
+
+
+# =============================================================================
+# 曲面
+# =============================================================================
+
+def compute_backsolve_surface(
+    fundamentals_list: Sequence[dict],
+    weights: Sequence[float],
+    metal_price: float,
+    ratio_mult: float,
+    metal_range: Tuple[float, float, int] = DEFAULT_METAL_RANGE,
+    aisc_range: Tuple[float, float, int] = DEFAULT_AISC_RANGE,
+    multiple_range: Tuple[float, float, int] = DEFAULT_MULTIPLE_RANGE,
+) -> Dict[str, Any]:
+    """
+    計算密集網格上的比率倍數曲面與等比率解
+
+    Parameters
+    ----------
+    fundamentals_list : Sequence[dict]
+        各持股基本面
+    weights : Sequence[float]
+        持股權重（內部正規化）
+    metal_price : float
+        當前金屬價格 S
+    ratio_mult : float
+        目標比率倍數 R_target / R_now
+    metal_range, aisc_range, multiple_range : tuple
+        各軸 (起, 迄, 點數)，皆為相對當前的倍數
+
+    Returns
+    -------
+    Dict[str, Any]
+        axes（metal / aisc / multiple）、achieved (Ns, Na, Nm)、
+        multiple_needed (Ns, Na)、hits_target (Ns, Na, Nm)、
+        以及解析解所需的係數 A / B / value_now
+    """
+    holdings = holdings_arrays(fundamentals_list)
+    w = np.asarray(weights, dtype=np.float64)
+    w = w / w.sum() if w.sum() > 0 else w
+
+    s = _axis(metal_range)
+    a = _axis(aisc_range)
+    m = _axis(multiple_range)
+
+    now = compute_factor_arrays(holdings, metal_price)
+    k = w * now["M"] * now["one_minus_L"] * now["D"]      # (H,)
+    value_now = float(np.dot(k, now["C"]))
+
+    # 每檔持股在 (金屬, AISC) 網格上的成本因子：(Ns, Na, H)
+    grid_price = metal_price * s[:, None, None]
+    C_grid = compute_factor_arrays(
+        {**holdings, "aisc": a[None, :, None] * holdings["aisc"]}, grid_price
+    )["C"]
+    value = np.einsum("ijh,h->ij", C_grid, k)             # (Ns, Na)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # 籃子整體虧損（value_now <= 0）時比率模型無意義
+        base = value / value_now if value_now > 0 else np.full_like(value, np.nan)
+        achieved = base[:, :, None] * m[None, None, :]
+        multiple_needed = np.where(base > 0, ratio_mult / base, np.nan)
+
+    return {
+        "axes": {"metal": s, "aisc": a, "multiple": m},
+        "metal_price": float(metal_price),
+        "ratio_mult": float(ratio_mult),
+        "achieved": achieved,
+        "hits_target": achieved >= ratio_mult,
+        "multiple_needed": multiple_needed,
+        "A": float(k.sum()),
+        "B": float(np.dot(k, holdings["aisc"])),
+        "value_now": value_now,
+    }
+
+
+def metal_needed(surface: Dict[str, Any], aisc_mult, multiple_mult) -> np.ndarray:
+    """
+    等比率曲線的解析解：給定 AISC 與倍數，達標所需的金屬價格倍數
+
+    無解（任何金屬價格都無法達標）時為 NaN。
+    """
+    a = np.asarray(aisc_mult, dtype=np.float64)
+    m = np.asarray(multiple_mult, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gap = surface["A"] - surface["ratio_mult"] * surface["value_now"] / m
+        s = a * surface["B"] / (surface["metal_price"] * gap)
+    return np.where((gap > 0) & (s > 0), s, np.nan)
+
+
+def multiple_needed_at(surface: Dict[str, Any], metal_mult, aisc_mult) -> np.ndarray:
+    """等比率曲面的解析解：給定金屬價格與 AISC，達標所需的倍數"""
+    s = np.asarray(metal_mult, dtype=np.float64)
+    a = np.asarray(aisc_mult, dtype=np.float64)
+    value = surface["A"] - a * surface["B"] / (s * surface["metal_price"])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        need = surface["ratio_mult"] * surface["value_now"] / value
+    return np.where(value > 0, need, np.nan)
+
+
+def _move(metal: float, aisc: float, multiple: float) -> Dict[str, float]:
+    return {
+        "metal_change": float(metal - 1),
+        "aisc_change": float(aisc - 1),
+        "multiple_change": float(multiple - 1),
+        "distance": float(np.sqrt(np.log(metal) ** 2 + np.log(aisc) ** 2 + np.log(multiple) ** 2)),
+    }
+
+
+def _best_on_contour(metal, aisc, multiple, bounds) -> Optional[Dict[str, float]]:
+    """等比率解集合中 log 距離最小的點（輸入可互相廣播）"""
+    metal, aisc, multiple = (np.ravel(x) for x in np.broadcast_arrays(metal, aisc, multiple))
+    ok = np.isfinite(metal) & np.isfinite(multiple) & (multiple >= bounds[0]) & (multiple <= bounds[1])
+    if not ok.any():
+        return None
+    dist = np.sqrt(np.log(metal) ** 2 + np.log(aisc) ** 2 + np.log(multiple) ** 2)
+    idx = np.flatnonzero(ok)[np.argmin(dist[ok])]
+    return _move(metal[idx], aisc[idx], multiple[idx])
+
+
+def minimal_moves(surface: Dict[str, Any]) -> Dict[str, Optional[Dict[str, float]]]:
+    """
+    等比率曲面上的最小變動解
+
+    距離以各軸 log 變動的歐氏距離衡量（+10% 與 -9.1% 等價）。
+
+    Returns
+    -------
+    Dict
+        multiple_only / metal_only / aisc_only：單軸解析解
+        metal_and_multiple / aisc_and_multiple：固定另一軸為 1 的雙軸最小解
+        all_three：整個 (金屬, AISC) 網格上的三軸最小解
+        無解或超出倍數軸範圍時為 None
+    """
+    s_axis = surface["axes"]["metal"]
+    a_axis = surface["axes"]["aisc"]
+    m_axis = surface["axes"]["multiple"]
+    bounds = (m_axis[0], m_axis[-1])
+    r = surface["ratio_mult"]
+
+    s_only = float(metal_needed(surface, 1.0, 1.0))
+    # 只調 AISC：A - a × B / S = r × V_now
+    with np.errstate(divide="ignore", invalid="ignore"):
+        a_only = (surface["A"] - r * surface["value_now"]) * surface["metal_price"] / surface["B"]
+
+    s_fine = np.linspace(s_axis[0], s_axis[-1], 4 * len(s_axis))
+    a_fine = np.linspace(a_axis[0], a_axis[-1], 4 * len(a_axis))
+
+    grid_need = surface["multiple_needed"]
+    all_three = _best_on_contour(
+        s_axis[:, None], a_axis[None, :], grid_need, bounds
+    )
+
+    return {
+        "multiple_only": _move(1.0, 1.0, r) if bounds[0] <= r <= bounds[1] else None,
+        "metal_only": _move(s_only, 1.0, 1.0) if np.isfinite(s_only) else None,
+        "aisc_only": _move(1.0, a_only, 1.0) if np.isfinite(a_only) and a_only > 0 else None,
+        "metal_and_multiple": _best_on_contour(s_fine, 1.0, multiple_needed_at(surface, s_fine, 1.0), bounds),
+        "aisc_and_multiple": _best_on_contour(1.0, a_fine, multiple_needed_at(surface, 1.0, a_fine), bounds),
+        "all_three": all_three,
+    }
+
+
+def iso_ratio_contour(
+    surface: Dict[str, Any],
+    multiples: Optional[Sequence[float]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    各倍數水準下、沿 AISC 軸的等比率曲線（解析解）
+
+    Returns
+    -------
+    List[Dict]
+        每個倍數水準一筆：multiple、aisc[]、metal_needed[]（無解為 None）
+    """
+    a_axis = surface["axes"]["aisc"]
+    levels = np.asarray(multiples if multiples is not None else [1.0, 1.1, 1.2, 1.3, 1.5])
+    need = metal_needed(surface, a_axis[None, :], levels[:, None])
+    return [
+        {
+            "multiple": float(level),
+            "aisc": [round(float(x), 4) for x in a_axis],
+            "metal_needed": [None if not np.isfinite(x) else round(float(x), 4) for x in row],
+        }
+        for level, row in zip(levels, need)
+    ]
+
+
+def summarize_surface(surface: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    可 JSON 序列化的曲面摘要（不含整個陣列）
+    """
+    axes = surface["axes"]
+    return {
+        "grid": {
+            name: {"min": float(ax[0]), "max": float(ax[-1]), "points": int(len(ax))}
+            for name, ax in axes.items()
+        },
+        "grid_points": int(surface["achieved"].size),
+        "ratio_multiplier": surface["ratio_mult"],
+        "share_of_grid_hitting_target": float(surface["hits_target"].mean()),
+        "minimal_moves": minimal_moves(surface),
+    }
+
+
+def save_surface(surface: Dict[str, Any], path: str) -> None:
+    """將曲面陣列存為 .npz（供繪圖）"""
+    np.savez_compressed(
+        path,
+        metal=surface["axes"]["metal"],
+        aisc=surface["axes"]["aisc"],
+        multiple=surface["axes"]["multiple"],
+        achieved=surface["achieved"],
+        multiple_needed=surface["multiple_needed"],
+        ratio_mult=surface["ratio_mult"],
+    )
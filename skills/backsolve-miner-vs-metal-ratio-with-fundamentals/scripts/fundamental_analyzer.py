@@ -9,10 +9,12 @@ Usage:
     python fundamental_analyzer.py --quick
     python fundamental_analyzer.py --metal-symbol SI=F --miner-universe etf:SIL
     python fundamental_analyzer.py --backsolve-target 1.7 --event-study
+    python fundamental_analyzer.py --fundamentals-store cache/sec_fundamentals.arrow
 """
 
 import argparse
 import json
+import sys
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -21,6 +23,10 @@ from typing import Any, Optional
 import numpy as np
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).parent))
+from backsolve_surface import compute_backsolve_surface, save_surface, summarize_surface
+from sec_fundamentals import latest_snapshot, load_store
+
 try:
     import yfinance as yf
 except ImportError:
@@ -56,9 +62,11 @@ class AnalyzerConfig:
 
     cache_enabled: bool = True
     cache_dir: str = "./cache"
+    fundamentals_store: str = ""
 
     output_format: str = "json"
     output_path: str = ""
+    surface_output: str = ""
 
     def __post_init__(self):
         if not self.start_date:
@@ -222,6 +230,100 @@ def get_holdings(etf_ticker: str) -> dict:
     return {}
 
 
+def resolve_holdings(config: AnalyzerConfig) -> dict:
+    """依 miner_universe 取得 {ticker: 權重}；ticker_list 未給權重時等權"""
+    if config.miner_universe_type == "ticker_list" and config.miner_universe_tickers:
+        tickers = config.miner_universe_tickers
+        weights = config.miner_universe_weights or [1.0 / len(tickers)] * len(tickers)
+        return dict(zip(tickers, weights))
+    return get_holdings(config.miner_universe_ticker)
+
+
+# =============================================================================
+# SEC XBRL 基本面（sec_fundamentals 存放檔）
+# =============================================================================
+
+def fetch_last_prices(tickers: list, end: str) -> dict:
+    """一次下載所有持股的最新收盤價（計算市值用）；失敗時回傳空 dict"""
+    if yf is None or not tickers:
+        return {}
+    start = (pd.Timestamp(end) - pd.Timedelta(days=30)).strftime("%Y-%m-%d")
+    try:
+        data = yf.download(tickers, start=start, end=end, progress=False)
+    except Exception as e:
+        print(f"Warning: 持股價格下載失敗: {e}")
+        return {}
+    if data.empty:
+        return {}
+    close = data["Close"]
+    if isinstance(close, pd.Series):
+        close = close.to_frame(tickers[0])
+    last = close.ffill().iloc[-1].dropna()
+    return {str(ticker): float(price) for ticker, price in last.items()}
+
+
+def load_store_fundamentals(
+    tickers: list,
+    store_path: str,
+    metal: pd.Series,
+    as_of: str,
+) -> dict:
+    """
+    從 SEC XBRL 存放檔取得持股基本面（get_fundamentals 格式）
+
+    Parameters
+    ----------
+    tickers : list
+        持股代碼
+    store_path : str
+        sec_fundamentals.py build 產生的存放檔
+    metal : pd.Series
+        金屬價格（AISC 代理值 = 成本率 × 財報期間平均金屬價格）
+    as_of : str
+        只使用此日期以前的財報期間
+
+    Returns
+    -------
+    dict
+        {ticker: 基本面}；金額與股數單位為百萬。XBRL 缺少的欄位沿用模擬值，
+        仍無法得到市值或 AISC 的持股不列入
+    """
+    snapshot = latest_snapshot(load_store(store_path), tickers, as_of=as_of)
+    prices = fetch_last_prices(list(snapshot.index), as_of)
+
+    result = {}
+    for ticker, row in snapshot.iterrows():
+        fundamentals = get_fundamentals(ticker) or {"name": row["entity"]}
+        for key, column in (
+            ("total_debt", "total_debt"),
+            ("cash", "cash"),
+            ("ebitda", "ebitda_ttm"),
+            ("shares", "shares"),
+        ):
+            if pd.notna(row[column]):
+                fundamentals[key] = float(row[column]) / 1e6
+        if pd.notna(row["shares"]):
+            base = row["shares_base"] if pd.notna(row["shares_base"]) else row["shares"]
+            fundamentals["shares_base"] = float(base) / 1e6
+            if ticker in prices:
+                fundamentals["market_cap"] = fundamentals["shares"] * prices[ticker]
+
+        if pd.notna(row["cost_ratio"]) and pd.notna(row["period_end"]):
+            window = metal.loc[row["period_end"] - pd.Timedelta(days=365):row["period_end"]]
+            avg_price = float(window.mean()) if not window.empty else float(metal.iloc[-1])
+            fundamentals["aisc"] = float(row["cost_ratio"]) * avg_price
+            fundamentals["aisc_method"] = "xbrl_cost_ratio"
+            fundamentals["period_end"] = row["period_end"].strftime("%Y-%m-%d")
+
+        if "market_cap" not in fundamentals or "aisc" not in fundamentals:
+            print(f"Warning: {ticker} 缺少市值或成本資料，略過")
+            continue
+        fundamentals["data_source"] = "sec_xbrl"
+        result[ticker] = fundamentals
+
+    return result
+
+
 # =============================================================================
 # 因子計算
 # =============================================================================
@@ -283,39 +385,19 @@ def compute_factors(fundamentals: dict, metal_price: float) -> dict:
     }
 
 
+AGGREGATE_KEYS = ("aisc", "C", "one_minus_L", "L", "M", "D", "shares_yoy", "net_debt", "ev", "ebitda")
+
+
 def weighted_aggregate(factors_list: list, weights: list) -> dict:
     """權重加總因子"""
-    agg = {
-        "aisc": 0,
-        "C": 0,
-        "one_minus_L": 0,
-        "L": 0,
-        "M": 0,
-        "D": 0,
-        "shares_yoy": 0,
-        "net_debt": 0,
-        "ev": 0,
-        "ebitda": 0,
-    }
-
     total_weight = sum(weights)
     if total_weight == 0:
-        return agg
-
-    for factors, w in zip(factors_list, weights):
-        norm_w = w / total_weight
-        agg["aisc"] += factors["aisc"] * norm_w
-        agg["C"] += factors["C"] * norm_w
-        agg["one_minus_L"] += factors["one_minus_L"] * norm_w
-        agg["L"] += factors["L"] * norm_w
-        agg["M"] += factors["M"] * norm_w
-        agg["D"] += factors["D"] * norm_w
-        agg["shares_yoy"] += factors["shares_yoy"] * norm_w
-        agg["net_debt"] += factors["net_debt"] * norm_w
-        agg["ev"] += factors["ev"] * norm_w
-        agg["ebitda"] += factors["ebitda"] * norm_w
+        return {key: 0 for key in AGGREGATE_KEYS}
 
-    return agg
+    # (持股數, 因子數) 矩陣與正規化權重做一次內積
+    matrix = np.array([[factors[key] for key in AGGREGATE_KEYS] for factors in factors_list], dtype=float)
+    norm_w = np.asarray(weights, dtype=float) / total_weight
+    return {key: float(value) for key, value in zip(AGGREGATE_KEYS, norm_w @ matrix)}
 
 
 # =============================================================================
@@ -377,21 +459,26 @@ def backsolve(
         "dilution_feasible": 0.5 < D_need < 1.5,
     }
 
-    # 雙因子組合網格
-    two_factor_grid = []
-    for m_mult in [1.10, 1.15, 1.20, 1.25, 1.30]:
-        for s_mult in [0.85, 0.90, 0.95, 1.00]:
-            new_S = S * s_mult
-            new_C = 1 - AISC_now / new_S if new_S > 0 else 0
-            achieved = m_mult * (new_C / C_now) if C_now > 0 else 0
-
-            two_factor_grid.append({
-                "scenario": "multiple_up_metal_down",
-                "multiple_change": m_mult - 1,
-                "metal_change": s_mult - 1,
-                "achieved_multiplier": achieved,
-                "hits_target": achieved >= ratio_mult,
-            })
+    # 雙因子組合網格（倍數 × 金屬價格，一次廣播計算）
+    m_mults = np.array([1.10, 1.15, 1.20, 1.25, 1.30])[:, None]
+    s_mults = np.array([0.85, 0.90, 0.95, 1.00])[None, :]
+    new_S = S * s_mults
+    with np.errstate(divide="ignore", invalid="ignore"):
+        new_C = np.where(new_S > 0, 1 - AISC_now / new_S, 0.0)
+        achieved = m_mults * (new_C / C_now) if C_now > 0 else np.zeros_like(new_C * m_mults)
+    achieved = np.broadcast_to(achieved, (m_mults.size, s_mults.size))
+
+    two_factor_grid = [
+        {
+            "scenario": "multiple_up_metal_down",
+            "multiple_change": float(m_mults[i, 0]) - 1,
+            "metal_change": float(s_mults[0, j]) - 1,
+            "achieved_multiplier": float(achieved[i, j]),
+            "hits_target": bool(achieved[i, j] >= ratio_mult),
+        }
+        for i in range(m_mults.size)
+        for j in range(s_mults.size)
+    ]
 
     return {
         "target_ratio": R_target,
@@ -516,17 +603,25 @@ def run_analysis(config: AnalyzerConfig) -> dict:
 
     # 3. 取得持股與計算因子
     print("計算基本面因子...")
-    holdings = get_holdings(config.miner_universe_ticker)
+    holdings = resolve_holdings(config)
+    store_fundamentals = {}
+    if config.fundamentals_store:
+        store_fundamentals = load_store_fundamentals(
+            list(holdings), config.fundamentals_store, metal, config.end_date
+        )
+        print(f"SEC XBRL 基本面: {len(store_fundamentals)}/{len(holdings)} 檔持股")
 
     factors_list = []
+    fundamentals_list = []
     weights = []
     holdings_detail = []
 
     for ticker, weight in holdings.items():
-        fundamentals = get_fundamentals(ticker)
+        fundamentals = store_fundamentals.get(ticker) or get_fundamentals(ticker)
         if fundamentals:
             factors = compute_factors(fundamentals, S_now)
             factors_list.append(factors)
+            fundamentals_list.append(fundamentals)
             weights.append(weight)
 
             holdings_detail.append({
@@ -534,7 +629,8 @@ def run_analysis(config: AnalyzerConfig) -> dict:
                 "name": fundamentals.get("name", ticker),
                 "weight": weight,
                 "aisc": factors["aisc"],
-                "aisc_method": "simulated",
+                "aisc_method": fundamentals.get("aisc_method", "simulated"),
+                "data_source": fundamentals.get("data_source", "simulated"),
                 "net_debt_to_ev": factors["L"],
                 "ev_to_ebitda": factors["M"],
                 "shares_yoy": factors["shares_yoy"],
@@ -552,6 +648,23 @@ def run_analysis(config: AnalyzerConfig) -> dict:
     backsolve_top = backsolve(R_now, R_top, agg_factors, S_now)
     backsolve_median = backsolve(R_now, R_median, agg_factors, S_now)
 
+    # 密集網格反推曲面（金屬價格 × AISC × 倍數，逐持股計算）
+    surface = compute_backsolve_surface(
+        fundamentals_list, weights, S_now, backsolve_top["ratio_multiplier"]
+    )
+    backsolve_surface = summarize_surface(surface)
+    if config.surface_output:
+        Path(config.surface_output).parent.mkdir(parents=True, exist_ok=True)
+        save_surface(surface, config.surface_output)
+        print(f"反推曲面已輸出至: {config.surface_output}")
+
+    if not store_fundamentals:
+        filings_source = "simulated"
+    elif len(store_fundamentals) < len(holdings):
+        filings_source = "sec_xbrl+simulated"
+    else:
+        filings_source = "sec_xbrl"
+
     # 5. 事件研究
     print("執行事件研究...")
     events = event_study(ratio, R_bottom)
@@ -568,6 +681,7 @@ def run_analysis(config: AnalyzerConfig) -> dict:
             "miner_universe": {
                 "type": config.miner_universe_type,
                 "etf_ticker": config.miner_universe_ticker,
+                "tickers": config.miner_universe_tickers,
             },
             "region_profile": config.region_profile,
             "time_range": {
@@ -608,6 +722,7 @@ def run_analysis(config: AnalyzerConfig) -> dict:
 
         "backsolve_to_top": backsolve_top,
         "backsolve_to_median": backsolve_median,
+        "backsolve_surface_to_top": backsolve_surface,
 
         "event_study": {
             "bottom_threshold": R_bottom,
@@ -625,15 +740,19 @@ def run_analysis(config: AnalyzerConfig) -> dict:
         ),
 
         "notes": [
-            "AISC 使用模擬數據，實際應從 SEC EDGAR 抓取",
+            (
+                "AISC 以 XBRL 銷貨成本率 × 財報期間平均金屬價格代理；未涵蓋的持股使用模擬數據"
+                if store_fundamentals
+                else "AISC 使用模擬數據；以 --fundamentals-store 改用 SEC XBRL 財報"
+            ),
             "財報數據時滯 1-2 季，反映過去而非當前狀態",
             "建議交叉驗證：COT 持倉、ETF 流量、美元/實質利率",
         ],
 
         "data_sources": {
             "prices": "yfinance",
-            "filings": "simulated",
-            "holdings": "simulated",
+            "filings": filings_source,
+            "holdings": "ticker_list" if config.miner_universe_type == "ticker_list" else "simulated",
         },
     }
 
@@ -698,6 +817,20 @@ def parse_args():
         help="輸出檔案路徑"
     )
 
+    parser.add_argument(
+        "--surface-output",
+        type=str,
+        default="",
+        help="反推曲面陣列輸出路徑 (.npz，供繪圖)"
+    )
+
+    parser.add_argument(
+        "--fundamentals-store",
+        type=str,
+        default="",
+        help="SEC XBRL 基本面存放檔（sec_fundamentals.py build 產生），取代模擬財報"
+    )
+
     parser.add_argument(
         "--event-study",
         action="store_true",
@@ -713,20 +846,24 @@ def main():
     # 解析 miner_universe
     miner_type = "etf_holdings"
     miner_ticker = "SIL"
+    miner_tickers = []
 
     if args.miner_universe.startswith("etf:"):
         miner_ticker = args.miner_universe.split(":")[1]
     elif args.miner_universe.startswith("tickers:"):
         miner_type = "ticker_list"
-        # 這裡可以解析 tickers 列表
+        miner_tickers = [t.strip().upper() for t in args.miner_universe.split(":")[1].split(",") if t.strip()]
 
     config = AnalyzerConfig(
         metal_symbol=args.metal_symbol,
         miner_universe_type=miner_type,
         miner_universe_ticker=miner_ticker,
+        miner_universe_tickers=miner_tickers,
         start_date=args.start_date,
         end_date=args.end_date,
         frequency=args.freq,
+        surface_output=args.surface_output,
+        fundamentals_store=args.fundamentals_store,
     )
 
     # 執行分析
@@ -12,6 +12,7 @@ Usage:
     python scenario_path_simulator.py --quick
     python scenario_path_simulator.py --silver-monthly 5 --ratio-start 1.10 --ratio-end 1.20 --months 6
     python scenario_path_simulator.py --miner-target 15 --ratio-range 1.00,1.20
+    python scenario_path_simulator.py --quick --no-chart   # 只輸出路徑表，不載入 matplotlib
 """
 
 import argparse
@@ -20,17 +21,9 @@ from datetime import datetime
 from pathlib import Path
 from typing import Tuple
 
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
 import numpy as np
 import pandas as pd
 
-# 設定中文字體
-plt.rcParams['font.sans-serif'] = ['Microsoft JhengHei', 'SimHei', 'Arial Unicode MS', 'DejaVu Sans']
-plt.rcParams['axes.unicode_minus'] = False
-
 # 配色
 COLORS = {
     'silver': '#C0C0C0',
@@ -44,6 +37,17 @@ COLORS = {
 }
 
 
+def _pyplot():
+    """延遲載入 matplotlib（只在繪圖時），並設定中文字體"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    plt.rcParams['font.sans-serif'] = ['Microsoft JhengHei', 'SimHei', 'Arial Unicode MS', 'DejaVu Sans']
+    plt.rcParams['axes.unicode_minus'] = False
+    return plt
+
+
 def compute_miner_return(
     silver_return: float,
     ratio_start: float,
@@ -188,6 +192,7 @@ def plot_scenario_path(
     """
     繪製共同上漲路徑圖（雙軸：價格 + 比率）
     """
+    plt = _pyplot()
     fig, ax1 = plt.subplots(figsize=(12, 7), facecolor=COLORS['background'])
 
     months = df['month'].tolist()
@@ -282,6 +287,7 @@ def plot_return_heatmap(
     """
     繪製收益率網格熱力圖
     """
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(10, 7), facecolor=COLORS['background'])
 
     # 準備數據
@@ -386,6 +392,8 @@ def main():
                         help="輸出目錄")
     parser.add_argument("--heatmap", action="store_true",
                         help="同時生成收益率熱力圖")
+    parser.add_argument("--no-chart", action="store_true",
+                        help="只輸出路徑表與 JSON，不繪圖（不載入 matplotlib）")
 
     args = parser.parse_args()
 
@@ -418,11 +426,12 @@ def main():
     print(df.to_string(index=False))
 
     # 生成路徑圖
-    path_output = output_dir / f"scenario_path_{today}.png"
-    plot_scenario_path(df, str(path_output))
+    if not args.no_chart:
+        path_output = output_dir / f"scenario_path_{today}.png"
+        plot_scenario_path(df, str(path_output))
 
     # 生成熱力圖
-    if args.heatmap or args.quick:
+    if not args.no_chart and (args.heatmap or args.quick):
         grid_df = generate_return_grid(args.r0)
         heatmap_output = output_dir / f"return_heatmap_{today}.png"
         plot_return_heatmap(grid_df, args.r0, str(heatmap_output))
@@ -0,0 +1,648 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+SEC companyfacts 批次基本面載入器
+
+SEC 每晚發布 companyfacts.zip（所有申報公司的 XBRL companyfacts，每家一個
+CIK##########.json）。本模組從本機檔案一次建立整個礦業宇宙的基本面存放檔，
+不需逐家呼叫 API：
+
+1. 依 company_tickers.json 把 ticker 對應到 CIK，只開啟需要的 zip 成員
+2. 串流解析（ijson）只保留 INSTANT_FIELDS / DURATION_FIELDS 列出的標籤，其餘 facts 不建立物件
+3. 同一期間重複申報時保留最新 filed；缺 Q4 時以 FY 減前三季補齊
+4. 輸出 ticker × period_end 的寬表（Arrow IPC，可 memory-map）
+
+欄位（金額 USD、股數為股）：
+    total_debt, cash, shares                      # 時點值
+    revenue, cost_of_revenue, operating_income, dna   # 單季值
+    revenue_ttm, cost_of_revenue_ttm, ...             # 近四季合計（僅年報者為 FY 值）
+
+Usage:
+    python sec_fundamentals.py build --archive companyfacts.zip \\
+        --tickers-file company_tickers.json --tickers PAAS,AG,HL,CDE
+    python sec_fundamentals.py show --ticker HL
+
+    from sec_fundamentals import load_store, latest_snapshot
+    snapshot = latest_snapshot(load_store())
+    snapshot.loc["HL", ["total_debt", "cash", "ebitda_ttm"]]
+
+依賴: pip install pandas pyarrow ijson（ijson 缺少時改為整份 json.load，結果相同）
+"""
+
+import argparse
+import json
+import sys
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+# =============================================================================
+# 標籤對照
+# =============================================================================
+
+# 欄位 -> 依優先順序排列的 (taxonomy, tag)；同一期間有多個標籤時取排序最前者
+INSTANT_FIELDS = {
+    "total_debt": [
+        ("us-gaap", "LongTermDebt"),
+        ("us-gaap", "LongTermDebtNoncurrent"),
+        ("us-gaap", "DebtInstrumentCarryingAmount"),
+        ("ifrs-full", "Borrowings"),
+        ("ifrs-full", "NoncurrentPortionOfNoncurrentBorrowings"),
+    ],
+    "cash": [
+        ("us-gaap", "CashAndCashEquivalentsAtCarryingValue"),
+        ("us-gaap", "CashCashEquivalentsRestrictedCashAndRestrictedCashEquivalents"),
+        ("ifrs-full", "CashAndCashEquivalents"),
+    ],
+    "shares": [
+        ("us-gaap", "CommonStockSharesOutstanding"),
+        ("ifrs-full", "NumberOfSharesOutstanding"),
+        ("dei", "EntityCommonStockSharesOutstanding"),
+    ],
+}
+
+DURATION_FIELDS = {
+    "revenue": [
+        ("us-gaap", "Revenues"),
+        ("us-gaap", "RevenueFromContractWithCustomerExcludingAssessedTax"),
+        ("ifrs-full", "Revenue"),
+    ],
+    "cost_of_revenue": [
+        ("us-gaap", "CostOfRevenue"),
+        ("us-gaap", "CostOfGoodsAndServicesSold"),
+        ("ifrs-full", "CostOfSales"),
+    ],
+    "operating_income": [
+        ("us-gaap", "OperatingIncomeLoss"),
+        ("ifrs-full", "ProfitLossFromOperatingActivities"),
+    ],
+    "dna": [
+        ("us-gaap", "DepreciationDepletionAndAmortization"),
+        ("us-gaap", "DepreciationAndAmortization"),
+        ("ifrs-full", "DepreciationAndAmortisationExpense"),
+    ],
+}
+
+# 只接受美元與股數；其他幣別的申報者該欄位留空
+UNITS = ("USD", "shares")
+
+TTM_FIELDS = [f"{name}_ttm" for name in DURATION_FIELDS]
+VALUE_COLUMNS = list(INSTANT_FIELDS) + list(DURATION_FIELDS) + TTM_FIELDS
+STORE_COLUMNS = ["ticker", "cik", "entity", "period_end"] + VALUE_COLUMNS
+
+# 期間長度（天）判定單季 / 全年
+QUARTER_DAYS = (80, 100)
+ANNUAL_DAYS = (350, 380)
+
+DEFAULT_STORE = Path(__file__).parent.parent / "cache" / "sec_fundamentals.arrow"
+
+
+def _tag_index() -> Dict[Tuple[str, str], Tuple[str, int]]:
+    """(taxonomy, tag) -> (欄位, 優先序)"""
+    index = {}
+    for fields in (INSTANT_FIELDS, DURATION_FIELDS):
+        for name, tags in fields.items():
+            for priority, key in enumerate(tags):
+                index[key] = (name, priority)
+    return index
+
+
+WANTED_TAGS = _tag_index()
+
+
+# =============================================================================
+# Ticker / CIK 對照
+# =============================================================================
+
+def read_ticker_map(path: str) -> Dict[str, int]:
+    """
+    讀取 SEC ticker 對照檔
+
+    Parameters
+    ----------
+    path : str
+        company_tickers.json（{"0": {"cik_str", "ticker", "title"}, ...}）
+        或 company_tickers_exchange.json（{"fields": [...], "data": [[...], ...]}）
+
+    Returns
+    -------
+    Dict[str, int]
+        {TICKER: cik}
+    """
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+
+    if "fields" in raw and "data" in raw:
+        fields = raw["fields"]
+        cik_col, ticker_col = fields.index("cik"), fields.index("ticker")
+        rows = ((row[ticker_col], row[cik_col]) for row in raw["data"])
+    else:
+        rows = ((item["ticker"], item["cik_str"]) for item in raw.values())
+
+    mapping = {}
+    for ticker, cik in rows:
+        if ticker:
+            # 同一 ticker 出現多次時保留第一筆（SEC 檔案依市值排序）
+            mapping.setdefault(str(ticker).upper(), int(cik))
+    return mapping
+
+
+def member_name(cik: int) -> str:
+    """companyfacts.zip 內的檔名"""
+    return f"CIK{int(cik):010d}.json"
+
+
+# =============================================================================
+# 串流解析
+# =============================================================================
+
+def iter_facts_from_events(
+    events: Iterable[Tuple[str, str, Any]],
+    meta: Dict[str, Any],
+) -> Iterator[Tuple[str, str, str, Dict[str, Any]]]:
+    """
+    從 ijson.parse 事件流挑出需要的 facts
+
+    只在 `facts.<taxonomy>.<tag>.units.<unit>.item` 屬於 WANTED_TAGS 時
+    建立 dict；其餘事件直接略過。
+
+    Parameters
+    ----------
+    events : Iterable
+        (prefix, event, value) 事件
+    meta : dict
+        寫入 cik、entityName
+
+    Yields
+    ------
+    (taxonomy, tag, unit, record)
+    """
+    record = None
+    key = None
+    for prefix, event, value in events:
+        if record is not None:
+            # 單筆 fact 是扁平物件：end_map 即結束
+            if event == "end_map":
+                yield key + (record,)
+                record = None
+            elif event != "map_key":
+                record[prefix.rpartition(".")[2]] = value
+            continue
+
+        if event == "start_map" and prefix.startswith("facts.") and prefix.endswith(".item"):
+            parts = prefix.split(".")
+            if (
+                len(parts) == 6
+                and parts[3] == "units"
+                and parts[4] in UNITS
+                and (parts[1], parts[2]) in WANTED_TAGS
+            ):
+                key = (parts[1], parts[2], parts[4])
+                record = {}
+        elif prefix in ("cik", "entityName") and event in ("number", "string"):
+            meta[prefix] = value
+
+
+def iter_facts_from_dict(
+    doc: Dict[str, Any],
+    meta: Dict[str, Any],
+) -> Iterator[Tuple[str, str, str, Dict[str, Any]]]:
+    """iter_facts_from_events 的整份讀取版本（無 ijson 時使用）"""
+    meta["cik"] = doc.get("cik")
+    meta["entityName"] = doc.get("entityName")
+    for taxonomy, concepts in doc.get("facts", {}).items():
+        for tag, body in concepts.items():
+            if (taxonomy, tag) not in WANTED_TAGS:
+                continue
+            for unit, items in body.get("units", {}).items():
+                if unit in UNITS:
+                    for item in items:
+                        yield taxonomy, tag, unit, item
+
+
+def parse_companyfacts(fp) -> Tuple[Dict[str, Any], pd.DataFrame]:
+    """
+    解析單一公司的 companyfacts JSON
+
+    Parameters
+    ----------
+    fp : binary file object
+
+    Returns
+    -------
+    (meta, records)
+        meta: {"cik", "entityName"}
+        records: 長表，欄位 field, priority, start, end, val, filed, form
+    """
+    meta = {}
+    if HAS_IJSON:
+        facts = iter_facts_from_events(ijson.parse(fp), meta)
+    else:
+        facts = iter_facts_from_dict(json.load(fp), meta)
+
+    rows = []
+    for taxonomy, tag, _unit, item in facts:
+        if item.get("val") is None or not item.get("end"):
+            continue
+        field, priority = WANTED_TAGS[(taxonomy, tag)]
+        rows.append((
+            field,
+            priority,
+            item.get("start"),
+            item["end"],
+            float(item["val"]),
+            item.get("filed"),
+            item.get("form"),
+        ))
+
+    records = pd.DataFrame(rows, columns=["field", "priority", "start", "end", "val", "filed", "form"])
+    for col in ("start", "end", "filed"):
+        records[col] = pd.to_datetime(records[col], errors="coerce")
+    return meta, records
+
+
+# =============================================================================
+# 期間整理
+# =============================================================================
+
+def _dedupe(records: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    """同一期間保留優先序最高、最新申報的一筆"""
+    ordered = records.sort_values(["priority", "filed"], ascending=[True, False], kind="stable")
+    return ordered.drop_duplicates(keys, keep="first")
+
+
+def _between(days: pd.Series, bounds: Tuple[int, int]) -> pd.Series:
+    return (days >= bounds[0]) & (days <= bounds[1])
+
+
+def quarterly_and_ttm(records: pd.DataFrame) -> Tuple[pd.Series, pd.Series]:
+    """
+    期間型欄位整理成單季與 TTM 序列
+
+    Parameters
+    ----------
+    records : pd.DataFrame
+        單一欄位的 facts（已去重），含 start, end, val
+
+    Returns
+    -------
+    (quarterly, ttm)
+        皆以期末日為索引；年報中未單獨揭露的 Q4 = FY - (Q1 + Q2 + Q3)；
+        TTM 為連續四季合計，只有年報的期間以 FY 值代替
+    """
+    days = (records["end"] - records["start"]).dt.days
+    quarters = records[_between(days, QUARTER_DAYS)]
+    annual = records[_between(days, ANNUAL_DAYS)]
+
+    q_start = dict(zip(quarters["end"], quarters["start"]))
+    q_val = dict(zip(quarters["end"], quarters["val"]))
+
+    slack = pd.Timedelta(days=7)
+    for start, end, value in zip(annual["start"], annual["end"], annual["val"]):
+        if end in q_val:
+            continue
+        inside = [e for e, s in q_start.items() if s >= start - slack and e < end]
+        if len(inside) == 3:
+            q_start[end] = max(inside) + pd.Timedelta(days=1)
+            q_val[end] = value - sum(q_val[e] for e in inside)
+
+    ends = pd.DatetimeIndex(sorted(q_val))
+    quarterly = pd.Series([q_val[e] for e in ends], index=ends, dtype=float)
+    starts = pd.Series(pd.DatetimeIndex([q_start[e] for e in ends]), index=ends)
+
+    # 四季須首尾相連（跨度約一年）才計 TTM
+    ttm = quarterly.rolling(4).sum()
+    span = (ends.to_series() - starts.shift(3)).dt.days
+    ttm = ttm.where(_between(span, ANNUAL_DAYS))
+
+    fy = pd.Series(annual["val"].to_numpy(), index=annual["end"], dtype=float)
+    fy = fy[~fy.index.duplicated(keep="first")]
+    ttm = ttm.dropna().combine_first(fy).sort_index()
+    return quarterly, ttm
+
+
+def company_frame(records: pd.DataFrame) -> pd.DataFrame:
+    """
+    單一公司的 facts 長表轉為期末日 × 欄位寬表
+
+    Parameters
+    ----------
+    records : pd.DataFrame
+        parse_companyfacts 的 records
+
+    Returns
+    -------
+    pd.DataFrame
+        index 為 period_end，欄位為 VALUE_COLUMNS
+    """
+    columns = {}
+    for field in INSTANT_FIELDS:
+        sub = _dedupe(records[records["field"] == field], ["end"])
+        columns[field] = pd.Series(sub["val"].to_numpy(), index=sub["end"], dtype=float)
+
+    for field in DURATION_FIELDS:
+        sub = records[(records["field"] == field) & records["start"].notna()]
+        quarterly, ttm = quarterly_and_ttm(_dedupe(sub, ["start", "end"]))
+        columns[field] = quarterly
+        columns[f"{field}_ttm"] = ttm
+
+    frame = pd.DataFrame({k: v for k, v in columns.items() if not v.empty})
+    frame = frame.reindex(columns=VALUE_COLUMNS).sort_index()
+    frame.index.name = "period_end"
+    return frame.dropna(how="all")
+
+
+# =============================================================================
+# 建立存放檔
+# =============================================================================
+
+def _open_member(archive: Path, cik: int, zf: Optional[zipfile.ZipFile]):
+    """回傳 zip 成員或目錄內檔案；不存在時回傳 None"""
+    name = member_name(cik)
+    if zf is not None:
+        try:
+            return zf.open(name)
+        except KeyError:
+            return None
+    path = archive / name
+    return open(path, "rb") if path.exists() else None
+
+
+def _parse_members(archive: str, ciks: Sequence[int]) -> List[Tuple[int, Dict[str, Any], pd.DataFrame]]:
+    """讀取一批 CIK（ProcessPoolExecutor 的工作單位，每個程序各自開檔）"""
+    path = Path(archive)
+    zf = zipfile.ZipFile(path) if path.is_file() else None
+    results = []
+    try:
+        for cik in ciks:
+            fp = _open_member(path, cik, zf)
+            if fp is None:
+                continue
+            with fp:
+                meta, records = parse_companyfacts(fp)
+            results.append((cik, meta, company_frame(records)))
+    finally:
+        if zf is not None:
+            zf.close()
+    return results
+
+
+def build_store(
+    archive: str,
+    ticker_map: Dict[str, int],
+    tickers: Optional[Sequence[str]] = None,
+    workers: int = 1,
+) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    從 companyfacts 批次檔建立基本面存放檔
+
+    Parameters
+    ----------
+    archive : str
+        companyfacts.zip 路徑，或已解壓的目錄
+    ticker_map : Dict[str, int]
+        read_ticker_map 的輸出
+    tickers : Sequence[str], optional
+        只建立這些 ticker（None 表示 ticker_map 全部）
+    workers : int
+        解析程序數（>1 時以 ProcessPoolExecutor 分批平行）
+
+    Returns
+    -------
+    (store, missing)
+        store: STORE_COLUMNS 長表（每列一個 ticker × period_end）
+        missing: 找不到 CIK 或 zip 成員的 ticker
+    """
+    wanted = [t.upper() for t in tickers] if tickers else sorted(ticker_map)
+    missing = [t for t in wanted if t not in ticker_map]
+
+    by_cik: Dict[int, List[str]] = {}
+    for ticker in wanted:
+        if ticker in ticker_map:
+            by_cik.setdefault(ticker_map[ticker], []).append(ticker)
+    ciks = sorted(by_cik)
+
+    if workers > 1 and len(ciks) > 1:
+        chunks = [ciks[i::workers] for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parsed = [item for batch in pool.map(_parse_members, [archive] * workers, chunks) for item in batch]
+    else:
+        parsed = _parse_members(archive, ciks)
+
+    found = set()
+    frames = []
+    for cik, meta, frame in parsed:
+        found.add(cik)
+        if frame.empty:
+            continue
+        for ticker in by_cik[cik]:
+            block = frame.reset_index()
+            block.insert(0, "entity", meta.get("entityName"))
+            block.insert(0, "cik", cik)
+            block.insert(0, "ticker", ticker)
+            frames.append(block)
+
+    missing += [t for cik in ciks if cik not in found for t in by_cik[cik]]
+
+    if frames:
+        store = pd.concat(frames, ignore_index=True)
+    else:
+        store = pd.DataFrame(columns=STORE_COLUMNS)
+    store = store.reindex(columns=STORE_COLUMNS).sort_values(["ticker", "period_end"], kind="stable")
+    store["cik"] = store["cik"].astype("int64")
+    store[VALUE_COLUMNS] = store[VALUE_COLUMNS].astype(float)
+    return store.reset_index(drop=True), sorted(missing)
+
+
+def save_store(store: pd.DataFrame, path: Optional[str] = None, meta: Optional[Dict[str, Any]] = None) -> Path:
+    """寫出存放檔（Arrow IPC；無 pyarrow 時為 pickle）與同名 .json 中繼資料"""
+    path = Path(path) if path else DEFAULT_STORE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    if HAS_PYARROW:
+        table = pa.Table.from_pandas(store, preserve_index=False)
+        feather.write_feather(table, str(tmp), compression="uncompressed")
+    else:
+        store.to_pickle(tmp)
+    tmp.replace(path)
+
+    info = {
+        "built_at": datetime.now().isoformat(),
+        "tickers": int(store["ticker"].nunique()),
+        "rows": int(len(store)),
+        **(meta or {}),
+    }
+    path.with_suffix(".json").write_text(json.dumps(info, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+def load_store(path: Optional[str] = None) -> pd.DataFrame:
+    """讀取存放檔"""
+    path = Path(path) if path else DEFAULT_STORE
+    if HAS_PYARROW:
+        try:
+            return feather.read_table(str(path), memory_map=True).to_pandas()
+        except pa.ArrowInvalid:
+            pass
+    return pd.read_pickle(path)
+
+
+# =============================================================================
+# 查詢
+# =============================================================================
+
+def latest_snapshot(
+    store: pd.DataFrame,
+    tickers: Optional[Sequence[str]] = None,
+    as_of: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    每個 ticker 各欄位最近一筆非空值
+
+    Parameters
+    ----------
+    store : pd.DataFrame
+        load_store 的輸出
+    tickers : Sequence[str], optional
+        只取這些 ticker
+    as_of : str, optional
+        只使用此日期（含）以前的期間，避免前視
+
+    Returns
+    -------
+    pd.DataFrame
+        index 為 ticker；除 VALUE_COLUMNS 外另含
+        entity, cik, period_end（最近一期 TTM 營收的期末日）,
+        shares_base（約一年前股數）, ebitda_ttm, cost_ratio（TTM 銷貨成本 / 營收）
+    """
+    df = store
+    if tickers is not None:
+        df = df[df["ticker"].isin([t.upper() for t in tickers])]
+    if as_of is not None:
+        df = df[df["period_end"] <= pd.Timestamp(as_of)]
+    if df.empty:
+        return pd.DataFrame(columns=["entity", "cik", "period_end", "shares_base", "ebitda_ttm", "cost_ratio"])
+
+    # groupby.last 逐欄取最後一筆非空值
+    snapshot = df.groupby("ticker", sort=True)[["entity", "cik"] + VALUE_COLUMNS].last()
+    snapshot["period_end"] = df[df["revenue_ttm"].notna()].groupby("ticker")["period_end"].max()
+
+    shares = df.loc[df["shares"].notna(), ["ticker", "period_end", "shares"]]
+    last_shares = shares.groupby("ticker")["period_end"].max()
+    target = (last_shares - pd.Timedelta(days=365)).rename("target").reset_index().sort_values("target")
+    base = pd.merge_asof(
+        target,
+        shares.sort_values("period_end"),
+        left_on="target",
+        right_on="period_end",
+        by="ticker",
+        direction="backward",
+    ).set_index("ticker")["shares"]
+    snapshot["shares_base"] = base.reindex(snapshot.index)
+
+    snapshot["ebitda_ttm"] = snapshot["operating_income_ttm"] + snapshot["dna_ttm"].fillna(0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        snapshot["cost_ratio"] = snapshot["cost_of_revenue_ttm"] / snapshot["revenue_ttm"].where(
+            snapshot["revenue_ttm"] > 0
+        )
+    return snapshot
+
+
+def cost_ratio_history(store: pd.DataFrame, ticker: str) -> pd.DataFrame:
+    """
+    單一 ticker 的成本率歷史（銷貨成本 / 營收）
+
+    有單季資料時用單季比率，否則用 TTM（僅年報者）。
+
+    Returns
+    -------
+    pd.DataFrame
+        index 為 period_end，欄位 cost_ratio, revenue（同口徑的期間營收）,
+        period_days（91 = 單季、365 = TTM）
+    """
+    rows = store[store["ticker"] == ticker.upper()].set_index("period_end").sort_index()
+    quarterly = rows["cost_of_revenue"] / rows["revenue"].where(rows["revenue"] > 0)
+    ttm = rows["cost_of_revenue_ttm"] / rows["revenue_ttm"].where(rows["revenue_ttm"] > 0)
+    use_q = quarterly.notna()
+    out = pd.DataFrame({
+        "cost_ratio": quarterly.where(use_q, ttm),
+        "revenue": rows["revenue"].where(use_q, rows["revenue_ttm"]),
+        "period_days": np.where(use_q, 91, 365),
+    })
+    return out.dropna()
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def _build(args) -> int:
+    ticker_map = read_ticker_map(args.tickers_file)
+    tickers = [t.strip() for t in args.tickers.split(",") if t.strip()] if args.tickers else None
+    started = datetime.now()
+    store, missing = build_store(args.archive, ticker_map, tickers, workers=args.workers)
+    path = save_store(store, args.store, {
+        "archive": str(args.archive),
+        "missing": missing,
+        "parser": "ijson" if HAS_IJSON else "json",
+    })
+    elapsed = (datetime.now() - started).total_seconds()
+    print(f"已建立 {path}: {store['ticker'].nunique()} 家公司、{len(store)} 列（{elapsed:.1f} 秒）")
+    if missing:
+        print(f"缺少: {', '.join(missing)}")
+    return 0
+
+
+def _show(args) -> int:
+    store = load_store(args.store)
+    tickers = [args.ticker] if args.ticker else None
+    snapshot = latest_snapshot(store, tickers, as_of=args.as_of)
+    if snapshot.empty:
+        print("存放檔中沒有符合的 ticker")
+        return 1
+    records = json.loads(snapshot.reset_index().to_json(orient="records", date_format="iso"))
+    print(json.dumps(records, indent=2, ensure_ascii=False))
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="SEC companyfacts 批次基本面載入器")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="從 companyfacts.zip 建立存放檔")
+    build.add_argument("--archive", required=True, help="companyfacts.zip 或已解壓目錄")
+    build.add_argument("--tickers-file", required=True, help="SEC company_tickers.json")
+    build.add_argument("--tickers", default="", help="逗號分隔 ticker（預設: 對照檔全部）")
+    build.add_argument("--workers", type=int, default=1, help="解析程序數")
+    build.add_argument("--store", default=None, help=f"輸出路徑（預設: {DEFAULT_STORE}）")
+
+    show = sub.add_parser("show", help="顯示最新基本面快照")
+    show.add_argument("--store", default=None, help="存放檔路徑")
+    show.add_argument("--ticker", default="", help="只顯示此 ticker")
+    show.add_argument("--as-of", default=None, help="只使用此日期以前的期間")
+
+    args = parser.parse_args()
+    return _build(args) if args.command == "build" else _show(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+SEC Fundamentals Tests
+
+以合成的 companyfacts.zip 驗證 sec_fundamentals：
+1. 串流事件解析與整份讀取結果一致，且只保留需要的標籤
+2. 重複申報取最新、Q4 由 FY 補齊、TTM 為連續四季合計
+3. 僅年報（IFRS）申報者以 FY 值作為 TTM
+4. 批次建立存放檔、快照（shares_base、ebitda、cost_ratio、as_of）
+
+Usage:
+    cd skills/backsolve-miner-vs-metal-ratio-with-fundamentals/scripts/tests
+    python -m pytest -q test_sec_fundamentals.py
+"""
+
+import io
+import json
+import sys
+import zipfile
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# Add scripts directory to path (tests is inside scripts/)
+scripts_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(scripts_dir))
+
+import sec_fundamentals as sf  # noqa: E402
+
+QUARTERS_2023 = [("2023-01-01", "2023-03-31"), ("2023-04-01", "2023-06-30"), ("2023-07-01", "2023-09-30")]
+
+
+def _fact(val, end, start=None, filed="2024-02-20", form="10-Q"):
+    item = {"end": end, "val": val, "filed": filed, "form": form, "accn": "0000000000-24-000001"}
+    if start:
+        item["start"] = start
+    return item
+
+
+def _us_filer():
+    """季報 + 年報申報者：2023 Q1-Q3 單季、FY2023（含 Q4）、2024 Q1"""
+    revenue = [_fact(100.0 * (i + 1), e, s) for i, (s, e) in enumerate(QUARTERS_2023)]
+    revenue += [
+        _fact(1000.0, "2023-12-31", "2023-01-01", form="10-K"),
+        _fact(500.0, "2024-03-31", "2024-01-01", filed="2024-05-01"),
+        # 六個月累計：不是單季也不是全年，應忽略
+        _fact(300.0, "2023-06-30", "2023-01-01"),
+    ]
+    cost = [_fact(60.0 * (i + 1), e, s) for i, (s, e) in enumerate(QUARTERS_2023)]
+    cost += [
+        _fact(600.0, "2023-12-31", "2023-01-01", form="10-K"),
+        _fact(250.0, "2024-03-31", "2024-01-01"),
+    ]
+    return {
+        "cik": 719413,
+        "entityName": "Test Mining Co",
+        "facts": {
+            "dei": {
+                "EntityCommonStockSharesOutstanding": {"units": {"shares": [_fact(620e6, "2024-04-25")]}},
+            },
+            "us-gaap": {
+                "Revenues": {"label": "Revenues", "units": {"USD": revenue}},
+                "CostOfRevenue": {"units": {"USD": cost}},
+                "OperatingIncomeLoss": {"units": {"USD": [
+                    _fact(300.0, "2023-12-31", "2023-01-01", form="10-K"),
+                ]}},
+                "DepreciationDepletionAndAmortization": {"units": {"USD": [
+                    _fact(150.0, "2023-12-31", "2023-01-01", form="10-K"),
+                ]}},
+                "LongTermDebt": {"units": {"USD": [
+                    _fact(400.0, "2023-12-31", filed="2024-02-20"),
+                    # 重新申報（修正）：取最新 filed
+                    _fact(450.0, "2023-12-31", filed="2024-05-01"),
+                ]}},
+                "LongTermDebtNoncurrent": {"units": {"USD": [_fact(999.0, "2023-12-31")]}},
+                "CashAndCashEquivalentsAtCarryingValue": {"units": {"USD": [
+                    _fact(120.0, "2023-12-31"),
+                    _fact(180.0, "2024-03-31"),
+                ]}},
+                "CommonStockSharesOutstanding": {"units": {"shares": [
+                    _fact(580e6, "2023-03-31"),
+                    _fact(610e6, "2024-03-31"),
+                ]}},
+                "AccountsPayableCurrent": {"units": {"USD": [_fact(1.0, "2023-12-31")]}},
+            },
+        },
+    }
+
+
+def _ifrs_filer():
+    """僅年報（40-F）申報者，另有非美元單位"""
+    return {
+        "cik": 1209028,
+        "entityName": "Test Silver Corp",
+        "facts": {
+            "ifrs-full": {
+                "Revenue": {"units": {
+                    "USD": [
+                        _fact(2000.0, "2022-12-31", "2022-01-01", form="40-F"),
+                        _fact(2400.0, "2023-12-31", "2023-01-01", form="40-F"),
+                    ],
+                    "CAD": [_fact(3000.0, "2023-12-31", "2023-01-01", form="40-F")],
+                }},
+                "CostOfSales": {"units": {"USD": [
+                    _fact(1800.0, "2023-12-31", "2023-01-01", form="40-F"),
+                ]}},
+                "Borrowings": {"units": {"USD": [_fact(700.0, "2023-12-31", form="40-F")]}},
+            },
+        },
+    }
+
+
+def _events(value, prefix=""):
+    """產生與 ijson.parse 相同格式的 (prefix, event, value) 事件"""
+    if isinstance(value, dict):
+        yield prefix, "start_map", None
+        for key, item in value.items():
+            yield prefix, "map_key", key
+            yield from _events(item, f"{prefix}.{key}" if prefix else key)
+        yield prefix, "end_map", None
+    elif isinstance(value, list):
+        yield prefix, "start_array", None
+        for item in value:
+            yield from _events(item, f"{prefix}.item" if prefix else "item")
+        yield prefix, "end_array", None
+    elif isinstance(value, str):
+        yield prefix, "string", value
+    elif value is None:
+        yield prefix, "null", None
+    else:
+        yield prefix, "number", value
+
+
+@pytest.fixture
+def archive(tmp_path):
+    path = tmp_path / "companyfacts.zip"
+    with zipfile.ZipFile(path, "w") as zf:
+        for doc in (_us_filer(), _ifrs_filer()):
+            zf.writestr(sf.member_name(doc["cik"]), json.dumps(doc))
+    tickers = tmp_path / "company_tickers.json"
+    tickers.write_text(json.dumps({
+        "0": {"cik_str": 719413, "ticker": "HL", "title": "Test Mining Co"},
+        "1": {"cik_str": 1209028, "ticker": "PAAS", "title": "Test Silver Corp"},
+        "2": {"cik_str": 1111111, "ticker": "NOPE", "title": "Not In Archive"},
+    }))
+    return path, sf.read_ticker_map(str(tickers))
+
+
+def test_event_stream_matches_dict_reader():
+    doc = _us_filer()
+    meta_events, meta_dict = {}, {}
+    from_events = list(sf.iter_facts_from_events(_events(doc), meta_events))
+    from_dict = list(sf.iter_facts_from_dict(doc, meta_dict))
+    assert from_events == from_dict
+    assert meta_events == meta_dict == {"cik": 719413, "entityName": "Test Mining Co"}
+    assert {tag for _, tag, _, _ in from_events}.isdisjoint({"AccountsPayableCurrent"})
+
+
+def test_ifrs_filer_keeps_only_usd():
+    meta = {}
+    facts = list(sf.iter_facts_from_events(_events(_ifrs_filer()), meta))
+    assert {unit for _, _, unit, _ in facts} == {"USD"}
+
+
+def test_company_frame_quarters_q4_and_ttm():
+    _, records = sf.parse_companyfacts(io.BytesIO(json.dumps(_us_filer()).encode()))
+    frame = sf.company_frame(records)
+
+    # Q4 = FY - (Q1 + Q2 + Q3) = 1000 - 600
+    assert frame.loc["2023-12-31", "revenue"] == 400.0
+    assert frame.loc["2023-12-31", "cost_of_revenue"] == 240.0
+    # TTM：FY2023 = 1000；2024Q1 = 200 + 300 + 400 + 500
+    assert frame.loc["2023-12-31", "revenue_ttm"] == 1000.0
+    assert frame.loc["2024-03-31", "revenue_ttm"] == 1400.0
+    assert pd.isna(frame.loc["2023-09-30", "revenue_ttm"])
+    # 六個月累計不列入單季
+    assert frame.loc["2023-06-30", "revenue"] == 200.0
+    # 修正申報取最新；LongTermDebt 優先於 LongTermDebtNoncurrent
+    assert frame.loc["2023-12-31", "total_debt"] == 450.0
+    assert frame.loc["2024-03-31", "shares"] == 610e6
+
+
+def test_build_store_and_snapshot(archive, tmp_path):
+    path, ticker_map = archive
+    store, missing = sf.build_store(str(path), ticker_map, ["hl", "paas", "nope", "zzzz"])
+    assert missing == ["NOPE", "ZZZZ"]
+    assert set(store["ticker"]) == {"HL", "PAAS"}
+    assert list(store.columns) == sf.STORE_COLUMNS
+
+    saved = sf.save_store(store, str(tmp_path / "store.arrow"), {"archive": str(path)})
+    loaded = sf.load_store(str(saved))
+    pd.testing.assert_frame_equal(loaded, store)
+    assert json.loads(saved.with_suffix(".json").read_text())["tickers"] == 2
+
+    snap = sf.latest_snapshot(loaded)
+    hl = snap.loc["HL"]
+    assert hl["entity"] == "Test Mining Co"
+    assert hl["period_end"] == pd.Timestamp("2024-03-31")
+    assert hl["total_debt"] == 450.0 and hl["cash"] == 180.0
+    # dei 封面股數（2024-04-25）為最近一筆，一年前的股數取 2023-03-31
+    assert hl["shares"] == 620e6 and hl["shares_base"] == 580e6
+    assert hl["ebitda_ttm"] == 450.0
+    assert hl["cost_ratio"] == pytest.approx((120 + 180 + 240 + 250) / 1400)
+
+    paas = snap.loc["PAAS"]
+    assert paas["revenue_ttm"] == 2400.0 and paas["cost_ratio"] == pytest.approx(0.75)
+    assert pd.isna(paas["shares"])
+
+    # as_of 之後的期間不得使用
+    early = sf.latest_snapshot(loaded, ["HL"], as_of="2023-12-31")
+    assert early.loc["HL", "cash"] == 120.0
+    assert early.loc["HL", "revenue_ttm"] == 1000.0
+
+
+def test_parallel_build_matches_serial(archive, tmp_path):
+    path, ticker_map = archive
+    serial, _ = sf.build_store(str(path), ticker_map, ["HL", "PAAS"])
+    parallel, _ = sf.build_store(str(path), ticker_map, ["HL", "PAAS"], workers=2)
+    pd.testing.assert_frame_equal(serial, parallel)
+
+
+def test_cost_ratio_history_falls_back_to_ttm(archive):
+    path, ticker_map = archive
+    store, _ = sf.build_store(str(path), ticker_map, ["HL", "PAAS"])
+    hl = sf.cost_ratio_history(store, "HL")
+    assert hl.loc["2023-03-31", "cost_ratio"] == pytest.approx(0.6)
+    assert hl.loc["2023-03-31", "revenue"] == 100.0
+    paas = sf.cost_ratio_history(store, "paas")
+    assert list(paas.index) == [pd.Timestamp("2023-12-31")]
+    assert paas.iloc[0]["revenue"] == 2400.0
@@ -8,6 +8,8 @@
 Usage:
     python margin_calculator.py --quick --metal gold
     python margin_calculator.py --metal silver --miners CDE,HL,AG --frequency quarterly
+    python margin_calculator.py --metal gold --cost-file costs.csv --frequency daily
+    python margin_calculator.py --metal silver --miners HL,CDE,PAAS --fundamentals-store cache/sec_fundamentals.arrow
 """
 
 import argparse
@@ -15,11 +17,15 @@ import json
 import os
 import sys
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).parent))
+from sec_fundamentals import cost_ratio_history, load_store
+
 try:
     import yfinance as yf
 except ImportError:
@@ -42,6 +48,17 @@ METAL_TICKERS = {
     "silver": "SI=F",
 }
 
+# 每年期數（用於把歷史視窗年數換算成期數）
+PERIODS_PER_YEAR = {
+    "daily": 252,
+    "weekly": 52,
+    "monthly": 12,
+    "quarterly": 4,
+}
+
+# 滾動分位數每批處理的 (列 × 視窗) 元素上限，控制記憶體用量
+_RANK_CHUNK_ELEMENTS = 20_000_000
+
 # 範例成本數據（實際使用時應從外部載入或爬取）
 # 格式：{miner: {quarter: {"aisc": float, "production": int}}}
 SAMPLE_COST_DATA = {
@@ -156,10 +173,91 @@ def get_metal_price(
     return price_resampled.dropna()
 
 
+def _parse_quarter(quarter: str) -> pd.Timestamp:
+    """解析 "YYYY-QN" 為該季最後一個月的第一天"""
+    year, q = quarter.split("-Q")
+    return pd.Timestamp(year=int(year), month=int(q) * 3, day=1)
+
+
+def load_cost_file(
+    path: str,
+    miners: Optional[List[str]] = None,
+) -> Tuple[Dict[str, pd.Series], Dict[str, pd.Series]]:
+    """從長格式 CSV 載入成本數據
+
+    CSV 欄位：ticker, quarter (YYYY-QN) 或 date, aisc, production
+
+    Args:
+        path: CSV 路徑
+        miners: 只保留這些礦業（None 表示全部）
+
+    Returns:
+        (成本字典, 產量字典)
+    """
+    df = pd.read_csv(path)
+    if "date" in df.columns:
+        df["date"] = pd.to_datetime(df["date"])
+    else:
+        df["date"] = df["quarter"].map(_parse_quarter)
+    if miners:
+        df = df[df["ticker"].isin(miners)]
+
+    df = df.sort_values(["ticker", "date"])
+    costs = {t: g.set_index("date")["aisc"].astype(float) for t, g in df.groupby("ticker")}
+    productions = {t: g.set_index("date")["production"].astype(float) for t, g in df.groupby("ticker")}
+    return costs, productions
+
+
+def load_store_costs(
+    store_path: str,
+    miners: List[str],
+    price_series: pd.Series,
+) -> Tuple[Dict[str, pd.Series], Dict[str, pd.Series]]:
+    """從 SEC XBRL 基本面存放檔推估成本與產量
+
+    單位成本 = 銷貨成本率 × 財報期間平均金屬價格；
+    產量 = 期間營收 / 平均金屬價格（金屬當量盎司，換算為每季）。
+    有單季財報時逐季計算，僅年報者用 TTM。
+
+    Args:
+        store_path: sec_fundamentals.py build 產生的存放檔
+        miners: 礦業清單
+        price_series: 金屬價格序列（計算期間平均價格）
+
+    Returns:
+        (成本字典, 產量字典)
+    """
+    store = load_store(store_path)
+    index = price_series.index
+
+    costs = {}
+    productions = {}
+    for miner in miners:
+        history = cost_ratio_history(store, miner)
+        if history.empty:
+            print(f"Warning: No XBRL cost data for {miner}")
+            continue
+
+        avg_prices = []
+        for end, days in zip(history.index, history["period_days"]):
+            window = price_series[(index > end - pd.Timedelta(days=int(days))) & (index <= end)]
+            avg_prices.append(window.mean() if not window.empty else price_series.asof(end))
+        avg_price = pd.Series(avg_prices, index=history.index, dtype=float)
+
+        valid = avg_price > 0
+        costs[miner] = (history["cost_ratio"] * avg_price)[valid]
+        productions[miner] = (history["revenue"] / avg_price * 91 / history["period_days"])[valid]
+
+    return costs, productions
+
+
 def load_cost_data(
     metal: str,
     miners: List[str],
     cost_metric: str = "AISC",
+    cost_file: Optional[str] = None,
+    fundamentals_store: Optional[str] = None,
+    price_series: Optional[pd.Series] = None,
 ) -> Tuple[Dict[str, pd.Series], Dict[str, pd.Series]]:
     """載入成本數據
 
@@ -167,10 +265,18 @@ def load_cost_data(
         metal: 金屬類型
         miners: 礦業清單
         cost_metric: 成本口徑
+        cost_file: 長格式成本 CSV（提供時取代範例數據）
+        fundamentals_store: SEC XBRL 基本面存放檔（需同時提供 price_series）
+        price_series: 金屬價格序列
 
     Returns:
         (成本字典, 產量字典)
     """
+    if cost_file:
+        return load_cost_file(cost_file, miners)
+    if fundamentals_store and price_series is not None:
+        return load_store_costs(fundamentals_store, miners, price_series)
+
     # 使用範例數據（實際應從外部載入）
     sample_data = SAMPLE_COST_DATA.get(metal, {})
 
@@ -188,11 +294,7 @@ def load_cost_data(
         prod_values = []
 
         for quarter, values in miner_data.items():
-            # 解析季度為日期
-            year, q = quarter.split("-Q")
-            month = int(q) * 3
-            date = pd.Timestamp(year=int(year), month=month, day=1)
-            dates.append(date)
+            dates.append(_parse_quarter(quarter))
             aisc_values.append(values.get("aisc", 0))
             prod_values.append(values.get("production", 0))
 
@@ -219,6 +321,51 @@ def align_cost_to_price_index(
     return cost_series.reindex(price_index, method="ffill")
 
 
+def align_to_price_index(
+    series_map: Dict[str, pd.Series],
+    price_index: pd.DatetimeIndex,
+) -> pd.DataFrame:
+    """一次對齊多個礦業序列到價格索引（日期 × 礦業矩陣）
+
+    等同對每個序列呼叫 align_cost_to_price_index。
+
+    Args:
+        series_map: {礦業: 序列}
+        price_index: 價格索引
+
+    Returns:
+        對齊後的 DataFrame
+    """
+    if not series_map:
+        return pd.DataFrame(index=price_index)
+    wide = pd.DataFrame(series_map).sort_index().ffill()
+    return wide.reindex(price_index, method="ffill")
+
+
+def compute_margin_matrix(
+    price_series: pd.Series,
+    cost_df: pd.DataFrame,
+) -> pd.DataFrame:
+    """向量化計算所有礦業的毛利率代理值
+
+    與 margin_proxy 相同：max(0, (price - cost) / price)，price <= 0 時為 0；
+    成本缺值的期間保留 NaN（不視為零毛利）。
+
+    Args:
+        price_series: 金屬價格序列
+        cost_df: 對齊後的成本矩陣（日期 × 礦業）
+
+    Returns:
+        毛利率矩陣（日期 × 礦業）
+    """
+    price = price_series.reindex(cost_df.index).to_numpy(dtype=float)[:, None]
+    cost = cost_df.to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        margin = np.where(price > 0, np.maximum((price - cost) / price, 0.0), 0.0)
+    margin = np.where(np.isnan(cost), np.nan, margin)
+    return pd.DataFrame(margin, index=cost_df.index, columns=cost_df.columns)
+
+
 def aggregate_margins(
     margins_df: pd.DataFrame,
     weights_df: Optional[pd.DataFrame] = None,
@@ -237,33 +384,71 @@ def aggregate_margins(
     if mode == "equal_weight" or weights_df is None:
         return margins_df.mean(axis=1)
 
-    # 正規化權重
-    w = weights_df.div(weights_df.sum(axis=1), axis=0).fillna(0.0)
-    return (margins_df * w).sum(axis=1)
+    # 只在當期有毛利率的礦業之間正規化權重（缺值礦業的權重分給其他成員）
+    w = weights_df.where(margins_df.notna(), 0.0).fillna(0.0)
+    w = w.div(w.sum(axis=1), axis=0).fillna(0.0)
+    return (margins_df * w).where(w > 0).sum(axis=1, min_count=1)
+
+
+def _rolling_rank_matrix(values: np.ndarray, window: int, min_periods: int) -> np.ndarray:
+    """滾動分位數的陣列實作（欄位各自獨立）
+
+    對每個時點 t，計算視窗內「先前有效值中嚴格小於當期值」的比例。
+    以 sliding_window_view 建立 (時點 × 視窗) 視圖，分批處理以限制記憶體。
+
+    Args:
+        values: (n, k) 陣列
+        window: 視窗長度（含當期）
+        min_periods: 視窗內最少有效值數
+
+    Returns:
+        (n, k) 分位數陣列
+    """
+    n, k = values.shape
+    padded = np.vstack([np.full((window - 1, k), np.nan), values])
+    # (n, k, window) 視圖，不複製資料
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window, axis=0)
+
+    ranks = np.full((n, k), np.nan)
+    chunk = max(1, _RANK_CHUNK_ELEMENTS // max(window * k, 1))
+    for start in range(0, n, chunk):
+        w = windows[start:start + chunk]
+        current = w[..., -1]
+        history = w[..., :-1]
+        valid_hist = ~np.isnan(history)
+        n_valid = valid_hist.sum(axis=-1)
+        below = (history < current[..., None]).sum(axis=-1)
+
+        ok = (n_valid + ~np.isnan(current) >= min_periods) & (n_valid > 0) & ~np.isnan(current)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ranks[start:start + chunk] = np.where(ok, below / n_valid, np.nan)
+    return ranks
 
 
 def compute_percentile_rank(
-    series: pd.Series,
+    series,
     window_years: int = 20,
-) -> pd.Series:
+    periods_per_year: int = 4,
+):
     """計算滾動歷史分位數
 
     Args:
-        series: 輸入序列
+        series: 輸入序列，或 DataFrame（每欄各自計算）
         window_years: 視窗年數
+        periods_per_year: 每年期數（季度 4、日資料 252）
 
     Returns:
-        分位數排名序列
+        分位數排名（與輸入同型別）
     """
-    window = window_years * 4  # 季度
+    window = max(window_years * periods_per_year, 2)
 
-    def rank_func(x):
-        if len(x) < 2:
-            return np.nan
-        return (x.iloc[-1] > x.iloc[:-1]).mean()
+    if isinstance(series, pd.DataFrame):
+        ranks = _rolling_rank_matrix(series.to_numpy(dtype=float), window, min_periods=4)
+        return pd.DataFrame(ranks, index=series.index, columns=series.columns)
 
-    ranks = series.rolling(window, min_periods=4).apply(rank_func, raw=False)
-    return ranks
+    values = series.to_numpy(dtype=float)[:, None]
+    ranks = _rolling_rank_matrix(values, window, min_periods=4)
+    return pd.Series(ranks[:, 0], index=series.index, name=series.name)
 
 
 def regime_label(percentile: float) -> str:
@@ -325,6 +510,64 @@ def decompose_driver(
     }
 
 
+def decompose_driver_matrix(
+    price_series: pd.Series,
+    cost_df: pd.DataFrame,
+    lookback: int = 3,
+) -> pd.DataFrame:
+    """逐礦業驅動拆解（向量化版 decompose_driver）
+
+    Args:
+        price_series: 價格序列（與 cost_df 同索引）
+        cost_df: 成本矩陣（日期 × 礦業）
+        lookback: 回顧期數
+
+    Returns:
+        DataFrame（index=礦業）：price_change_pct, cost_change_pct, driver
+    """
+    columns = ["price_change_pct", "cost_change_pct", "driver"]
+    if len(cost_df) < lookback + 1:
+        return pd.DataFrame(
+            {"driver": "insufficient_data"}, index=cost_df.columns, columns=columns
+        )
+
+    price = price_series.reindex(cost_df.index).to_numpy(dtype=float)
+    cost = cost_df.to_numpy(dtype=float)
+
+    # 每個礦業最後一個有效成本位置
+    valid = ~np.isnan(cost)
+    last = np.where(valid.any(axis=0), len(cost) - 1 - np.argmax(valid[::-1], axis=0), -1)
+    base = last - lookback
+    cols = np.arange(cost.shape[1])
+    ok = base >= 0
+
+    price_change = np.full(cost.shape[1], np.nan)
+    cost_change = np.full(cost.shape[1], np.nan)
+    price_change[ok] = price[last[ok]] / price[base[ok]] - 1
+    cost_change[ok] = cost[last[ok], cols[ok]] / cost[base[ok], cols[ok]] - 1
+
+    abs_p, abs_c = np.abs(price_change), np.abs(cost_change)
+    driver = np.where(
+        abs_p > abs_c * 2,
+        np.where(price_change > 0, "mostly_price_up", "mostly_price_down"),
+        np.where(
+            abs_c > abs_p * 2,
+            np.where(cost_change < 0, "mostly_cost_down", "mostly_cost_up"),
+            "mixed",
+        ),
+    )
+    driver = np.where(ok & ~np.isnan(cost_change), driver, "insufficient_data")
+
+    return pd.DataFrame(
+        {
+            "price_change_pct": np.round(price_change, 4),
+            "cost_change_pct": np.round(cost_change, 4),
+            "driver": driver,
+        },
+        index=cost_df.columns,
+    )
+
+
 def winsorize(series: pd.Series, lower: float = 0.01, upper: float = 0.99) -> pd.Series:
     """Winsorize 離群值
 
@@ -338,9 +581,76 @@ def winsorize(series: pd.Series, lower: float = 0.01, upper: float = 0.99) -> pd
     """
     low = series.quantile(lower)
     high = series.quantile(upper)
+    if isinstance(series, pd.DataFrame):
+        return series.clip(low, high, axis=1)
     return series.clip(low, high)
 
 
+def compute_margin_panel(
+    price_series: pd.Series,
+    costs: Dict[str, pd.Series],
+    productions: Dict[str, pd.Series],
+    aggregation: str = "production_weighted",
+    history_window_years: int = 20,
+    frequency: str = "quarterly",
+    outlier_rule: str = "winsorize_1_99",
+    lookback: int = 3,
+) -> Dict[str, object]:
+    """一次計算整個礦業宇宙的毛利率矩陣與聚合結果
+
+    Args:
+        price_series: 金屬價格序列
+        costs: {礦業: 成本序列}
+        productions: {礦業: 產量序列}
+        aggregation: 聚合方式
+        history_window_years: 歷史視窗（年）
+        frequency: 價格頻率（決定視窗期數）
+        outlier_rule: 離群處理
+        lookback: 驅動拆解回顧期數
+
+    Returns:
+        {
+            "costs", "productions", "margins", "weights": 日期 × 礦業矩陣,
+            "basket_margin", "weighted_cost", "basket_percentile": 序列,
+            "miner_percentiles": 日期 × 礦業矩陣,
+            "miner_drivers": 逐礦業驅動拆解,
+        }
+    """
+    index = price_series.index
+    cost_df = align_to_price_index(costs, index)
+    prod_df = align_to_price_index(productions, index).reindex(columns=cost_df.columns)
+
+    margins_df = compute_margin_matrix(price_series, cost_df)
+    if outlier_rule == "winsorize_1_99":
+        margins_df = winsorize(margins_df, 0.01, 0.99)
+
+    use_production = aggregation == "production_weighted" and not prod_df.empty
+    if use_production:
+        weights_df = prod_df.div(prod_df.sum(axis=1), axis=0).fillna(0.0)
+    else:
+        present = cost_df.notna().astype(float)
+        weights_df = present.div(present.sum(axis=1), axis=0).fillna(0.0)
+
+    basket_margin = aggregate_margins(margins_df, prod_df if use_production else None, aggregation)
+    if use_production:
+        weighted_cost = (cost_df * weights_df).where(weights_df > 0).sum(axis=1, min_count=1)
+    else:
+        weighted_cost = cost_df.mean(axis=1)
+
+    periods = PERIODS_PER_YEAR.get(frequency, 4)
+    return {
+        "costs": cost_df,
+        "productions": prod_df,
+        "margins": margins_df,
+        "weights": weights_df,
+        "basket_margin": basket_margin,
+        "weighted_cost": weighted_cost,
+        "basket_percentile": compute_percentile_rank(basket_margin, history_window_years, periods),
+        "miner_percentiles": compute_percentile_rank(margins_df, history_window_years, periods),
+        "miner_drivers": decompose_driver_matrix(price_series, cost_df, lookback),
+    }
+
+
 # =============================================================================
 # 主計算流程
 # =============================================================================
@@ -356,6 +666,8 @@ def calculate_margin_analysis(
     aggregation: str = "production_weighted",
     history_window_years: int = 20,
     outlier_rule: str = "winsorize_1_99",
+    cost_file: Optional[str] = None,
+    fundamentals_store: Optional[str] = None,
 ) -> Dict:
     """執行完整毛利率分析
 
@@ -369,6 +681,8 @@ def calculate_margin_analysis(
         aggregation: 聚合方式
         history_window_years: 歷史視窗
         outlier_rule: 離群處理
+        cost_file: 長格式成本 CSV（可選）
+        fundamentals_store: SEC XBRL 基本面存放檔（可選）
 
     Returns:
         分析結果字典
@@ -388,44 +702,28 @@ def calculate_margin_analysis(
         return {"error": f"Failed to get price data: {e}"}
 
     # 2. 載入成本
-    costs, productions = load_cost_data(metal, miners, cost_metric)
+    costs, productions = load_cost_data(
+        metal, miners, cost_metric, cost_file, fundamentals_store, price_series
+    )
     if not costs:
         return {"error": "No cost data available"}
 
-    # 3. 計算各礦業毛利率
-    margins = {}
-    aligned_costs = {}
-    for miner in costs:
-        aligned_cost = align_cost_to_price_index(costs[miner], price_series.index)
-        aligned_costs[miner] = aligned_cost
-        margins[miner] = pd.Series(
-            [margin_proxy(p, c) for p, c in zip(price_series, aligned_cost)],
-            index=price_series.index,
-        )
-
-    margins_df = pd.DataFrame(margins)
-    productions_df = pd.DataFrame(
-        {m: align_cost_to_price_index(productions[m], price_series.index) for m in productions}
+    # 3-7. 毛利率矩陣、離群處理、聚合、加權成本與歷史分位數（一次完成）
+    panel = compute_margin_panel(
+        price_series,
+        costs,
+        productions,
+        aggregation=aggregation,
+        history_window_years=history_window_years,
+        frequency=frequency,
+        outlier_rule=outlier_rule,
     )
-
-    # 4. 離群處理
-    if outlier_rule == "winsorize_1_99":
-        for col in margins_df.columns:
-            margins_df[col] = winsorize(margins_df[col], 0.01, 0.99)
-
-    # 5. 聚合籃子毛利率
-    basket_margin = aggregate_margins(margins_df, productions_df, aggregation)
-
-    # 6. 計算加權成本
-    aligned_costs_df = pd.DataFrame(aligned_costs)
-    if aggregation == "production_weighted" and not productions_df.empty:
-        w = productions_df.div(productions_df.sum(axis=1), axis=0).fillna(0)
-        weighted_cost = (aligned_costs_df * w).sum(axis=1)
-    else:
-        weighted_cost = aligned_costs_df.mean(axis=1)
-
-    # 7. 歷史分位數
-    percentile_series = compute_percentile_rank(basket_margin, history_window_years)
+    margins_df = panel["margins"]
+    aligned_costs_df = panel["costs"]
+    productions_df = panel["productions"]
+    basket_margin = panel["basket_margin"]
+    weighted_cost = panel["weighted_cost"]
+    percentile_series = panel["basket_percentile"]
 
     # 8. 最新數據
     latest_idx = basket_margin.dropna().index[-1] if not basket_margin.dropna().empty else None
@@ -433,38 +731,40 @@ def calculate_margin_analysis(
         return {"error": "No valid margin data"}
 
     latest_margin = basket_margin.loc[latest_idx]
-    latest_percentile = percentile_series.loc[latest_idx] if latest_idx in percentile_series.index else np.nan
-    latest_price = price_series.loc[latest_idx] if latest_idx in price_series.index else np.nan
-    latest_cost = weighted_cost.loc[latest_idx] if latest_idx in weighted_cost.index else np.nan
+    latest_percentile = percentile_series.loc[latest_idx]
+    latest_price = price_series.loc[latest_idx]
+    latest_cost = weighted_cost.loc[latest_idx]
 
     # 9. 驅動拆解
     decomposition = decompose_driver(price_series.dropna(), weighted_cost.dropna(), lookback=3)
 
     # 10. 礦業詳情
-    miner_details = []
-    for miner in margins_df.columns:
-        if latest_idx in margins_df.index:
-            miner_margin = margins_df.loc[latest_idx, miner]
-            miner_cost = aligned_costs_df.loc[latest_idx, miner] if latest_idx in aligned_costs_df.index else np.nan
-            miner_prod = productions_df.loc[latest_idx, miner] if latest_idx in productions_df.index else np.nan
-            miner_details.append(
-                {
-                    "ticker": miner,
-                    "aisc_usd_oz": round(miner_cost, 2) if not np.isnan(miner_cost) else None,
-                    "production_oz": int(miner_prod) if not np.isnan(miner_prod) else None,
-                    "margin_proxy": round(miner_margin, 4) if not np.isnan(miner_margin) else None,
-                    "margin_vs_basket": round(miner_margin - latest_margin, 4)
-                    if not np.isnan(miner_margin)
-                    else None,
-                }
-            )
+    latest_row = pd.DataFrame({
+        "cost": aligned_costs_df.loc[latest_idx],
+        "production": productions_df.loc[latest_idx],
+        "margin": margins_df.loc[latest_idx],
+        "percentile": panel["miner_percentiles"].loc[latest_idx],
+    })
+    drivers = panel["miner_drivers"]
+
+    def _num(value, digits):
+        return round(float(value), digits) if not pd.isna(value) else None
+
+    miner_details = [
+        {
+            "ticker": miner,
+            "aisc_usd_oz": _num(row["cost"], 2),
+            "production_oz": int(row["production"]) if not pd.isna(row["production"]) else None,
+            "margin_proxy": _num(row["margin"], 4),
+            "margin_vs_basket": _num(row["margin"] - latest_margin, 4),
+            "history_percentile": _num(row["percentile"], 2),
+            "driver": drivers.loc[miner, "driver"],
+        }
+        for miner, row in latest_row.iterrows()
+    ]
 
     # 計算權重
-    if aggregation == "production_weighted" and latest_idx in productions_df.index:
-        total_prod = productions_df.loc[latest_idx].sum()
-        weights = {m: round(productions_df.loc[latest_idx, m] / total_prod, 3) for m in productions_df.columns}
-    else:
-        weights = {m: round(1.0 / len(miners), 3) for m in miners if m in margins_df.columns}
+    weights = {m: round(float(w), 3) for m, w in panel["weights"].loc[latest_idx].items()}
 
     # 組裝結果
     result = {
@@ -478,6 +778,7 @@ def calculate_margin_analysis(
             "end_date": end_date,
             "frequency": frequency,
             "cost_metric": cost_metric,
+            "cost_source": "cost_file" if cost_file else ("sec_xbrl" if fundamentals_store else "sample"),
             "aggregation": aggregation,
             "history_window_years": history_window_years,
         },
@@ -512,6 +813,11 @@ def calculate_margin_analysis(
         ],
     }
 
+    if fundamentals_store and not cost_file:
+        result["notes"].insert(
+            1, "成本由 SEC XBRL 推估：銷貨成本率 × 期間平均金屬價格（不含維持性資本支出，通常低於 AISC）。"
+        )
+
     return result
 
 
@@ -553,6 +859,12 @@ def main():
         help="聚合方式",
     )
     parser.add_argument("--history-window", type=int, default=20, help="歷史視窗（年）")
+    parser.add_argument("--cost-file", type=str, help="長格式成本 CSV（ticker, quarter, aisc, production）")
+    parser.add_argument(
+        "--fundamentals-store",
+        type=str,
+        help="SEC XBRL 基本面存放檔（sec_fundamentals.py build 產生），以銷貨成本率推估成本",
+    )
     parser.add_argument("--output", type=str, help="輸出檔案路徑")
     parser.add_argument("--generate-signals", action="store_true", help="生成訊號")
     parser.add_argument("--compact", action="store_true", help="精簡輸出")
@@ -572,6 +884,8 @@ def main():
         cost_metric=args.cost_metric,
         aggregation=args.aggregation,
         history_window_years=args.history_window,
+        cost_file=args.cost_file,
+        fundamentals_store=args.fundamentals_store,
     )
 
     # 精簡輸出
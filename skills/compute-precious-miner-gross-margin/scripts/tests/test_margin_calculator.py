@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Margin Calculator Tests
+
+Checks aggregate_margins' production-weighted basket:
+1. A miner with no margin in a period drops out and the rest are renormalized
+2. Periods with no margins at all stay NaN
+
+Usage:
+    cd skills/compute-precious-miner-gross-margin/scripts/tests
+    python -m pytest -q test_margin_calculator.py
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add scripts directory to path (tests is inside scripts/)
+scripts_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(scripts_dir))
+
+from margin_calculator import aggregate_margins  # noqa: E402
+
+
+def test_aggregate_margins_renormalizes_missing_miner():
+    index = pd.date_range("2024-03-31", periods=3, freq="QE")
+    margins = pd.DataFrame(
+        {"HL": [0.40, 0.50, np.nan], "CDE": [0.20, np.nan, np.nan], "PAAS": [0.30, 0.30, np.nan]},
+        index=index,
+    )
+    weights = pd.DataFrame({"HL": 2.0, "CDE": 1.0, "PAAS": 1.0}, index=index)
+
+    basket = aggregate_margins(margins, weights)
+
+    assert basket.iloc[0] == pytest.approx((0.40 * 2 + 0.20 + 0.30) / 4)
+    # CDE missing: HL / PAAS weights renormalize to 2/3 and 1/3
+    assert basket.iloc[1] == pytest.approx(0.50 * 2 / 3 + 0.30 / 3)
+    assert np.isnan(basket.iloc[2])
@@ -0,0 +1,384 @@
+"""
+Cost Density Scenario Grid - Vectorized Engine
+
+Evaluates the cost density model over full Cartesian grids of
+RR_g × P × commission × spread × pip value as NumPy arrays, finds
+threshold crossings analytically (snapped to the P grid with
+searchsorted) and writes the results to Parquet for friction-surface
+lookups across a whole book of instruments.
+
+All formulas match cost_density.compute_single:
+
+    CostDensity = c/V + s
+    x           = CostDensity / P
+    RR_net      = (RR_g - x) / (1 + x)
+    WR_min      = (1 + x) / (1 + RR_g)
+    Loss_RR     = x (RR_g + 1) / (RR_g (1 + x))
+
+Because every metric is monotone in P, each threshold has a closed form:
+
+    RR_net  > 0  <=>  P > CostDensity / RR_g
+    WR_min <= w  <=>  P >= CostDensity / (w (1 + RR_g) - 1)
+    Loss_RR <= L <=>  P >= CostDensity (RR_g (1 - L) + 1) / (L RR_g)
+
+Usage:
+    python scenario_grid.py --rr 1,2,3 --p-min 1 --p-max 200 --steps 2000 \\
+        --commission 0,3.5,7 --spread 0.1:3:30 --pip-value 1,10 \\
+        --output cache/friction_grid.parquet
+"""
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+from cli_startup import lazy_module
+
+# pandas is only needed for --output / --thresholds-output; load it on first use
+pd = lazy_module("pandas")
+
+# 與 cost_density.sweep_stoploss 相同的閾值水平
+WR_LEVELS = (0.35, 0.40, 0.50)
+LOSS_LEVELS = (0.20, 0.40, 0.60)
+
+# 單次網格上限（約 6 個 float64 欄位 × 5e7 ≈ 2.4 GB）
+MAX_CELLS = 50_000_000
+
+PARAM_NAMES = ("RR_g", "P", "c", "s", "V")
+
+
+@dataclass
+class ScenarioGrid:
+    """Axes of a Cartesian scenario grid (each axis is a 1-D array)."""
+    RR_g: np.ndarray
+    P: np.ndarray
+    c: np.ndarray
+    s: np.ndarray
+    V: np.ndarray
+
+    @property
+    def shape(self) -> tuple:
+        return tuple(len(getattr(self, name)) for name in PARAM_NAMES)
+
+    @property
+    def n_cells(self) -> int:
+        return int(np.prod(self.shape))
+
+
+def build_grid(
+    RR_g: Sequence[float],
+    P: Sequence[float],
+    c: Sequence[float],
+    s: Sequence[float],
+    V: Sequence[float],
+    max_cells: int = MAX_CELLS
+) -> ScenarioGrid:
+    """
+    Validate axis values and build a ScenarioGrid.
+
+    P is sorted ascending so thresholds can be located with searchsorted.
+
+    Raises:
+        ValueError: on invalid parameter values or an oversized grid
+    """
+    axes = {
+        name: np.atleast_1d(np.asarray(values, dtype=np.float64))
+        for name, values in zip(PARAM_NAMES, (RR_g, P, c, s, V))
+    }
+
+    for name, values in axes.items():
+        if values.size == 0:
+            raise ValueError(f"{name} axis must not be empty")
+        if not np.all(np.isfinite(values)):
+            raise ValueError(f"{name} axis must be finite")
+
+    if np.any(axes["RR_g"] < 0):
+        raise ValueError("RR_g must be non-negative")
+    if np.any(axes["P"] <= 0):
+        raise ValueError("P (stop-loss) must be positive")
+    if np.any(axes["V"] <= 0):
+        raise ValueError("V (pip value) must be positive")
+    if np.any(axes["c"] < 0):
+        raise ValueError("c (commission) must be non-negative")
+    if np.any(axes["s"] < 0):
+        raise ValueError("s (spread) must be non-negative")
+
+    axes["P"] = np.unique(axes["P"])
+
+    grid = ScenarioGrid(**axes)
+    if grid.n_cells > max_cells:
+        raise ValueError(
+            f"grid has {grid.n_cells:,} cells, exceeds max_cells={max_cells:,}"
+        )
+    return grid
+
+
+def linspace_P(P_min: float, P_max: float, steps: int, log: bool = False) -> np.ndarray:
+    """Generate a stop-loss axis (linear or log spaced)."""
+    if P_min <= 0:
+        raise ValueError("P_min must be positive")
+    if P_max <= P_min:
+        raise ValueError("P_max must be greater than P_min")
+    if steps < 3:
+        raise ValueError("steps must be at least 3")
+    if log:
+        return np.geomspace(P_min, P_max, steps)
+    return np.linspace(P_min, P_max, steps)
+
+
+def _cost_density(grid: ScenarioGrid) -> np.ndarray:
+    """Cost density over (c, s, V), shape (n_c, n_s, n_V)."""
+    c = grid.c[:, None, None]
+    s = grid.s[None, :, None]
+    V = grid.V[None, None, :]
+    return c / V + s
+
+
+def evaluate_grid(grid: ScenarioGrid, dtype=np.float64) -> Dict[str, np.ndarray]:
+    """
+    Evaluate all metrics over the full grid.
+
+    Returns:
+        Dict of arrays with shape grid.shape, i.e. (RR_g, P, c, s, V):
+        cost_density, x, RR_net, WR_min, Loss_RR, high_friction
+    """
+    RR = grid.RR_g[:, None, None, None, None]
+    P = grid.P[None, :, None, None, None]
+    D = _cost_density(grid)[None, None, :, :, :]
+
+    x = D / P
+    one_plus_x = 1.0 + x
+    RR_net = (RR - x) / one_plus_x
+    WR_min = one_plus_x / (1.0 + RR)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        Loss_RR = np.where(RR > 0, x * (RR + 1.0) / (RR * one_plus_x), 0.0)
+        P_critical = np.where(RR > 0, D * (RR + 2.0) / RR, np.inf)
+
+    shape = grid.shape
+    return {
+        "cost_density": np.broadcast_to(D, shape).astype(dtype),
+        "x": np.broadcast_to(x, shape).astype(dtype),
+        "RR_net": np.broadcast_to(RR_net, shape).astype(dtype),
+        "WR_min": np.broadcast_to(WR_min, shape).astype(dtype),
+        "Loss_RR": np.broadcast_to(Loss_RR, shape).astype(dtype),
+        "high_friction": np.broadcast_to(P < P_critical, shape).copy(),
+    }
+
+
+def _snap_to_grid(P_axis: np.ndarray, threshold: np.ndarray, side: str) -> np.ndarray:
+    """First grid P satisfying the threshold (NaN when none does)."""
+    idx = np.searchsorted(P_axis, threshold.ravel(), side=side)
+    padded = np.append(P_axis, np.nan)
+    return padded[idx].reshape(threshold.shape)
+
+
+def compute_thresholds(grid: ScenarioGrid) -> Dict[str, np.ndarray]:
+    """
+    Analytic threshold surface over (RR_g, c, s, V).
+
+    For each threshold two arrays are returned: the exact crossing
+    (e.g. ``P_breakeven``) and the first P on the grid satisfying it
+    (e.g. ``P_breakeven_grid``, NaN if no grid point qualifies), matching
+    the semantics of cost_density.sweep_stoploss. Crossings are compared
+    on exact values, so a grid point that only qualifies after the sweep's
+    4-decimal rounding is not selected.
+
+    Returns:
+        Dict of arrays with shape (n_RR_g, n_c, n_s, n_V)
+    """
+    RR = grid.RR_g[:, None, None, None]
+    D = _cost_density(grid)[None, :, :, :]
+    shape = (len(grid.RR_g),) + D.shape[1:]
+    D = np.broadcast_to(D, shape)
+    RR = np.broadcast_to(RR, shape)
+
+    exact = {}
+    strict = {}
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        exact["P_breakeven"] = np.where(RR > 0, D / RR, np.inf)
+        strict["P_breakeven"] = True
+
+        exact["P_critical"] = np.where(RR > 0, D * (RR + 2.0) / RR, np.inf)
+        strict["P_critical"] = False
+
+        for w in WR_LEVELS:
+            denom = w * (1.0 + RR) - 1.0
+            exact[f"P_WR_{int(round(w * 100))}"] = np.where(denom > 0, D / denom, np.inf)
+            strict[f"P_WR_{int(round(w * 100))}"] = False
+
+        for L in LOSS_LEVELS:
+            exact[f"P_Loss_{int(round(L * 100))}"] = np.where(
+                RR > 0, D * (RR * (1.0 - L) + 1.0) / (L * RR), 0.0
+            )
+            strict[f"P_Loss_{int(round(L * 100))}"] = False
+
+    result = {}
+    for name, values in exact.items():
+        result[name] = values
+        side = "right" if strict[name] else "left"
+        result[f"{name}_grid"] = _snap_to_grid(grid.P, values, side)
+    return result
+
+
+def _coordinate_columns(axes: Sequence[np.ndarray], dtype) -> List[np.ndarray]:
+    """Flattened Cartesian coordinates in C order."""
+    mesh = np.meshgrid(*axes, indexing="ij", sparse=True)
+    shape = tuple(len(a) for a in axes)
+    return [np.broadcast_to(m, shape).astype(dtype).ravel() for m in mesh]
+
+
+def grid_to_frame(
+    grid: ScenarioGrid,
+    metrics: Dict[str, np.ndarray],
+    dtype=np.float32
+) -> "pd.DataFrame":
+    """Flatten grid metrics into a long columnar DataFrame."""
+    coords = _coordinate_columns([getattr(grid, n) for n in PARAM_NAMES], dtype)
+    columns = dict(zip(PARAM_NAMES, coords))
+    for name, values in metrics.items():
+        if values.dtype == bool:
+            columns[name] = values.ravel()
+        else:
+            columns[name] = values.astype(dtype, copy=False).ravel()
+    return pd.DataFrame(columns, copy=False)
+
+
+def thresholds_to_frame(
+    grid: ScenarioGrid,
+    thresholds: Dict[str, np.ndarray],
+    dtype=np.float32
+) -> "pd.DataFrame":
+    """Flatten the threshold surface into a columnar DataFrame keyed by (RR_g, c, s, V)."""
+    names = ("RR_g", "c", "s", "V")
+    coords = _coordinate_columns([getattr(grid, n) for n in names], dtype)
+    columns = dict(zip(names, coords))
+    for name, values in thresholds.items():
+        columns[name] = values.astype(dtype).ravel()
+    return pd.DataFrame(columns, copy=False)
+
+
+def write_parquet(df: "pd.DataFrame", path: str) -> Path:
+    """Write a frame to Parquet (zstd compressed)."""
+    output_path = Path(path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(output_path, index=False, compression="zstd")
+    return output_path
+
+
+def run_scenario_grid(
+    grid: ScenarioGrid,
+    output: Optional[str] = None,
+    thresholds_output: Optional[str] = None,
+    dtype=np.float32
+) -> Dict:
+    """
+    Evaluate a grid, optionally persist it, and return a JSON-friendly summary.
+    """
+    t0 = time.perf_counter()
+    metrics = evaluate_grid(grid)
+    thresholds = compute_thresholds(grid)
+    elapsed_compute = time.perf_counter() - t0
+
+    files = {}
+    if output:
+        files["grid"] = str(write_parquet(grid_to_frame(grid, metrics, dtype), output))
+    if thresholds_output:
+        files["thresholds"] = str(
+            write_parquet(thresholds_to_frame(grid, thresholds, dtype), thresholds_output)
+        )
+    elapsed_total = time.perf_counter() - t0
+
+    def _range(values: np.ndarray) -> Dict[str, Optional[float]]:
+        finite = values[np.isfinite(values)]
+        if finite.size == 0:
+            return {"min": None, "max": None}
+        return {"min": round(float(finite.min()), 4), "max": round(float(finite.max()), 4)}
+
+    return {
+        "shape": dict(zip(PARAM_NAMES, grid.shape)),
+        "n_cells": grid.n_cells,
+        "high_friction_share": round(float(metrics["high_friction"].mean()), 4),
+        "RR_net_range": _range(metrics["RR_net"]),
+        "threshold_ranges": {
+            name: _range(values)
+            for name, values in thresholds.items()
+            if not name.endswith("_grid")
+        },
+        "files": files,
+        "timing_seconds": {
+            "compute": round(elapsed_compute, 4),
+            "total": round(elapsed_total, 4),
+        },
+    }
+
+
+def _parse_axis(text: str) -> np.ndarray:
+    """
+    Parse an axis spec: comma list ("1,2,3") or range "start:stop:num".
+    """
+    if ":" in text:
+        parts = text.split(":")
+        if len(parts) != 3:
+            raise argparse.ArgumentTypeError(f"range must be start:stop:num, got {text!r}")
+        start, stop, num = float(parts[0]), float(parts[1]), int(parts[2])
+        return np.linspace(start, stop, num)
+    return np.array([float(v) for v in text.split(",") if v.strip()])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Vectorized cost density scenario grid (RR_g × P × c × s × V)"
+    )
+    parser.add_argument("--rr", type=_parse_axis, default="1,2,3",
+                        help="RR_g values: comma list or start:stop:num")
+    parser.add_argument("--p-min", type=float, default=1.0, help="Minimum stop-loss")
+    parser.add_argument("--p-max", type=float, default=100.0, help="Maximum stop-loss")
+    parser.add_argument("--steps", type=int, default=200, help="Number of P steps")
+    parser.add_argument("--log", action="store_true", help="Log-spaced P axis")
+    parser.add_argument("--commission", type=_parse_axis, default="7.0",
+                        help="Round-turn commission values")
+    parser.add_argument("--spread", type=_parse_axis, default="1.5",
+                        help="Spread values (pips/points)")
+    parser.add_argument("--pip-value", type=_parse_axis, default="10.0",
+                        help="Value per pip per lot")
+    parser.add_argument("--output", type=str, default=None,
+                        help="Parquet path for the full grid")
+    parser.add_argument("--thresholds-output", type=str, default=None,
+                        help="Parquet path for the threshold surface")
+    parser.add_argument("--float64", action="store_true",
+                        help="Store float64 columns instead of float32")
+
+    args = parser.parse_args()
+
+    try:
+        grid = build_grid(
+            RR_g=args.rr,
+            P=linspace_P(args.p_min, args.p_max, args.steps, log=args.log),
+            c=args.commission,
+            s=args.spread,
+            V=args.pip_value,
+        )
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+    summary = run_scenario_grid(
+        grid,
+        output=args.output,
+        thresholds_output=args.thresholds_output,
+        dtype=np.float64 if args.float64 else np.float32,
+    )
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -8,6 +8,7 @@ and inflation incentives to quantify "fiscal trap" risks for countries/regions.
 
 Usage:
     python fiscal_trap_analyzer.py --entities JPN USA DEU --start-year 2010 --end-year 2023
+    python fiscal_trap_analyzer.py --entities ALL --start-year 2000 --end-year 2023 --offline
 
 Dependencies:
     pip install pandas numpy wbdata requests scipy
@@ -30,6 +31,14 @@ except ImportError:
     HAS_WBDATA = False
     print("Warning: wbdata not installed. Using mock data for demo.")
 
+try:
+    from wb_panel_cache import WorldBankPanelCache, ALL_ENTITIES
+except ImportError:
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent))
+    from wb_panel_cache import WorldBankPanelCache, ALL_ENTITIES
+
 
 # =============================================================================
 # Configuration
@@ -110,20 +119,36 @@ def fetch_worldbank_data(
     entities: List[str],
     indicators: Dict[str, str],
     start_year: int,
-    end_year: int
+    end_year: int,
+    cache: Optional[WorldBankPanelCache] = None,
+    force_refresh: bool = False
 ) -> pd.DataFrame:
     """
     Fetch data from World Bank API.
 
     Parameters:
-        entities: List of ISO3 country codes
+        entities: List of ISO3 country codes (or ALL when using the cache)
         indicators: Dict mapping indicator names to WB codes
         start_year: Start year
         end_year: End year
+        cache: Optional panel cache; only missing years are requested
+        force_refresh: Ignore cached cells
 
     Returns:
         DataFrame with MultiIndex (entity, year) and indicator columns
     """
+    if cache is not None:
+        try:
+            data = cache.load_panel(indicators, entities, start_year, end_year, force_refresh)
+            if not data.empty and data[list(indicators.keys())].notna().any().any():
+                return data
+            print("Warning: World Bank panel cache returned no data.")
+        except Exception as e:
+            print(f"Warning: World Bank panel cache failed: {e}")
+        if ALL_ENTITIES in entities:
+            entities = [e for e in entities if e != ALL_ENTITIES] or ENTITY_GROUPS["OECD"]
+        return _generate_mock_data(entities, indicators, start_year, end_year)
+
     if not HAS_WBDATA:
         return _generate_mock_data(entities, indicators, start_year, end_year)
 
@@ -193,7 +218,9 @@ def _generate_mock_data(
             }
             records.append(record)
 
-    return pd.DataFrame(records)
+    data = pd.DataFrame(records)
+    data.attrs["mock"] = True
+    return data
 
 
 # =============================================================================
@@ -386,6 +413,153 @@ def compute_inflation_incentive(
     )
 
 
+def panel_linear_slope(wide: pd.DataFrame) -> pd.Series:
+    """
+    Compute linear regression slopes for every row of an (entity x year) frame.
+
+    Closed-form OLS on centered years, ignoring NaN cells; rows with fewer
+    than two observations get 0.0 (same convention as linear_slope).
+    """
+    y = wide.to_numpy(dtype=float)
+    x = wide.columns.to_numpy(dtype=float)
+    mask = ~np.isnan(y)
+    n = mask.sum(axis=1)
+
+    x = np.where(mask, x - x.mean(), 0.0)
+    y = np.where(mask, y, 0.0)
+    sx, sy = x.sum(axis=1), y.sum(axis=1)
+    sxx, sxy = (x * x).sum(axis=1), (x * y).sum(axis=1)
+    denom = n * sxx - sx * sx
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where((n >= 2) & (denom > 0), (n * sxy - sx * sy) / denom, 0.0)
+    return pd.Series(slope, index=wide.index)
+
+
+def compute_panel_scores(
+    data: pd.DataFrame,
+    end_year: int,
+    weights: Dict[str, float]
+) -> pd.DataFrame:
+    """
+    Compute all pillar scores for every entity at once.
+
+    Vectorized equivalent of calling compute_aging_pressure,
+    compute_debt_dynamics, compute_bloat_index and compute_growth_drag per
+    entity. Entities without an end-year row get zero scores and
+    ``has_end_year = False``.
+
+    Returns:
+        DataFrame indexed by entity with pillar scores, composite scores
+        and the underlying metrics
+    """
+    data = data.drop_duplicates(["entity", "year"])
+    entities = pd.Index(data["entity"].unique(), name="entity")
+    cross_end = data[data["year"] == end_year]
+    end = cross_end.set_index("entity").reindex(entities)
+
+    def _wide(column: str, since: int) -> pd.DataFrame:
+        recent = data[data["year"] >= since]
+        return recent.pivot(index="entity", columns="year", values=column).reindex(entities)
+
+    out = pd.DataFrame(index=entities)
+    out["has_end_year"] = entities.isin(cross_end["entity"])
+
+    # Aging pressure
+    out["aging_level"] = end["old_age_dependency"]
+    out["aging_slope_10y"] = panel_linear_slope(_wide("old_age_dependency", end_year - 10))
+    out["level_zscore"] = (
+        (out["aging_level"] - cross_end["old_age_dependency"].mean())
+        / cross_end["old_age_dependency"].std()
+    )
+    out["slope_zscore"] = out["aging_slope_10y"] / 0.5
+    out["aging_pressure"] = 0.5 * out["level_zscore"] + 0.5 * out["slope_zscore"]
+
+    # Debt dynamics
+    out["debt_level"] = end["debt_to_gdp"]
+    out["debt_slope_5y"] = panel_linear_slope(_wide("debt_to_gdp", end_year - 5))
+    out["nominal_rate"] = end["lending_rate"] if "lending_rate" in end else 3.0
+    out["nominal_growth"] = end["real_gdp_growth"] + end["cpi_inflation"]
+    out["r_minus_g"] = out["nominal_rate"] - out["nominal_growth"]
+    debt_z = (
+        (out["debt_level"] - cross_end["debt_to_gdp"].mean())
+        / np.maximum(cross_end["debt_to_gdp"].std(), 1)
+    )
+    out["debt_dynamics"] = 0.5 * debt_z + 0.3 * (out["debt_slope_5y"] / 3.0) + 0.2 * (out["r_minus_g"] / 2.0)
+
+    # Bloat index
+    out["gov_consumption"] = end["gov_consumption"]
+    out["gov_expenditure"] = end["gov_expenditure"] if "gov_expenditure" in end else end["gov_consumption"] * 2
+    cons_z = (
+        (out["gov_consumption"] - cross_end["gov_consumption"].mean())
+        / np.maximum(cross_end["gov_consumption"].std(), 1)
+    )
+    exp_z = (
+        (out["gov_expenditure"] - cross_end["gov_expenditure"].mean())
+        / np.maximum(cross_end["gov_expenditure"].std(), 1)
+    )
+    out["bloat_index"] = 0.6 * cons_z + 0.4 * exp_z
+
+    # Growth drag
+    out["real_gdp_growth"] = end["real_gdp_growth"]
+    out["nominal_gdp_growth"] = out["nominal_growth"]
+    growth_z = (
+        out["nominal_growth"] - cross_end["real_gdp_growth"].mean() - cross_end["cpi_inflation"].mean()
+    ) / 3.0
+    out["growth_drag"] = -growth_z
+
+    # Entities without end-year data score zero (as in analyze_entity)
+    pillars = ["aging_pressure", "debt_dynamics", "bloat_index", "growth_drag"]
+    out.loc[~out["has_end_year"], pillars] = 0.0
+
+    out["fiscal_trap_score"] = (
+        weights["aging"] * out["aging_pressure"] +
+        weights["debt"] * out["debt_dynamics"] +
+        weights["bloat"] * out["bloat_index"] +
+        weights["growth_drag"] * out["growth_drag"]
+    )
+    out["inflation_incentive_score"] = compute_inflation_incentive(
+        out["debt_level"].where(out["has_end_year"], 100),
+        out["r_minus_g"].where(out["has_end_year"], 0),
+        out["bloat_index"],
+    )
+
+    return out
+
+
+def _entity_result_from_row(entity: str, row: pd.Series) -> EntityResult:
+    """Build an EntityResult from a compute_panel_scores row."""
+    def _metrics(keys: List[str]) -> Dict[str, float]:
+        if not row["has_end_year"]:
+            return {}
+        return {k: float(row[k]) for k in keys}
+
+    aging_score = float(row["aging_pressure"])
+    debt_score = float(row["debt_dynamics"])
+    fiscal_trap_score = float(row["fiscal_trap_score"])
+
+    return EntityResult(
+        entity=entity,
+        entity_name=entity,
+        scores={
+            "fiscal_trap_score": round(fiscal_trap_score, 2),
+            "inflation_incentive_score": round(float(row["inflation_incentive_score"]), 2),
+            "aging_pressure": round(aging_score, 2),
+            "debt_dynamics": round(debt_score, 2),
+            "bloat_index": round(float(row["bloat_index"]), 2),
+            "growth_drag": round(float(row["growth_drag"]), 2),
+        },
+        risk_level=classify_risk_level(fiscal_trap_score),
+        quadrant=classify_quadrant(aging_score, debt_score),
+        key_metrics={
+            "demographics": _metrics(["aging_level", "aging_slope_10y", "level_zscore", "slope_zscore"]),
+            "debt": _metrics(["debt_level", "debt_slope_5y", "r_minus_g", "nominal_rate", "nominal_growth"]),
+            "expenditure": _metrics(["gov_consumption", "gov_expenditure"]),
+            "growth": _metrics(["real_gdp_growth", "nominal_gdp_growth"]),
+        }
+    )
+
+
 def classify_quadrant(aging_pressure: float, debt_dynamics: float) -> Dict[str, str]:
     """Classify entity into quadrant based on aging and debt scores."""
     threshold = 1.0
@@ -509,7 +683,9 @@ def analyze_demographic_fiscal_trap(
     start_year: int,
     end_year: int,
     forecast_end_year: int = 2050,
-    weights: Optional[Dict[str, float]] = None
+    weights: Optional[Dict[str, float]] = None,
+    cache: Optional[WorldBankPanelCache] = None,
+    force_refresh: bool = False
 ) -> AnalysisResult:
     """
     Main entry point for demographic-fiscal trap analysis.
@@ -520,6 +696,8 @@ def analyze_demographic_fiscal_trap(
         end_year: Historical data end year
         forecast_end_year: Projection end year (for aging forecasts)
         weights: Custom pillar weights
+        cache: Optional World Bank panel cache
+        force_refresh: Ignore cached cells
 
     Returns:
         AnalysisResult with full analysis
@@ -531,14 +709,25 @@ def analyze_demographic_fiscal_trap(
     entities = expand_entity_groups(entities)
 
     # Fetch data
-    print(f"Fetching data for {len(entities)} entities...")
-    data = fetch_worldbank_data(entities, WORLD_BANK_INDICATORS, start_year, end_year)
-
-    # Analyze each entity
-    results = []
-    for entity in entities:
-        result = analyze_entity(entity, data, end_year, weights)
-        results.append(result)
+    if ALL_ENTITIES in entities:
+        print("Fetching data for all World Bank economies...")
+    else:
+        print(f"Fetching data for {len(entities)} entities...")
+    data = fetch_worldbank_data(
+        entities, WORLD_BANK_INDICATORS, start_year, end_year,
+        cache=cache, force_refresh=force_refresh
+    )
+    if ALL_ENTITIES in entities:
+        entities = sorted(data["entity"].unique())
+
+    # Score all entities in one cross-sectional pass
+    panel_scores = compute_panel_scores(data, end_year, weights)
+    results = [
+        _entity_result_from_row(entity, panel_scores.loc[entity])
+        if entity in panel_scores.index
+        else EntityResult(entity=entity, entity_name=entity)
+        for entity in entities
+    ]
 
     # Sort by fiscal trap score
     results.sort(key=lambda x: x.scores.get("fiscal_trap_score", 0), reverse=True)
@@ -586,7 +775,8 @@ def analyze_demographic_fiscal_trap(
                 "primary": "World Bank WDI",
                 "fallback": "IMF WEO",
             },
-            "mock_data_used": not HAS_WBDATA,
+            "mock_data_used": bool(data.attrs.get("mock", False)),
+            "cache": cache.last_stats if cache is not None else None,
         }
     )
 
@@ -635,6 +825,33 @@ def main():
         default=None,
         help="Custom weights as JSON string"
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="World Bank panel cache directory (default: data/wb_cache)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the panel cache and query the API directly"
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore cached cells and refetch the requested panel"
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Serve from the panel cache only (no network)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Concurrent indicator requests (default: 4)"
+    )
 
     args = parser.parse_args()
 
@@ -643,6 +860,14 @@ def main():
     if args.weights:
         weights = json.loads(args.weights)
 
+    cache = None
+    if not args.no_cache:
+        cache = WorldBankPanelCache(
+            cache_dir=args.cache_dir,
+            max_workers=args.workers,
+            offline=args.offline,
+        )
+
     # Run analysis
     result = analyze_demographic_fiscal_trap(
         entities=args.entities,
@@ -650,6 +875,8 @@ def main():
         end_year=args.end_year,
         forecast_end_year=args.forecast_end_year,
         weights=weights,
+        cache=cache,
+        force_refresh=args.refresh,
     )
 
     # Output
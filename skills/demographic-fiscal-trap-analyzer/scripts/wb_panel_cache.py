@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+World Bank Panel Cache
+======================
+
+Local panel cache of World Bank WDI indicators for the fiscal trap analyzer.
+
+- One Parquet file per indicator in long format (entity, year, value)
+- Year-level incremental refresh: only (entity, year) cells missing from the
+  cache are requested; recent years are re-requested once the cache is older
+  than ``max_age_days`` to pick up WDI revisions
+- Requested cells the API has no row for (e.g. the latest, not yet
+  published year) are stored as nulls, so a warm run stays offline until the
+  recent window goes stale
+- Indicators are fetched concurrently (one request per indicator and
+  missing year span)
+- Failed indicators fall back to whatever is cached
+
+Usage:
+    python wb_panel_cache.py --entities ALL --start-year 2000 --end-year 2023
+    python wb_panel_cache.py --entities G7 --start-year 2010 --end-year 2023 --refresh
+    python wb_panel_cache.py --info
+
+Dependencies:
+    pip install pandas pyarrow wbdata
+"""
+
+import argparse
+import datetime
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+
+try:
+    import wbdata
+    HAS_WBDATA = True
+except ImportError:
+    HAS_WBDATA = False
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "data" / "wb_cache"
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_AGE_DAYS = 30
+DEFAULT_RECENT_YEARS = 2  # 過期時重抓最近 N 年（WDI 會回補修正）
+
+ALL_ENTITIES = "ALL"
+META_FILE = "panel_meta.json"
+
+
+class WorldBankPanelCache:
+    """
+    Per-indicator Parquet cache of World Bank panel data.
+
+    The cache stores every requested cell, including rows with null values
+    and cells the API returned nothing for, so a cell that exists on disk is
+    never requested again unless it falls in the stale "recent years" window.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_age_days: int = DEFAULT_MAX_AGE_DAYS,
+        recent_years: int = DEFAULT_RECENT_YEARS,
+        offline: bool = False,
+    ):
+        """
+        Parameters:
+            cache_dir: Cache directory (default: <skill>/data/wb_cache)
+            max_workers: Concurrent indicator requests
+            max_age_days: Age after which recent years are re-requested
+            recent_years: Size of the re-requested recent window
+            offline: Serve from cache only, never hit the network
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max(1, max_workers)
+        self.max_age_days = max_age_days
+        self.recent_years = recent_years
+        self.offline = offline or not HAS_WBDATA
+
+        self.meta = self._load_meta()
+        self.last_stats: Dict[str, Any] = {}
+
+    # -------------------------------------------------------------------------
+    # Storage
+    # -------------------------------------------------------------------------
+
+    def _indicator_path(self, code: str) -> Path:
+        return self.cache_dir / f"{code.replace('.', '_')}.parquet"
+
+    def _load_meta(self) -> Dict[str, Any]:
+        path = self.cache_dir / META_FILE
+        if not path.exists():
+            return {"indicators": {}, "countries": None}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return {"indicators": {}, "countries": None}
+
+    def _save_meta(self) -> None:
+        with open(self.cache_dir / META_FILE, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, ensure_ascii=False, indent=2)
+
+    def _read_indicator(self, code: str) -> pd.DataFrame:
+        path = self._indicator_path(code)
+        if not path.exists():
+            return pd.DataFrame({
+                "entity": pd.Series(dtype="string"),
+                "year": pd.Series(dtype="int32"),
+                "value": pd.Series(dtype="float64"),
+            })
+        return pd.read_parquet(path)
+
+    def _write_indicator(self, code: str, df: pd.DataFrame) -> None:
+        df = df.astype({"entity": "string", "year": "int32", "value": "float64"})
+        df = df.sort_values(["entity", "year"]).reset_index(drop=True)
+        df.to_parquet(self._indicator_path(code), index=False)
+
+    # -------------------------------------------------------------------------
+    # Entity resolution
+    # -------------------------------------------------------------------------
+
+    def resolve_entities(self, entities: List[str]) -> List[str]:
+        """
+        Resolve ``ALL`` to every non-aggregate WB economy (cached in meta).
+        """
+        if not any(e.upper() == ALL_ENTITIES for e in entities):
+            return sorted(set(entities))
+
+        countries = self.meta.get("countries")
+        if not countries and not self.offline:
+            countries = sorted(
+                c["id"] for c in wbdata.get_countries()
+                if c.get("region", {}).get("value") != "Aggregates"
+            )
+            self.meta["countries"] = countries
+            self._save_meta()
+        if not countries:
+            # Offline without a country list: use every entity already cached
+            countries = sorted({
+                e for code in self.meta.get("indicators", {})
+                for e in self._read_indicator(code)["entity"].unique()
+            })
+
+        others = [e for e in entities if e.upper() != ALL_ENTITIES]
+        return sorted(set(countries) | set(others))
+
+    # -------------------------------------------------------------------------
+    # Incremental refresh
+    # -------------------------------------------------------------------------
+
+    def _is_stale(self, code: str) -> bool:
+        info = self.meta.get("indicators", {}).get(code)
+        if not info or "fetched_at" not in info:
+            return True
+        fetched_at = datetime.datetime.fromisoformat(info["fetched_at"])
+        age = datetime.datetime.now() - fetched_at
+        return age.days >= self.max_age_days
+
+    def missing_cells(
+        self,
+        code: str,
+        entities: List[str],
+        years: range,
+        force_refresh: bool = False,
+    ) -> List[Tuple[List[str], List[int]]]:
+        """
+        Year-level diff between the request and the cache.
+
+        Entities with the same missing year span are batched together so a
+        newly added country does not force a full refetch for the others.
+
+        Returns:
+            List of (entities, sorted years) batches to request
+        """
+        if force_refresh:
+            return [(list(entities), list(years))] if entities else []
+
+        cached = self._read_indicator(code)
+        have: Dict[str, Set[int]] = (
+            cached.groupby("entity")["year"].agg(set).to_dict() if not cached.empty else {}
+        )
+
+        stale_years: Set[int] = set()
+        if self._is_stale(code) and not cached.empty:
+            last_year = int(cached["year"].max())
+            stale_years = set(range(last_year - self.recent_years + 1, last_year + 1))
+
+        wanted = set(years)
+        batches: Dict[Tuple[int, int], List[str]] = {}
+        for entity in entities:
+            missing = (wanted - have.get(entity, set())) | (wanted & stale_years)
+            if missing:
+                batches.setdefault((min(missing), max(missing)), []).append(entity)
+
+        return [
+            (batch_entities, list(range(lo, hi + 1)))
+            for (lo, hi), batch_entities in sorted(batches.items())
+        ]
+
+    def _fetch_indicator(
+        self,
+        code: str,
+        entities: List[str],
+        years: List[int],
+    ) -> pd.DataFrame:
+        """
+        One API request covering the span of the missing years.
+
+        Every requested (entity, year) cell is returned; cells the API has no
+        row for get a null value so they are recorded as requested-but-empty.
+        """
+        rows = wbdata.get_data(
+            code,
+            country=entities,
+            date=(str(years[0]), str(years[-1])),
+        )
+        records = [
+            {
+                "entity": r.get("countryiso3code") or r["country"]["id"],
+                "year": int(r["date"]),
+                "value": r["value"],
+            }
+            for r in (rows or [])
+            if r.get("date", "").isdigit()
+        ]
+        returned = {(r["entity"], r["year"]) for r in records}
+        records += [
+            {"entity": entity, "year": year, "value": None}
+            for entity in entities
+            for year in years
+            if (entity, year) not in returned
+        ]
+        return pd.DataFrame(records, columns=["entity", "year", "value"])
+
+    def refresh(
+        self,
+        indicators: Dict[str, str],
+        entities: List[str],
+        start_year: int,
+        end_year: int,
+        force_refresh: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Bring the cache up to date for the requested panel.
+
+        Parameters:
+            indicators: Dict mapping indicator names to WB codes
+            entities: Resolved ISO3 codes
+            start_year, end_year: Inclusive year range
+            force_refresh: Ignore cached cells
+
+        Returns:
+            Stats dict: fetched/cached indicators, cells fetched, errors, timing
+        """
+        years = range(start_year, end_year + 1)
+        stats = {
+            "fetched": [],
+            "cache_hits": [],
+            "cells_fetched": 0,
+            "errors": {},
+            "elapsed_seconds": 0.0,
+        }
+        t0 = time.perf_counter()
+
+        plan = {}
+        for code in indicators.values():
+            batches = self.missing_cells(code, entities, years, force_refresh)
+            if batches and not self.offline:
+                plan[code] = batches
+            else:
+                stats["cache_hits"].append(code)
+
+        if plan:
+            fresh_frames: Dict[str, List[pd.DataFrame]] = {code: [] for code in plan}
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {
+                    pool.submit(self._fetch_indicator, code, ents, yrs): code
+                    for code, batches in plan.items()
+                    for ents, yrs in batches
+                }
+                for future in as_completed(futures):
+                    code = futures[future]
+                    try:
+                        fresh_frames[code].append(future.result())
+                    except Exception as e:  # keep cached data for this indicator
+                        stats["errors"][code] = str(e)
+
+            for code, frames in fresh_frames.items():
+                if code in stats["errors"] or not frames:
+                    continue
+                fresh = pd.concat(frames, ignore_index=True)
+                cached = self._read_indicator(code)
+                merged = pd.concat([cached, fresh], ignore_index=True)
+                merged = merged.drop_duplicates(["entity", "year"], keep="last")
+                self._write_indicator(code, merged)
+
+                self.meta.setdefault("indicators", {})[code] = {
+                    "fetched_at": datetime.datetime.now().isoformat(timespec="seconds"),
+                    "rows": int(len(merged)),
+                }
+                stats["fetched"].append(code)
+                stats["cells_fetched"] += int(len(fresh))
+
+            self._save_meta()
+
+        stats["elapsed_seconds"] = round(time.perf_counter() - t0, 3)
+        self.last_stats = stats
+        return stats
+
+    # -------------------------------------------------------------------------
+    # Loading
+    # -------------------------------------------------------------------------
+
+    def load_panel(
+        self,
+        indicators: Dict[str, str],
+        entities: List[str],
+        start_year: int,
+        end_year: int,
+        force_refresh: bool = False,
+    ) -> pd.DataFrame:
+        """
+        Refresh (if needed) and return the panel in analyzer format.
+
+        Returns:
+            DataFrame with columns entity, year and one column per indicator name
+        """
+        entities = self.resolve_entities(entities)
+        self.refresh(indicators, entities, start_year, end_year, force_refresh)
+
+        wanted = set(entities)
+        frames = []
+        for name, code in indicators.items():
+            df = self._read_indicator(code)
+            df = df[df["entity"].isin(wanted) & df["year"].between(start_year, end_year)]
+            frames.append(df.set_index(["entity", "year"])["value"].rename(name))
+
+        if not frames:
+            return pd.DataFrame(columns=["entity", "year"])
+
+        panel = pd.concat(frames, axis=1).reset_index()
+        panel["entity"] = panel["entity"].astype(object)
+        panel["year"] = panel["year"].astype(int)
+        return panel.sort_values(["entity", "year"]).reset_index(drop=True)
+
+    def info(self) -> Dict[str, Any]:
+        """Summary of cached indicators."""
+        summary = {}
+        for code, meta in self.meta.get("indicators", {}).items():
+            df = self._read_indicator(code)
+            summary[code] = {
+                **meta,
+                "entities": int(df["entity"].nunique()),
+                "years": [int(df["year"].min()), int(df["year"].max())] if not df.empty else None,
+                "stale": self._is_stale(code),
+            }
+        return {
+            "cache_dir": str(self.cache_dir),
+            "countries_cached": len(self.meta.get("countries") or []),
+            "indicators": summary,
+        }
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main():
+    from fiscal_trap_analyzer import WORLD_BANK_INDICATORS, expand_entity_groups
+
+    parser = argparse.ArgumentParser(description="World Bank panel cache")
+    parser.add_argument("--entities", "-e", nargs="+", default=[ALL_ENTITIES],
+                        help="Country codes, groups (G7, OECD, ...) or ALL")
+    parser.add_argument("--start-year", "-s", type=int, default=2000)
+    parser.add_argument("--end-year", "-y", type=int, default=datetime.date.today().year - 1)
+    parser.add_argument("--cache-dir", type=str, default=None)
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS)
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached cells")
+    parser.add_argument("--info", action="store_true", help="Show cache summary only")
+
+    args = parser.parse_args()
+
+    cache = WorldBankPanelCache(cache_dir=args.cache_dir, max_workers=args.workers)
+
+    if args.info:
+        print(json.dumps(cache.info(), indent=2, ensure_ascii=False))
+        return
+
+    panel = cache.load_panel(
+        WORLD_BANK_INDICATORS,
+        expand_entity_groups(args.entities),
+        args.start_year,
+        args.end_year,
+        force_refresh=args.refresh,
+    )
+    print(json.dumps({
+        "entities": int(panel["entity"].nunique()) if not panel.empty else 0,
+        "rows": int(len(panel)),
+        "stats": cache.last_stats,
+    }, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,14 +7,17 @@ FRED 資料抓取工具
 
 import json
 import random
-import time
+import sys
 from datetime import datetime, timedelta
 from io import StringIO
 from pathlib import Path
 from typing import Dict, List, Optional, Union
+from urllib.parse import urlparse
 
 import pandas as pd
-import requests
+
+sys.path.insert(0, str(Path(__file__).parent))
+import http_client
 
 # ============================================================================
 # 常數定義
@@ -30,6 +33,9 @@ USER_AGENTS = [
     'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36',
 ]
 
+# 連續請求 FRED 之間的隨機間隔（由共用 HTTP 客戶端負責，第一次請求不等待）
+http_client.limit_host(urlparse(FRED_CSV_URL).netloc, min_interval=0.5, max_interval=1.5)
+
 # ============================================================================
 # 快取函數
 # ============================================================================
@@ -80,11 +86,6 @@ def save_cache(cache_path: Path, series: pd.Series, series_id: str) -> None:
 # ============================================================================
 
 
-def random_delay(min_sec: float = 0.3, max_sec: float = 1.0) -> None:
-    """模擬人類行為的隨機延遲"""
-    time.sleep(random.uniform(min_sec, max_sec))
-
-
 def get_headers() -> Dict[str, str]:
     """取得隨機 User-Agent"""
     return {
@@ -132,7 +133,6 @@ def fetch_fred_series(
 
     # 抓取新資料
     print(f"[Fetch] 抓取 FRED: {series_id}")
-    random_delay()
 
     params = {
         "id": series_id,
@@ -141,7 +141,7 @@ def fetch_fred_series(
     }
 
     try:
-        response = requests.get(
+        response = http_client.get(
             FRED_CSV_URL,
             params=params,
             headers=get_headers(),
@@ -195,7 +195,6 @@ def fetch_multiple_series(
         result[series_id] = fetch_fred_series(
             series_id, start_date, end_date, use_cache
         )
-        random_delay(0.5, 1.5)  # 避免請求過快
     return result
 
 
@@ -28,6 +28,7 @@ Usage:
 
 import argparse
 import json
+import sys
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -35,10 +36,14 @@ from typing import Dict, Any, Optional, List
 
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).parent))
+from cdp_client import CDPError, cdp_execute_js, get_cdp_ws_url as _get_cdp_ws_url, get_session
+
 # ========== 配置區域 ==========
 CASS_FREIGHT_URL = "https://www.macromicro.me/charts/46877/cass-freight-index"
 CDP_PORT = 9222
 CACHE_MAX_AGE_HOURS = 12
+CHART_READY_TIMEOUT = 30  # 等待圖表就緒的上限（秒）
 
 # CASS Freight Index 四個指標的關鍵字
 CASS_SERIES_KEYWORDS = {
@@ -124,60 +129,7 @@ def get_cdp_ws_url(port: int = CDP_PORT, url_keyword: str = 'macromicro') -> Opt
     str or None
         WebSocket URL，若無法連接則返回 None
     """
-    import requests
-
-    try:
-        resp = requests.get(f'http://127.0.0.1:{port}/json', timeout=5)
-        pages = resp.json()
-
-        # 優先找包含關鍵字的頁面
-        for page in pages:
-            if url_keyword.lower() in page.get('url', '').lower():
-                return page.get('webSocketDebuggerUrl')
-
-        # 沒找到就返回第一個頁面
-        return pages[0].get('webSocketDebuggerUrl') if pages else None
-
-    except Exception as e:
-        print(f"[CDP] 無法連接到 Chrome (port {port}): {e}")
-        return None
-
-
-def cdp_execute_js(ws_url: str, js_code: str, timeout: int = 30) -> Any:
-    """
-    透過 CDP 執行 JavaScript
-
-    Parameters
-    ----------
-    ws_url : str
-        WebSocket URL
-    js_code : str
-        要執行的 JavaScript 代碼
-    timeout : int
-        連線超時秒數
-
-    Returns
-    -------
-    Any
-        JavaScript 執行結果
-    """
-    import websocket
-
-    ws = websocket.create_connection(ws_url, timeout=timeout)
-
-    cmd = {
-        "id": 1,
-        "method": "Runtime.evaluate",
-        "params": {
-            "expression": js_code,
-            "returnByValue": True
-        }
-    }
-    ws.send(json.dumps(cmd))
-    result = json.loads(ws.recv())
-    ws.close()
-
-    return result
+    return _get_cdp_ws_url(port, url_keyword)
 
 
 def fetch_via_cdp(port: int = CDP_PORT) -> Dict[str, Any]:
@@ -215,6 +167,12 @@ def fetch_via_cdp(port: int = CDP_PORT) -> Dict[str, Any]:
             f'    "{CASS_FREIGHT_URL}"'
         )
 
+    # 頁面可能仍在載入：等 Highcharts 出現資料且點數穩定
+    try:
+        get_session(ws_url).wait_for_highcharts(timeout=CHART_READY_TIMEOUT)
+    except CDPError as e:
+        print(f"[CDP] 圖表尚未就緒（{e}），仍嘗試提取...")
+
     print(f"[CDP] 已連接，正在提取 Highcharts 數據...")
     result = cdp_execute_js(ws_url, EXTRACT_HIGHCHARTS_JS)
 
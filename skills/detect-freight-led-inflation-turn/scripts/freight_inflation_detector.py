@@ -14,13 +14,16 @@ Usage:
 
 import argparse
 import json
+import sys
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, Dict, Any
 
 import numpy as np
 import pandas as pd
-import requests
+
+sys.path.insert(0, str(Path(__file__).parent))
+import http_client
 
 # ========== 配置區域 ==========
 # CASS Freight Index 指標
@@ -45,6 +48,9 @@ DEFAULT_YOY_THRESHOLD = 0.0
 
 # 快取設定
 CACHE_MAX_AGE_HOURS = 12
+
+# 分析產物（供 visualize_freight_cpi.py 離線繪圖）
+BUNDLE_NAME = "freight_cpi"
 # ==============================
 
 
@@ -70,7 +76,7 @@ def fetch_fred_cpi(
     print(f"[Fetching] CPI from FRED...")
 
     try:
-        response = requests.get(url, timeout=30)
+        response = http_client.get(url, timeout=30)
         response.raise_for_status()
 
         from io import StringIO
@@ -360,7 +366,8 @@ def run_analysis(
     lead_months: int = DEFAULT_LEAD_MONTHS,
     yoy_threshold: float = DEFAULT_YOY_THRESHOLD,
     cycle_window: int = DEFAULT_CYCLE_WINDOW,
-    cache_dir: Optional[str] = None
+    cache_dir: Optional[str] = None,
+    bundle_dir: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     執行完整分析
@@ -381,6 +388,8 @@ def run_analysis(
         週期窗口
     cache_dir : str, optional
         快取目錄
+    bundle_dir : str, optional
+        若指定，將分析使用的序列與結果寫成分析產物（{bundle_dir}/freight_cpi.arrow/.json）
 
     Returns
     -------
@@ -514,6 +523,17 @@ def run_analysis(
         ]
     }
 
+    if bundle_dir:
+        from analysis_bundle import write_bundle
+
+        bundle_series = {f"cass_{key}": df.iloc[:, 0] for key, df in cass_data.items()}
+        bundle_series.update({
+            "cpi": cpi_series,
+            "freight_yoy": freight_yoy,
+            "cpi_yoy": cpi_yoy,
+        })
+        write_bundle(bundle_dir, BUNDLE_NAME, bundle_series, result)
+
     return result
 
 
@@ -640,6 +660,12 @@ def main():
         default=None,
         help="輸出檔案路徑 (JSON)"
     )
+    parser.add_argument(
+        "--bundle-dir",
+        type=str,
+        default=None,
+        help="分析產物目錄（預設: {cache-dir}/bundle）"
+    )
 
     args = parser.parse_args()
 
@@ -656,7 +682,8 @@ def main():
                 indicator=args.indicator,
                 lead_months=args.lead_months,
                 yoy_threshold=args.yoy_threshold,
-                cache_dir=args.cache_dir
+                cache_dir=args.cache_dir,
+                bundle_dir=args.bundle_dir or str(Path(args.cache_dir) / "bundle")
             )
             print("\n" + "=" * 60)
             print("CASS Freight Index - 通膨先行訊號完整分析")
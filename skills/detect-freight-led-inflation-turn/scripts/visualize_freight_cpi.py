@@ -8,6 +8,10 @@ CASS Freight Index vs CPI YoY 領先性視覺化
 2. 雙軸對比：CPI YoY (左軸) vs CASS (右軸)
 3. 衰退區間標記 (NBER Recession)
 4. Bloomberg 風格配色
+
+資料來源優先讀取 freight_inflation_detector.py 寫出的分析產物
+（cache/bundle/freight_cpi.arrow + .json），圖表與分析使用完全相同的序列，
+不需連網；找不到產物時才退回讀取 CASS 快取並從 FRED 抓取 CPI。
 """
 
 import matplotlib
@@ -20,9 +24,12 @@ import pandas as pd
 import numpy as np
 import json
 import argparse
+import sys
 from pathlib import Path
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).parent))
+
 # 中文字體設定
 plt.rcParams['font.sans-serif'] = ['Microsoft JhengHei', 'SimHei', 'PingFang TC', 'DejaVu Sans']
 plt.rcParams['axes.unicode_minus'] = False
@@ -78,15 +85,42 @@ def load_cass_data(cache_path: str) -> pd.DataFrame:
     return pd.DataFrame(result)
 
 
+def load_bundle_data(bundle_dir: str):
+    """
+    從分析產物載入 CASS 與 CPI YoY
+
+    Returns
+    -------
+    tuple or None
+        (cass_df, cpi_yoy, result)；產物不存在時回傳 None
+    """
+    from analysis_bundle import bundle_exists, read_bundle
+
+    if not bundle_exists(bundle_dir, "freight_cpi"):
+        return None
+
+    bundle = read_bundle(bundle_dir, "freight_cpi")
+    cass_df = pd.DataFrame({
+        key: bundle.series(key)
+        for key in ("cass_shipments_yoy", "cass_expenditures_yoy")
+        if key in bundle
+    })
+    return cass_df, bundle.get("cpi_yoy"), bundle.result
+
+
 def fetch_cpi_data(start_date: str = "1990-01-01") -> pd.Series:
     """從 FRED 獲取 CPI YoY 數據"""
     try:
-        import requests
+        from io import StringIO
+
+        import http_client
 
         # FRED API - CPI All Items YoY
         url = f"https://fred.stlouisfed.org/graph/fredgraph.csv?id=CPIAUCSL&cosd={start_date}"
 
-        df = pd.read_csv(url)
+        response = http_client.get(url, timeout=30)
+        response.raise_for_status()
+        df = pd.read_csv(StringIO(response.text))
         # 處理不同的列名格式
         date_col = df.columns[0]
         value_col = df.columns[1]
@@ -283,8 +317,10 @@ def plot_freight_cpi_comparison(
 
 def main():
     parser = argparse.ArgumentParser(description='CASS Freight vs CPI 視覺化')
+    parser.add_argument('--bundle', type=str, default='cache/bundle',
+                       help='分析產物目錄（freight_inflation_detector.py 輸出）')
     parser.add_argument('--cache', type=str, default='cache/cass_freight_cdp.json',
-                       help='CASS 數據快取路徑')
+                       help='CASS 數據快取路徑（找不到分析產物時使用）')
     parser.add_argument('--output', type=str, default=None,
                        help='輸出路徑（預設: output/freight_cpi_YYYY-MM-DD.png）')
     parser.add_argument('--lead-months', type=int, default=6,
@@ -303,15 +339,22 @@ def main():
     else:
         output_path = args.output
 
-    # 載入 CASS 數據
-    print("載入 CASS Freight Index 數據...")
-    cass_df = load_cass_data(args.cache)
+    bundled = load_bundle_data(args.bundle)
+    if bundled is not None:
+        print(f"載入分析產物: {args.bundle}")
+        cass_df, cpi_yoy, _ = bundled
+        if args.no_cpi:
+            cpi_yoy = None
+    else:
+        # 載入 CASS 數據
+        print("找不到分析產物，改讀 CASS 快取...")
+        cass_df = load_cass_data(args.cache)
+        cpi_yoy = None
     print(f"  數據範圍: {cass_df.index.min()} ~ {cass_df.index.max()}")
     print(f"  最新 Shipments YoY: {cass_df['cass_shipments_yoy'].iloc[-1]:.2f}%")
 
     # 獲取 CPI 數據
-    cpi_yoy = None
-    if not args.no_cpi:
+    if bundled is None and not args.no_cpi:
         print("\n獲取 CPI 數據...")
         cpi_yoy = fetch_cpi_data(args.start)
         if cpi_yoy is not None:
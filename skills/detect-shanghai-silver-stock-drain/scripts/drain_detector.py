@@ -14,6 +14,8 @@ Usage:
     python drain_detector.py --start 2020-01-01 --end 2026-01-16 --output result.json
 """
 
+from __future__ import annotations
+
 import argparse
 import json
 import os
@@ -23,14 +25,22 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 
-import numpy as np
-import pandas as pd
+sys.path.insert(0, str(Path(__file__).parent))
+import instrumentation
+from cli_startup import lazy_module, read_snapshot, snapshot_key, write_snapshot
+
+# numpy / pandas 延遲載入：--help 與快照命中的 --quick 不需匯入
+np = lazy_module("numpy")
+pd = lazy_module("pandas")
 
 # 設定專案根目錄
 SCRIPT_DIR = Path(__file__).parent
 SKILL_DIR = SCRIPT_DIR.parent
 DATA_DIR = SKILL_DIR / "data"
 
+# --quick 結果快照（同一天且庫存檔未變時直接讀回）
+QUICK_SNAPSHOT_PATH = SKILL_DIR / "cache" / "quick_snapshot.json"
+
 
 @dataclass
 class DrainConfig:
@@ -97,7 +107,10 @@ def load_stock_data(sources: List[str], auto_fetch: bool = True) -> pd.DataFrame
     # 主要使用 SHFE 數據（來自 CEIC）
     shfe_path = DATA_DIR / "shfe_stock.csv"
 
-    if not shfe_path.exists():
+    if shfe_path.exists():
+        instrumentation.cache_hit()
+    else:
+        instrumentation.cache_miss()
         if auto_fetch:
             print("數據檔案不存在，正在從 CEIC 抓取...")
             try:
@@ -347,17 +360,21 @@ def analyze(config: DrainConfig) -> DrainResult:
         分析結果
     """
     # 載入數據
-    df = load_stock_data(config.include_sources)
+    with instrumentation.stage("load") as st:
+        df = load_stock_data(config.include_sources)
+        st.add_rows(len(df))
 
     # 合併庫存
-    df = build_combined_stock(df, config.unit)
+    with instrumentation.stage("combine", rows=len(df)):
+        df = build_combined_stock(df, config.unit)
 
     # 計算耗盡指標
-    df = compute_drain_metrics(
-        df,
-        smooth=config.smoothing_window_weeks,
-        z_window=config.z_score_window_weeks
-    )
+    with instrumentation.stage("metrics", rows=len(df)):
+        df = compute_drain_metrics(
+            df,
+            smooth=config.smoothing_window_weeks,
+            z_window=config.z_score_window_weeks
+        )
 
     # 過濾日期範圍
     df = df[
@@ -366,12 +383,13 @@ def analyze(config: DrainConfig) -> DrainResult:
     ].reset_index(drop=True)
 
     # 判定訊號
-    signal, conditions = classify_signal(
-        df,
-        drain_z=config.drain_threshold_z,
-        accel_z=config.accel_threshold_z,
-        level_pctl=config.level_percentile_threshold
-    )
+    with instrumentation.stage("classify", rows=len(df)):
+        signal, conditions = classify_signal(
+            df,
+            drain_z=config.drain_threshold_z,
+            accel_z=config.accel_threshold_z,
+            level_pctl=config.level_percentile_threshold
+        )
 
     # 提取最新數據
     latest = df.iloc[-1]
@@ -422,6 +440,14 @@ def quick_check() -> Dict[str, Any]:
     }
 
 
+def quick_snapshot_key() -> str:
+    """--quick 快照鍵值：預設視窗依今天計算，輸入為 SHFE / SGE 庫存檔"""
+    return snapshot_key(
+        "drain_quick",
+        files=[DATA_DIR / "shfe_stock.csv", DATA_DIR / "sge_stock.csv"],
+    )
+
+
 def main():
     """主程式入口"""
     parser = argparse.ArgumentParser(
@@ -481,12 +507,26 @@ def main():
         default="",
         help="輸出檔案路徑"
     )
+    parser.add_argument(
+        "--no-snapshot",
+        action="store_true",
+        help="--quick 不讀寫結果快照，一律重新計算"
+    )
+    instrumentation.add_cli_arguments(parser)
 
     args = parser.parse_args()
+    instrumentation.configure_from_args(args, "drain_detector")
 
     if args.quick:
-        # 快速檢查模式
-        result = quick_check()
+        # 快速檢查模式：庫存檔未變時讀回快照（不匯入 pandas）；開啟診斷時一律重算
+        use_snapshot = not args.no_snapshot and not instrumentation.is_enabled()
+        result = read_snapshot(QUICK_SNAPSHOT_PATH, quick_snapshot_key()) if use_snapshot else None
+        if result is None:
+            result = quick_check()
+            # 鍵值在計算後取得：缺檔時 quick_check 會自動抓取並寫出庫存檔
+            if use_snapshot:
+                write_snapshot(QUICK_SNAPSHOT_PATH, quick_snapshot_key(), result)
+        result = instrumentation.attach(result)
         print(json.dumps(result, indent=2, ensure_ascii=False))
     else:
         # 完整分析模式
@@ -524,6 +564,7 @@ def main():
             "narrative": result.narrative,
             "caveats": result.caveats
         }
+        instrumentation.attach(result_dict)
 
         # 輸出
         output_json = json.dumps(result_dict, indent=2, ensure_ascii=False)
@@ -15,14 +15,18 @@ https://www.ceicdata.com/datapage/charts/o_china_cn-warehouse-stock-shanghai-fut
 import json
 import random
 import re
+import sys
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
 from xml.etree import ElementTree as ET
 
 import pandas as pd
-import requests
+
+sys.path.insert(0, str(Path(__file__).parent))
+import http_client
 
 try:
     from selenium import webdriver
@@ -115,9 +119,10 @@ def fetch_svg_with_requests(url: str) -> Optional[str]:
         }
 
         print(f"  使用 requests 獲取: {url[:80]}...")
-        time.sleep(random.uniform(0.5, 1.5))
+        # 同一主機連續請求間隔 0.5-1.5 秒（由共用 HTTP 客戶端負責）
+        http_client.limit_host(urlparse(url).netloc, min_interval=0.5, max_interval=1.5)
 
-        response = requests.get(url, headers=headers, timeout=30)
+        response = http_client.get(url, headers=headers, timeout=30)
         response.raise_for_status()
 
         return response.text
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+分析產物包（analysis bundle）
+
+分析器把「實際使用的時間序列」與「結果 JSON」寫成一組檔案，
+視覺化腳本直接讀取，不再重新抓取資料：
+
+    {bundle_dir}/{name}.arrow   # Arrow IPC（未壓縮，可 memory-map），date 索引 + 每條序列一欄
+    {bundle_dir}/{name}.json    # {"meta": {...}, "result": {...}}
+
+不同頻率的序列以日期外連接（outer join）存放，讀取時 `bundle.series(key)`
+會去除 NaN，還原成原本的頻率。
+
+Usage:
+    from analysis_bundle import write_bundle, read_bundle
+
+    write_bundle("cache/bundle", "freight", {"cpi_yoy": cpi_yoy}, result)
+    bundle = read_bundle("cache/bundle", "freight")
+    cpi_yoy = bundle.series("cpi_yoy")
+
+依賴: pip install pandas pyarrow
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Union
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+BUNDLE_VERSION = 1
+DATE_COLUMN = "date"
+
+
+class AnalysisBundle:
+    """
+    讀回的分析產物
+
+    Attributes
+    ----------
+    frame : pd.DataFrame
+        日期索引的寬表（所有序列）
+    result : dict
+        分析器輸出的結果 JSON
+    meta : dict
+        產生時間、產生者、參數等
+    """
+
+    def __init__(self, frame: pd.DataFrame, result: Dict[str, Any], meta: Dict[str, Any]):
+        self.frame = frame
+        self.result = result
+        self.meta = meta
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.frame.columns
+
+    def series(self, key: str) -> pd.Series:
+        """取出單一序列（去除外連接產生的 NaN）"""
+        return self.frame[key].dropna().rename(key)
+
+    def get(self, key: str) -> Optional[pd.Series]:
+        """同 series，不存在時回傳 None"""
+        return self.series(key) if key in self else None
+
+
+def _json_default(obj: Any) -> Any:
+    """numpy 純量轉回 Python 型別（避免 np.bool_ 被寫成字串），其餘以 str 表示"""
+    if isinstance(obj, (pd.Timestamp, datetime)):
+        return obj.isoformat()
+    if hasattr(obj, "item"):
+        return obj.item()
+    return str(obj)
+
+
+def _paths(bundle_dir: Union[str, Path], name: str):
+    bundle_dir = Path(bundle_dir)
+    return bundle_dir / f"{name}.arrow", bundle_dir / f"{name}.json"
+
+
+def bundle_exists(bundle_dir: Union[str, Path], name: str) -> bool:
+    """序列與結果檔是否都存在"""
+    table_path, json_path = _paths(bundle_dir, name)
+    return table_path.exists() and json_path.exists()
+
+
+def write_bundle(
+    bundle_dir: Union[str, Path],
+    name: str,
+    series: Mapping[str, Union[pd.Series, pd.DataFrame]],
+    result: Dict[str, Any],
+    meta: Optional[Dict[str, Any]] = None
+) -> Path:
+    """
+    寫出分析產物
+
+    Parameters
+    ----------
+    bundle_dir : str or Path
+        輸出目錄
+    name : str
+        產物名稱（檔名前綴）
+    series : Mapping
+        {欄名: 日期索引的 Series}；DataFrame 會以 "{key}.{column}" 展開
+    result : dict
+        分析結果（寫入 JSON；numpy 純量轉回 Python 型別，其餘無法序列化的值以 str 表示）
+    meta : dict, optional
+        額外的中繼資料（例如分析參數）
+
+    Returns
+    -------
+    Path
+        Arrow 檔路徑
+    """
+    if not HAS_PYARROW:
+        raise ImportError("寫出分析產物需要 pyarrow：pip install pyarrow")
+
+    columns = {}
+    for key, value in series.items():
+        if value is None:
+            continue
+        if isinstance(value, pd.DataFrame):
+            for col in value.columns:
+                columns[f"{key}.{col}"] = value[col]
+        else:
+            columns[key] = value
+
+    frame = pd.concat(columns, axis=1).sort_index() if columns else pd.DataFrame()
+    frame.index = pd.DatetimeIndex(frame.index, name=DATE_COLUMN)
+    frame.columns = [str(c) for c in frame.columns]
+
+    table_path, json_path = _paths(bundle_dir, name)
+    table_path.parent.mkdir(parents=True, exist_ok=True)
+
+    table = pa.Table.from_pandas(frame.reset_index(), preserve_index=False)
+    feather.write_feather(table, str(table_path), compression="uncompressed")
+
+    payload = {
+        "meta": {
+            "bundle_version": BUNDLE_VERSION,
+            "name": name,
+            "created_at": datetime.now().isoformat(),
+            "series": list(frame.columns),
+            "rows": len(frame),
+            **(meta or {}),
+        },
+        "result": result,
+    }
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2, default=_json_default)
+
+    print(f"[Bundle] 已寫出 {table_path.name} + {json_path.name}（{len(frame.columns)} 條序列）")
+    return table_path
+
+
+def read_bundle(bundle_dir: Union[str, Path], name: str) -> AnalysisBundle:
+    """
+    讀取分析產物（Arrow 檔以 memory-map 開啟）
+
+    Raises
+    ------
+    FileNotFoundError
+        產物不存在（請先執行分析器）
+    """
+    if not HAS_PYARROW:
+        raise ImportError("讀取分析產物需要 pyarrow：pip install pyarrow")
+
+    table_path, json_path = _paths(bundle_dir, name)
+    if not (table_path.exists() and json_path.exists()):
+        raise FileNotFoundError(f"找不到分析產物 {table_path}，請先執行分析器")
+
+    frame = feather.read_table(str(table_path), memory_map=True).to_pandas()
+    frame = frame.set_index(DATE_COLUMN)
+
+    with open(json_path, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+
+    return AnalysisBundle(frame, payload.get("result", {}), payload.get("meta", {}))
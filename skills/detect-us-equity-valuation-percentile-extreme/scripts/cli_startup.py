@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+CLI 啟動加速（只用標準庫）
+
+技能腳本常被 agent 以 `--quick` / `--help` 反覆呼叫，啟動時間主要花在
+import pandas / yfinance / scipy / selenium。本模組提供兩件事：
+
+1. 延遲匯入
+   - lazy_module("pandas")：回傳延遲載入的模組，第一次存取屬性時才真正匯入；
+     腳本頂端 `pd = lazy_module("pandas")` 後，用不到 pandas 的路徑不付匯入成本
+   - has_module("yfinance")：只查找套件是否存在，不匯入（取代 try/import 的 HAS_X 旗標）
+     需要時在函數內 `import yfinance as yf`
+
+2. 快速結果快照
+   quick 結果寫成 JSON，鍵值由參數、當日日期與輸入檔的 (mtime, size) 組成；
+   輸入不變時直接讀回，完全不匯入 pandas。
+
+Usage:
+    from cli_startup import has_module, lazy_module, read_snapshot, snapshot_key, write_snapshot
+
+    np = lazy_module("numpy")
+    pd = lazy_module("pandas")
+    HAS_YFINANCE = has_module("yfinance")
+
+    key = snapshot_key("quick", args.metrics, files=[DATA_DIR / "stock.csv"])
+    result = read_snapshot(SNAPSHOT_PATH, key)
+    if result is None:
+        result = quick_check()
+        write_snapshot(SNAPSHOT_PATH, key, result)
+
+注意：`from __future__ import annotations` 需搭配 lazy_module 使用，
+否則函數簽名中的 `pd.DataFrame` 會在定義時觸發匯入。
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Union
+
+SNAPSHOT_VERSION = 1
+
+
+# =============================================================================
+# 延遲匯入
+# =============================================================================
+
+def has_module(name: str) -> bool:
+    """套件是否可匯入（只查找 spec，不執行模組）"""
+    if name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def lazy_module(name: str):
+    """
+    回傳延遲載入的模組
+
+    已匯入時直接回傳原模組；否則以 importlib.util.LazyLoader 建立，
+    第一次存取屬性時才執行模組。套件不存在時拋出 ImportError（與一般 import 相同）。
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+# =============================================================================
+# 快速結果快照
+# =============================================================================
+
+def _file_state(path: Union[str, Path]) -> Optional[list]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def snapshot_key(*parts: Any, files: Iterable[Union[str, Path]] = (), day: Optional[str] = None) -> str:
+    """
+    快照鍵值
+
+    Parameters
+    ----------
+    *parts
+        影響結果的參數（需可 JSON 序列化）
+    files : Iterable
+        輸入檔；任一檔案的 mtime / size 改變即失效（不存在也計入）
+    day : str, optional
+        日期（預設今天）；結果依「今天」計算時隔日自動失效
+
+    Returns
+    -------
+    str
+        sha1 十六進位字串
+    """
+    payload = {
+        "version": SNAPSHOT_VERSION,
+        "day": day or date.today().isoformat(),
+        "parts": parts,
+        "files": {str(f): _file_state(f) for f in files},
+    }
+    text = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def read_snapshot(path: Union[str, Path], key: str) -> Optional[Dict[str, Any]]:
+    """鍵值相符時回傳快照結果，否則 None"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if snapshot.get("key") != key:
+        return None
+    return snapshot.get("result")
+
+
+def write_snapshot(path: Union[str, Path], key: str, result: Dict[str, Any]) -> None:
+    """寫出快照（先寫暫存檔再取代，避免讀到半個檔案）；寫入失敗不影響主流程"""
+    path = Path(path)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(
+            json.dumps(
+                {"key": key, "written_at": datetime.now().isoformat(), "result": result},
+                ensure_ascii=False,
+                default=str,
+            ),
+            encoding="utf-8",
+        )
+        tmp.replace(path)
+    except OSError as e:
+        print(f"警告: 快照寫入失敗: {e}", file=sys.stderr)
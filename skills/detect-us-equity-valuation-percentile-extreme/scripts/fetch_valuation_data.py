@@ -7,7 +7,9 @@
 """
 
 import argparse
+import io
 import json
+import sys
 import time
 import random
 from datetime import datetime
@@ -16,9 +18,12 @@ from typing import Any, Dict, List, Optional
 
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).parent))
+from shiller_source import load_shiller_data
+
 # 嘗試導入可選依賴
 try:
-    import requests
+    import http_client
     HAS_REQUESTS = True
 except ImportError:
     HAS_REQUESTS = False
@@ -34,14 +39,19 @@ except ImportError:
 # Shiller CAPE 資料
 # =============================================================================
 
-def fetch_shiller_cape(output_path: Optional[str] = None) -> Optional[pd.DataFrame]:
+def fetch_shiller_cape(
+    output_path: Optional[str] = None,
+    refresh: bool = False
+) -> Optional[pd.DataFrame]:
     """
-    從 Shiller 資料集抓取 CAPE 及相關資料
+    從 Shiller 資料集抓取 CAPE 及相關資料（經 shiller_source 快取）
 
     Parameters
     ----------
     output_path : str, optional
         輸出 CSV 路徑
+    refresh : bool
+        強制重新下載活頁簿
 
     Returns
     -------
@@ -53,55 +63,29 @@ def fetch_shiller_cape(output_path: Optional[str] = None) -> Optional[pd.DataFra
 
     print("正在抓取 Shiller CAPE 資料...")
 
-    try:
-        url = "http://www.econ.yale.edu/~shiller/data/ie_data.xls"
-
-        # 隨機延遲
-        time.sleep(random.uniform(0.5, 1.5))
-
-        df = pd.read_excel(url, sheet_name="Data", skiprows=7)
-
-        # 重命名欄位（根據典型的 Shiller 資料格式）
-        # 欄位順序可能會變化，這裡使用位置索引
-        expected_columns = [
-            'Date', 'SP_Price', 'Dividend', 'Earnings', 'CPI',
-            'Date_Fraction', 'Long_Rate', 'Real_Price', 'Real_Dividend',
-            'Real_TR_Price', 'Real_Earnings', 'Real_TR_Scaled_Earnings',
-            'CAPE', 'TR_CAPE', 'Excess_CAPE_Yield', 'Monthly_TR',
-            'Monthly_TR_Reinvested', 'Monthly_Real_TR', 'Monthly_Real_TR_Reinvested'
-        ]
-
-        if len(df.columns) >= len(expected_columns):
-            df.columns = expected_columns[:len(df.columns)]
-        else:
-            df.columns = expected_columns[:len(df.columns)]
-
-        # 處理日期
-        df['Date'] = pd.to_datetime(
-            df['Date'].astype(str).str[:7].str.replace('.', '-'),
-            format='%Y-%m',
-            errors='coerce'
-        )
-
-        df = df.dropna(subset=['Date'])
-        df = df.set_index('Date')
+    df = load_shiller_data(refresh=refresh)
+    if df.empty or 'cape' not in df.columns:
+        print("Shiller 資料抓取失敗")
+        return None
 
-        # 選擇需要的欄位
-        output_df = df[['SP_Price', 'Earnings', 'CAPE', 'Long_Rate', 'CPI']].copy()
-        output_df = output_df.dropna(subset=['CAPE'])
+    # 沿用原本的輸出欄位名稱
+    output_df = df.rename(columns={
+        'sp_price': 'SP_Price', 'earnings': 'Earnings', 'cape': 'CAPE',
+        'long_rate': 'Long_Rate', 'cpi': 'CPI',
+    })
+    output_df = output_df[[c for c in ['SP_Price', 'Earnings', 'CAPE', 'Long_Rate', 'CPI']
+                           if c in output_df.columns]]
+    output_df = output_df.dropna(subset=['CAPE'])
+    output_df.index.name = 'Date'
 
-        print(f"成功抓取 {len(output_df)} 筆 Shiller 資料")
-        print(f"日期範圍: {output_df.index[0]} 至 {output_df.index[-1]}")
+    print(f"成功抓取 {len(output_df)} 筆 Shiller 資料")
+    print(f"日期範圍: {output_df.index[0]} 至 {output_df.index[-1]}")
 
-        if output_path:
-            output_df.to_csv(output_path)
-            print(f"已保存至: {output_path}")
-
-        return output_df
+    if output_path:
+        output_df.to_csv(output_path)
+        print(f"已保存至: {output_path}")
 
-    except Exception as e:
-        print(f"Shiller 資料抓取失敗: {e}")
-        return None
+    return output_df
 
 
 # =============================================================================
@@ -136,15 +120,16 @@ def fetch_fred_series(
     print(f"正在抓取 FRED 資料: {series_ids}")
 
     results = {}
+    # 連續請求之間的隨機間隔由共用 HTTP 客戶端負責（第一次請求不等待）
+    http_client.limit_host("fred.stlouisfed.org", min_interval=0.3, max_interval=0.8)
 
     for series_id in series_ids:
         url = f"https://fred.stlouisfed.org/graph/fredgraph.csv?id={series_id}"
 
         try:
-            # 隨機延遲
-            time.sleep(random.uniform(0.3, 0.8))
-
-            df = pd.read_csv(url, parse_dates=['DATE'], index_col='DATE')
+            response = http_client.get(url, timeout=30)
+            response.raise_for_status()
+            df = pd.read_csv(io.StringIO(response.text), parse_dates=['DATE'], index_col='DATE')
             df = df.rename(columns={series_id: series_id})
             df = df[df.index >= start]
 
@@ -360,6 +345,11 @@ def main():
         default="data",
         help="輸出目錄"
     )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="忽略 Shiller 快取，強制重新下載活頁簿"
+    )
 
     args = parser.parse_args()
 
@@ -371,7 +361,8 @@ def main():
 
     if args.source in ["shiller", "all"]:
         fetch_shiller_cape(
-            output_path=str(output_dir / f"shiller_cape_{timestamp}.csv")
+            output_path=str(output_dir / f"shiller_cape_{timestamp}.csv"),
+            refresh=args.refresh
         )
 
     if args.source in ["fred", "all"]:
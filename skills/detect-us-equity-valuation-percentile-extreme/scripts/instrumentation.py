@@ -0,0 +1,499 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+執行診斷：階段計時與剖析
+
+分析流程混合了抓取、對齊、計算、輸出，原本只靠 print 進度訊息，看不出時間與記憶體花在哪。
+本模組以階段（stage）為單位記錄：
+
+- wall_sec / cpu_sec：牆鐘時間與程序 CPU 時間
+- peak_mem_mb：階段內的峰值配置量（tracemalloc，需 trace_memory=True；會拖慢執行）
+- rows：處理的列數（由呼叫端回報）
+- cache_hits / cache_misses：快取命中 / 未命中次數（由呼叫端回報）
+
+同名階段重複進入時累加（calls 計次）；巢狀階段以 "外層/內層" 命名。
+停用時（預設）stage() 回傳共用的空物件、timed() 只多一次屬性檢查，幾乎沒有額外成本。
+可選擇以 cProfile（或已安裝的 pyinstrument）剖析整次執行並寫出剖析檔。
+cProfile 只剖析啟用它的執行緒；其他執行緒回報的列數與快取事件計入當時最內層的開啟階段。
+
+本檔在每個使用它的技能 scripts/ 目錄內各放一份，內容保持一致。
+
+Usage:
+    import instrumentation
+
+    instrumentation.configure(enabled=True, trace_memory=False, profile="cprofile")
+
+    with instrumentation.stage("fetch") as st:
+        df = load()
+        st.add_rows(len(df))
+        instrumentation.cache_hit()
+
+    @instrumentation.timed("compute")
+    def compute(df): ...
+
+    instrumentation.attach(result)        # result["diagnostics"] = {...}（停用時不做事）
+
+CLI:
+    instrumentation.add_cli_arguments(parser)     # --diagnostics / --trace-memory / --profile / --profile-output
+    instrumentation.configure_from_args(args, "valuation_percentile")
+"""
+
+import cProfile
+import functools
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import resource
+    HAS_RESOURCE = True
+except ImportError:
+    HAS_RESOURCE = False
+
+try:
+    import pyinstrument
+    HAS_PYINSTRUMENT = True
+except ImportError:
+    HAS_PYINSTRUMENT = False
+
+PROFILERS = ("cprofile", "pyinstrument")
+DEFAULT_PROFILE_DIR = "profiles"
+TOP_FUNCTIONS = 15
+MB = 1024 * 1024
+
+
+@dataclass
+class StageStats:
+    """單一階段（路徑）的累計統計"""
+    name: str
+    depth: int
+    calls: int = 0
+    wall_sec: float = 0.0
+    cpu_sec: float = 0.0
+    peak_mem_mb: Optional[float] = None
+    rows: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    errors: int = 0
+
+
+class _NullStage:
+    """停用時的階段：所有操作都不做事"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add_rows(self, n: int) -> None:
+        pass
+
+    def cache_hit(self, n: int = 1) -> None:
+        pass
+
+    def cache_miss(self, n: int = 1) -> None:
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """開啟中的階段"""
+
+    def __init__(self, recorder: "Instrumentation", name: str, rows: Optional[int] = None):
+        self.recorder = recorder
+        self.name = name
+        self.path = name
+        self.depth = 0
+        self.rows = int(rows or 0)
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.mem_start = 0
+        self.mem_peak = 0
+
+    def add_rows(self, n: int) -> None:
+        self.rows += int(n)
+
+    def cache_hit(self, n: int = 1) -> None:
+        self.cache_hits += n
+
+    def cache_miss(self, n: int = 1) -> None:
+        self.cache_misses += n
+
+    def __enter__(self):
+        self.recorder._enter(self)
+        self._t0 = time.perf_counter()
+        self._c0 = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._t0
+        cpu = time.process_time() - self._c0
+        self.recorder._exit(self, wall, cpu, failed=exc_type is not None)
+        return False
+
+
+class Instrumentation:
+    """
+    階段計時紀錄器（執行緒安全）
+
+    Args:
+        enabled: 是否記錄；False 時 stage() 回傳空物件
+        trace_memory: 是否以 tracemalloc 記錄各階段峰值記憶體
+        profile: None / "cprofile" / "pyinstrument"
+        profile_path: 剖析檔路徑（預設 profiles/run-<時間>.prof 或 .html）
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        trace_memory: bool = False,
+        profile: Optional[str] = None,
+        profile_path: Optional[str] = None
+    ):
+        if profile is not None and profile not in PROFILERS:
+            raise ValueError(f"未知的剖析器: {profile}（可用: {', '.join(PROFILERS)}）")
+        if profile == "pyinstrument" and not HAS_PYINSTRUMENT:
+            print("警告: pyinstrument 未安裝，改用 cProfile", file=sys.stderr)
+            profile = "cprofile"
+
+        self.enabled = enabled or trace_memory or profile is not None
+        self.trace_memory = trace_memory
+        self.profile = profile
+        self.profile_path = profile_path
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._open: List[_Stage] = []
+        self._stats: Dict[str, StageStats] = {}
+        self._unstaged = {"rows": 0, "cache_hits": 0, "cache_misses": 0}
+        self._profiler = None
+        self._profile_info: Optional[Dict[str, Any]] = None
+        self._started_tracemalloc = False
+        self._t0 = time.perf_counter()
+        self._c0 = time.process_time()
+
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        if self.profile:
+            self._start_profiler()
+
+    # ------------------------------------------------------------------
+    # 階段
+    # ------------------------------------------------------------------
+
+    def stage(self, name: str, rows: Optional[int] = None):
+        """開啟一個階段（context manager）；停用時回傳空物件"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, rows)
+
+    def timed(self, name: Optional[str] = None) -> Callable:
+        """把整個函數包成一個階段的裝飾器（預設以函數名稱命名）"""
+        def decorator(fn):
+            label = name or fn.__name__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with self.stage(label):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _stack(self) -> List[_Stage]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _current(self) -> Optional[_Stage]:
+        stack = self._stack()
+        if stack:
+            return stack[-1]
+        with self._lock:
+            return self._open[-1] if self._open else None
+
+    def _sync_memory(self) -> int:
+        """把目前的峰值分給所有開啟中的階段，再重設峰值（呼叫端持有 _lock）"""
+        current, peak = tracemalloc.get_traced_memory()
+        for st in self._open:
+            st.mem_peak = max(st.mem_peak, peak)
+        tracemalloc.reset_peak()
+        return current
+
+    def _enter(self, st: _Stage) -> None:
+        stack = self._stack()
+        if stack:
+            st.path = f"{stack[-1].path}/{st.name}"
+            st.depth = stack[-1].depth + 1
+        with self._lock:
+            if self.trace_memory and tracemalloc.is_tracing():
+                st.mem_start = st.mem_peak = self._sync_memory()
+            self._open.append(st)
+            if st.path not in self._stats:
+                self._stats[st.path] = StageStats(st.path, st.depth)
+        stack.append(st)
+
+    def _exit(self, st: _Stage, wall: float, cpu: float, failed: bool) -> None:
+        stack = self._stack()
+        if stack and stack[-1] is st:
+            stack.pop()
+        with self._lock:
+            peak_mb = None
+            if self.trace_memory and tracemalloc.is_tracing():
+                self._sync_memory()
+                peak_mb = round((st.mem_peak - st.mem_start) / MB, 3)
+            self._open.remove(st)
+
+            stats = self._stats[st.path]
+            stats.calls += 1
+            stats.wall_sec += wall
+            stats.cpu_sec += cpu
+            stats.rows += st.rows
+            stats.cache_hits += st.cache_hits
+            stats.cache_misses += st.cache_misses
+            stats.errors += int(failed)
+            if peak_mb is not None:
+                stats.peak_mem_mb = max(stats.peak_mem_mb or 0.0, peak_mb)
+
+    # ------------------------------------------------------------------
+    # 計數（記在目前最內層的階段）
+    # ------------------------------------------------------------------
+
+    def _count(self, field: str, n: int) -> None:
+        if not self.enabled:
+            return
+        st = self._current()
+        with self._lock:
+            if st is not None:
+                setattr(st, field, getattr(st, field) + n)
+            else:
+                self._unstaged[field] += n
+
+    def add_rows(self, n: int) -> None:
+        self._count("rows", int(n))
+
+    def cache_hit(self, n: int = 1) -> None:
+        self._count("cache_hits", n)
+
+    def cache_miss(self, n: int = 1) -> None:
+        self._count("cache_misses", n)
+
+    # ------------------------------------------------------------------
+    # 剖析
+    # ------------------------------------------------------------------
+
+    def _start_profiler(self) -> None:
+        if self.profile == "pyinstrument":
+            self._profiler = pyinstrument.Profiler()
+            self._profiler.start()
+        else:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def _default_profile_path(self) -> Path:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        suffix = ".html" if self.profile == "pyinstrument" else ".prof"
+        return Path(DEFAULT_PROFILE_DIR) / f"run-{stamp}{suffix}"
+
+    def stop_profile(self) -> Optional[Dict[str, Any]]:
+        """停止剖析並寫出剖析檔（可重複呼叫，只寫一次）"""
+        if self._profiler is None:
+            return self._profile_info
+
+        path = Path(self.profile_path) if self.profile_path else self._default_profile_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        info: Dict[str, Any] = {"tool": self.profile, "path": str(path)}
+
+        if self.profile == "pyinstrument":
+            self._profiler.stop()
+            path.write_text(self._profiler.output_html(), encoding="utf-8")
+        else:
+            self._profiler.disable()
+            self._profiler.dump_stats(str(path))
+            stats = pstats.Stats(self._profiler, stream=io.StringIO())
+            stats.sort_stats("cumulative")
+            top = []
+            for func in stats.fcn_list[:TOP_FUNCTIONS]:
+                _, ncalls, tottime, cumtime, _ = stats.stats[func]
+                filename, line, fname = func
+                top.append({
+                    "function": f"{Path(filename).name}:{line}({fname})",
+                    "calls": ncalls,
+                    "tottime_sec": round(tottime, 4),
+                    "cumtime_sec": round(cumtime, 4),
+                })
+            info["top"] = top
+
+        self._profiler = None
+        self._profile_info = info
+        print(f"剖析檔已寫出: {path}", file=sys.stderr)
+        return info
+
+    # ------------------------------------------------------------------
+    # 輸出
+    # ------------------------------------------------------------------
+
+    def diagnostics(self) -> Optional[Dict[str, Any]]:
+        """目前為止的診斷資料（停用時為 None）；會停止並寫出剖析"""
+        if not self.enabled:
+            return None
+        profile = self.stop_profile()
+
+        with self._lock:
+            stages = []
+            for stats in self._stats.values():
+                row = asdict(stats)
+                row["wall_sec"] = round(row["wall_sec"], 6)
+                row["cpu_sec"] = round(row["cpu_sec"], 6)
+                stages.append(row)
+            unstaged = dict(self._unstaged)
+
+        result: Dict[str, Any] = {
+            "generated_at": datetime.now().isoformat(),
+            "wall_sec": round(time.perf_counter() - self._t0, 6),
+            "cpu_sec": round(time.process_time() - self._c0, 6),
+            "max_rss_mb": _max_rss_mb(),
+            "trace_memory": self.trace_memory,
+            "stages": stages,
+        }
+        if any(unstaged.values()):
+            result["unstaged"] = unstaged
+        if profile:
+            result["profile"] = profile
+        return result
+
+    def attach(self, result: Any) -> Any:
+        """啟用時把診斷資料加到結果 dict 的 diagnostics 鍵，回傳 result"""
+        if self.enabled and isinstance(result, dict):
+            result["diagnostics"] = self.diagnostics()
+        return result
+
+    def close(self) -> None:
+        self.stop_profile()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+
+def _max_rss_mb() -> Optional[float]:
+    """程序的最大常駐記憶體（Linux 單位為 KB，macOS 為 bytes）"""
+    if not HAS_RESOURCE:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / MB if sys.platform == "darwin" else rss / 1024, 1)
+
+
+# ============================================================================
+# 模組層級 API（共用一個紀錄器）
+# ============================================================================
+
+_recorder = Instrumentation()
+
+
+def configure(
+    enabled: bool = True,
+    trace_memory: bool = False,
+    profile: Optional[str] = None,
+    profile_path: Optional[str] = None
+) -> Instrumentation:
+    """以新設定取代共用紀錄器（舊紀錄器的剖析與 tracemalloc 會先停止）"""
+    global _recorder
+    _recorder.close()
+    _recorder = Instrumentation(enabled, trace_memory, profile, profile_path)
+    return _recorder
+
+
+def get_recorder() -> Instrumentation:
+    return _recorder
+
+
+def is_enabled() -> bool:
+    return _recorder.enabled
+
+
+def stage(name: str, rows: Optional[int] = None):
+    return _recorder.stage(name, rows)
+
+
+def timed(name: Optional[str] = None) -> Callable:
+    """
+    函數裝飾器；於呼叫時才檢查共用紀錄器，因此可在 configure() 之前裝飾
+    """
+    def decorator(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            recorder = _recorder
+            if not recorder.enabled:
+                return fn(*args, **kwargs)
+            with recorder.stage(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def add_rows(n: int) -> None:
+    _recorder.add_rows(n)
+
+
+def cache_hit(n: int = 1) -> None:
+    _recorder.cache_hit(n)
+
+
+def cache_miss(n: int = 1) -> None:
+    _recorder.cache_miss(n)
+
+
+def diagnostics() -> Optional[Dict[str, Any]]:
+    return _recorder.diagnostics()
+
+
+def attach(result: Any) -> Any:
+    return _recorder.attach(result)
+
+
+# ============================================================================
+# CLI 輔助
+# ============================================================================
+
+def add_cli_arguments(parser) -> None:
+    """加入 --diagnostics / --trace-memory / --profile / --profile-output"""
+    group = parser.add_argument_group("診斷")
+    group.add_argument("--diagnostics", action="store_true",
+                       help="在 JSON 輸出加入 diagnostics（各階段耗時、CPU、列數、快取命中）")
+    group.add_argument("--trace-memory", action="store_true",
+                       help="另記錄各階段峰值記憶體（tracemalloc，會拖慢執行；隱含 --diagnostics）")
+    group.add_argument("--profile", choices=PROFILERS, default=None,
+                       help="剖析整次執行並寫出剖析檔（隱含 --diagnostics）")
+    group.add_argument("--profile-output", default=None,
+                       help=f"剖析檔路徑（預設 {DEFAULT_PROFILE_DIR}/<名稱>-<時間>.prof / .html）")
+
+
+def configure_from_args(args, name: str = "run") -> Instrumentation:
+    """依 add_cli_arguments 的參數設定共用紀錄器；未要求任何診斷時維持停用"""
+    profile = getattr(args, "profile", None)
+    profile_path = getattr(args, "profile_output", None)
+    if profile and not profile_path:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        suffix = ".html" if profile == "pyinstrument" and HAS_PYINSTRUMENT else ".prof"
+        profile_path = str(Path(DEFAULT_PROFILE_DIR) / f"{name}-{stamp}{suffix}")
+    return configure(
+        enabled=bool(getattr(args, "diagnostics", False)),
+        trace_memory=bool(getattr(args, "trace_memory", False)),
+        profile=profile,
+        profile_path=profile_path,
+    )
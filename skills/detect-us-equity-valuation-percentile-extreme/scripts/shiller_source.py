@@ -0,0 +1,292 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Shiller 資料集快取來源
+
+ie_data.xls 是數 MB 的 Excel 活頁簿，每次執行都下載並解析整本只為了取一欄太浪費。
+本模組把活頁簿解析一次，存成具型別的 Arrow 檔（所有欄位：價格、股利、獲利、CPI、
+長債利率、CAPE、TR CAPE 等），之後：
+
+- 快取未超過 max_age_hours：直接 memory-map 讀取，不連網
+- 超過：以 ETag / Last-Modified 發出條件式請求，304 時沿用快取（不下載、不解析）
+- 只有伺服器回傳新版本時才重新下載並解析 xls
+- 連線失敗時沿用舊快取
+
+    {cache_dir}/shiller.arrow   # Arrow IPC（未壓縮，可 memory-map），date + 各欄 float64
+    {cache_dir}/shiller.json    # etag / last_modified / fetched_at / checked_at
+
+Usage:
+    from shiller_source import load_shiller_data
+
+    df = load_shiller_data()
+    cape = df["cape"]
+
+    python shiller_source.py            # 顯示快取狀態（必要時更新）
+    python shiller_source.py --refresh  # 強制重新下載
+
+依賴: pip install pandas requests pyarrow xlrd
+"""
+
+import argparse
+import io
+import json
+import re
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+import instrumentation
+from cli_startup import has_module
+
+# requests 只在快取過期需要連網時才匯入
+HAS_REQUESTS = has_module("requests")
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+SHILLER_URL = "http://www.econ.yale.edu/~shiller/data/ie_data.xls"
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "cache" / "shiller"
+DEFAULT_MAX_AGE_HOURS = 24
+CACHE_NAME = "shiller"
+
+# 表頭（小寫）→ 欄位名稱；其餘欄位以 snake_case 命名
+COLUMN_ALIASES = {
+    "p": "sp_price",
+    "d": "dividend",
+    "e": "earnings",
+    "cpi": "cpi",
+    "fraction": "date_fraction",
+    "date fraction": "date_fraction",
+    "rate gs10": "long_rate",
+    "gs10": "long_rate",
+    "cape": "cape",
+    "tr cape": "tr_cape",
+    "excess cape yield": "excess_cape_yield",
+}
+
+
+# =============================================================================
+# 解析
+# =============================================================================
+
+def _snake(name: str) -> str:
+    return re.sub(r"[^0-9a-z]+", "_", name.strip().lower()).strip("_")
+
+
+def _shiller_dates(values: pd.Series) -> pd.DatetimeIndex:
+    """
+    Shiller 日期格式為 YYYY.MM 浮點數（1871.1 代表 10 月，不是 1 月）
+    """
+    numeric = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+    year = np.floor(numeric)
+    month = np.rint((numeric - year) * 100)
+    ok = np.isfinite(numeric) & (month >= 1) & (month <= 12)
+    text = [
+        f"{int(y):04d}-{int(m):02d}-01" if good else None
+        for y, m, good in zip(year, month, ok)
+    ]
+    return pd.DatetimeIndex(pd.to_datetime(text, errors="coerce"))
+
+
+def parse_shiller_workbook(content: bytes) -> pd.DataFrame:
+    """
+    解析 ie_data.xls 的 Data 工作表
+
+    Parameters
+    ----------
+    content : bytes
+        活頁簿內容
+
+    Returns
+    -------
+    pd.DataFrame
+        月度日期索引、所有數值欄位（float64）
+    """
+    raw = pd.read_excel(io.BytesIO(content), sheet_name="Data", skiprows=7)
+    raw = raw.dropna(axis=1, how="all")
+
+    dates = _shiller_dates(raw.iloc[:, 0])
+    columns = {}
+    for col in raw.columns[1:]:
+        header = str(col).split(".")[0] if str(col).endswith((".1", ".2")) else str(col)
+        if header.lower().startswith("unnamed"):
+            continue
+        name = COLUMN_ALIASES.get(header.strip().lower(), _snake(header))
+        while name in columns:
+            name = f"{name}_2"
+        columns[name] = pd.to_numeric(raw[col], errors="coerce").astype("float64")
+
+    if "cape" not in columns:
+        # 舊版表頭為長名稱（如 "... P/E10 or CAPE"）
+        for name in list(columns):
+            if "cape" in name and not name.startswith(("tr_", "excess")):
+                columns["cape"] = columns.pop(name)
+                break
+
+    df = pd.DataFrame(columns)
+    df.index = dates
+    df.index.name = "date"
+    df = df[df.index.notna()]
+    df = df[~df.index.duplicated(keep="last")].sort_index()
+    return df.dropna(how="all")
+
+
+# =============================================================================
+# 快取
+# =============================================================================
+
+def _paths(cache_dir: Path) -> Dict[str, Path]:
+    suffix = "arrow" if HAS_PYARROW else "pkl"
+    return {
+        "data": cache_dir / f"{CACHE_NAME}.{suffix}",
+        "meta": cache_dir / f"{CACHE_NAME}.json",
+    }
+
+
+def _read_meta(path: Path) -> Dict[str, Any]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_meta(path: Path, meta: Dict[str, Any]) -> None:
+    path.write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def _read_frame(path: Path) -> pd.DataFrame:
+    if HAS_PYARROW:
+        table = feather.read_table(str(path), memory_map=True)
+        return table.to_pandas().set_index("date")
+    return pd.read_pickle(path)
+
+
+def _write_frame(path: Path, df: pd.DataFrame) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    if HAS_PYARROW:
+        table = pa.Table.from_pandas(df.reset_index(), preserve_index=False)
+        feather.write_feather(table, str(tmp), compression="uncompressed")
+    else:
+        df.to_pickle(tmp)
+    tmp.replace(path)
+
+
+def load_shiller_data(
+    cache_dir: Optional[str] = None,
+    max_age_hours: float = DEFAULT_MAX_AGE_HOURS,
+    refresh: bool = False,
+    url: str = SHILLER_URL,
+) -> pd.DataFrame:
+    """
+    讀取 Shiller 資料集（快取優先，必要時條件式更新）
+
+    Parameters
+    ----------
+    cache_dir : str, optional
+        快取目錄（預設: 技能目錄下 cache/shiller）
+    max_age_hours : float
+        快取在此時數內不檢查更新
+    refresh : bool
+        忽略快取，強制重新下載
+    url : str
+        活頁簿網址
+
+    Returns
+    -------
+    pd.DataFrame
+        月度資料；無快取且抓取失敗時為空 DataFrame
+    """
+    cache = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+    paths = _paths(cache)
+    meta = {} if refresh else _read_meta(paths["meta"])
+    has_cache = paths["data"].exists() and bool(meta)
+
+    if has_cache:
+        checked_at = datetime.fromisoformat(meta.get("checked_at", "1970-01-01T00:00:00"))
+        if datetime.now() - checked_at < timedelta(hours=max_age_hours):
+            instrumentation.cache_hit()
+            return _read_frame(paths["data"])
+
+    if not HAS_REQUESTS:
+        print("警告: requests 套件未安裝，無法更新 Shiller 資料", file=sys.stderr)
+        return _read_frame(paths["data"]) if has_cache else pd.DataFrame()
+
+    import http_client
+
+    headers = {}
+    if has_cache and meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if has_cache and meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    try:
+        response = http_client.get(url, headers=headers, timeout=60)
+        if response.status_code == 304 and has_cache:
+            meta["checked_at"] = datetime.now().isoformat()
+            _write_meta(paths["meta"], meta)
+            instrumentation.cache_hit()
+            return _read_frame(paths["data"])
+        response.raise_for_status()
+        df = parse_shiller_workbook(response.content)
+    except Exception as e:
+        print(f"Shiller 資料更新失敗: {e}", file=sys.stderr)
+        if has_cache:
+            print("沿用既有快取", file=sys.stderr)
+            return _read_frame(paths["data"])
+        return pd.DataFrame()
+
+    instrumentation.cache_miss()
+    cache.mkdir(parents=True, exist_ok=True)
+    _write_frame(paths["data"], df)
+    now = datetime.now().isoformat()
+    _write_meta(paths["meta"], {
+        "url": url,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "fetched_at": now,
+        "checked_at": now,
+        "rows": len(df),
+        "columns": list(df.columns),
+        "start": str(df.index.min().date()) if len(df) else None,
+        "end": str(df.index.max().date()) if len(df) else None,
+    })
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shiller 資料集快取")
+    parser.add_argument("--cache-dir", default=None, help="快取目錄")
+    parser.add_argument(
+        "--max-age-hours",
+        type=float,
+        default=DEFAULT_MAX_AGE_HOURS,
+        help=f"快取在此時數內不檢查更新（預設: {DEFAULT_MAX_AGE_HOURS}）"
+    )
+    parser.add_argument("--refresh", action="store_true", help="強制重新下載")
+    args = parser.parse_args()
+
+    df = load_shiller_data(args.cache_dir, args.max_age_hours, args.refresh)
+    cache = Path(args.cache_dir) if args.cache_dir else DEFAULT_CACHE_DIR
+    meta = _read_meta(_paths(cache)["meta"])
+    print(json.dumps({
+        "rows": len(df),
+        "columns": list(df.columns),
+        "fetched_at": meta.get("fetched_at"),
+        "checked_at": meta.get("checked_at"),
+        "etag": meta.get("etag"),
+        "last_modified": meta.get("last_modified"),
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+CLI Startup Tests
+
+驗證 cli_startup：
+1. has_module 不執行模組；lazy_module 延到第一次存取屬性才執行，已匯入時回傳原模組
+2. 快照鍵值隨參數、日期、輸入檔 mtime / size 改變；鍵值不符或檔案損毀時不讀回
+
+Usage:
+    cd skills/detect-us-equity-valuation-percentile-extreme/scripts/tests
+    python -m pytest -q test_cli_startup.py
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add scripts directory to path (tests is inside scripts/)
+scripts_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(scripts_dir))
+
+import cli_startup  # noqa: E402
+
+
+@pytest.fixture
+def fake_module(tmp_path, monkeypatch):
+    """寫出一個匯入時會留下紀錄的模組"""
+    name = "_cli_startup_probe"
+    (tmp_path / f"{name}.py").write_text(
+        "import sys\nsys.modules['_cli_startup_log'] = True\nVALUE = 42\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield name
+    sys.modules.pop(name, None)
+    sys.modules.pop("_cli_startup_log", None)
+
+
+def test_has_module_does_not_execute(fake_module):
+    assert cli_startup.has_module(fake_module)
+    assert "_cli_startup_log" not in sys.modules
+    assert not cli_startup.has_module("_cli_startup_missing_pkg")
+
+
+def test_lazy_module_defers_execution(fake_module):
+    module = cli_startup.lazy_module(fake_module)
+    assert "_cli_startup_log" not in sys.modules
+    assert module.VALUE == 42
+    assert "_cli_startup_log" in sys.modules
+    assert cli_startup.lazy_module(fake_module) is module
+    assert cli_startup.lazy_module("json") is json
+
+
+def test_lazy_module_missing_raises():
+    with pytest.raises(ImportError):
+        cli_startup.lazy_module("_cli_startup_missing_pkg")
+
+
+def test_snapshot_key_tracks_inputs(tmp_path):
+    data = tmp_path / "stock.csv"
+    data.write_text("date,value\n")
+    key = cli_startup.snapshot_key("quick", [1, 2], files=[data], day="2026-01-02")
+
+    assert key == cli_startup.snapshot_key("quick", [1, 2], files=[data], day="2026-01-02")
+    assert key != cli_startup.snapshot_key("quick", [1, 3], files=[data], day="2026-01-02")
+    assert key != cli_startup.snapshot_key("quick", [1, 2], files=[data], day="2026-01-03")
+
+    stat = data.stat()
+    os.utime(data, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert key != cli_startup.snapshot_key("quick", [1, 2], files=[data], day="2026-01-02")
+
+    missing = cli_startup.snapshot_key("quick", files=[tmp_path / "nope.csv"], day="2026-01-02")
+    (tmp_path / "nope.csv").write_text("x")
+    assert missing != cli_startup.snapshot_key("quick", files=[tmp_path / "nope.csv"], day="2026-01-02")
+
+
+def test_snapshot_roundtrip(tmp_path):
+    path = tmp_path / "cache" / "quick_snapshot.json"
+    result = {"signal": "WATCH", "z": 1.5}
+
+    assert cli_startup.read_snapshot(path, "k1") is None
+    cli_startup.write_snapshot(path, "k1", result)
+    assert cli_startup.read_snapshot(path, "k1") == result
+    assert cli_startup.read_snapshot(path, "k2") is None
+    assert not path.with_suffix(".json.tmp").exists()
+
+    path.write_text("{broken")
+    assert cli_startup.read_snapshot(path, "k1") is None
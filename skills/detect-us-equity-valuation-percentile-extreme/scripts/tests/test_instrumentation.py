@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Instrumentation Tests
+
+驗證 instrumentation：
+1. 停用時 stage() 為共用空物件、timed() 直接呼叫原函數、attach() 不加鍵
+2. 階段計時、巢狀路徑、同名累加、列數與快取計數
+3. 例外仍會記錄（errors）並向外拋出
+4. trace_memory 記錄峰值、cProfile 寫出剖析檔
+
+Usage:
+    cd skills/detect-us-equity-valuation-percentile-extreme/scripts/tests
+    python -m pytest -q test_instrumentation.py
+"""
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add scripts directory to path (tests is inside scripts/)
+scripts_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(scripts_dir))
+
+import instrumentation  # noqa: E402
+from instrumentation import Instrumentation  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _reset_shared_recorder():
+    yield
+    instrumentation.configure(enabled=False)
+
+
+def _stages(diag):
+    return {s["name"]: s for s in diag["stages"]}
+
+
+def test_disabled_is_noop():
+    rec = Instrumentation()
+    assert rec.stage("a") is rec.stage("b")
+    with rec.stage("a") as st:
+        st.add_rows(10)
+        rec.cache_hit()
+    assert rec.diagnostics() is None
+    assert rec.attach({"x": 1}) == {"x": 1}
+
+
+def test_stage_timing_nesting_and_counters():
+    rec = Instrumentation(enabled=True)
+    with rec.stage("fetch", rows=5):
+        rec.cache_hit()
+        rec.cache_miss(2)
+        with rec.stage("parse") as inner:
+            inner.add_rows(3)
+            time.sleep(0.02)
+    for _ in range(2):
+        with rec.stage("fetch"):
+            pass
+
+    stages = _stages(rec.diagnostics())
+    assert list(stages) == ["fetch", "fetch/parse"]
+    assert stages["fetch"]["calls"] == 3
+    assert stages["fetch"]["rows"] == 5
+    assert (stages["fetch"]["cache_hits"], stages["fetch"]["cache_misses"]) == (1, 2)
+    assert stages["fetch/parse"]["depth"] == 1 and stages["fetch/parse"]["rows"] == 3
+    assert stages["fetch/parse"]["wall_sec"] >= 0.015
+    assert stages["fetch"]["wall_sec"] >= stages["fetch/parse"]["wall_sec"]
+
+
+def test_exception_is_recorded_and_raised():
+    rec = Instrumentation(enabled=True)
+    with pytest.raises(ValueError):
+        with rec.stage("boom"):
+            raise ValueError("x")
+    assert _stages(rec.diagnostics())["boom"]["errors"] == 1
+
+
+def test_module_timed_decorator_checks_recorder_at_call_time():
+    @instrumentation.timed("work")
+    def work(n):
+        instrumentation.add_rows(n)
+        return n * 2
+
+    assert work(3) == 6
+    assert instrumentation.diagnostics() is None
+
+    instrumentation.configure(enabled=True)
+    assert work(4) == 8
+    result = instrumentation.attach({"value": 1})
+    assert _stages(result["diagnostics"])["work"]["rows"] == 4
+    json.dumps(result)
+
+
+def test_counts_from_worker_threads_go_to_open_stage():
+    rec = Instrumentation(enabled=True)
+    with rec.stage("ingest"):
+        threads = [threading.Thread(target=rec.cache_hit) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    rec.cache_miss()
+    diag = rec.diagnostics()
+    assert _stages(diag)["ingest"]["cache_hits"] == 4
+    assert diag["unstaged"]["cache_misses"] == 1
+
+
+def test_trace_memory_records_peak():
+    rec = Instrumentation(trace_memory=True)
+    try:
+        with rec.stage("outer"):
+            with rec.stage("alloc"):
+                block = bytearray(8 * 1024 * 1024)
+                del block
+            with rec.stage("small"):
+                pass
+        stages = _stages(rec.diagnostics())
+    finally:
+        rec.close()
+    assert stages["outer/alloc"]["peak_mem_mb"] >= 7.5
+    assert stages["outer"]["peak_mem_mb"] >= 7.5
+    assert stages["outer/small"]["peak_mem_mb"] < 1
+
+
+def test_cprofile_dump(tmp_path):
+    path = tmp_path / "run.prof"
+    rec = Instrumentation(profile="cprofile", profile_path=str(path))
+    with rec.stage("compute"):
+        sum(i * i for i in range(10000))
+    diag = rec.diagnostics()
+    assert path.exists()
+    assert diag["profile"]["tool"] == "cprofile"
+    assert diag["profile"]["top"]
+    # 第二次取用不重寫
+    assert rec.diagnostics()["profile"] == diag["profile"]
@@ -8,28 +8,28 @@
 並用歷史類比（如 1929、1965、1999）給出風險解讀。
 """
 
+from __future__ import annotations
+
 import argparse
+import io
 import json
 import sys
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
-import numpy as np
-import pandas as pd
+sys.path.insert(0, str(Path(__file__).parent))
+import instrumentation
+from cli_startup import has_module, lazy_module, read_snapshot, snapshot_key, write_snapshot
 
-# 嘗試導入可選依賴
-try:
-    import yfinance as yf
-    HAS_YFINANCE = True
-except ImportError:
-    HAS_YFINANCE = False
+# numpy / pandas 延遲載入：--help 與快照命中的 --quick 不需匯入
+np = lazy_module("numpy")
+pd = lazy_module("pandas")
 
-try:
-    import requests
-    HAS_REQUESTS = True
-except ImportError:
-    HAS_REQUESTS = False
+# 可選依賴只檢查是否存在，實際匯入延到使用的函數內
+# （yfinance 僅完整模式抓價格、requests 僅抓 FRED 時需要）
+HAS_YFINANCE = has_module("yfinance")
+HAS_REQUESTS = has_module("requests")
 
 
 # =============================================================================
@@ -42,6 +42,13 @@ DEFAULT_THRESHOLD = 95
 DEFAULT_EPISODE_GAP_DAYS = 3650  # 約 10 年
 DEFAULT_FORWARD_WINDOWS = [180, 365, 1095]
 
+# 分析產物（供 visualize_valuation.py 離線繪圖）
+DEFAULT_BUNDLE_DIR = "cache/bundle"
+BUNDLE_NAME = "valuation"
+
+# --quick 結果快照（同一天、同參數且 Shiller 快取未變時直接讀回）
+QUICK_SNAPSHOT_PATH = Path(__file__).parent.parent / "cache" / "quick_snapshot.json"
+
 # 歷史極端事件（硬編碼，作為參考）
 KNOWN_HISTORICAL_EPISODES = {
     "1929-09-01": {"context": "大蕭條前夕", "cape": 33.0},
@@ -74,10 +81,14 @@ def fetch_fred_series(series_id: str, start: str = "1900-01-01") -> Optional[pd.
         print(f"警告: requests 套件未安裝，無法抓取 FRED 資料")
         return None
 
+    import http_client
+
     url = f"https://fred.stlouisfed.org/graph/fredgraph.csv?id={series_id}"
 
     try:
-        df = pd.read_csv(url, parse_dates=['DATE'], index_col='DATE')
+        response = http_client.get(url, timeout=30)
+        response.raise_for_status()
+        df = pd.read_csv(io.StringIO(response.text), parse_dates=['DATE'], index_col='DATE')
         df = df.rename(columns={series_id: 'value'})
         df = df[df.index >= start]
         df = df.dropna()
@@ -89,57 +100,23 @@ def fetch_fred_series(series_id: str, start: str = "1900-01-01") -> Optional[pd.
 
 def fetch_shiller_cape() -> Optional[pd.Series]:
     """
-    從 Shiller 資料集抓取 CAPE
+    從 Shiller 資料集抓取 CAPE（經 shiller_source 快取，重複執行不重新下載或解析）
 
     Returns
     -------
     pd.Series or None
     """
-    if not HAS_REQUESTS:
-        print("警告: requests 套件未安裝，無法抓取 Shiller 資料")
-        return None
-
-    try:
-        # Shiller 資料的 CSV 版本（更容易解析）
-        url = "http://www.econ.yale.edu/~shiller/data/ie_data.xls"
-
-        df = pd.read_excel(url, sheet_name="Data", skiprows=7)
-
-        # 嘗試找到 CAPE 欄位（欄位名稱可能變化）
-        cape_col = None
-        for col in df.columns:
-            if 'CAPE' in str(col).upper():
-                cape_col = col
-                break
-
-        if cape_col is None:
-            # 嘗試使用位置（CAPE 通常在第 12-13 欄）
-            cape_col = df.columns[12] if len(df.columns) > 12 else None
-
-        if cape_col is None:
-            print("警告: 無法在 Shiller 資料中找到 CAPE 欄位")
-            return None
-
-        # 處理日期欄位
-        date_col = df.columns[0]
-        df['Date'] = pd.to_datetime(
-            df[date_col].astype(str).str[:7].str.replace('.', '-'),
-            format='%Y-%m',
-            errors='coerce'
-        )
-
-        df = df.dropna(subset=['Date', cape_col])
-        df = df.set_index('Date')
-
-        series = df[cape_col].astype(float)
-        series.name = 'CAPE'
-
-        return series
+    from shiller_source import load_shiller_data
 
-    except Exception as e:
-        print(f"Shiller CAPE 資料抓取失敗: {e}")
+    df = load_shiller_data()
+    if df.empty or "cape" not in df.columns:
+        print("警告: 無法在 Shiller 資料中找到 CAPE 欄位")
         return None
 
+    series = df["cape"].dropna()
+    series.name = 'CAPE'
+    return series
+
 
 def fetch_mktcap_to_gdp() -> Optional[pd.Series]:
     """
@@ -194,6 +171,8 @@ def fetch_yahoo_pe(ticker: str = "^GSPC") -> Optional[float]:
         print("警告: yfinance 套件未安裝")
         return None
 
+    import yfinance as yf
+
     try:
         stock = yf.Ticker(ticker)
         info = stock.info
@@ -221,6 +200,8 @@ def fetch_price_history(ticker: str = "^GSPC", start: str = "1950-01-01") -> Opt
     if not HAS_YFINANCE:
         return None
 
+    import yfinance as yf
+
     try:
         stock = yf.Ticker(ticker)
         df = stock.history(start=start, auto_adjust=True)
@@ -405,11 +386,14 @@ def find_extreme_episodes(
 def calculate_forward_stats(
     price_series: pd.Series,
     event_dates: List[str],
-    windows: List[int]
+    windows: List[int],
+    n_bootstrap: int = 0
 ) -> Dict[str, Dict[str, Any]]:
     """
     計算事後統計
 
+    所有事件與視窗由 event_study 一次向量化計算（起點與終點皆取該日或之後的第一個交易日）。
+
     Parameters
     ----------
     price_series : pd.Series
@@ -418,60 +402,56 @@ def calculate_forward_stats(
         事件日期清單
     windows : list
         視窗（天）
+    n_bootstrap : int
+        報酬中位數 / 上漲機率 bootstrap 信賴區間的重抽樣次數（0 表示不計算）
 
     Returns
     -------
     dict
-        {window: {forward_return: {...}, max_drawdown: {...}}}
+        {window: {forward_return: {...}, max_drawdown: {...}, excursion: {...}}}
     """
-    results = {}
-
-    for window in windows:
-        returns = []
-        drawdowns = []
+    from event_study import bootstrap_ci, calendar_offsets, event_study
 
-        for event_date_str in event_dates:
-            event_date = pd.to_datetime(event_date_str)
+    start, end = calendar_offsets(price_series.index, event_dates, windows)
+    study = event_study(price_series.to_numpy(), start, end)
 
-            # 找最近的交易日
-            if event_date not in price_series.index:
-                mask = price_series.index >= event_date
-                if not mask.any():
-                    continue
-                event_date = price_series.index[mask][0]
-
-            future_date = event_date + timedelta(days=window)
-
-            # 找最近的交易日
-            if future_date not in price_series.index:
-                mask = price_series.index >= future_date
-                if not mask.any():
-                    continue
-                future_date = price_series.index[mask][0]
-
-            if future_date in price_series.index:
-                ret = (price_series[future_date] / price_series[event_date]) - 1
-                returns.append(ret * 100)  # 百分比
+    results = {}
 
-            # 最大回撤
-            period_prices = price_series[event_date:future_date]
-            if len(period_prices) > 1:
-                rolling_max = period_prices.cummax()
-                dd = (period_prices - rolling_max) / rolling_max
-                drawdowns.append(dd.min() * 100)  # 百分比
+    for h, window in enumerate(windows):
+        returns = study.forward_return[:, h]
+        returns = returns[np.isfinite(returns)] * 100  # 百分比
+        # 與原定義一致：期間至少兩個交易日才計算回撤
+        has_path = study.valid[:, h] & (end[:, h] > start)
+        drawdowns = study.max_drawdown[has_path, h] * 100
+        mae = study.mae[has_path, h] * 100
+        mfe = study.mfe[has_path, h] * 100
+
+        has_returns = len(returns) > 0
+        has_drawdowns = len(drawdowns) > 0
+
+        forward_return = {
+            'median': float(np.median(returns)) if has_returns else None,
+            'p25': float(np.percentile(returns, 25)) if has_returns else None,
+            'p10': float(np.percentile(returns, 10)) if has_returns else None,
+            'positive_prob': float((returns > 0).mean()) if has_returns else None,
+            'sample_size': len(returns)
+        }
+        if n_bootstrap > 0:
+            forward_return['median_ci'] = bootstrap_ci(returns, np.median, n_bootstrap)
+            forward_return['positive_prob_ci'] = bootstrap_ci(
+                returns, lambda x, axis: np.mean(x > 0, axis=axis), n_bootstrap
+            )
 
         results[f'{window}d'] = {
-            'forward_return': {
-                'median': float(np.median(returns)) if returns else None,
-                'p25': float(np.percentile(returns, 25)) if returns else None,
-                'p10': float(np.percentile(returns, 10)) if returns else None,
-                'positive_prob': float((np.array(returns) > 0).mean()) if returns else None,
-                'sample_size': len(returns)
-            },
+            'forward_return': forward_return,
             'max_drawdown': {
-                'median': float(np.median(drawdowns)) if drawdowns else None,
-                'p75': float(np.percentile(drawdowns, 75)) if drawdowns else None,
-                'worst': float(np.min(drawdowns)) if drawdowns else None
+                'median': float(np.median(drawdowns)) if has_drawdowns else None,
+                'p75': float(np.percentile(drawdowns, 75)) if has_drawdowns else None,
+                'worst': float(np.min(drawdowns)) if has_drawdowns else None
+            },
+            'excursion': {
+                'mae_median': float(np.median(mae)) if has_drawdowns else None,
+                'mfe_median': float(np.median(mfe)) if has_drawdowns else None
             }
         }
 
@@ -491,7 +471,9 @@ def run_analysis(
     extreme_threshold: float = 95,
     episode_min_gap_days: int = 3650,
     forward_windows_days: List[int] = None,
-    quick: bool = False
+    quick: bool = False,
+    bundle_dir: Optional[str] = None,
+    n_bootstrap: int = 0
 ) -> Dict[str, Any]:
     """
     執行估值分位數分析
@@ -516,6 +498,10 @@ def run_analysis(
         事後統計視窗
     quick : bool
         快速模式
+    bundle_dir : str, optional
+        若指定，將指標序列、歷史分位數、價格與結果寫成分析產物
+    n_bootstrap : int
+        事後統計 bootstrap 信賴區間重抽樣次數（0 表示不計算）
 
     Returns
     -------
@@ -537,15 +523,19 @@ def run_analysis(
 
     if "cape" in metrics:
         print("抓取 CAPE 資料...")
-        cape = fetch_shiller_cape()
-        if cape is not None:
-            metric_data['cape'] = cape
+        with instrumentation.stage("fetch_cape") as st:
+            cape = fetch_shiller_cape()
+            if cape is not None:
+                metric_data['cape'] = cape
+                st.add_rows(len(cape))
 
     if "mktcap_to_gdp" in metrics:
         print("計算 市值/GDP...")
-        mktcap_gdp = fetch_mktcap_to_gdp()
-        if mktcap_gdp is not None:
-            metric_data['mktcap_to_gdp'] = mktcap_gdp
+        with instrumentation.stage("fetch_mktcap_to_gdp") as st:
+            mktcap_gdp = fetch_mktcap_to_gdp()
+            if mktcap_gdp is not None:
+                metric_data['mktcap_to_gdp'] = mktcap_gdp
+                st.add_rows(len(mktcap_gdp))
 
     # 注意：trailing_pe 等指標需要歷史資料，這裡使用 CAPE 作為近似
     # 在實際應用中，應從其他來源獲取
@@ -558,21 +548,24 @@ def run_analysis(
         return {"error": "無法獲取任何估值指標資料"}
 
     # 合併資料
-    metric_df = pd.DataFrame(metric_data)
-    metric_df = metric_df.dropna(how='all')
+    with instrumentation.stage("align") as st:
+        metric_df = pd.DataFrame(metric_data)
+        metric_df = metric_df.dropna(how='all')
+        st.add_rows(len(metric_df))
 
     if metric_df.empty:
         return {"error": "資料合併後為空"}
 
     # 計算分位數
     print("計算分位數...")
-    metric_percentiles = compute_metric_percentiles(metric_df, as_of_date)
+    with instrumentation.stage("percentiles", rows=metric_df.count().sum()):
+        metric_percentiles = compute_metric_percentiles(metric_df, as_of_date)
 
-    if not metric_percentiles:
-        return {"error": "無法計算分位數"}
+        if not metric_percentiles:
+            return {"error": "無法計算分位數"}
 
-    # 合成總分
-    composite_percentile = aggregate_percentiles(metric_percentiles, weights, aggregation)
+        # 合成總分
+        composite_percentile = aggregate_percentiles(metric_percentiles, weights, aggregation)
 
     # 判定極端
     is_extreme = composite_percentile >= extreme_threshold
@@ -628,6 +621,7 @@ def run_analysis(
     }
 
     if quick:
+        write_analysis_bundle(bundle_dir, result, metric_df)
         return result
 
     # 完整分析：歷史事件
@@ -635,21 +629,24 @@ def run_analysis(
 
     # 建立歷史合成分位數序列（簡化版：使用 CAPE 分位數）
     if 'cape' in metric_df.columns:
-        cape_series = metric_df['cape'].dropna()
-        rolling_pct = pd.Series(index=cape_series.index, dtype=float)
-
-        for i, (date, val) in enumerate(cape_series.items()):
-            if i < 60:
-                continue
-            hist = cape_series.iloc[:i+1]
-            rolling_pct[date] = percentile_rank(hist, val)
-
-        historical_episodes = find_extreme_episodes(
-            rolling_pct,
-            threshold=extreme_threshold,
-            min_gap_days=episode_min_gap_days
-        )
+        with instrumentation.stage("episodes") as st:
+            cape_series = metric_df['cape'].dropna()
+            st.add_rows(len(cape_series))
+            rolling_pct = pd.Series(index=cape_series.index, dtype=float)
+
+            for i, (date, val) in enumerate(cape_series.items()):
+                if i < 60:
+                    continue
+                hist = cape_series.iloc[:i+1]
+                rolling_pct[date] = percentile_rank(hist, val)
+
+            historical_episodes = find_extreme_episodes(
+                rolling_pct,
+                threshold=extreme_threshold,
+                min_gap_days=episode_min_gap_days
+            )
     else:
+        rolling_pct = None
         historical_episodes = []
 
     # 加入已知歷史事件的背景資訊
@@ -666,17 +663,23 @@ def run_analysis(
     result["historical_episodes"] = episodes_with_context
 
     # 事後統計
+    price_series = None
     if historical_episodes:
         print("計算事後統計...")
-        price_series = fetch_price_history(universe)
+        with instrumentation.stage("fetch_prices") as st:
+            price_series = fetch_price_history(universe)
+            if price_series is not None:
+                st.add_rows(len(price_series))
 
         if price_series is not None:
             event_dates = [ep[0] for ep in historical_episodes]
-            forward_stats = calculate_forward_stats(
-                price_series,
-                event_dates,
-                forward_windows_days
-            )
+            with instrumentation.stage("forward_stats", rows=len(event_dates)):
+                forward_stats = calculate_forward_stats(
+                    price_series,
+                    event_dates,
+                    forward_windows_days,
+                    n_bootstrap=n_bootstrap
+                )
             result["forward_stats"] = forward_stats
 
     # 風險解讀
@@ -704,13 +707,74 @@ def run_analysis(
             f"{m} 資料可回溯至 {info['history_start']}，共 {info['data_points']} 個資料點"
         )
 
+    write_analysis_bundle(bundle_dir, result, metric_df, rolling_pct, price_series)
+
     return result
 
 
+def write_analysis_bundle(
+    bundle_dir: Optional[str],
+    result: Dict[str, Any],
+    metric_df: pd.DataFrame,
+    rolling_pct: Optional[pd.Series] = None,
+    price_series: Optional[pd.Series] = None
+) -> None:
+    """
+    寫出分析產物（bundle_dir 為 None 時不做事）
+
+    Parameters
+    ----------
+    bundle_dir : str or None
+        輸出目錄
+    result : dict
+        分析結果
+    metric_df : pd.DataFrame
+        各估值指標序列
+    rolling_pct : pd.Series, optional
+        CAPE 擴展視窗分位數序列
+    price_series : pd.Series, optional
+        價格歷史
+    """
+    if not bundle_dir:
+        return
+
+    from analysis_bundle import write_bundle
+
+    series = {col: metric_df[col] for col in metric_df.columns}
+    if rolling_pct is not None:
+        series["cape_rolling_percentile"] = rolling_pct
+    if price_series is not None:
+        # yfinance 回傳含時區的日資料，統一轉為 naive 日期以便與月資料對齊
+        if getattr(price_series.index, "tz", None) is not None:
+            price_series = price_series.tz_localize(None)
+        series["price"] = price_series
+
+    with instrumentation.stage("bundle", rows=sum(len(s) for s in series.values())):
+        write_bundle(bundle_dir, BUNDLE_NAME, series, result)
+
+
 # =============================================================================
 # CLI 入口
 # =============================================================================
 
+def quick_snapshot_key(args: argparse.Namespace) -> str:
+    """--quick 快照鍵值：分析參數 + Shiller 快取中繼檔（每次更新資料都會改寫）+ 分析產物檔的狀態"""
+    shiller_cache = Path(__file__).parent.parent / "cache" / "shiller"
+    files = [shiller_cache / "shiller.json"]
+    if args.bundle_dir:
+        files.append(Path(args.bundle_dir) / f"{BUNDLE_NAME}.json")
+    return snapshot_key(
+        "valuation_quick",
+        args.as_of_date,
+        args.universe,
+        args.metrics,
+        args.aggregation,
+        args.extreme_threshold,
+        args.bundle_dir,
+        files=files,
+    )
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="計算美股當前估值歷史分位數"
@@ -751,18 +815,51 @@ def main():
         action="store_true",
         help="快速模式（只輸出基本結果）"
     )
+    parser.add_argument(
+        "--bundle-dir",
+        default=DEFAULT_BUNDLE_DIR,
+        help=f"分析產物目錄，供視覺化離線使用（空字串表示不寫出，預設: {DEFAULT_BUNDLE_DIR}）"
+    )
+
+    parser.add_argument(
+        "--bootstrap",
+        type=int,
+        default=2000,
+        help="事後統計 bootstrap 信賴區間重抽樣次數（預設: 2000，0 表示不計算）"
+    )
+    parser.add_argument(
+        "--no-snapshot",
+        action="store_true",
+        help="--quick 不讀寫結果快照，一律重新計算"
+    )
+    instrumentation.add_cli_arguments(parser)
 
     args = parser.parse_args()
+    instrumentation.configure_from_args(args, "valuation_percentile")
 
-    # 執行分析
-    result = run_analysis(
-        as_of_date=args.as_of_date,
-        universe=args.universe,
-        metrics=args.metrics.split(","),
-        aggregation=args.aggregation,
-        extreme_threshold=args.extreme_threshold,
-        quick=args.quick
-    )
+    # --quick 快照：同一天、同參數，且 Shiller 快取與分析產物都未變動時直接讀回
+    # （不匯入 pandas、不連網）；開啟診斷時一律重算以便量測
+    use_snapshot = args.quick and not args.no_snapshot and not instrumentation.is_enabled()
+    result = read_snapshot(QUICK_SNAPSHOT_PATH, quick_snapshot_key(args)) if use_snapshot else None
+
+    if result is not None:
+        print(f"使用快速結果快照: {QUICK_SNAPSHOT_PATH}")
+    else:
+        # 執行分析
+        result = run_analysis(
+            as_of_date=args.as_of_date,
+            universe=args.universe,
+            metrics=args.metrics.split(","),
+            aggregation=args.aggregation,
+            extreme_threshold=args.extreme_threshold,
+            quick=args.quick,
+            bundle_dir=args.bundle_dir or None,
+            n_bootstrap=args.bootstrap
+        )
+        # 鍵值在分析後計算：本次執行更新的快取 / 產物檔即為下次比對的狀態
+        if use_snapshot and "error" not in result:
+            write_snapshot(QUICK_SNAPSHOT_PATH, quick_snapshot_key(args), result)
+    instrumentation.attach(result)
 
     # 輸出
     output_json = json.dumps(result, ensure_ascii=False, indent=2)
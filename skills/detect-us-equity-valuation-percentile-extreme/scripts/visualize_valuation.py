@@ -8,10 +8,15 @@
 - 歷史峰值標記 (1929, 1965, 1999, 2021)
 - S&P 500 指數疊加（對數刻度）
 - 當前位置標注
+
+若 valuation_percentile.py 已寫出分析產物（cache/bundle/valuation.arrow + .json），
+直接以分析實際使用的序列與結果繪圖，不重新抓取；否則退回線上抓取。
 """
 
 import argparse
+import io
 import json
+import sys
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
@@ -27,6 +32,9 @@ import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 from matplotlib.ticker import PercentFormatter
 
+sys.path.insert(0, str(Path(__file__).parent))
+from shiller_source import load_shiller_data
+
 # 設定字體和風格
 plt.rcParams['font.sans-serif'] = ['DejaVu Sans', 'Microsoft JhengHei', 'SimHei']
 plt.rcParams['axes.unicode_minus'] = False
@@ -66,35 +74,18 @@ METRIC_DISPLAY_NAMES = {
 
 def fetch_shiller_data() -> pd.DataFrame:
     """
-    從 Shiller 資料集抓取 CAPE 和價格資料
+    從 Shiller 資料集抓取 CAPE 和價格資料（經 shiller_source 快取）
     """
-    url = "http://www.econ.yale.edu/~shiller/data/ie_data.xls"
-
-    try:
-        df = pd.read_excel(url, sheet_name="Data", skiprows=7)
-
-        # 處理日期
-        df['Date'] = df['Date'].astype(str).str[:7].str.replace('.', '-')
-        df['Date'] = pd.to_datetime(df['Date'], format='%Y-%m', errors='coerce')
-        df = df.dropna(subset=['Date'])
-        df = df.set_index('Date')
-
-        # 提取關鍵欄位
-        result = pd.DataFrame(index=df.index)
+    df = load_shiller_data()
+    if df.empty or 'cape' not in df.columns:
+        return pd.DataFrame()
 
-        # CAPE
-        if 'CAPE' in df.columns:
-            result['cape'] = pd.to_numeric(df['CAPE'], errors='coerce')
+    result = pd.DataFrame(index=df.index)
+    result['cape'] = df['cape']
+    if 'sp_price' in df.columns:
+        result['sp500'] = df['sp_price']
 
-        # 價格 (用於 S&P 500)
-        if 'P' in df.columns:
-            result['sp500'] = pd.to_numeric(df['P'], errors='coerce')
-
-        return result.dropna()
-
-    except Exception as e:
-        print(f"Shiller 資料抓取失敗: {e}")
-        return pd.DataFrame()
+    return result.dropna()
 
 
 def fetch_fred_series(series_id: str, start: str = "1900-01-01") -> Optional[pd.Series]:
@@ -102,8 +93,12 @@ def fetch_fred_series(series_id: str, start: str = "1900-01-01") -> Optional[pd.
     從 FRED 抓取時間序列
     """
     try:
+        import http_client
+
         url = f"https://fred.stlouisfed.org/graph/fredgraph.csv?id={series_id}"
-        df = pd.read_csv(url, parse_dates=['DATE'], index_col='DATE')
+        response = http_client.get(url, timeout=30)
+        response.raise_for_status()
+        df = pd.read_csv(io.StringIO(response.text), parse_dates=['DATE'], index_col='DATE')
         df = df.rename(columns={series_id: 'value'})
         df = df[df.index >= start]
         df = df.dropna()
@@ -214,8 +209,8 @@ def create_combined_valuation_chart(
     ----------
     composite_percentile : pd.Series
         合成分位數時間序列
-    sp500_prices : pd.Series
-        S&P 500 價格序列
+    sp500_prices : pd.Series or None
+        S&P 500 價格序列（None 時不畫次軸）
     metric_percentiles : dict
         各指標分位數
     output_path : str, optional
@@ -232,9 +227,13 @@ def create_combined_valuation_chart(
     matplotlib.Figure
     """
     # 對齊資料
-    common_idx = composite_percentile.dropna().index.intersection(sp500_prices.dropna().index)
-    comp = composite_percentile.loc[common_idx]
-    sp = sp500_prices.loc[common_idx]
+    if sp500_prices is not None and not sp500_prices.dropna().empty:
+        common_idx = composite_percentile.dropna().index.intersection(sp500_prices.dropna().index)
+        comp = composite_percentile.loc[common_idx]
+        sp = sp500_prices.loc[common_idx]
+    else:
+        comp = composite_percentile.dropna()
+        sp = None
 
     # 創建圖表 - 使用 subplots 設定 2:1 的高度比例
     fig, axes = plt.subplots(2, 1, figsize=(14, 12),
@@ -258,11 +257,13 @@ def create_combined_valuation_chart(
     ax1.axhline(y=50, color='gray', linestyle='--', alpha=0.3, linewidth=1)
 
     # 次軸：S&P 500 (對數刻度) - 只畫線，不填充
-    ax2 = ax1.twinx()
-    ax2.plot(sp.index, sp.values, color='#2E86AB', linewidth=2, alpha=0.8, label='S&P 500')
-    ax2.set_yscale('log')
-    ax2.set_ylabel('S&P 500 (Log)', fontsize=11, color='#2E86AB')
-    ax2.tick_params(axis='y', labelcolor='#2E86AB')
+    ax2 = None
+    if sp is not None:
+        ax2 = ax1.twinx()
+        ax2.plot(sp.index, sp.values, color='#2E86AB', linewidth=2, alpha=0.8, label='S&P 500')
+        ax2.set_yscale('log')
+        ax2.set_ylabel('S&P 500 (Log)', fontsize=11, color='#2E86AB')
+        ax2.tick_params(axis='y', labelcolor='#2E86AB')
 
     # 標記歷史峰值
     if show_peaks:
@@ -316,7 +317,7 @@ def create_combined_valuation_chart(
 
     # 圖例
     lines1, labels1 = ax1.get_legend_handles_labels()
-    lines2, labels2 = ax2.get_legend_handles_labels()
+    lines2, labels2 = ax2.get_legend_handles_labels() if ax2 is not None else ([], [])
     ax1.legend(lines1 + lines2, labels1 + labels2, loc='upper left', fontsize=10)
 
     # =========================================================================
@@ -507,14 +508,86 @@ def create_metric_breakdown_chart(
 # 主函數
 # =============================================================================
 
+def load_bundle_inputs(bundle_dir: str, as_of_date: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    從分析產物載入繪圖所需的序列
+
+    Parameters
+    ----------
+    bundle_dir : str
+        分析產物目錄
+    as_of_date : str, optional
+        要求的評估日期；指定時產物的 as_of_date 必須相同
+
+    Returns
+    -------
+    dict or None
+        composite_percentile / sp500 / metric_percentiles / cape / result；
+        產物不存在或評估日期不符時回傳 None
+    """
+    from analysis_bundle import bundle_exists, read_bundle
+
+    if not bundle_exists(bundle_dir, "valuation"):
+        return None
+
+    bundle = read_bundle(bundle_dir, "valuation")
+    result = bundle.result
+    if "error" in result or "cape" not in bundle:
+        return None
+    if as_of_date is not None and result.get("as_of_date") != as_of_date:
+        print(f"分析產物的評估日期為 {result.get('as_of_date')}，與要求的 {as_of_date} 不同")
+        return None
+
+    cape = bundle.series("cape")
+
+    # 優先使用分析器實際算出的歷史分位數序列（quick 模式沒有，才在此重算）
+    composite = bundle.get("cape_rolling_percentile")
+    if composite is None:
+        composite = calculate_rolling_percentile(cape, min_periods=120)
+
+    # 價格為日資料，對齊到 CAPE 的月初日期
+    price = bundle.get("price")
+    sp500 = price.resample("MS").last() if price is not None else None
+
+    metric_percentiles = {
+        metric: info["percentile"]
+        for metric, info in result.get("metric_percentiles", {}).items()
+    }
+
+    return {
+        "composite_percentile": composite,
+        "sp500": sp500,
+        "metric_percentiles": metric_percentiles,
+        "cape": cape,
+        "result": result,
+    }
+
+
 def run_visualization(
     as_of_date: str = None,
     output_dir: str = "output",
-    show_plot: bool = False
+    show_plot: bool = False,
+    bundle_dir: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     執行完整的視覺化分析
+
+    bundle_dir 指定且分析產物存在時，直接以產物繪圖（離線、與分析結果一致）；
+    指定 as_of_date 而產物屬於其他日期時，先以該日期重新執行分析、改寫產物再繪圖。
     """
+    if bundle_dir:
+        bundled = load_bundle_inputs(bundle_dir, as_of_date)
+        if bundled is None and as_of_date is not None:
+            from valuation_percentile import run_analysis
+
+            print(f"以評估日期 {as_of_date} 重新產生分析產物...")
+            run_analysis(as_of_date=as_of_date, bundle_dir=bundle_dir)
+            bundled = load_bundle_inputs(bundle_dir, as_of_date)
+        if bundled is not None:
+            print(f"使用分析產物 {bundle_dir}（評估日期 {bundled['result'].get('as_of_date')}）")
+            return _render_from_bundle(bundled, output_dir, show_plot)
+        print(f"找不到分析產物 {bundle_dir}，改為線上抓取資料")
+
     if as_of_date is None:
         as_of_date = datetime.now().strftime("%Y-%m-%d")
 
@@ -664,6 +737,56 @@ def run_visualization(
     return result
 
 
+def _render_from_bundle(
+    bundled: Dict[str, Any],
+    output_dir: str,
+    show_plot: bool
+) -> Dict[str, Any]:
+    """以分析產物繪製合併圖表"""
+    analysis = bundled["result"]
+    summary = analysis.get("summary", {})
+    composite_percentile = bundled["composite_percentile"]
+    cape = bundled["cape"]
+
+    latest_percentile = float(summary.get("composite_percentile", composite_percentile.dropna().iloc[-1]))
+    is_extreme = bool(summary.get("is_extreme", latest_percentile >= 95))
+    as_of_date = analysis.get("as_of_date", datetime.now().strftime("%Y-%m-%d"))
+
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    combined_chart_path = output_path / f"us_valuation_percentile_{as_of_date}.png"
+
+    as_of_label = pd.Timestamp(as_of_date).strftime('%b %y')
+    create_combined_valuation_chart(
+        composite_percentile=composite_percentile,
+        sp500_prices=bundled["sp500"],
+        metric_percentiles=bundled["metric_percentiles"],
+        output_path=str(combined_chart_path),
+        title="US Stock Valuation Percentile",
+        show_peaks=True,
+        current_label=f"Extreme\nas of\n{as_of_label}" if is_extreme else None
+    )
+
+    if show_plot:
+        plt.show()
+    plt.close('all')
+
+    return {
+        "as_of_date": as_of_date,
+        "generated_at": datetime.now().isoformat(),
+        "source": "bundle",
+        "summary": {
+            "composite_percentile": round(latest_percentile, 1),
+            "is_extreme": is_extreme,
+            "status": summary.get("status"),
+            "cape_value": round(float(cape.iloc[-1]), 2),
+        },
+        "output_files": {
+            "combined_chart": str(combined_chart_path),
+        },
+    }
+
+
 # =============================================================================
 # CLI 入口
 # =============================================================================
@@ -673,13 +796,16 @@ def main():
     parser.add_argument("-d", "--as_of_date", default=None, help="評估日期")
     parser.add_argument("-o", "--output_dir", default="output", help="輸出目錄")
     parser.add_argument("--show", action="store_true", help="顯示圖表")
+    parser.add_argument("--bundle", default="cache/bundle",
+                        help="分析產物目錄（valuation_percentile.py 輸出；空字串表示線上抓取）")
 
     args = parser.parse_args()
 
     result = run_visualization(
         as_of_date=args.as_of_date,
         output_dir=args.output_dir,
-        show_plot=args.show
+        show_plot=args.show,
+        bundle_dir=args.bundle or None
     )
 
     print("\n" + json.dumps(result, ensure_ascii=False, indent=2))
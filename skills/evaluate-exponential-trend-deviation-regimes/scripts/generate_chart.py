@@ -10,10 +10,12 @@ Usage:
 """
 
 import argparse
+import io
 import json
 import os
 import sys
 from datetime import datetime
+from pathlib import Path
 
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend
@@ -23,6 +25,9 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 
+sys.path.insert(0, str(Path(__file__).parent))
+import http_client
+
 
 def fetch_gold_data(symbol: str = "xauusd", start_date: str = "19700101") -> pd.Series:
     """Fetch gold price data from Stooq."""
@@ -30,7 +35,9 @@ def fetch_gold_data(symbol: str = "xauusd", start_date: str = "19700101") -> pd.
     url = f"https://stooq.com/q/d/l/?s={symbol}&d1={start_date}&d2={end_date}&i=m"
 
     print(f"Fetching data from Stooq ({symbol})...")
-    gold = pd.read_csv(url)
+    response = http_client.get(url, timeout=30)
+    response.raise_for_status()
+    gold = pd.read_csv(io.StringIO(response.text))
     gold["Date"] = pd.to_datetime(gold["Date"])
     gold = gold.set_index("Date").sort_index()
     return gold["Close"].dropna()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Trend Engine Tests
+
+Checks trend_engine's point-in-time percentile:
+1. Rows before min_history valid deviations are NaN (not ranked against 1-N points)
+2. Later rows match the plain expanding rank
+3. NaN percentiles get no regime label and stay out of the backtest
+
+Usage:
+    cd skills/evaluate-exponential-trend-deviation-regimes/scripts/tests
+    python -m pytest -q test_trend_engine.py
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add scripts directory to path (tests is inside scripts/)
+scripts_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(scripts_dir))
+
+from trend_engine import (  # noqa: E402
+    backtest_deviation_regimes,
+    classify_deviation_regimes,
+    compute_deviation_panel,
+    expanding_percentile,
+)
+
+
+def test_expanding_percentile_min_history():
+    values = np.array([np.nan, 5.0, 1.0, 3.0, 4.0, 0.0])
+    ranked = expanding_percentile(values, min_history=3)[:, 0]
+
+    # Valid history counts: -, 1, 2, 3, 4, 5
+    assert np.isnan(ranked[:3]).all()
+    assert ranked[3] == pytest.approx(100.0 / 3)
+    assert ranked[4] == 50.0
+    assert ranked[5] == 0.0
+    np.testing.assert_array_equal(ranked[3:], expanding_percentile(values)[3:, 0])
+
+
+def test_panel_early_percentiles_are_nan_and_unlabelled():
+    dates = pd.date_range("2000-01-31", periods=80, freq="ME")
+    rng = np.random.default_rng(0)
+    prices = pd.DataFrame(
+        {"A": 100 * np.exp(np.cumsum(rng.normal(0.01, 0.04, len(dates))))},
+        index=dates,
+    )
+    panel = compute_deviation_panel(prices, min_periods=24, percentile_min_history=12)
+
+    deviation = panel["deviation_pct"]["A"]
+    percentile = panel["percentile"]["A"]
+    first_fit = deviation.first_valid_index()
+    first_rank = percentile.first_valid_index()
+    assert deviation.loc[first_fit:].iloc[:11].notna().all()
+    assert percentile.loc[first_fit:].iloc[:11].isna().all()
+    assert first_rank == deviation.loc[first_fit:].index[11]
+
+    regimes = classify_deviation_regimes(panel["percentile"])
+    assert regimes.loc[:first_rank, "A"].iloc[:-1].isna().all()
+
+    table = backtest_deviation_regimes(prices, regimes, horizons=(1,))
+    assert table["count"].sum() == percentile.notna().sum() - 1
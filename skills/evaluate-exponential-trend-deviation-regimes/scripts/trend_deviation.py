@@ -11,7 +11,8 @@ Based on analysis of "Gold % distance from exponential growth trendline" metrics
 import argparse
 import json
 import sys
-from datetime import datetime, timedelta
+from datetime import datetime
+from pathlib import Path
 from typing import Any
 
 import numpy as np
@@ -27,6 +28,17 @@ try:
 except ImportError:
     pdr = None
 
+from trend_engine import (
+    DEFAULT_HORIZONS,
+    DEFAULT_MIN_PERIODS,
+    DEFAULT_PERCENTILE_MIN_HISTORY,
+    backtest_deviation_regimes,
+    classify_deviation_regimes,
+    compute_deviation_panel,
+)
+
+DEFAULT_ROLLING_MONTHS = 240
+
 
 def fetch_gold_prices(
     symbol: str,
@@ -63,6 +75,41 @@ def fetch_gold_prices(
     return df
 
 
+def to_monthly_close(df: pd.DataFrame) -> pd.Series:
+    """Month-end closes with a tz-naive index (so assets from different exchanges align)."""
+    monthly = df["Close"].resample("ME").last().dropna()
+    if monthly.index.tz is not None:
+        monthly.index = monthly.index.tz_localize(None)
+    return monthly
+
+
+def fetch_price_panel(
+    symbols: list[str],
+    start_date: str,
+    end_date: str,
+) -> pd.DataFrame:
+    """
+    Fetch month-end closes for several assets into one panel.
+
+    Args:
+        symbols: Asset symbols
+        start_date: Start date (YYYY-MM-DD)
+        end_date: End date (YYYY-MM-DD)
+
+    Returns:
+        DataFrame (month-end dates x symbols); assets with shorter history are NaN-padded
+    """
+    columns = {}
+    for symbol in symbols:
+        try:
+            columns[symbol] = to_monthly_close(fetch_gold_prices(symbol, start_date, end_date))
+        except Exception as e:
+            print(f"Warning: {symbol} skipped ({e})", file=sys.stderr)
+    if not columns:
+        raise ValueError("No data found for any symbol")
+    return pd.DataFrame(columns).sort_index()
+
+
 def fit_exponential_trend(prices: pd.Series) -> tuple[pd.Series, tuple[float, float]]:
     """
     Fit exponential trend line to price series.
@@ -97,6 +144,15 @@ def calculate_percentile(distance_series: pd.Series) -> float:
     return float(percentile)
 
 
+def _round_or_none(value: float, ndigits: int) -> float | None:
+    return round(float(value), ndigits) if pd.notna(value) else None
+
+
+def _first_valid_date(series: pd.Series) -> str | None:
+    first = series.first_valid_index()
+    return first.strftime("%Y-%m-%d") if first is not None else None
+
+
 def find_reference_peaks(
     distance_series: pd.Series,
     peak_dates: list[str] | None = None,
@@ -372,6 +428,10 @@ def analyze_asset_deviation(
     end_date: str | None = None,
     compare_peak_dates: list[str] | None = None,
     include_macro: bool = False,
+    fit_window: str = "full",
+    rolling_months: int = DEFAULT_ROLLING_MONTHS,
+    min_months: int = DEFAULT_MIN_PERIODS,
+    percentile_min_months: int = DEFAULT_PERCENTILE_MIN_HISTORY,
 ) -> dict[str, Any]:
     """
     Main analysis function for any asset.
@@ -382,6 +442,12 @@ def analyze_asset_deviation(
         end_date: End date
         compare_peak_dates: Optional historical peak dates to compare
         include_macro: Whether to include macro analysis (currently only for gold)
+        fit_window: "full" (headline metrics from a full-sample fit), "expanding"
+            or "rolling" (point-in-time fits; see trend_engine)
+        rolling_months: Window for fit_window="rolling"
+        min_months: Months of history before the first point-in-time fit
+        percentile_min_months: Point-in-time deviations ranked before the first
+            percentile; with fewer, headline metrics stay on the full-sample fit
 
     Returns:
         Analysis result dictionary
@@ -416,6 +482,23 @@ def analyze_asset_deviation(
     current_distance = float(distance_pct.iloc[-1])
     current_percentile = calculate_percentile(distance_pct)
 
+    # Point-in-time view: each date measured against the trend known at that date
+    window = rolling_months if fit_window == "rolling" else None
+    pit = compute_deviation_panel(
+        monthly_prices.rename(symbol),
+        window=window,
+        min_periods=min(min_months, len(monthly_prices)),
+        percentile_min_history=percentile_min_months,
+    )
+    pit_distance = pit["deviation_pct"][symbol]
+    pit_percentile = pit["percentile"][symbol]
+
+    if fit_window != "full" and pit_percentile.notna().any():
+        trend = pit["trend"][symbol]
+        distance_pct = pit_distance.dropna()
+        current_distance = float(distance_pct.iloc[-1])
+        current_percentile = float(pit_percentile.iloc[-1])
+
     # Reference peaks
     references = find_reference_peaks(distance_pct, compare_peak_dates)
 
@@ -433,6 +516,7 @@ def analyze_asset_deviation(
         "skill": "evaluate-exponential-trend-deviation-regimes",
         "asset": symbol,
         "trend_model": "exponential_log_linear",
+        "trend_fit_window": fit_window if fit_window != "rolling" else f"rolling_{rolling_months}m",
         "date_range": {
             "start": monthly_prices.index[0].strftime("%Y-%m-%d"),
             "end": monthly_prices.index[-1].strftime("%Y-%m-%d"),
@@ -440,7 +524,11 @@ def analyze_asset_deviation(
         "metrics": {
             "current_distance_pct": round(current_distance, 2),
             "current_percentile": round(current_percentile, 1),
-            "reference": {k: round(v, 1) for k, v in references.items()},
+            "reference": {
+                k: round(v, 1) if isinstance(v, float)
+                else {**v, "distance_pct": round(v["distance_pct"], 1)}
+                for k, v in references.items()
+            },
             "verdict": verdict,
         },
         "trend_parameters": {
@@ -453,6 +541,12 @@ def analyze_asset_deviation(
             "trend_price": round(float(trend.iloc[-1]), 2),
             "data_points": len(monthly_prices),
         },
+        "point_in_time": {
+            "distance_pct": _round_or_none(pit_distance.iloc[-1], 2),
+            "percentile": _round_or_none(pit_percentile.iloc[-1], 1),
+            "growth_rate_pct": _round_or_none(pit["growth_rate_pct"][symbol].iloc[-1], 2),
+            "first_fit_date": _first_valid_date(pit_distance),
+        },
     }
 
     # Macro regime analysis
@@ -511,6 +605,121 @@ def analyze_asset_deviation(
     return result
 
 
+def analyze_deviation_panel(
+    symbols: list[str],
+    start_date: str | None = None,
+    end_date: str | None = None,
+    fit_window: str = "expanding",
+    rolling_months: int = DEFAULT_ROLLING_MONTHS,
+    min_months: int = DEFAULT_MIN_PERIODS,
+    percentile_min_months: int = DEFAULT_PERCENTILE_MIN_HISTORY,
+    backtest: bool = False,
+    horizons: tuple[int, ...] = DEFAULT_HORIZONS,
+    history_output: str | None = None,
+) -> dict[str, Any]:
+    """
+    Point-in-time trend deviation for several assets in one pass.
+
+    Unlike the single-asset full-sample fit, every date is measured against the
+    trend fitted with data available at that date, so the regime history can
+    be backtested without look-ahead.
+
+    Args:
+        symbols: Asset symbols
+        start_date: Start date (default 1970-01-01; each asset starts at its first data)
+        end_date: End date
+        fit_window: "expanding" or "rolling"
+        rolling_months: Window for fit_window="rolling"
+        min_months: Months of history before the first fit
+        percentile_min_months: Deviations ranked before the first percentile
+            and regime label (earlier months are left out of the backtest)
+        backtest: Whether to add forward returns grouped by regime
+        horizons: Forward horizons in months for the backtest
+        history_output: Optional CSV path for the monthly deviation history
+
+    Returns:
+        Panel analysis result dictionary
+    """
+    if end_date is None:
+        end_date = datetime.now().strftime("%Y-%m-%d")
+    if start_date is None:
+        start_date = "1970-01-01"
+
+    prices = fetch_price_panel(symbols, start_date, end_date)
+    window = rolling_months if fit_window == "rolling" else None
+    panel = compute_deviation_panel(
+        prices,
+        window=window,
+        min_periods=min_months,
+        percentile_min_history=percentile_min_months,
+    )
+    regimes = classify_deviation_regimes(panel["percentile"])
+
+    assets = {}
+    for symbol in prices.columns:
+        deviation = panel["deviation_pct"][symbol].dropna()
+        if deviation.empty:
+            assets[symbol] = {
+                "error": f"Fewer than {min_months} months of data",
+                "data_points": int(prices[symbol].notna().sum()),
+            }
+            continue
+        last = deviation.index[-1]
+        assets[symbol] = {
+            "as_of": last.strftime("%Y-%m-%d"),
+            "distance_pct": _round_or_none(deviation.iloc[-1], 2),
+            "percentile": _round_or_none(panel["percentile"].at[last, symbol], 1),
+            "regime": regimes.at[last, symbol],
+            "growth_rate_pct": _round_or_none(panel["growth_rate_pct"].at[last, symbol], 2),
+            "latest_price": round(float(prices.at[last, symbol]), 2),
+            "trend_price": round(float(panel["trend"].at[last, symbol]), 2),
+            "max_distance_pct": round(float(deviation.max()), 2),
+            "max_distance_date": deviation.idxmax().strftime("%Y-%m-%d"),
+            "first_fit_date": _first_valid_date(deviation),
+            "data_points": int(prices[symbol].notna().sum()),
+        }
+
+    result = {
+        "skill": "evaluate-exponential-trend-deviation-regimes",
+        "symbols": list(prices.columns),
+        "as_of": prices.index[-1].strftime("%Y-%m-%d"),
+        "trend_model": "exponential_log_linear",
+        "trend_fit_window": fit_window if fit_window != "rolling" else f"rolling_{rolling_months}m",
+        "min_months": min_months,
+        "percentile_min_months": percentile_min_months,
+        "assets": assets,
+    }
+
+    if backtest:
+        table = backtest_deviation_regimes(prices, regimes, horizons=horizons)
+        result["backtest"] = [
+            {k: (round(v, 2) if isinstance(v, float) else v) for k, v in row.items()}
+            for row in table.to_dict(orient="records")
+        ]
+
+    if history_output:
+        history = pd.concat(
+            {
+                "price": prices,
+                "trend": panel["trend"],
+                "distance_pct": panel["deviation_pct"],
+                "percentile": panel["percentile"],
+                "regime": regimes,
+            },
+            axis=1,
+        ).stack(level=1, future_stack=True).dropna(subset=["distance_pct"])
+        history.index.names = ["date", "symbol"]
+        Path(history_output).parent.mkdir(parents=True, exist_ok=True)
+        history.to_csv(history_output)
+        result["history_output"] = history_output
+
+    result["metadata"] = {
+        "generated_at": datetime.now().isoformat(),
+        "data_sources": {"prices": "Yahoo Finance"},
+    }
+    return result
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Asset Exponential Trend Deviation Analysis",
@@ -531,15 +740,26 @@ Examples:
 
   # Output to file
   python trend_deviation.py --symbol GC=F --output result.json
+
+  # Point-in-time (expanding) fit instead of full-sample fit
+  python trend_deviation.py --symbol GC=F --start 1970-01-01 --fit-window expanding
+
+  # Multi-asset panel with regime backtest
+  python trend_deviation.py --symbols GC=F SI=F HG=F BTC-USD ^GSPC --backtest
         """,
     )
 
-    parser.add_argument(
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument(
         "--symbol",
         type=str,
-        required=True,
         help="Asset symbol (e.g., GC=F for gold, ^GSPC for S&P 500, BTC-USD for Bitcoin)",
     )
+    target.add_argument(
+        "--symbols",
+        nargs="+",
+        help="Several asset symbols, analyzed as one point-in-time panel",
+    )
     parser.add_argument(
         "--start",
         type=str,
@@ -570,9 +790,54 @@ Examples:
         action="store_true",
         help="Quick mode (for gold, enables macro analysis)",
     )
+    parser.add_argument(
+        "--fit-window",
+        choices=["full", "expanding", "rolling"],
+        help="Trend fit window: full sample (default for --symbol), expanding or rolling "
+             "point-in-time fits (default for --symbols: expanding)",
+    )
+    parser.add_argument(
+        "--rolling-months",
+        type=int,
+        default=DEFAULT_ROLLING_MONTHS,
+        help=f"Window for --fit-window rolling (default: {DEFAULT_ROLLING_MONTHS})",
+    )
+    parser.add_argument(
+        "--min-months",
+        type=int,
+        default=DEFAULT_MIN_PERIODS,
+        help=f"Months of history before the first point-in-time fit (default: {DEFAULT_MIN_PERIODS})",
+    )
+    parser.add_argument(
+        "--percentile-min-months",
+        type=int,
+        default=DEFAULT_PERCENTILE_MIN_HISTORY,
+        help="Point-in-time deviations ranked before the first percentile / regime "
+             f"(default: {DEFAULT_PERCENTILE_MIN_HISTORY})",
+    )
+    parser.add_argument(
+        "--backtest",
+        action="store_true",
+        help="With --symbols: forward returns grouped by point-in-time deviation regime",
+    )
+    parser.add_argument(
+        "--horizons",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_HORIZONS),
+        help="Forward horizons in months for --backtest (default: 12 36)",
+    )
+    parser.add_argument(
+        "--history-output",
+        type=str,
+        help="With --symbols: CSV path for the monthly deviation / percentile / regime history",
+    )
 
     args = parser.parse_args()
 
+    if args.symbols and args.fit_window == "full":
+        parser.error("--symbols uses point-in-time fits; choose --fit-window expanding or rolling")
+
     # Parse compare peaks
     compare_peaks = None
     if args.compare_peaks:
@@ -585,13 +850,31 @@ Examples:
             args.start = "1970-01-01"
 
     try:
-        result = analyze_asset_deviation(
-            symbol=args.symbol,
-            start_date=args.start,
-            end_date=args.end,
-            compare_peak_dates=compare_peaks,
-            include_macro=args.include_macro,
-        )
+        if args.symbols:
+            result = analyze_deviation_panel(
+                symbols=args.symbols,
+                start_date=args.start,
+                end_date=args.end,
+                fit_window=args.fit_window or "expanding",
+                rolling_months=args.rolling_months,
+                min_months=args.min_months,
+                percentile_min_months=args.percentile_min_months,
+                backtest=args.backtest,
+                horizons=tuple(args.horizons),
+                history_output=args.history_output,
+            )
+        else:
+            result = analyze_asset_deviation(
+                symbol=args.symbol,
+                start_date=args.start,
+                end_date=args.end,
+                compare_peak_dates=compare_peaks,
+                include_macro=args.include_macro,
+                fit_window=args.fit_window or "full",
+                rolling_months=args.rolling_months,
+                min_months=args.min_months,
+                percentile_min_months=args.percentile_min_months,
+            )
 
         output_json = json.dumps(result, indent=2, ensure_ascii=False)
 
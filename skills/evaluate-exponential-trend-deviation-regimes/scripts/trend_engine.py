@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Vectorized Exponential Trend Engine
+
+Closed-form expanding / rolling log-linear trend fits for a panel of assets.
+
+For each date tau the OLS fit of y = log(price) on t uses only observations up
+to tau (expanding) or the last `window` rows (rolling). The normal equations
+need just five running sums per asset:
+
+    n, S_t, S_tt, S_y, S_ty
+
+so every fit for every date and asset comes from one cumulative sum over the
+panel (rolling windows are differences of cumulative sums). The deviation at
+tau is measured against the trend fitted with data available at tau, which
+gives a look-ahead-free deviation series; its percentile at tau is ranked
+against the deviation history up to tau.
+
+Assets with different start dates are handled with a validity mask, so gold
+(1970), BTC (2014) and equity indices can share one monthly panel.
+
+Usage:
+    from trend_engine import compute_deviation_panel, backtest_deviation_regimes
+
+    panel = compute_deviation_panel(monthly_prices, window=None, min_periods=120)
+    panel["deviation_pct"]   # DataFrame (dates x assets)
+    panel["percentile"]      # point-in-time percentile
+"""
+
+import numpy as np
+import pandas as pd
+
+PERIODS_PER_YEAR = 12
+DEFAULT_MIN_PERIODS = 120
+# Deviations ranked before a percentile is reported (earlier ranks are noise)
+DEFAULT_PERCENTILE_MIN_HISTORY = 36
+DEFAULT_REGIME_BINS = (0.0, 20.0, 80.0, 95.0, 100.0)
+DEFAULT_REGIME_LABELS = ("depressed", "normal", "elevated", "extreme")
+DEFAULT_HORIZONS = (12, 36)
+PERCENTILE_CHUNK = 512
+
+
+def _window_sums(values: np.ndarray, window: int | None) -> np.ndarray:
+    """Expanding (window=None) or trailing-window sums along axis 0."""
+    csum = np.cumsum(values, axis=0)
+    if window is None or window >= len(values):
+        return csum
+    out = csum.copy()
+    out[window:] -= csum[:-window]
+    return out
+
+
+def rolling_exponential_fit(
+    log_prices: np.ndarray,
+    window: int | None = None,
+    min_periods: int = DEFAULT_MIN_PERIODS,
+) -> dict[str, np.ndarray]:
+    """
+    Expanding / rolling OLS of log price on time, for every row and column.
+
+    Args:
+        log_prices: (T, N) array of log prices; NaN marks missing observations
+        window: Trailing window in rows (None = expanding)
+        min_periods: Minimum valid observations for a fit
+
+    Returns:
+        Dict of (T, N) arrays: "a" (intercept at the centred time origin),
+        "b" (slope per row), "trend_log" (fitted log trend at each row),
+        "n" (observations used). Rows with fewer than min_periods are NaN.
+    """
+    y = np.asarray(log_prices, dtype=np.float64)
+    if y.ndim == 1:
+        y = y[:, None]
+    rows = y.shape[0]
+
+    # Centre t to keep S_tt small; OLS slope and fitted values are shift-invariant
+    t = (np.arange(rows, dtype=np.float64) - (rows - 1) / 2.0)[:, None]
+    mask = np.isfinite(y)
+    y0 = np.where(mask, y, 0.0)
+    tm = np.where(mask, t, 0.0)
+
+    n = _window_sums(mask.astype(np.float64), window)
+    s_t = _window_sums(tm, window)
+    s_tt = _window_sums(tm * tm, window)
+    s_y = _window_sums(y0, window)
+    s_ty = _window_sums(tm * y0, window)
+
+    denom = n * s_tt - s_t * s_t
+    valid = mask & (n >= max(min_periods, 2)) & (denom > 0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        b = np.where(valid, (n * s_ty - s_t * s_y) / denom, np.nan)
+        a = np.where(valid, (s_y - b * s_t) / n, np.nan)
+    trend_log = a + b * t
+
+    return {"a": a, "b": b, "trend_log": trend_log, "n": n}
+
+
+def expanding_percentile(
+    values: np.ndarray,
+    window: int | None = None,
+    min_history: int = 1,
+) -> np.ndarray:
+    """
+    Point-in-time percentile of each value within its own history.
+
+    Matches `calculate_percentile` evaluated at every date: the share of valid
+    observations up to (and including) tau that are strictly below value[tau].
+
+    Args:
+        values: (T, N) array; NaN is ignored
+        window: Optional trailing window in rows for the ranking history
+        min_history: Minimum valid observations in the ranking history
+            (including tau) before a percentile is reported
+
+    Returns:
+        (T, N) array of percentiles in [0, 100) (NaN where value is NaN or
+        the history is shorter than min_history)
+    """
+    x = np.asarray(values, dtype=np.float64)
+    if x.ndim == 1:
+        x = x[:, None]
+    rows, cols = x.shape
+    out = np.full_like(x, np.nan)
+    idx = np.arange(rows)
+
+    for j in range(cols):
+        col = x[:, j]
+        valid = np.isfinite(col)
+        if not valid.any():
+            continue
+        hist = np.where(valid, col, np.inf)
+        # Blocks of rows against the history prefix keep memory at chunk x T
+        for start in range(0, rows, PERCENTILE_CHUNK):
+            stop = min(start + PERCENTILE_CHUNK, rows)
+            cur = col[start:stop, None]
+            in_hist = idx[None, :stop] <= idx[start:stop, None]
+            if window is not None:
+                in_hist &= idx[None, :stop] > idx[start:stop, None] - window
+            below = ((hist[None, :stop] < cur) & in_hist).sum(axis=1)
+            count = (valid[None, :stop] & in_hist).sum(axis=1)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                out[start:stop, j] = np.where(
+                    valid[start:stop] & (count >= max(min_history, 1)), below / count * 100.0, np.nan
+                )
+    return out
+
+
+def compute_deviation_panel(
+    prices: pd.DataFrame | pd.Series,
+    window: int | None = None,
+    min_periods: int = DEFAULT_MIN_PERIODS,
+    percentile_window: int | None = None,
+    periods_per_year: int = PERIODS_PER_YEAR,
+    percentile_min_history: int = DEFAULT_PERCENTILE_MIN_HISTORY,
+) -> dict[str, pd.DataFrame]:
+    """
+    Look-ahead-free trend deviation for a panel of assets in one pass.
+
+    Args:
+        prices: Price panel (dates x assets), typically month-end closes
+        window: Trend fit window in rows (None = expanding)
+        min_periods: Minimum observations before the first fit
+        percentile_window: Optional trailing window for percentile ranking
+        periods_per_year: Rows per year, for the annualized growth rate
+        percentile_min_history: Valid deviations required before the first
+            percentile (earlier rows are NaN and get no regime label)
+
+    Returns:
+        Dict of DataFrames aligned to `prices`: "trend", "deviation_pct",
+        "percentile", "growth_rate_pct" (annualized trend growth)
+    """
+    frame = prices.to_frame() if isinstance(prices, pd.Series) else prices
+    values = frame.to_numpy(dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_prices = np.where(values > 0, np.log(values), np.nan)
+
+    fit = rolling_exponential_fit(log_prices, window=window, min_periods=min_periods)
+    with np.errstate(over="ignore", invalid="ignore"):
+        deviation = (np.exp(log_prices - fit["trend_log"]) - 1.0) * 100.0
+        growth = (np.exp(fit["b"] * periods_per_year) - 1.0) * 100.0
+    percentile = expanding_percentile(
+        deviation, window=percentile_window, min_history=percentile_min_history
+    )
+
+    def _frame(arr):
+        return pd.DataFrame(arr, index=frame.index, columns=frame.columns)
+
+    return {
+        "trend": _frame(np.exp(fit["trend_log"])),
+        "deviation_pct": _frame(deviation),
+        "percentile": _frame(percentile),
+        "growth_rate_pct": _frame(growth),
+    }
+
+
+def classify_deviation_regimes(
+    percentile: pd.DataFrame,
+    bins: tuple[float, ...] = DEFAULT_REGIME_BINS,
+    labels: tuple[str, ...] = DEFAULT_REGIME_LABELS,
+) -> pd.DataFrame:
+    """Label each point-in-time percentile with a deviation regime."""
+    codes = np.digitize(percentile.to_numpy(), np.asarray(bins[1:-1]), right=False)
+    labelled = np.asarray(labels, dtype=object)[codes]
+    labelled[~np.isfinite(percentile.to_numpy())] = None
+    return pd.DataFrame(labelled, index=percentile.index, columns=percentile.columns)
+
+
+def backtest_deviation_regimes(
+    prices: pd.DataFrame,
+    regimes: pd.DataFrame,
+    horizons: tuple[int, ...] = DEFAULT_HORIZONS,
+) -> pd.DataFrame:
+    """
+    Forward log returns grouped by point-in-time deviation regime.
+
+    Regimes use only information available at each date, so the table is a
+    genuine out-of-sample check of "extreme deviation -> weak forward returns".
+
+    Args:
+        prices: Price panel (dates x assets)
+        regimes: Regime labels from `classify_deviation_regimes`
+        horizons: Forward horizons in rows
+
+    Returns:
+        Long DataFrame with columns asset, regime, horizon, count,
+        mean_return_pct, median_return_pct, hit_rate_pct
+    """
+    log_prices = np.log(prices.where(prices > 0))
+    long_regime = regimes.stack().rename("regime")
+    pieces = []
+    for h in horizons:
+        fwd = (log_prices.shift(-h) - log_prices).stack().rename("fwd")
+        joined = pd.concat([long_regime, fwd], axis=1, join="inner").dropna()
+        if joined.empty:
+            continue
+        joined.index.names = ["date", "asset"]
+        grouped = joined.groupby([joined.index.get_level_values("asset"), "regime"])["fwd"]
+        stats = pd.DataFrame({
+            "count": grouped.size(),
+            "mean_return_pct": (np.exp(grouped.mean()) - 1.0) * 100.0,
+            "median_return_pct": (np.exp(grouped.median()) - 1.0) * 100.0,
+            "hit_rate_pct": grouped.apply(lambda s: (s > 0).mean() * 100.0),
+        })
+        stats.index.names = ["asset", "regime"]
+        stats["horizon"] = h
+        pieces.append(stats.reset_index())
+
+    if not pieces:
+        return pd.DataFrame(columns=["asset", "regime", "horizon", "count",
+                                     "mean_return_pct", "median_return_pct", "hit_rate_pct"])
+    return pd.concat(pieces, ignore_index=True)[
+        ["asset", "regime", "horizon", "count", "mean_return_pct", "median_return_pct", "hit_rate_pct"]
+    ]
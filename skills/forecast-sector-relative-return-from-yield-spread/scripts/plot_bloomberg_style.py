@@ -18,10 +18,13 @@ import pandas as pd
 import numpy as np
 import json
 import argparse
+import sys
 from pathlib import Path
 from datetime import datetime, timedelta
 from io import StringIO
-import requests
+
+sys.path.insert(0, str(Path(__file__).parent))
+import http_client
 
 try:
     import yfinance as yf
@@ -72,7 +75,7 @@ def fetch_fred_series(series_id: str, start_date: str, end_date: str) -> pd.Seri
     """從 FRED 抓取時間序列"""
     params = {"id": series_id, "cosd": start_date, "coed": end_date}
     try:
-        response = requests.get(FRED_CSV_URL, params=params, timeout=30)
+        response = http_client.get(FRED_CSV_URL, params=params, timeout=30)
         response.raise_for_status()
         df = pd.read_csv(StringIO(response.text))
         df.columns = ["DATE", series_id]
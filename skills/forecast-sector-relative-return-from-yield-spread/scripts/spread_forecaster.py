@@ -15,7 +15,9 @@ from pathlib import Path
 
 import numpy as np
 import pandas as pd
-import requests
+
+sys.path.insert(0, str(Path(__file__).parent))
+import http_client
 
 try:
     import yfinance as yf
@@ -65,7 +67,7 @@ def fetch_fred_series(series_id: str, start_date: str, end_date: str) -> pd.Seri
     params = {"id": series_id, "cosd": start_date, "coed": end_date}
 
     try:
-        response = requests.get(FRED_CSV_URL, params=params, timeout=30)
+        response = http_client.get(FRED_CSV_URL, params=params, timeout=30)
         response.raise_for_status()
 
         df = pd.read_csv(StringIO(response.text))
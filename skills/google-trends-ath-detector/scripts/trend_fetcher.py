@@ -13,23 +13,21 @@ import random
 import argparse
 import asyncio
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import TYPE_CHECKING, Dict, List, Optional, Any
 from dataclasses import dataclass
 from pathlib import Path
 import tempfile
 import csv
 import glob as glob_module
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
 from loguru import logger
 
+# selenium / webdriver_manager / bs4 are only needed when actually crawling;
+# they are imported inside the methods that use them so that --csv analysis
+# and --help start without loading a browser stack.
+if TYPE_CHECKING:
+    from selenium import webdriver
+
 # ========== Configuration ==========
 
 USER_AGENTS = [
@@ -84,8 +82,13 @@ class GoogleTrendsCrawler:
             else:
                 self.download_dir = tempfile.mkdtemp(prefix="gtrends_")
 
-    def _create_driver(self) -> webdriver.Chrome:
+    def _create_driver(self) -> "webdriver.Chrome":
         """Create Chrome driver with anti-detection options"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+        from webdriver_manager.chrome import ChromeDriverManager
+
         chrome_options = Options()
 
         # Basic settings
@@ -137,7 +140,7 @@ class GoogleTrendsCrawler:
         logger.debug(f"Waiting {delay:.2f}s...")
         time.sleep(delay)
 
-    def _wait_for_google_login(self, driver: webdriver.Chrome):
+    def _wait_for_google_login(self, driver: "webdriver.Chrome"):
         """
         Navigate to Google login page and wait for user to complete login.
 
@@ -195,8 +198,12 @@ class GoogleTrendsCrawler:
         query_string = urllib.parse.urlencode(params)
         return f"{GOOGLE_TRENDS_BASE}?{query_string}"
 
-    def _wait_for_chart(self, driver: webdriver.Chrome, timeout: int = 20):
+    def _wait_for_chart(self, driver: "webdriver.Chrome", timeout: int = 20):
         """Wait for Google Trends chart to load"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
         wait = WebDriverWait(driver, timeout)
 
         # Multiple selector strategies
@@ -218,8 +225,10 @@ class GoogleTrendsCrawler:
         logger.warning("Chart element not found, continuing anyway...")
         return False
 
-    def _download_csv(self, driver: webdriver.Chrome, topic: str, geo: str, timeframe: str) -> Dict[str, Any]:
+    def _download_csv(self, driver: "webdriver.Chrome", topic: str, geo: str, timeframe: str) -> Dict[str, Any]:
         """Download CSV from Google Trends and parse it"""
+        from selenium.webdriver.common.by import By
+
         try:
             # Record time before download to find new files
             before_download = time.time()
@@ -382,6 +391,8 @@ class GoogleTrendsCrawler:
 
     def _extract_timeseries_data(self, html: str) -> Dict[str, Any]:
         """Extract time series data from page"""
+        from bs4 import BeautifulSoup
+
         soup = BeautifulSoup(html, 'lxml')
 
         # Look for data in various formats
@@ -528,12 +539,14 @@ class GoogleTrendsCrawler:
 
     def _fetch_via_internal_api(
         self,
-        driver: webdriver.Chrome,
+        driver: "webdriver.Chrome",
         topic: str,
         geo: str,
         timeframe: str
     ) -> Dict[str, Any]:
         """Fetch data via Google Trends internal API"""
+        from selenium.webdriver.common.by import By
+
         try:
             start_date, end_date = timeframe.split(" ")
         except ValueError:
@@ -694,6 +707,8 @@ class GoogleTrendsCrawler:
         """
         Fetch related queries (top and rising) using Selenium.
         """
+        from selenium.webdriver.common.by import By
+
         driver = None
         try:
             driver = self._create_driver()
@@ -18,10 +18,13 @@ import sys
 import time
 import concurrent.futures
 from datetime import datetime
+from pathlib import Path
 
-import requests
 from bs4 import BeautifulSoup
 
+sys.path.insert(0, str(Path(__file__).parent))
+import http_client
+
 # =============================================================================
 # Configuration
 # =============================================================================
@@ -82,7 +85,8 @@ def fetch_url_content(url):
     if not url or not url.startswith('http'):
         return ""
     try:
-        response = requests.get(url, headers=HEADERS, timeout=5)
+        # 正文是附加資訊：逾時只重試一次，避免拖慢整批
+        response = http_client.get(url, headers=HEADERS, timeout=5, retries=1)
         response.raise_for_status()
         soup = BeautifulSoup(response.content, 'html.parser')
 
@@ -129,7 +133,7 @@ def fetch_wallstreetcn(limit=15, keyword=None):
     """
     try:
         url = "https://api-one.wallstcn.com/apiv1/content/information-flow?channel=global-channel&accept=article&limit=50"
-        response = requests.get(url, timeout=10)
+        response = http_client.get(url, timeout=10)
         data = response.json()
 
         items = []
@@ -168,7 +172,7 @@ def fetch_36kr(limit=15, keyword=None):
     輔助來源：科技財經，涵蓋經濟政策
     """
     try:
-        response = requests.get("https://36kr.com/newsflashes", headers=HEADERS, timeout=10)
+        response = http_client.get("https://36kr.com/newsflashes", headers=HEADERS, timeout=10)
         soup = BeautifulSoup(response.text, 'html.parser')
 
         items = []
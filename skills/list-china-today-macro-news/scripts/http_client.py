@@ -0,0 +1,435 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+共用 HTTP 客戶端
+
+各抓取器原本直接呼叫 requests.get / requests.post：每次請求都重新建立 TCP + TLS
+連線，並各自手寫重試迴圈與 time.sleep 隨機延遲。本模組提供單一共用客戶端：
+
+- 連線池：共用 requests.Session，每個主機保留 keep-alive 連線（HTTPAdapter 連線池）
+- 重試：連線錯誤、逾時與 429 / 5xx 以指數退避 + full jitter 重試，尊重 Retry-After
+- 主機限制：每個主機的並行上限與最小請求間隔；禮貌性延遲只在連續請求同一主機時才付，
+  不同主機互不等待
+- 壓縮：預設 Accept-Encoding: gzip, deflate（requests 自動解壓）
+- 計時：每次請求記錄主機、狀態碼、嘗試次數、耗時與位元組數，可彙總為各主機統計
+
+回傳值就是 requests.Response，呼叫端照舊 raise_for_status() / .text / .json()；
+重試用盡仍為 429 / 5xx 時回傳最後一次回應，連線錯誤用盡時拋出最後一次例外。
+
+本檔在各 skill 的 scripts/ 中保持相同內容（skill 以目錄為單位獨立打包）。
+
+Usage:
+    import http_client
+
+    response = http_client.get(url, params={"id": "DGS10"}, timeout=30)
+    response.raise_for_status()
+
+    client = http_client.get_client()
+    client.limit_host("fred.stlouisfed.org", min_interval=0.3, max_interval=1.0)
+    client.stats()    # {host: {requests, attempts, failures, total_sec, ...}}
+
+Dependencies:
+    pip install requests
+"""
+
+import contextlib
+import email.utils
+import logging
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 30
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+DEFAULT_MAX_BACKOFF = 30.0
+DEFAULT_PER_HOST = 4
+DEFAULT_POOL_SIZE = 10
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+METRICS_MAXLEN = 5000
+
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0",
+]
+
+
+def random_user_agent() -> str:
+    return random.choice(USER_AGENTS)
+
+
+# ============================================================================
+# 主機限制
+# ============================================================================
+
+@dataclass
+class HostPolicy:
+    """單一主機的並行上限與請求間隔（秒，每次在 [min, max] 間隨機取值）"""
+    per_host: int = DEFAULT_PER_HOST
+    min_interval: float = 0.0
+    max_interval: float = 0.0
+
+
+class HostLimiter:
+    """
+    每個主機的並行上限與請求間隔
+
+    同一主機的請求之間至少間隔 uniform(min_interval, max_interval) 秒，
+    且同時最多 per_host 個請求；不同主機各自計算。limit_host 可覆寫個別主機。
+    """
+
+    def __init__(self, per_host: int = DEFAULT_PER_HOST, min_interval: float = 0.0, max_interval: float = 0.0):
+        self.default = HostPolicy(per_host, min_interval, max(min_interval, max_interval))
+        self._policies: Dict[str, HostPolicy] = {}
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._next_allowed: Dict[str, float] = {}
+
+    def limit_host(
+        self,
+        host: str,
+        per_host: Optional[int] = None,
+        min_interval: Optional[float] = None,
+        max_interval: Optional[float] = None
+    ) -> None:
+        """設定個別主機的限制（未指定的欄位沿用預設）"""
+        with self._lock:
+            base = self._policies.get(host, self.default)
+            low = base.min_interval if min_interval is None else min_interval
+            high = base.max_interval if max_interval is None else max_interval
+            policy = HostPolicy(
+                per_host=base.per_host if per_host is None else per_host,
+                min_interval=low,
+                max_interval=max(low, high),
+            )
+            if policy.per_host != base.per_host:
+                self._semaphores.pop(host, None)
+            self._policies[host] = policy
+
+    def policy(self, host: str) -> HostPolicy:
+        return self._policies.get(host, self.default)
+
+    def _semaphore(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.policy(host).per_host)
+            return self._semaphores[host]
+
+    def _reserve_slot(self, host: str) -> float:
+        """預約下一個可發送時間，回傳需等待的秒數"""
+        policy = self.policy(host)
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_allowed.get(host, now))
+            self._next_allowed[host] = start + random.uniform(policy.min_interval, policy.max_interval)
+            return start - now
+
+    @contextlib.contextmanager
+    def slot(self, url: str) -> Iterator[float]:
+        """取得主機名額（必要時等待），回傳等待秒數（並行名額 + 請求間隔）"""
+        host = urlparse(url).netloc
+        t0 = time.monotonic()
+        with self._semaphore(host):
+            wait = self._reserve_slot(host)
+            if wait > 0:
+                time.sleep(wait)
+            yield time.monotonic() - t0
+
+    def request(self, url: str, fn) -> Any:
+        """在主機限制下執行 fn()"""
+        with self.slot(url):
+            return fn()
+
+
+# ============================================================================
+# 計時紀錄
+# ============================================================================
+
+@dataclass
+class RequestMetric:
+    """單次（含重試）請求的紀錄"""
+    method: str
+    url: str
+    host: str
+    status: Optional[int]
+    attempts: int
+    elapsed_sec: float       # 含重試與退避，不含主機間隔等待
+    wait_sec: float          # 主機限制等待（並行名額 + 請求間隔）
+    bytes: int               # 解壓後內容長度
+    wire_bytes: Optional[int]  # Content-Length（壓縮時為壓縮後大小）
+    started_at: str
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status is not None and self.status < 400
+
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    """Retry-After 標頭（秒數或 HTTP 日期）"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+        return max(0.0, when.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# ============================================================================
+# 客戶端
+# ============================================================================
+
+class HttpClient:
+    """
+    連線池 + 重試 + 主機限制 + 計時的 HTTP 客戶端（執行緒安全）
+
+    Args:
+        timeout: 預設逾時秒數
+        retries: 失敗後最多重試次數（0 表示不重試）
+        backoff: 退避基數秒數；第 n 次重試等待 uniform(0, min(max_backoff, backoff * 2^n))
+        max_backoff: 單次退避上限秒數
+        limiter: 主機限制（預設每主機 4 個並行、無間隔）
+        pool_size: 每個主機保留的 keep-alive 連線數
+        headers: 額外的預設標頭
+    """
+
+    def __init__(
+        self,
+        timeout: float = DEFAULT_TIMEOUT,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        limiter: Optional[HostLimiter] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.limiter = limiter or HostLimiter()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "User-Agent": random_user_agent(),
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        })
+        if headers:
+            self.session.headers.update(headers)
+
+        self._metrics: Deque[RequestMetric] = deque(maxlen=METRICS_MAXLEN)
+        self._metrics_lock = threading.Lock()
+
+    def limit_host(self, host: str, **policy) -> "HttpClient":
+        """設定個別主機的 per_host / min_interval / max_interval"""
+        self.limiter.limit_host(host, **policy)
+        return self
+
+    def _sleep_before_retry(self, attempt: int, response: Optional[requests.Response], backoff: float) -> None:
+        delay = random.uniform(0, min(self.max_backoff, backoff * (2 ** attempt)))
+        if response is not None:
+            hinted = _retry_after(response)
+            if hinted is not None:
+                delay = min(self.max_backoff, max(delay, hinted))
+        time.sleep(delay)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        retries: Optional[int] = None,
+        timeout: Optional[float] = None,
+        backoff: Optional[float] = None,
+        **kwargs
+    ) -> requests.Response:
+        """
+        發送請求（參數同 requests.request）
+
+        Args:
+            method: HTTP 方法
+            url: 網址
+            retries: 覆寫預設重試次數
+            timeout: 覆寫預設逾時
+            backoff: 覆寫退避基數秒數
+            **kwargs: params / headers / json / data / stream 等，直接傳給 Session.request
+
+        Returns:
+            requests.Response（重試用盡時為最後一次回應）
+
+        Raises:
+            requests.RequestException: 連線錯誤或逾時且重試用盡
+        """
+        retries = self.retries if retries is None else retries
+        timeout = self.timeout if timeout is None else timeout
+        backoff = self.backoff if backoff is None else backoff
+        host = urlparse(url).netloc
+        started_at = datetime.now().isoformat()
+        started = time.perf_counter()
+        wait_total = 0.0
+        response, error = None, None
+
+        attempt = 0
+        while True:
+            attempt += 1
+            response, error = None, None
+            with self.limiter.slot(url) as waited:
+                wait_total += waited
+                try:
+                    response = self.session.request(method, url, timeout=timeout, **kwargs)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    error = e
+            retryable = error is not None or response.status_code in RETRY_STATUSES
+            if not retryable or attempt > retries:
+                break
+            logger.debug(f"{method} {url} attempt {attempt} failed "
+                         f"({error or response.status_code}), retrying")
+            self._sleep_before_retry(attempt - 1, response, backoff)
+            if response is not None:
+                response.close()
+
+        elapsed = time.perf_counter() - started - wait_total
+        content_length = response.headers.get("Content-Length") if response is not None else None
+        self._record(RequestMetric(
+            method=method.upper(),
+            url=url,
+            host=host,
+            status=response.status_code if response is not None else None,
+            attempts=attempt,
+            elapsed_sec=round(elapsed, 4),
+            wait_sec=round(wait_total, 4),
+            bytes=len(response.content) if response is not None and not kwargs.get("stream") else 0,
+            wire_bytes=int(content_length) if content_length and content_length.isdigit() else None,
+            started_at=started_at,
+            error=str(error) if error is not None else None,
+        ))
+        if error is not None:
+            raise error
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("allow_redirects", False)   # 同 requests.head
+        return self.request("HEAD", url, **kwargs)
+
+    # ------------------------------------------------------------------
+    # 計時
+    # ------------------------------------------------------------------
+
+    def _record(self, metric: RequestMetric) -> None:
+        with self._metrics_lock:
+            self._metrics.append(metric)
+        logger.debug(f"{metric.method} {metric.url} -> {metric.status} "
+                     f"in {metric.elapsed_sec:.3f}s ({metric.attempts} attempts)")
+
+    def metrics(self) -> List[RequestMetric]:
+        """所有請求紀錄（最多保留 METRICS_MAXLEN 筆）"""
+        with self._metrics_lock:
+            return list(self._metrics)
+
+    def reset_metrics(self) -> None:
+        with self._metrics_lock:
+            self._metrics.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        各主機彙總：請求數、嘗試數、失敗數、總耗時 / 平均 / p95 / 最大、等待秒數、位元組數
+        """
+        by_host: Dict[str, List[RequestMetric]] = {}
+        for m in self.metrics():
+            by_host.setdefault(m.host, []).append(m)
+
+        out = {}
+        for host, items in by_host.items():
+            times = sorted(m.elapsed_sec for m in items)
+            p95 = times[min(len(times) - 1, int(round(0.95 * (len(times) - 1))))]
+            out[host] = {
+                "requests": len(items),
+                "attempts": sum(m.attempts for m in items),
+                "failures": sum(not m.ok for m in items),
+                "total_sec": round(sum(times), 3),
+                "mean_sec": round(sum(times) / len(times), 4),
+                "p95_sec": p95,
+                "max_sec": times[-1],
+                "wait_sec": round(sum(m.wait_sec for m in items), 3),
+                "bytes": sum(m.bytes for m in items),
+            }
+        return out
+
+    def metrics_records(self) -> List[Dict[str, Any]]:
+        """請求紀錄轉為 dict 列表（供 JSON 輸出）"""
+        return [asdict(m) for m in self.metrics()]
+
+    def close(self) -> None:
+        self.session.close()
+
+
+# ============================================================================
+# 共用實例
+# ============================================================================
+
+_default_client: Optional[HttpClient] = None
+_default_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    """行程內共用的 HttpClient（首次呼叫時建立）"""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
+
+
+def set_client(client: HttpClient) -> Tuple[Optional[HttpClient], HttpClient]:
+    """替換共用 HttpClient，回傳 (舊, 新)"""
+    global _default_client
+    with _default_lock:
+        previous, _default_client = _default_client, client
+    return previous, client
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    return get_client().request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return get_client().get(url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return get_client().post(url, **kwargs)
+
+
+def head(url: str, **kwargs) -> requests.Response:
+    return get_client().head(url, **kwargs)
+
+
+def limit_host(host: str, **policy) -> HttpClient:
+    """設定共用客戶端的個別主機限制"""
+    return get_client().limit_host(host, **policy)
@@ -4,15 +4,33 @@
 Lithium Price Regime Classification
 
 鋰價型態分類（Downtrend → Bottoming → Uptrend → Overheat）
+
+指標以陣列實作：對 (日期 × 產品) 價格矩陣一次算出每個日期、每個產品的
+ROC / 斜率 / 波動率 / 均值偏離，分類亦向量化，產出完整型態歷史供回測。
+單點函數（compute_roc 等）取陣列結果的最後一列，兩者定義一致。
 """
 
 import logging
 from dataclasses import dataclass
 from datetime import date
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 
 logger = logging.getLogger(__name__)
 
+REGIMES = ("downtrend", "bottoming", "uptrend", "overheat")
+
+DEFAULT_THRESHOLDS = {
+    "roc_up": 5,
+    "roc_down": -5,
+    "roc_overheat": 30,
+    "deviation_extreme": 30,
+    "deviation_bottom": -20
+}
+
 
 @dataclass
 class PriceData:
@@ -36,6 +54,128 @@ class RegimeResult:
 # 技術指標計算
 # ============================================================================
 
+def _as_matrix(prices) -> np.ndarray:
+    """價格轉為 (T, N) float 陣列"""
+    values = np.asarray(prices, dtype=np.float64)
+    return values[:, None] if values.ndim == 1 else values
+
+
+def _windows(values: np.ndarray, window: int) -> np.ndarray:
+    """(T - window + 1, N, window) 的滑動視窗 view"""
+    return sliding_window_view(values, window, axis=0)
+
+
+def roc_array(prices, period: int = 12) -> np.ndarray:
+    """
+    每個日期的 ROC = (current - past) / past * 100
+
+    Args:
+        prices: (T,) 或 (T, N) 價格
+        period: 週期
+
+    Returns:
+        (T, N) 陣列；資料不足或 past <= 0 時為 NaN
+    """
+    values = _as_matrix(prices)
+    out = np.full_like(values, np.nan)
+    if len(values) > period:
+        past = values[:-period]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[period:] = np.where(past > 0, (values[period:] - past) / past * 100, np.nan)
+    return out
+
+
+def slope_array(prices, window: int = 26) -> np.ndarray:
+    """
+    每個日期的滾動線性回歸斜率（除以視窗均價 * 100 標準化）
+
+    Args:
+        prices: (T,) 或 (T, N) 價格
+        window: 視窗大小
+
+    Returns:
+        (T, N) 陣列；資料不足時為 NaN
+    """
+    values = _as_matrix(prices)
+    out = np.full_like(values, np.nan)
+    if window < 2 or len(values) < window:
+        return out
+
+    x = np.arange(window, dtype=np.float64) - (window - 1) / 2
+    windows = _windows(values, window)
+    y_mean = windows.mean(axis=-1)
+    # Σ(x - x̄)(y - ȳ) = Σ(x - x̄)y，因為 Σ(x - x̄) = 0
+    slope = (windows @ x) / np.dot(x, x)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[window - 1:] = np.where(y_mean > 0, slope / y_mean * 100, slope)
+    return out
+
+
+def volatility_array(prices, window: int = 26) -> np.ndarray:
+    """
+    每個日期的波動率：最近 window 期變化率絕對值的平均（ATR 風格）
+
+    Args:
+        prices: (T,) 或 (T, N) 價格
+        window: 視窗大小
+
+    Returns:
+        (T, N) 陣列；資料不足或視窗內無有效變化時為 NaN
+    """
+    values = _as_matrix(prices)
+    out = np.full_like(values, np.nan)
+    if len(values) < window + 1:
+        return out
+
+    prev = values[:-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        changes = np.where(prev > 0, np.abs(values[1:] - prev) / prev * 100, np.nan)
+    windows = _windows(changes, window)
+    valid = np.isfinite(windows)
+    count = valid.sum(axis=-1)
+    total = np.where(valid, windows, 0.0).sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[window:] = np.where(count > 0, total / count, np.nan)
+    return out
+
+
+def mean_deviation_array(prices, window: int = 200, min_periods: int = 10) -> np.ndarray:
+    """
+    每個日期相對均值的偏離度；歷史不足 window 時使用全部可用數據
+
+    Args:
+        prices: (T,) 或 (T, N) 價格
+        window: 均值視窗
+        min_periods: 最少需要的數據點
+
+    Returns:
+        (T, N) 陣列（正=高於均值，負=低於均值）；資料不足或均值 <= 0 時為 NaN
+    """
+    values = _as_matrix(prices)
+    rows = len(values)
+    mean = np.full_like(values, np.nan)
+
+    head = min(window - 1, rows)
+    if head > 0:
+        mean[:head] = np.cumsum(values[:head], axis=0) / np.arange(1, head + 1)[:, None]
+    if rows >= window:
+        mean[window - 1:] = _windows(values, window).mean(axis=-1)
+
+    effective = np.minimum(np.arange(1, rows + 1), window)[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(
+            (effective >= min_periods) & (mean > 0),
+            (values - mean) / mean * 100,
+            np.nan
+        )
+
+
+def _latest(values: np.ndarray) -> Optional[float]:
+    if len(values) == 0 or not np.isfinite(values[-1, 0]):
+        return None
+    return float(values[-1, 0])
+
+
 def compute_roc(prices: List[float], period: int = 12) -> Optional[float]:
     """
     計算 Rate of Change (ROC)
@@ -49,16 +189,7 @@ def compute_roc(prices: List[float], period: int = 12) -> Optional[float]:
     Returns:
         ROC 百分比
     """
-    if len(prices) < period + 1:
-        return None
-
-    current = prices[-1]
-    past = prices[-(period + 1)]
-
-    if past <= 0:
-        return None
-
-    return (current - past) / past * 100
+    return _latest(roc_array(prices, period))
 
 
 def compute_slope(prices: List[float], window: int = 26) -> Optional[float]:
@@ -74,29 +205,7 @@ def compute_slope(prices: List[float], window: int = 26) -> Optional[float]:
     Returns:
         標準化斜率
     """
-    if len(prices) < window:
-        return None
-
-    subset = prices[-window:]
-    n = len(subset)
-
-    # 簡單線性回歸
-    x_mean = (n - 1) / 2
-    y_mean = sum(subset) / n
-
-    numerator = sum((i - x_mean) * (y - y_mean) for i, y in enumerate(subset))
-    denominator = sum((i - x_mean) ** 2 for i in range(n))
-
-    if denominator == 0:
-        return None
-
-    slope = numerator / denominator
-
-    # 標準化（除以平均價格）
-    if y_mean > 0:
-        slope = slope / y_mean * 100
-
-    return slope
+    return _latest(slope_array(prices, window))
 
 
 def compute_volatility(prices: List[float], window: int = 26) -> Optional[float]:
@@ -110,22 +219,7 @@ def compute_volatility(prices: List[float], window: int = 26) -> Optional[float]
     Returns:
         波動率百分比
     """
-    if len(prices) < window + 1:
-        return None
-
-    subset = prices[-(window + 1):]
-
-    # 計算每週變化率的絕對值
-    changes = []
-    for i in range(1, len(subset)):
-        if subset[i - 1] > 0:
-            change = abs(subset[i] - subset[i - 1]) / subset[i - 1] * 100
-            changes.append(change)
-
-    if not changes:
-        return None
-
-    return sum(changes) / len(changes)
+    return _latest(volatility_array(prices, window))
 
 
 def compute_mean_deviation(
@@ -142,21 +236,42 @@ def compute_mean_deviation(
     Returns:
         偏離度百分比（正=高於均值，負=低於均值）
     """
-    if len(prices) < window:
-        # 使用可用數據
-        window = len(prices)
+    return _latest(mean_deviation_array(prices, window))
 
-    if window < 10:
-        return None
 
-    subset = prices[-window:]
-    mean = sum(subset) / len(subset)
-    current = prices[-1]
+def compute_indicator_panel(prices: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    一次計算所有日期、所有產品的型態指標
 
-    if mean <= 0:
-        return None
+    Args:
+        prices: 週頻價格（日期 × 產品，如 carbonate / hydroxide / spodumene / LIT）
+
+    Returns:
+        {"roc_12w", "roc_26w", "slope", "volatility", "deviation"} → 與 prices 對齊的 DataFrame
+    """
+    values = prices.to_numpy(dtype=np.float64)
+    indicators = {
+        "roc_12w": lambda v: roc_array(v, 12),
+        "roc_26w": lambda v: roc_array(v, 26),
+        "slope": lambda v: slope_array(v, 26),
+        "volatility": lambda v: volatility_array(v, 26),
+        "deviation": lambda v: mean_deviation_array(v, 200),
+    }
+    out = {name: np.full_like(values, np.nan) for name in indicators}
+
+    # 各產品起始日不同（如 LIT 與現貨報價），同起點的欄位一起計算
+    valid = np.isfinite(values)
+    starts = np.where(valid.any(axis=0), valid.argmax(axis=0), len(values))
+    for start in np.unique(starts[starts < len(values)]):
+        cols = np.flatnonzero(starts == start)
+        block = values[start:, cols]
+        for name, fn in indicators.items():
+            out[name][start:, cols] = fn(block)
 
-    return (current - mean) / mean * 100
+    return {
+        name: pd.DataFrame(arr, index=prices.index, columns=prices.columns)
+        for name, arr in out.items()
+    }
 
 
 # ============================================================================
@@ -194,13 +309,7 @@ def classify_regime(
         reasoning: 判斷理由
     """
     if thresholds is None:
-        thresholds = {
-            "roc_up": 5,
-            "roc_down": -5,
-            "roc_overheat": 30,
-            "deviation_extreme": 30,
-            "deviation_bottom": -20
-        }
+        thresholds = DEFAULT_THRESHOLDS
 
     signals = []
     regime_scores = {
@@ -264,6 +373,162 @@ def classify_regime(
     }
 
 
+def classify_regime_array(
+    roc_12w: np.ndarray,
+    slope: np.ndarray,
+    deviation: np.ndarray,
+    thresholds: Optional[Dict[str, float]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    classify_regime 的向量化版本（NaN 視同缺值）
+
+    計分規則與 classify_regime 相同；同分時依 REGIMES 順序取第一個。
+
+    Args:
+        roc_12w: 12 週 ROC
+        slope: 趨勢斜率
+        deviation: 均值偏離度
+        thresholds: 自定義閾值
+
+    Returns:
+        regime: 型態陣列（無任何分數時為 "unknown"）
+        confidence: 置信度
+        scores: (..., 4) 各型態分數，順序同 REGIMES
+    """
+    t = thresholds or DEFAULT_THRESHOLDS
+    roc, slp, dev = (np.asarray(x, dtype=np.float64) for x in (roc_12w, slope, deviation))
+    scores = np.zeros(roc.shape + (len(REGIMES),))
+    down, bottom, up, hot = range(len(REGIMES))
+
+    has_roc = np.isfinite(roc)
+    roc_hot = has_roc & (roc > t["roc_overheat"])
+    roc_up = has_roc & ~roc_hot & (roc > t["roc_up"])
+    roc_down = has_roc & ~roc_hot & ~roc_up & (roc < t["roc_down"])
+    scores[..., hot] += 3 * roc_hot
+    scores[..., up] += 2 * roc_up
+    scores[..., down] += 2 * roc_down
+    scores[..., bottom] += has_roc & ~roc_hot & ~roc_up & ~roc_down
+
+    has_slope = np.isfinite(slp)
+    scores[..., up] += has_slope & (slp > 0.5)
+    scores[..., down] += has_slope & (slp < -0.5)
+    scores[..., bottom] += has_slope & (slp >= -0.5) & (slp <= 0.5)
+
+    has_dev = np.isfinite(dev)
+    scores[..., hot] += 2 * (has_dev & (dev > t["deviation_extreme"]))
+    scores[..., bottom] += 2 * (has_dev & (dev < t["deviation_bottom"]))
+
+    max_score = scores.max(axis=-1)
+    total = scores.sum(axis=-1)
+    labels = np.asarray(REGIMES, dtype=object)[scores.argmax(axis=-1)]
+    regime = np.where(max_score > 0, labels, "unknown")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        confidence = np.where(max_score > 0, max_score / total, 0.3)
+
+    return {"regime": regime, "confidence": confidence, "scores": scores}
+
+
+def compute_regime_history(
+    prices: pd.DataFrame,
+    thresholds: Optional[Dict[str, float]] = None
+) -> pd.DataFrame:
+    """
+    每個日期、每個產品的型態歷史
+
+    Args:
+        prices: 週頻價格（日期 × 產品）
+        thresholds: 自定義閾值
+
+    Returns:
+        長格式 DataFrame（index: date, product），欄位為五個指標、regime、confidence
+    """
+    panel = compute_indicator_panel(prices)
+    classified = classify_regime_array(
+        panel["roc_12w"].to_numpy(), panel["slope"].to_numpy(),
+        panel["deviation"].to_numpy(), thresholds
+    )
+
+    columns = {name: frame.to_numpy().ravel() for name, frame in panel.items()}
+    columns["regime"] = classified["regime"].ravel()
+    columns["confidence"] = classified["confidence"].ravel()
+    index = pd.MultiIndex.from_product([prices.index, prices.columns], names=["date", "product"])
+    history = pd.DataFrame(columns, index=index)
+
+    # 價格缺值的日期不分類
+    return history[prices.notna().to_numpy().ravel()]
+
+
+def regime_transitions(history: pd.DataFrame) -> pd.DataFrame:
+    """
+    型態轉換事件
+
+    Args:
+        history: compute_regime_history 的輸出
+
+    Returns:
+        DataFrame（date, product, from_regime, to_regime）
+    """
+    wide = history["regime"].unstack("product")
+    previous = wide.shift(1)
+    changed = (wide.ne(previous) & previous.notna() & wide.notna()).stack()
+    events = pd.DataFrame({
+        "from_regime": previous.stack()[changed],
+        "to_regime": wide.stack()[changed],
+    }).reset_index()
+    return events.sort_values(["date", "product"]).reset_index(drop=True)
+
+
+def backtest_regime_transitions(
+    prices: pd.DataFrame,
+    history: pd.DataFrame,
+    horizons: Sequence[int] = (4, 12, 26)
+) -> pd.DataFrame:
+    """
+    轉入各型態後的前瞻報酬（對照實際價格路徑）
+
+    Args:
+        prices: 週頻價格（日期 × 產品）
+        history: compute_regime_history 的輸出
+        horizons: 前瞻週數
+
+    Returns:
+        長格式 DataFrame：product, to_regime, horizon, count,
+        mean_return_pct, median_return_pct, hit_rate_pct
+    """
+    events = regime_transitions(history)
+    columns = ["product", "to_regime", "horizon", "count",
+               "mean_return_pct", "median_return_pct", "hit_rate_pct"]
+    if events.empty:
+        return pd.DataFrame(columns=columns)
+
+    values = prices.to_numpy(dtype=np.float64)
+    rows = prices.index.get_indexer(events["date"])
+    cols = prices.columns.get_indexer(events["product"])
+    pieces = []
+    for h in horizons:
+        ends = rows + h
+        ok = ends < len(values)
+        start_px = values[rows[ok], cols[ok]]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fwd = (values[ends[ok], cols[ok]] / start_px - 1) * 100
+        frame = events[ok].assign(fwd=fwd).dropna(subset=["fwd"])
+        if frame.empty:
+            continue
+        grouped = frame.groupby(["product", "to_regime"])["fwd"]
+        stats = pd.DataFrame({
+            "count": grouped.size(),
+            "mean_return_pct": grouped.mean(),
+            "median_return_pct": grouped.median(),
+            "hit_rate_pct": grouped.apply(lambda x: (x > 0).mean() * 100),
+        }).reset_index()
+        stats["horizon"] = h
+        pieces.append(stats)
+
+    if not pieces:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(pieces, ignore_index=True)[columns]
+
+
 def compute_price_regime(
     prices: List[float],
     product: str = "carbonate",
@@ -16,6 +16,7 @@ Usage:
 import argparse
 import json
 import logging
+import sys
 from dataclasses import dataclass, field
 from datetime import date, datetime, timedelta
 from pathlib import Path
@@ -24,6 +25,9 @@ from typing import Any, Dict, List, Optional, Tuple
 import numpy as np
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).parent))
+import instrumentation
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -173,6 +177,7 @@ def load_australia_req() -> Dict[str, Any]:
     }
 
 
+@instrumentation.timed()
 def load_lithium_price(chem_focus: str, data_level: str) -> Dict[str, Any]:
     """
     載入鋰價格數據
@@ -188,6 +193,7 @@ def load_lithium_price(chem_focus: str, data_level: str) -> Dict[str, Any]:
     dates = pd.date_range(end=date.today(), periods=52 * 5, freq="W")
     np.random.seed(42)
     prices = base_price * (1 + np.cumsum(np.random.randn(len(dates)) * 0.02))
+    instrumentation.add_rows(len(dates))
 
     return {
         "carbonate": pd.Series(prices * 0.9, index=dates),
@@ -198,6 +204,7 @@ def load_lithium_price(chem_focus: str, data_level: str) -> Dict[str, Any]:
     }
 
 
+@instrumentation.timed()
 def load_etf_price(ticker: str, years: int, freq: str) -> Dict[str, Any]:
     """載入 ETF 價格數據"""
     logger.info(f"Loading {ticker} price data...")
@@ -211,6 +218,7 @@ def load_etf_price(ticker: str, years: int, freq: str) -> Dict[str, Any]:
 
         interval = "1wk" if freq == "weekly" else "1d"
         df = etf.history(start=start_date, end=end_date, interval=interval)
+        instrumentation.add_rows(len(df))
 
         return {
             "prices": df["Close"],
@@ -224,6 +232,7 @@ def load_etf_price(ticker: str, years: int, freq: str) -> Dict[str, Any]:
         dates = pd.date_range(end=date.today(), periods=52 * years, freq="W")
         np.random.seed(42)
         prices = 50 * (1 + np.cumsum(np.random.randn(len(dates)) * 0.02))
+        instrumentation.add_rows(len(dates))
         return {
             "prices": pd.Series(prices, index=dates),
             "returns": pd.Series(prices, index=dates).pct_change(),
@@ -378,6 +387,55 @@ class PriceRegime:
 
         return results
 
+    def compute_history(self, horizons: Tuple[int, ...] = (4, 12, 26)) -> Dict[str, Any]:
+        """
+        全歷史型態：所有產品（碳酸鋰 / 氫氧化鋰 / 鋰輝石 / ETF）每個日期的型態，
+        以及型態轉換後的前瞻報酬回測
+        """
+        from classify_regime import (
+            backtest_regime_transitions,
+            compute_regime_history,
+            regime_transitions
+        )
+
+        logger.info("Computing price regime history...")
+        prices = load_lithium_price(self.config.chem_focus, self.config.data_level)
+        series = {
+            chem: prices[chem]
+            for chem in ("carbonate", "hydroxide", "spodumene")
+            if prices.get(chem) is not None
+        }
+        etf = load_etf_price(self.config.etf_ticker, self.config.lookback_years, "weekly")
+        etf_prices = etf["prices"]
+        if etf_prices.index.tz is not None:
+            etf_prices = etf_prices.tz_localize(None)
+        series[self.config.etf_ticker] = etf_prices
+
+        panel = pd.DataFrame(series).resample("W").last()
+        history = compute_regime_history(panel)
+        transitions = regime_transitions(history)
+        backtest = backtest_regime_transitions(panel, history, horizons)
+
+        latest = history.groupby(level="product").tail(1).reset_index()
+        return {
+            "products": list(panel.columns),
+            "periods": len(panel),
+            "current": {
+                row["product"]: {"date": row["date"].strftime("%Y-%m-%d"), "regime": row["regime"],
+                                 "confidence": round(float(row["confidence"]), 2)}
+                for _, row in latest.iterrows()
+            },
+            "regime_counts": {
+                product: group.value_counts().to_dict()
+                for product, group in history["regime"].groupby(level="product")
+            },
+            "transitions": [
+                {**record, "date": record["date"].strftime("%Y-%m-%d")}
+                for record in transitions.tail(20).to_dict("records")
+            ],
+            "transition_backtest": backtest.round(2).to_dict("records"),
+        }
+
     def _compute_indicators(self, price_series: pd.Series) -> Dict[str, float]:
         """計算型態指標"""
         # ROC
@@ -590,18 +648,22 @@ class LithiumSupplyDemandRadar:
         """完整分析"""
         logger.info("Running full analysis...")
 
-        balance_result = self.balance.compute()
-        price_result = self.price.compute()
-        etf_result = self.etf.compute()
+        with instrumentation.stage("balance"):
+            balance_result = self.balance.compute()
+        with instrumentation.stage("price_regime"):
+            price_result = self.price.compute()
+        with instrumentation.stage("etf_exposure"):
+            etf_result = self.etf.compute()
 
-        # 綜合判斷
-        thesis = self._compute_thesis(balance_result, price_result, etf_result)
+        with instrumentation.stage("synthesis"):
+            # 綜合判斷
+            thesis = self._compute_thesis(balance_result, price_result, etf_result)
 
-        # 目標路徑
-        targets = self._compute_targets()
+            # 目標路徑
+            targets = self._compute_targets()
 
-        # 失效條件
-        invalidation = self._build_invalidation(balance_result, price_result, etf_result)
+            # 失效條件
+            invalidation = self._build_invalidation(balance_result, price_result, etf_result)
 
         return {
             "metadata": {
@@ -622,9 +684,9 @@ class LithiumSupplyDemandRadar:
         """僅供需平衡分析"""
         return self.balance.compute()
 
-    def price_regime(self) -> Dict[str, Any]:
-        """僅價格型態分析"""
-        return self.price.compute()
+    def price_regime(self, history: bool = False) -> Dict[str, Any]:
+        """僅價格型態分析（history=True 時輸出全歷史型態與轉換回測）"""
+        return self.price.compute_history() if history else self.price.compute()
 
     def etf_exposure(self) -> Dict[str, Any]:
         """僅 ETF 暴露分析"""
@@ -713,13 +775,19 @@ def main():
     # regime command
     regime_parser = subparsers.add_parser("regime", help="Price regime only")
     regime_parser.add_argument("--chem", default="both", help="Chemical focus")
+    regime_parser.add_argument("--history", action="store_true",
+                               help="Full regime history for every product, with transition backtest")
 
     # etf-beta command
     etf_parser = subparsers.add_parser("etf-beta", help="ETF beta only")
     etf_parser.add_argument("--ticker", default="LIT", help="ETF ticker")
     etf_parser.add_argument("--window", type=int, default=52, help="Beta window")
 
+    for sub in (analyze_parser, balance_parser, regime_parser, etf_parser):
+        instrumentation.add_cli_arguments(sub)
+
     args = parser.parse_args()
+    instrumentation.configure_from_args(args, f"lithium_{args.command or 'pipeline'}")
 
     # Create config from args
     config = LithiumConfig(
@@ -738,7 +806,7 @@ def main():
     elif args.command == "balance":
         result = radar.balance_nowcast()
     elif args.command == "regime":
-        result = radar.price_regime()
+        result = radar.price_regime(history=getattr(args, "history", False))
     elif args.command == "etf-beta":
         result = radar.etf_exposure()
     else:
@@ -746,6 +814,7 @@ def main():
         return
 
     # Output
+    instrumentation.attach(result)
     print(json.dumps(result, indent=2, default=str, ensure_ascii=False))
 
 
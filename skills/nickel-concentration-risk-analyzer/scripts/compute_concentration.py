@@ -8,15 +8,21 @@ Computes:
 - CR_n (n-firm concentration ratio)
 - HHI (Herfindahl-Hirschman Index)
 - Policy leverage
+- Structural breaks in share / HHI / country production trends
 
 Author: Ricky Wang
 License: MIT
 """
 
+import sys
+from pathlib import Path
 from typing import Dict, Any, List, Optional
 import pandas as pd
 import numpy as np
 
+sys.path.insert(0, str(Path(__file__).parent))
+from segmented_regression import breaks_to_records, detect_breaks
+
 
 def calculate_country_share(
     df: pd.DataFrame,
@@ -195,6 +201,32 @@ def calculate_policy_leverage(
     }
 
 
+def share_panel(
+    df: pd.DataFrame,
+    supply_type: str = "mined"
+) -> pd.DataFrame:
+    """
+    Pivot supply data into a year x country share matrix in one pass.
+
+    Args:
+        df: DataFrame with supply data ('year', 'country', 'value' columns)
+        supply_type: Filter by supply type
+
+    Returns:
+        DataFrame indexed by year, one column per country; rows sum to 1
+        (all-zero years stay zero). Includes every year present in df.
+    """
+    years = pd.Index(sorted(df['year'].unique()), name='year')
+    if 'supply_type' in df.columns:
+        df = df[df['supply_type'] == supply_type]
+
+    production = df.pivot_table(
+        index='year', columns='country', values='value', aggfunc='sum', fill_value=0
+    ).reindex(years, fill_value=0)
+    totals = production.sum(axis=1)
+    return production.div(totals.where(totals != 0), axis=0).fillna(0.0)
+
+
 def compute_concentration_time_series(
     df: pd.DataFrame,
     years: List[int],
@@ -211,27 +243,71 @@ def compute_concentration_time_series(
     Returns:
         List of yearly concentration metrics
     """
-    results = []
+    shares = share_panel(df)
+    hhi = ((shares ** 2).sum(axis=1) * 10000).round(0)
+    country_share = shares[country] if country in shares.columns else pd.Series(0.0, index=shares.index)
 
+    results = []
     for year in years:
-        year_df = df[df['year'] == year]
-
-        if len(year_df) == 0:
+        if year not in shares.index:
             continue
 
-        share = calculate_country_share(year_df, country)
-        hhi = calculate_HHI(year_df)
-
         results.append({
             'year': year,
-            f'{country.lower()}_share': share,
-            'hhi': hhi,
-            'market_structure': classify_market_structure(hhi)
+            f'{country.lower()}_share': float(country_share[year]),
+            'hhi': float(hhi[year]),
+            'market_structure': classify_market_structure(hhi[year])
         })
 
     return results
 
 
+def detect_concentration_breaks(
+    df: pd.DataFrame,
+    time_series: List[Dict],
+    country: str = "Indonesia",
+    min_segment: int = 3,
+    max_breaks: int = 1
+) -> Dict[str, Any]:
+    """
+    Detect structural breaks in the concentration path and in every producer's output.
+
+    Uses the shared segmented-regression engine, so the tracked share, HHI and the
+    full country panel are all fitted in one vectorized pass each.
+
+    Args:
+        df: DataFrame with supply data
+        time_series: Output of compute_concentration_time_series
+        country: Country whose share series is tested
+        min_segment: Minimum years per segment
+        max_breaks: Maximum breaks per series (BIC-selected when > 1)
+
+    Returns:
+        Dictionary with 'concentration' (share / HHI) and 'producers' break records
+    """
+    share_key = f'{country.lower()}_share'
+    ts = pd.DataFrame(time_series).set_index('year')
+    metrics = ts[[share_key, 'hhi']].T
+
+    producers = df
+    if 'supply_type' in df.columns:
+        producers = df[df['supply_type'] == 'mined']
+    producers = producers[producers['country'] != 'World']
+    panel = producers.pivot_table(index='country', columns='year', values='value', aggfunc='sum')
+    panel = panel.loc[:, panel.columns.isin(ts.index)]
+    panel = panel[panel.notna().sum(axis=1) >= 2 * min_segment]
+
+    result = {
+        'min_segment': min_segment,
+        'max_breaks': max_breaks,
+        'concentration': breaks_to_records(detect_breaks(metrics, min_segment, max_breaks)),
+        'producers': []
+    }
+    if not panel.empty:
+        result['producers'] = breaks_to_records(detect_breaks(panel, min_segment, max_breaks))
+    return result
+
+
 def sanity_check_values(
     value: float,
     unit: str,
@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+並行數據擷取
+
+各數據源原本依序擷取、每次都付一次隨機延遲、也不重用上次的回應。本模組提供：
+
+- run_concurrent：以執行緒池同時跑所有數據源，單一來源失敗不影響其他來源，
+  總耗時約等於最慢的來源而非所有來源相加
+- HostLimiter（來自 http_client）：同一主機的並行數與最小請求間隔（禮貌性限制），
+  不同主機互不等待；請求經共用 HTTP 客戶端送出（keep-alive 連線池、429/5xx 重試）
+- SourceCache：每個來源一個快取檔，含新鮮度中繼資料（fetched_at / checked_at /
+  ETag / Last-Modified）；未過期直接使用、過期以條件式請求確認、失敗時沿用舊快取
+
+    {cache_dir}/{source_id}.json   # url / etag / last_modified / fetched_at / checked_at / text
+
+Usage:
+    from concurrent_ingest import CachedFetcher, run_concurrent
+
+    fetcher = CachedFetcher(cache_dir="cache/ingest", max_age_hours=24)
+    page = fetcher.get("https://example.org/data", source_id="USGS")
+    page.text, page.status, page.elapsed_sec
+
+    outcomes = run_concurrent({"USGS": ingest_usgs, "IEA": ingest_iea}, max_workers=4)
+"""
+
+import json
+import logging
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+from http_client import HostLimiter, HttpClient, random_user_agent
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_AGE_HOURS = 24
+DEFAULT_MAX_WORKERS = 4
+
+
+# ============================================================================
+# 來源快取
+# ============================================================================
+
+def _cache_key(source_id: str) -> str:
+    return re.sub(r"[^0-9A-Za-z_.-]+", "_", source_id)
+
+
+class SourceCache:
+    """每個來源一個 JSON 快取檔（回應內容 + 新鮮度中繼資料）"""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = Path(cache_dir)
+        self._lock = threading.Lock()
+
+    def _path(self, source_id: str) -> Path:
+        return self.cache_dir / f"{_cache_key(source_id)}.json"
+
+    def load(self, source_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(self._path(source_id).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def save(self, source_id: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(source_id)
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(path)
+
+
+@dataclass
+class FetchResult:
+    """單次抓取結果"""
+    source_id: str
+    url: str
+    text: Optional[str]
+    status: str              # fresh_cache | not_modified | downloaded | stale_cache | failed
+    fetched_at: Optional[str]
+    elapsed_sec: float
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.text is not None
+
+
+class CachedFetcher:
+    """
+    帶快取與主機限制的 HTTP 抓取器（執行緒安全）
+
+    Args:
+        cache_dir: 快取目錄；None 表示不快取
+        max_age_hours: 快取在此時數內不連網
+        limiter: 主機限制（預設每主機 1 個並行、間隔 0.5-2 秒）
+        timeout: 請求逾時秒數
+        client: 共用 HTTP 客戶端（預設以 limiter 建立一個，連線在本抓取器內重用）
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_age_hours: float = DEFAULT_MAX_AGE_HOURS,
+        limiter: Optional[HostLimiter] = None,
+        timeout: int = 30,
+        client: Optional[HttpClient] = None
+    ):
+        self.cache = SourceCache(cache_dir) if cache_dir else None
+        self.max_age = timedelta(hours=max_age_hours)
+        self.client = client or HttpClient(
+            timeout=timeout,
+            limiter=limiter or HostLimiter(per_host=1, min_interval=0.5, max_interval=2.0)
+        )
+        self.limiter = self.client.limiter
+        self.timeout = timeout
+
+    def get(self, url: str, source_id: Optional[str] = None, refresh: bool = False) -> FetchResult:
+        """
+        抓取 URL（快取優先，必要時條件式請求）
+
+        Args:
+            url: 網址
+            source_id: 快取鍵（預設為 URL）
+            refresh: 忽略快取新鮮度，仍會帶條件式標頭
+
+        Returns:
+            FetchResult；失敗且無快取時 text 為 None
+        """
+        key = source_id or url
+        started = time.perf_counter()
+        entry = self.cache.load(key) if self.cache else None
+        if entry and entry.get("url") != url:
+            entry = None
+
+        def _result(text, status, fetched_at, error=None):
+            return FetchResult(key, url, text, status, fetched_at,
+                               round(time.perf_counter() - started, 3), error)
+
+        if entry and not refresh:
+            checked_at = datetime.fromisoformat(entry.get("checked_at", "1970-01-01T00:00:00"))
+            if datetime.now() - checked_at < self.max_age:
+                return _result(entry["text"], "fresh_cache", entry.get("fetched_at"))
+
+        headers = {"User-Agent": random_user_agent()}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            response = self.client.get(url, headers=headers, timeout=self.timeout)
+            now = datetime.now().isoformat()
+            if response.status_code == 304 and entry:
+                entry["checked_at"] = now
+                self.cache.save(key, entry)
+                return _result(entry["text"], "not_modified", entry.get("fetched_at"))
+            response.raise_for_status()
+        except Exception as e:
+            logger.error(f"Failed to fetch {url}: {e}")
+            if entry:
+                return _result(entry["text"], "stale_cache", entry.get("fetched_at"), str(e))
+            return _result(None, "failed", None, str(e))
+
+        if self.cache:
+            self.cache.save(key, {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "fetched_at": now,
+                "checked_at": now,
+                "text": response.text,
+            })
+        return _result(response.text, "downloaded", now)
+
+
+# ============================================================================
+# 並行執行
+# ============================================================================
+
+@dataclass
+class TaskOutcome:
+    """單一來源任務的結果與耗時"""
+    name: str
+    value: Any
+    error: Optional[str]
+    started_at: str
+    elapsed_sec: float
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def run_concurrent(
+    tasks: Dict[str, Callable[[], Any]],
+    max_workers: int = DEFAULT_MAX_WORKERS
+) -> Dict[str, TaskOutcome]:
+    """
+    以執行緒池並行執行各來源任務；例外被捕捉並記錄在結果中
+
+    Args:
+        tasks: {名稱: 無參數函數}
+        max_workers: 執行緒數
+
+    Returns:
+        {名稱: TaskOutcome}，順序與 tasks 相同
+    """
+    def _run(name: str, fn: Callable[[], Any]) -> TaskOutcome:
+        started_at = datetime.now().isoformat()
+        t0 = time.perf_counter()
+        try:
+            value, error = fn(), None
+        except Exception as e:
+            logger.error(f"Source {name} failed: {e}")
+            value, error = None, str(e)
+        return TaskOutcome(name, value, error, started_at, round(time.perf_counter() - t0, 3))
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks) or 1))) as pool:
+        futures = {name: pool.submit(_run, name, fn) for name, fn in tasks.items()}
+        outcomes = {name: future.result() for name, future in futures.items()}
+
+    wall = time.perf_counter() - wall_start
+    serial = sum(o.elapsed_sec for o in outcomes.values())
+    logger.info(f"Concurrent ingestion: {wall:.2f}s wall vs {serial:.2f}s serial "
+                f"({sum(o.ok for o in outcomes.values())}/{len(outcomes)} tasks without exceptions)")
+    return outcomes
@@ -8,22 +8,32 @@ This module handles data ingestion from various sources:
 - Tier 1: Company reports (free, scattered)
 - Tier 2: S&P Global (paid)
 
+Sources run concurrently (see concurrent_ingest); web fetches are cached per
+source under cache/ingest/ and rate-limited per host.
+
 Author: Ricky Wang
 License: MIT
 """
 
 import os
-import time
-import random
+import sys
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
 import pandas as pd
 import numpy as np
-import requests
 from bs4 import BeautifulSoup
 
+sys.path.insert(0, str(Path(__file__).parent))
+from concurrent_ingest import (
+    DEFAULT_MAX_AGE_HOURS,
+    DEFAULT_MAX_WORKERS,
+    CachedFetcher,
+    HostLimiter,
+    run_concurrent
+)
+
 # Optional imports for PDF parsing
 try:
     import camelot
@@ -45,42 +55,59 @@ USER_AGENTS = [
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0',
 ]
 
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "cache" / "ingest"
+
 
 def ingest_all_sources(
     data_level: str = "free_nolimit",
-    supply_type: str = "mined"
+    supply_type: str = "mined",
+    max_workers: int = DEFAULT_MAX_WORKERS
 ) -> pd.DataFrame:
     """
     Ingest data from all sources based on data_level.
 
+    Sources run concurrently; a failing source is logged and skipped.
+    Per-source timing is attached as df.attrs['ingest'].
+
     Args:
         data_level: free_nolimit | free_limit | paid_low | paid_high
         supply_type: mined | refined
+        max_workers: Thread pool size
 
     Returns:
         DataFrame with standardized nickel supply data
     """
-    all_records = []
-
     # Tier 0: Always include
-    print("Ingesting Tier 0 sources...")
-    usgs_data = ingest_usgs_nickel()
-    all_records.extend(usgs_data)
-
-    insg_data = ingest_insg()
-    all_records.extend(insg_data)
+    tasks = {
+        'USGS': ingest_usgs_nickel,
+        'INSG': ingest_insg,
+    }
 
     # Tier 1: Include if data_level >= free_limit
     if data_level in ['free_limit', 'paid_low', 'paid_high']:
-        print("Ingesting Tier 1 sources (company reports)...")
-        company_data = ingest_company_reports()
-        all_records.extend(company_data)
+        tasks['COMPANY'] = ingest_company_reports
 
     # Tier 2: Include if paid
     if data_level in ['paid_low', 'paid_high']:
-        print("Adding Tier 2 anchor points...")
-        sp_anchors = get_sp_global_anchors()
-        all_records.extend(sp_anchors)
+        tasks['SP_GLOBAL'] = get_sp_global_anchors
+
+    print(f"Ingesting {len(tasks)} sources concurrently: {', '.join(tasks)}")
+    outcomes = run_concurrent(tasks, max_workers=max_workers)
+
+    all_records = []
+    report = {}
+    for source_id, outcome in outcomes.items():
+        if outcome.ok:
+            all_records.extend(outcome.value)
+        else:
+            print(f"Source {source_id} failed: {outcome.error}")
+        report[source_id] = {
+            'success': outcome.ok,
+            'records': len(outcome.value) if outcome.ok else 0,
+            'started_at': outcome.started_at,
+            'elapsed_sec': outcome.elapsed_sec,
+            'error': outcome.error,
+        }
 
     # Convert to DataFrame
     df = pd.DataFrame(all_records)
@@ -88,6 +115,7 @@ def ingest_all_sources(
     # Validate schema
     validate_schema(df)
 
+    df.attrs['ingest'] = report
     return df
 
 
@@ -305,38 +333,50 @@ def validate_schema(df: pd.DataFrame) -> bool:
     return True
 
 
-def fetch_with_delay(url: str, min_delay: float = 0.5, max_delay: float = 2.0) -> Optional[str]:
+_FETCHERS: Dict[tuple, CachedFetcher] = {}
+
+
+def fetch_with_delay(
+    url: str,
+    min_delay: float = 0.5,
+    max_delay: float = 2.0,
+    source_id: Optional[str] = None,
+    max_age_hours: float = DEFAULT_MAX_AGE_HOURS
+) -> Optional[str]:
     """
-    Fetch URL with random delay and user agent rotation.
+    Fetch URL with per-host politeness delay, user agent rotation and caching.
+
+    Requests to the same host are spaced by uniform(min_delay, max_delay);
+    different hosts do not wait on each other. Responses are cached per
+    source and revalidated with ETag / Last-Modified once stale.
 
     Args:
         url: URL to fetch
-        min_delay: Minimum delay in seconds
-        max_delay: Maximum delay in seconds
+        min_delay: Minimum delay between requests to the same host
+        max_delay: Maximum delay between requests to the same host
+        source_id: Cache key (default: URL)
+        max_age_hours: Cache freshness window
 
     Returns:
-        Response content or None on failure
+        Response content (or stale cached content) or None on failure
     """
-    # Random delay
-    delay = random.uniform(min_delay, max_delay)
-    time.sleep(delay)
-
-    # Random user agent
-    headers = {
-        'User-Agent': random.choice(USER_AGENTS)
-    }
-
-    try:
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-        return response.text
-    except Exception as e:
-        print(f"Failed to fetch {url}: {e}")
-        return None
+    key = (min_delay, max_delay, max_age_hours)
+    if key not in _FETCHERS:
+        _FETCHERS[key] = CachedFetcher(
+            cache_dir=str(DEFAULT_CACHE_DIR),
+            max_age_hours=max_age_hours,
+            limiter=HostLimiter(per_host=1, min_interval=min_delay, max_interval=max_delay)
+        )
+    result = _FETCHERS[key].get(url, source_id=source_id)
+    if not result.ok:
+        print(f"Failed to fetch {url}: {result.error}")
+    return result.text
 
 
 if __name__ == '__main__':
     # Test ingestion
     df = ingest_all_sources(data_level='free_limit')
     print(f"Ingested {len(df)} records")
+    for source_id, info in df.attrs['ingest'].items():
+        print(f"  {source_id}: {info['records']} records in {info['elapsed_sec']:.3f}s")
     print(df.head(10))
@@ -6,6 +6,7 @@ Nickel Concentration Risk Analyzer - Main Pipeline
 Usage:
     python nickel_pipeline.py analyze --asof=2026-01-16 --scope=mined
     python nickel_pipeline.py scenario --cut=20 --target=Indonesia --exec-prob=0.5
+    python nickel_pipeline.py scenario --simulate=10000 --targets=Indonesia,Philippines,Russia --cuts=20,10,5
     python nickel_pipeline.py validate --claim="Indonesia 60% share"
     python nickel_pipeline.py ingest --data-level=free_nolimit
 
@@ -28,9 +29,20 @@ from compute_concentration import (
     calculate_country_share,
     calculate_CRn,
     calculate_HHI,
-    classify_market_structure
+    classify_market_structure,
+    compute_concentration_time_series,
+    detect_concentration_breaks
 )
 from scenario_impact import calculate_scenario_impact
+from scenario_engine import (
+    DEFAULT_COUNTRY_PROD,
+    DEFAULT_GLOBAL_PROD,
+    ShockSpec,
+    baseline_from_supply,
+    build_shocks,
+    simulate_shocks,
+    summarize_simulation
+)
 
 
 class NickelConcentrationAnalyzer:
@@ -151,29 +163,40 @@ class NickelConcentrationAnalyzer:
             self.ingest()
 
         end_year = end_year or self.data['year'].max()
-        time_series = []
-
-        for year in range(start_year, end_year + 1):
-            df = self.data[
-                (self.data['supply_type'] == 'mined') &
-                (self.data['year'] == year)
-            ]
+        mined = self.data[self.data['supply_type'] == 'mined']
+        time_series = compute_concentration_time_series(
+            mined, list(range(start_year, end_year + 1)), 'Indonesia'
+        )
 
-            if len(df) == 0:
-                continue
+        self.results['time_series'] = time_series
+        return time_series
 
-            indonesia_share = calculate_country_share(df, 'Indonesia')
-            hhi = calculate_HHI(df)
+    def compute_trend_breaks(
+        self,
+        min_segment: int = 3,
+        max_breaks: int = 1
+    ) -> Dict[str, Any]:
+        """
+        Detect structural breaks in Indonesia share, HHI and each producer's output.
 
-            time_series.append({
-                'year': year,
-                'indonesia_share': indonesia_share,
-                'hhi': hhi,
-                'market_structure': classify_market_structure(hhi)
-            })
+        Args:
+            min_segment: Minimum years per segment
+            max_breaks: Maximum breaks per series
 
-        self.results['time_series'] = time_series
-        return time_series
+        Returns:
+            Break records (see detect_concentration_breaks)
+        """
+        if 'time_series' not in self.results:
+            self.compute_time_series()
+
+        self.results['trend_breaks'] = detect_concentration_breaks(
+            self.data,
+            self.results['time_series'],
+            'Indonesia',
+            min_segment=min_segment,
+            max_breaks=max_breaks
+        )
+        return self.results['trend_breaks']
 
     def run_scenario(
         self,
@@ -209,6 +232,54 @@ class NickelConcentrationAnalyzer:
 
         return results
 
+    def run_simulation(
+        self,
+        shocks: List[ShockSpec],
+        n_samples: int = 10_000,
+        common_shock: float = 0.0,
+        seed: Optional[int] = 0,
+        year: int = None
+    ) -> Dict[str, Any]:
+        """
+        Run a probabilistic multi-country scenario (see scenario_engine).
+
+        Country production comes from ingested data when available,
+        otherwise from the default 2024 baseline.
+
+        Args:
+            shocks: One ShockSpec per shocked country
+            n_samples: Number of Monte Carlo samples
+            common_shock: Weight (0-1) of a shared execution driver
+            seed: Random seed
+            year: Baseline year for ingested data (default: latest)
+
+        Returns:
+            Simulation summary
+        """
+        if self.data is not None:
+            country_prod, global_prod = baseline_from_supply(
+                self.data, year, self.scope.get("supply_type", "mined")
+            )
+            baseline_source = 'ingested'
+        else:
+            country_prod, global_prod = DEFAULT_COUNTRY_PROD, DEFAULT_GLOBAL_PROD
+            baseline_source = 'default_2024'
+
+        result = simulate_shocks(
+            shocks, country_prod, global_prod,
+            n_samples=n_samples, common_shock=common_shock, seed=seed
+        )
+        summary = summarize_simulation(result)
+        summary['baseline_source'] = baseline_source
+
+        self.results['simulations'] = self.results.get('simulations', [])
+        self.results['simulations'].append({
+            'countries': [s.country for s in shocks],
+            'results': summary
+        })
+
+        return summary
+
     def generate_output(
         self,
         output_format: str = 'json',
@@ -336,10 +407,52 @@ def main():
         default=0.5,
         help='Execution probability (0-1)'
     )
+    parser.add_argument(
+        '--simulate',
+        type=int,
+        default=0,
+        help='Monte Carlo samples for a probabilistic scenario (0 = deterministic tiers)'
+    )
+    parser.add_argument(
+        '--targets',
+        help='Comma-separated countries for --simulate (default: --target)'
+    )
+    parser.add_argument(
+        '--cuts',
+        help='Comma-separated cut percentages matching --targets (default: --cut)'
+    )
+    parser.add_argument(
+        '--exec-probs',
+        help='Comma-separated execution probabilities matching --targets (default: --exec-prob)'
+    )
+    parser.add_argument(
+        '--cut-spread',
+        type=float,
+        default=0.25,
+        help='Relative +/- range of the triangular cut distribution (default: 0.25)'
+    )
+    parser.add_argument(
+        '--common-shock',
+        type=float,
+        default=0.0,
+        help='Correlation weight (0-1) of execution across countries'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=0,
+        help='Random seed for --simulate'
+    )
     parser.add_argument(
         '--claim',
         help='Claim to validate'
     )
+    parser.add_argument(
+        '--max-breaks',
+        type=int,
+        default=1,
+        help='Maximum structural breaks per trend series (analyze workflow)'
+    )
     parser.add_argument(
         '--output', '-o',
         default='./output/nickel',
@@ -366,8 +479,32 @@ def main():
         analyzer.ingest()
         analyzer.compute_concentration()
         analyzer.compute_time_series()
+        analyzer.compute_trend_breaks(max_breaks=args.max_breaks)
         analyzer.generate_output(args.format, args.output)
 
+    elif args.workflow == 'scenario' and args.simulate > 0:
+        targets = (args.targets or args.target).split(',')
+        cuts = args.cuts.split(',') if args.cuts else [args.cut] * len(targets)
+        probs = args.exec_probs.split(',') if args.exec_probs else [args.exec_prob] * len(targets)
+        if None in cuts:
+            parser.error("--cut or --cuts is required for scenario workflow")
+        if not len(targets) == len(cuts) == len(probs):
+            parser.error("--targets, --cuts and --exec-probs must have the same length")
+
+        shocks = build_shocks(
+            [t.strip() for t in targets],
+            [float(c) / 100 for c in cuts],
+            [float(p) for p in probs],
+            cut_spread=args.cut_spread
+        )
+        results = analyzer.run_simulation(
+            shocks,
+            n_samples=args.simulate,
+            common_shock=args.common_shock,
+            seed=args.seed
+        )
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+
     elif args.workflow == 'scenario':
         if args.cut is None:
             parser.error("--cut is required for scenario workflow")
@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Probabilistic Scenario Engine
+
+Monte Carlo version of scenario_impact: instead of three fixed tiers
+(hard / half / soft), every uncertain input is drawn from a distribution
+and all samples are evaluated at once as arrays:
+
+- cut size (fraction of the country's production)
+- whether the policy is executed (execution probability), and how fully
+- timing (months of delay before the cut bites within the horizon)
+- substitution (share of the lost supply offset elsewhere)
+
+Several countries can be shocked simultaneously (e.g. Indonesia +
+Philippines + Russia); country production comes from compute_concentration
+shares. A common-shock weight couples the execution draws across countries.
+
+Author: Ricky Wang
+License: MIT
+"""
+
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+from compute_concentration import share_panel
+
+# Same thresholds and labels as scenario_impact._calculate_tier
+RISK_BAND_EDGES = (0.02, 0.05, 0.10)
+RISK_BAND_LABELS = ("低風險", "中等風險", "高風險", "極高風險")
+
+# Fallback baseline when no ingested data is supplied (tonnes Ni content, 2024)
+DEFAULT_COUNTRY_PROD = {
+    "Indonesia": 2_280_000,   # S&P Global
+    "Philippines": 330_000,   # USGS
+    "Russia": 210_000,        # USGS
+    "Canada": 190_000,
+    "China": 120_000,
+    "Australia": 110_000,
+}
+DEFAULT_GLOBAL_PROD = 3_780_000
+
+
+@dataclass
+class Distribution:
+    """
+    A sampling distribution for one scenario input.
+
+    kind: fixed (value) | uniform (low, high) | triangular (low, mode, high)
+          | beta (mean, concentration) | normal (mean, std, clipped to [low, high])
+    """
+    kind: str
+    params: Tuple[float, ...]
+    low: float = 0.0
+    high: float = 1.0
+
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        p = self.params
+        if self.kind == "fixed":
+            return np.full(n, float(p[0]))
+        if self.kind == "uniform":
+            return rng.uniform(p[0], p[1], n)
+        if self.kind == "triangular":
+            if p[0] == p[2]:
+                return np.full(n, float(p[1]))
+            return rng.triangular(p[0], p[1], p[2], n)
+        if self.kind == "beta":
+            mean, conc = p
+            return rng.beta(mean * conc, (1 - mean) * conc, n)
+        if self.kind == "normal":
+            return np.clip(rng.normal(p[0], p[1], n), self.low, self.high)
+        raise ValueError(f"Unknown distribution kind: {self.kind}")
+
+
+def fixed(value: float) -> Distribution:
+    return Distribution("fixed", (value,))
+
+
+def uniform(low: float, high: float) -> Distribution:
+    return Distribution("uniform", (low, high))
+
+
+def triangular(low: float, mode: float, high: float) -> Distribution:
+    return Distribution("triangular", (low, mode, high))
+
+
+@dataclass
+class ShockSpec:
+    """One country's policy shock, with uncertain inputs."""
+    country: str
+    cut: Distribution                       # fraction of country production
+    execution_prob: float = 0.5             # probability the policy is executed at all
+    execution_rate: Distribution = field(default_factory=lambda: uniform(0.25, 1.0))
+    delay_months: Distribution = field(default_factory=lambda: uniform(0.0, 6.0))
+    substitution: Distribution = field(default_factory=lambda: uniform(0.0, 0.3))
+
+
+@dataclass
+class SimulationResult:
+    """Per-sample arrays; country_cut is (n_samples, n_countries) in tonnes."""
+    countries: List[str]
+    country_cut: np.ndarray
+    executed: np.ndarray
+    total_cut: np.ndarray
+    global_hit_pct: np.ndarray
+    equivalent_days: np.ndarray
+    risk_band: np.ndarray
+
+
+def baseline_from_supply(
+    df: pd.DataFrame,
+    year: Optional[int] = None,
+    supply_type: str = "mined"
+) -> Tuple[Dict[str, float], float]:
+    """
+    Country production and global total from ingested supply data.
+
+    Args:
+        df: Supply data ('year', 'country', 'value' columns)
+        year: Target year (default: latest)
+        supply_type: Filter by supply type
+
+    Returns:
+        (country -> production in tonnes, global production)
+    """
+    # INSG's 'World' row is an aggregate, not a producer
+    df = df[df['country'] != 'World']
+    shares = share_panel(df, supply_type=supply_type)
+    year = year or int(shares.index.max())
+    rows = df[df['year'] == year]
+    if 'supply_type' in rows.columns:
+        rows = rows[rows['supply_type'] == supply_type]
+    global_prod = float(rows['value'].sum())
+    country_prod = (shares.loc[year] * global_prod).to_dict()
+    return {c: float(v) for c, v in country_prod.items() if v > 0}, global_prod
+
+
+def simulate_shocks(
+    shocks: Sequence[ShockSpec],
+    country_prod: Dict[str, float],
+    global_prod: float,
+    n_samples: int = 10_000,
+    horizon_months: int = 12,
+    common_shock: float = 0.0,
+    seed: Optional[int] = 0
+) -> SimulationResult:
+    """
+    Draw joint samples of all shock inputs and evaluate them at once.
+
+    Args:
+        shocks: One ShockSpec per shocked country
+        country_prod: Country production (tonnes) for the horizon year
+        global_prod: Global production (tonnes)
+        n_samples: Number of Monte Carlo samples
+        horizon_months: Evaluation horizon; a cut delayed past it has no effect
+        common_shock: Weight (0-1) of a shared driver in the execution draws;
+            1 means all countries execute or fail together
+        seed: Random seed
+
+    Returns:
+        SimulationResult with per-sample arrays
+    """
+    if global_prod <= 0:
+        raise ValueError("Global production is zero")
+    missing = [s.country for s in shocks if s.country not in country_prod]
+    if missing:
+        raise ValueError(f"No baseline production for: {', '.join(missing)}")
+
+    rng = np.random.default_rng(seed)
+    n, k = n_samples, len(shocks)
+
+    prod = np.array([country_prod[s.country] for s in shocks])
+    cut = np.column_stack([s.cut.sample(rng, n) for s in shocks])
+    rate = np.column_stack([s.execution_rate.sample(rng, n) for s in shocks])
+    delay = np.column_stack([s.delay_months.sample(rng, n) for s in shocks])
+    substitution = np.column_stack([s.substitution.sample(rng, n) for s in shocks])
+
+    # Execution: each country uses the shared uniform with probability common_shock
+    own_u = rng.random((n, k))
+    shared_u = rng.random((n, 1))
+    use_shared = rng.random((n, k)) < common_shock
+    u = np.where(use_shared, shared_u, own_u)
+    executed = u < np.array([s.execution_prob for s in shocks])
+
+    active = np.clip((horizon_months - delay) / horizon_months, 0.0, 1.0)
+    country_cut = (
+        prod * np.clip(cut, 0.0, 1.0) * executed * np.clip(rate, 0.0, 1.0)
+        * active * (1.0 - np.clip(substitution, 0.0, 1.0))
+    )
+
+    total_cut = country_cut.sum(axis=1)
+    horizon_prod = global_prod * horizon_months / 12
+    global_hit = total_cut / horizon_prod
+    daily_consumption = global_prod / 365
+
+    return SimulationResult(
+        countries=[s.country for s in shocks],
+        country_cut=country_cut,
+        executed=executed,
+        total_cut=total_cut,
+        global_hit_pct=global_hit,
+        equivalent_days=total_cut / daily_consumption,
+        risk_band=np.digitize(global_hit, RISK_BAND_EDGES),
+    )
+
+
+def summarize_simulation(
+    result: SimulationResult,
+    percentiles: Sequence[float] = (5, 25, 50, 75, 95),
+    hit_thresholds: Sequence[float] = (0.02, 0.05, 0.10)
+) -> Dict[str, Any]:
+    """
+    Distribution summary of a simulation.
+
+    Returns:
+        Dictionary with global-hit and days-of-consumption percentiles,
+        risk-band probabilities, exceedance probabilities and per-country
+        contributions
+    """
+    def _pcts(values: np.ndarray, scale: float = 1.0) -> Dict[str, float]:
+        qs = np.percentile(values, percentiles) * scale
+        out = {f"p{int(p)}": float(q) for p, q in zip(percentiles, qs)}
+        out["mean"] = float(values.mean() * scale)
+        return out
+
+    band_counts = np.bincount(result.risk_band, minlength=len(RISK_BAND_LABELS))
+    n = len(result.total_cut)
+    mean_cut = result.country_cut.mean(axis=0)
+
+    return {
+        'n_samples': n,
+        'global_hit_pct': _pcts(result.global_hit_pct),
+        'equivalent_days_consumption': _pcts(result.equivalent_days),
+        'total_cut_kt': _pcts(result.total_cut, 1 / 1000),
+        'risk_band_probability': {
+            label: float(count / n) for label, count in zip(RISK_BAND_LABELS, band_counts)
+        },
+        'prob_hit_at_least': {
+            f"{t:.0%}": float((result.global_hit_pct >= t).mean()) for t in hit_thresholds
+        },
+        'countries': [
+            {
+                'country': country,
+                'execution_frequency': float(result.executed[:, j].mean()),
+                'mean_cut_kt': float(mean_cut[j] / 1000),
+                'share_of_expected_cut': float(mean_cut[j] / mean_cut.sum()) if mean_cut.sum() > 0 else 0.0,
+            }
+            for j, country in enumerate(result.countries)
+        ],
+        'prob_all_executed': float(result.executed.all(axis=1).mean()),
+        'prob_none_executed': float((~result.executed).all(axis=1).mean()),
+    }
+
+
+def build_shocks(
+    countries: Sequence[str],
+    cuts: Sequence[float],
+    execution_probs: Sequence[float],
+    cut_spread: float = 0.25
+) -> List[ShockSpec]:
+    """
+    ShockSpecs from point estimates: each cut becomes a triangular distribution
+    of +/- cut_spread around its value; other inputs use the ShockSpec defaults.
+    """
+    shocks = []
+    for country, cut, prob in zip(countries, cuts, execution_probs):
+        low = max(0.0, cut * (1 - cut_spread))
+        high = min(1.0, cut * (1 + cut_spread))
+        shocks.append(ShockSpec(country=country, cut=triangular(low, cut, high), execution_prob=prob))
+    return shocks
+
+
+if __name__ == '__main__':
+    shocks = build_shocks(
+        countries=["Indonesia", "Philippines", "Russia"],
+        cuts=[0.20, 0.10, 0.05],
+        execution_probs=[0.5, 0.3, 0.2]
+    )
+    result = simulate_shocks(shocks, DEFAULT_COUNTRY_PROD, DEFAULT_GLOBAL_PROD, common_shock=0.3)
+    summary = summarize_simulation(result)
+
+    print("=== Multi-country shock (10,000 samples) ===")
+    print(f"Median global hit: {summary['global_hit_pct']['p50']:.1%}")
+    print(f"P95 global hit:    {summary['global_hit_pct']['p95']:.1%}")
+    print(f"P95 days:          {summary['equivalent_days_consumption']['p95']:.0f}")
+    for label, prob in summary['risk_band_probability'].items():
+        print(f"{label}: {prob:.1%}")
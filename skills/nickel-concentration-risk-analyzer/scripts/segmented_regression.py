@@ -0,0 +1,382 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+分段線性迴歸引擎（結構斷點 / 滾動斜率）
+
+以累積和（prefix sums）保存每條序列的 n, Σx, Σx², Σy, Σxy, Σy²，
+任一區段 [i, j) 的 OLS 斜率與殘差平方和都能以 O(1) 取得：
+- 滾動斜率：每個窗口 O(1)，整個面板一次向量化
+- 單一斷點：所有候選斷點 O(T)，與逐點 np.polyfit 結果相同
+- 多重斷點：動態規劃（Bai-Perron 式），O(M·T²)，依 BIC 選擇斷點數
+
+所有函數同時處理整個面板（每列一個國家、每欄一年），缺值以 NaN 表示。
+
+Usage:
+    from segmented_regression import detect_breaks, rolling_slopes
+
+    panel = df.pivot_table(index="country", columns="year", values="production")
+    breaks = detect_breaks(panel, min_segment=5, max_breaks=2)
+    slopes = rolling_slopes(panel, window=10)
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy import stats as _stats
+    HAS_SCIPY = True
+except ImportError:
+    HAS_SCIPY = False
+
+
+# ============================================================================
+# 累積矩
+# ============================================================================
+
+def _prefix_moments(Y: np.ndarray, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    計算累積矩
+
+    x 先置中、Y 逐列標準化後再累加，避免年份平方與大數值產量造成的抵銷誤差。
+
+    Returns
+    -------
+    tuple
+        (P, scale)：P 形狀 (6, n, T+1)，依序為 n, Σx, Σx², Σy, Σxy, Σy²；
+        scale 為每列的標準差（斜率與 SSE 需乘回 scale / scale²）
+    """
+    Y = np.atleast_2d(np.asarray(Y, dtype=float))
+    x = np.asarray(x, dtype=float)
+    valid = ~np.isnan(Y)
+
+    with np.errstate(invalid="ignore"):
+        loc = np.nanmean(np.where(valid, Y, np.nan), axis=1, keepdims=True)
+        scale = np.nanstd(np.where(valid, Y, np.nan), axis=1, keepdims=True)
+    loc = np.nan_to_num(loc)
+    scale = np.where(np.isfinite(scale) & (scale > 0), scale, 1.0)
+
+    w = valid.astype(float)
+    xc = np.where(valid, x - x.mean(), 0.0)
+    z = np.where(valid, (Y - loc) / scale, 0.0)
+
+    moments = np.stack([w, xc, xc * xc, z, xc * z, z * z])
+    P = np.zeros(moments.shape[:2] + (moments.shape[2] + 1,))
+    np.cumsum(moments, axis=2, out=P[:, :, 1:])
+    return P, scale[:, 0]
+
+
+def _segment_fit(S: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    由區段矩計算 OLS 斜率與 SSE
+
+    Parameters
+    ----------
+    S : np.ndarray
+        形狀 (6, ...)，為 P[..., j] - P[..., i]
+
+    Returns
+    -------
+    tuple
+        (slope, sse, n_obs)；少於 2 點或 x 無變異時 slope/sse 為 NaN
+    """
+    n, sx, sxx, sy, sxy, syy = S
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vxx = sxx - sx * sx / n
+        vxy = sxy - sx * sy / n
+        vyy = syy - sy * sy / n
+        slope = vxy / vxx
+        sse = np.maximum(vyy - vxy * slope, 0.0)
+    bad = (n < 2) | ~(vxx > 1e-12)
+    slope = np.where(bad, np.nan, slope)
+    sse = np.where(bad, np.nan, sse)
+    return slope, sse, n
+
+
+def _f_pvalue(f_stat: np.ndarray, df1: np.ndarray, df2: np.ndarray) -> np.ndarray:
+    """F 檢定右尾機率（無 scipy 時回傳 NaN）"""
+    if not HAS_SCIPY:
+        return np.full(np.shape(f_stat), np.nan)
+    with np.errstate(invalid="ignore"):
+        return _stats.f.sf(f_stat, df1, df2)
+
+
+# ============================================================================
+# 滾動斜率
+# ============================================================================
+
+def rolling_slope_matrix(Y: np.ndarray, x: np.ndarray, window: int) -> np.ndarray:
+    """
+    滾動 OLS 斜率（每個窗口 O(1)）
+
+    Parameters
+    ----------
+    Y : np.ndarray
+        形狀 (n, T) 的面板
+    x : np.ndarray
+        長度 T 的 x 軸（例如年份）
+    window : int
+        窗口長度
+
+    Returns
+    -------
+    np.ndarray
+        形狀 (n, T)；前 window-1 期與窗口內有缺值者為 NaN
+    """
+    P, scale = _prefix_moments(Y, x)
+    T = P.shape[2] - 1
+    out = np.full(P.shape[1:2] + (T,), np.nan)
+    if window > T or window < 2:
+        return out
+
+    S = P[:, :, window:] - P[:, :, :-window]
+    slope, _, n = _segment_fit(S)
+    slope = np.where(n == window, slope, np.nan)
+    out[:, window - 1:] = slope * scale[:, None]
+    return out
+
+
+def rolling_slopes(panel: pd.DataFrame, window: int = 10) -> pd.DataFrame:
+    """面板版滾動斜率（index = 個體，columns = 年份）"""
+    values = rolling_slope_matrix(panel.to_numpy(dtype=float), panel.columns.to_numpy(dtype=float), window)
+    return pd.DataFrame(values, index=panel.index, columns=panel.columns)
+
+
+# ============================================================================
+# 斷點搜尋
+# ============================================================================
+
+def single_break(
+    Y: np.ndarray,
+    x: np.ndarray,
+    min_segment: int = 5
+) -> Dict[str, np.ndarray]:
+    """
+    單一斷點的窮舉搜尋（所有序列、所有候選點一次計算）
+
+    候選斷點位置 k ∈ [min_segment, T - min_segment)，前段為 [0, k)、後段為 [k, T)，
+    與逐點 np.polyfit 的舊實作一致。
+
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        break_index, sse_break, pre_slope, post_slope（原始單位），
+        以及無斷點模型的 sse_full / n_obs；無可用候選時 break_index = -1
+    """
+    P, scale = _prefix_moments(Y, x)
+    n_series, T = P.shape[1], P.shape[2] - 1
+
+    full_slope, full_sse, n_obs = _segment_fit(P[:, :, T] - P[:, :, 0])
+    ks = np.arange(min_segment, T - min_segment)
+
+    result = {
+        "break_index": np.full(n_series, -1),
+        "sse_break": np.full(n_series, np.nan),
+        "pre_slope": np.full(n_series, np.nan),
+        "post_slope": np.full(n_series, np.nan),
+        "sse_full": full_sse * scale ** 2,
+        "full_slope": full_slope * scale,
+        "n_obs": n_obs,
+    }
+    if len(ks) == 0:
+        return result
+
+    pre_slope, pre_sse, _ = _segment_fit(P[:, :, ks] - P[:, :, :1])
+    post_slope, post_sse, _ = _segment_fit(P[:, :, T:] - P[:, :, ks])
+    total = pre_sse + post_sse
+    total = np.where(np.isnan(total), np.inf, total)
+
+    best = np.argmin(total, axis=1)
+    rows = np.arange(n_series)
+    found = np.isfinite(total[rows, best])
+
+    result["break_index"] = np.where(found, ks[best], -1)
+    result["sse_break"] = np.where(found, total[rows, best], np.nan) * scale ** 2
+    result["pre_slope"] = np.where(found, pre_slope[rows, best], np.nan) * scale
+    result["post_slope"] = np.where(found, post_slope[rows, best], np.nan) * scale
+    return result
+
+
+def multi_break(
+    Y: np.ndarray,
+    x: np.ndarray,
+    n_breaks: int,
+    min_segment: int = 5
+) -> Dict[str, Any]:
+    """
+    固定斷點數的最適分段（動態規劃）
+
+    區段成本 SSE[i, j) 由累積矩 O(1) 取得，DP 對所有序列同時進行。
+    每段至少 min_segment 期。
+
+    Returns
+    -------
+    Dict[str, Any]
+        breaks：每列的斷點位置 list（無解時為空）；
+        slopes：每列各段斜率 list；sse：每列總 SSE（原始單位）
+    """
+    P, scale = _prefix_moments(Y, x)
+    n_series, T = P.shape[1], P.shape[2] - 1
+
+    # cost[s, i, j] = 區段 [i, j) 的 SSE
+    S = P[:, :, None, :] - P[:, :, :, None]
+    seg_slope, cost, _ = _segment_fit(S)
+    span = np.arange(T + 1)[None, :] - np.arange(T + 1)[:, None]
+    cost = np.where((span >= min_segment) & ~np.isnan(cost), cost, np.inf)
+
+    # F[m][s, j] = 前 j 期切成 m+1 段的最小 SSE
+    F = cost[:, 0, :]
+    back = []
+    for _ in range(n_breaks):
+        candidates = F[:, :, None] + cost
+        back.append(np.argmin(candidates, axis=1))
+        F = np.min(candidates, axis=1)
+
+    total = F[:, T]
+    breaks: List[List[int]] = []
+    slopes: List[List[float]] = []
+    for s in range(n_series):
+        if not np.isfinite(total[s]):
+            breaks.append([])
+            slopes.append([])
+            continue
+        cuts, j = [], T
+        for m in range(n_breaks - 1, -1, -1):
+            j = int(back[m][s, j])
+            cuts.append(j)
+        cuts = cuts[::-1]
+        bounds = [0] + cuts + [T]
+        breaks.append(cuts)
+        slopes.append([float(seg_slope[s, a, b] * scale[s]) for a, b in zip(bounds[:-1], bounds[1:])])
+
+    return {"breaks": breaks, "slopes": slopes, "sse": np.where(np.isfinite(total), total, np.nan) * scale ** 2}
+
+
+def _bic(sse: np.ndarray, n_obs: np.ndarray, n_breaks: int) -> np.ndarray:
+    """分段線性模型的 BIC（每段 2 參數 + 每個斷點 1 參數）"""
+    k = 2 * (n_breaks + 1) + n_breaks
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return n_obs * np.log(np.maximum(sse, 1e-300) / n_obs) + k * np.log(n_obs)
+
+
+def detect_breaks(
+    panel: pd.DataFrame,
+    min_segment: int = 5,
+    max_breaks: int = 1
+) -> pd.DataFrame:
+    """
+    對面板中每個個體偵測結構斷點
+
+    max_breaks = 1 時為單一斷點窮舉；> 1 時以 DP 求 1..max_breaks 個斷點的最適解，
+    並以 BIC 選擇斷點數（若 BIC 不支持任何斷點，仍回報單一斷點但 n_breaks = 0）。
+    信心水準來自 Chow 型 F 檢定（斷點模型 vs 單一直線）；斷點位置是搜尋出來的，
+    名目 p 值偏樂觀，應視為相對強度而非嚴格顯著性。
+
+    Parameters
+    ----------
+    panel : pd.DataFrame
+        index = 個體（國家/指標），columns = 年份
+    min_segment : int
+        每段最少期數
+    max_breaks : int
+        最多斷點數
+
+    Returns
+    -------
+    pd.DataFrame
+        每列一個個體：n_obs, n_breaks, break_year, break_years, pre_slope, post_slope,
+        segment_slopes, f_stat, p_value, confidence, sse_reduction
+    """
+    Y = panel.to_numpy(dtype=float)
+    years = panel.columns.to_numpy()
+    x = years.astype(float)
+
+    single = single_break(Y, x, min_segment)
+    sse_full, n_obs = single["sse_full"], single["n_obs"]
+
+    break_lists = [[int(k)] if k >= 0 else [] for k in single["break_index"]]
+    slope_lists = [
+        [float(a), float(b)] if k >= 0 else []
+        for k, a, b in zip(single["break_index"], single["pre_slope"], single["post_slope"])
+    ]
+    sse_best = single["sse_break"].copy()
+    n_best = np.where(single["break_index"] >= 0, 1, 0)
+
+    if max_breaks > 1:
+        bic_best = np.where(n_best > 0, _bic(sse_best, n_obs, 1), np.inf)
+        for m in range(2, max_breaks + 1):
+            fit = multi_break(Y, x, m, min_segment)
+            bic_m = _bic(fit["sse"], n_obs, m)
+            better = np.isfinite(bic_m) & (bic_m < bic_best)
+            for s in np.flatnonzero(better):
+                break_lists[s] = fit["breaks"][s]
+                slope_lists[s] = fit["slopes"][s]
+            sse_best = np.where(better, fit["sse"], sse_best)
+            n_best = np.where(better, m, n_best)
+            bic_best = np.where(better, bic_m, bic_best)
+        # 與無斷點模型比較
+        no_break = _bic(sse_full, n_obs, 0) <= bic_best
+    else:
+        no_break = np.zeros(len(panel), dtype=bool)
+
+    # Chow 型 F 檢定：每多一段增加 2 個參數
+    df1 = 2 * np.maximum(n_best, 1)
+    df2 = n_obs - 2 * (n_best + 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f_stat = ((sse_full - sse_best) / df1) / (sse_best / df2)
+        sse_reduction = 1 - sse_best / sse_full
+    f_stat = np.where((n_best > 0) & (df2 > 0), f_stat, np.nan)
+    p_value = _f_pvalue(f_stat, df1, np.maximum(df2, 1))
+
+    rows = []
+    for s, entity in enumerate(panel.index):
+        cuts = break_lists[s]
+        seg = slope_lists[s]
+        break_years = [int(years[k]) for k in cuts]
+        rows.append({
+            "entity": entity,
+            "n_obs": int(n_obs[s]),
+            "n_breaks": 0 if no_break[s] else len(cuts),
+            # 多重斷點時以最後一個斷點描述「目前」的趨勢轉折
+            "break_year": break_years[-1] if break_years else np.nan,
+            "break_years": break_years,
+            "pre_slope": seg[-2] if len(seg) >= 2 else np.nan,
+            "post_slope": seg[-1] if len(seg) >= 2 else np.nan,
+            "segment_slopes": seg,
+            "f_stat": f_stat[s],
+            "p_value": p_value[s],
+            "confidence": 1 - p_value[s],
+            "sse_reduction": sse_reduction[s],
+        })
+
+    result = pd.DataFrame(rows).set_index("entity")
+    result["break_year"] = result["break_year"].astype("Int64")
+    return result
+
+
+def breaks_to_records(breaks: pd.DataFrame, digits: int = 4) -> List[Dict[str, Any]]:
+    """detect_breaks 結果轉為 JSON 友善的 list（NaN → None）"""
+    records = []
+    for entity, row in breaks.iterrows():
+        record: Dict[str, Any] = {"entity": entity}
+        for key, value in row.items():
+            if isinstance(value, list):
+                record[key] = [round(v, digits) if isinstance(v, float) else v for v in value]
+            elif pd.isna(value):
+                record[key] = None
+            elif isinstance(value, (float, np.floating)):
+                record[key] = round(float(value), digits)
+            else:
+                record[key] = int(value) if isinstance(value, (np.integer,)) else value
+        records.append(record)
+    return records
+
+
+def series_break(series: pd.Series, min_segment: int = 5, max_breaks: int = 1) -> Optional[Dict[str, Any]]:
+    """單一序列的斷點偵測（index = 年份）；無可用候選時回傳 None"""
+    panel = pd.DataFrame([series.to_numpy(dtype=float)], index=[series.name or "series"], columns=series.index)
+    breaks = detect_breaks(panel, min_segment, max_breaks)
+    if pd.isna(breaks["break_year"].iloc[0]):
+        return None
+    return breaks_to_records(breaks, digits=6)[0]
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Scenario Engine Tests
+
+Checks baseline_from_supply on ingested data:
+1. INSG's 'World' aggregate row is not counted as a producing country
+2. The global total matches the real mined supply (~3.8 Mt), not double it
+
+Usage:
+    cd skills/nickel-concentration-risk-analyzer/scripts/tests
+    python -m pytest -q test_scenario_engine.py
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add scripts directory to path (tests is inside scripts/)
+scripts_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(scripts_dir))
+
+from ingest_sources import ingest_all_sources  # noqa: E402
+from scenario_engine import baseline_from_supply  # noqa: E402
+
+
+def test_baseline_from_supply_excludes_world_row():
+    df = ingest_all_sources()
+    assert (df['country'] == 'World').any()
+
+    country_prod, global_prod = baseline_from_supply(df)
+
+    assert 'World' not in country_prod
+    assert global_prod == pytest.approx(3_800_000, rel=0.05)
+    assert sum(country_prod.values()) == pytest.approx(global_prod)
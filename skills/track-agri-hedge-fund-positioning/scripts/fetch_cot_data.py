@@ -7,13 +7,16 @@ CFTC COT 資料抓取腳本
 
 import argparse
 import json
+import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional
 from urllib.parse import urlencode
 
 import pandas as pd
-import requests
+
+sys.path.insert(0, str(Path(__file__).parent))
+import http_client
 
 # CFTC Socrata API endpoint
 CFTC_API_URL = "https://publicreporting.cftc.gov/resource/6dca-aqww.json"
@@ -68,7 +71,7 @@ def fetch_cot_from_api(
     print(f"Fetching COT data from CFTC API...")
     print(f"  Date range: {start_date} to {end_date}")
 
-    response = requests.get(url, timeout=120)
+    response = http_client.get(url, timeout=120)
     response.raise_for_status()
 
     data = response.json()
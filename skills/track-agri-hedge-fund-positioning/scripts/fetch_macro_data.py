@@ -6,13 +6,16 @@
 """
 
 import argparse
+import sys
 from datetime import datetime, timedelta
 from io import StringIO
 from pathlib import Path
 from typing import Dict
 
 import pandas as pd
-import requests
+
+sys.path.insert(0, str(Path(__file__).parent))
+import http_client
 
 # 嘗試導入 yfinance
 try:
@@ -99,7 +102,7 @@ def fetch_fred_series(series_id: str, start_date: str, end_date: str) -> pd.Seri
     print(f"  Downloading {series_id} from FRED...")
 
     try:
-        response = requests.get(FRED_CSV_URL, params=params, timeout=30)
+        response = http_client.get(FRED_CSV_URL, params=params, timeout=30)
         response.raise_for_status()
 
         df = pd.read_csv(StringIO(response.text))
@@ -18,14 +18,18 @@ BLS 資料抓取模組
     data = fetcher.fetch_series(['CUUR0000SA0'], 2020, 2024)
 """
 
-import requests
 import pandas as pd
 from datetime import datetime
 from typing import List, Dict, Optional, Union
+import sys
 import time
 import random
 import json
 from pathlib import Path
+from urllib.parse import urlparse
+
+sys.path.insert(0, str(Path(__file__).parent))
+import http_client
 
 
 # BLS 系列代碼對照表
@@ -72,11 +76,10 @@ class BLSFetcher:
         self.cache_dir = Path(cache_dir) if cache_dir else None
         if self.cache_dir:
             self.cache_dir.mkdir(parents=True, exist_ok=True)
-
-    def _random_delay(self, min_sec: float = 0.5, max_sec: float = 1.5):
-        """模擬人類行為的隨機延遲"""
-        delay = random.uniform(min_sec, max_sec)
-        time.sleep(delay)
+        # BLS 每 IP 有請求上限：同時只送一個請求，連續請求間隔 0.5-1.5 秒
+        http_client.limit_host(
+            urlparse(self.BASE_URL).netloc, per_host=1, min_interval=0.5, max_interval=1.5
+        )
 
     def _get_headers(self) -> Dict[str, str]:
         """取得 headers"""
@@ -171,12 +174,9 @@ class BLSFetcher:
         if self.api_key:
             payload["registrationkey"] = self.api_key
 
-        # 隨機延遲
-        self._random_delay()
-
-        # 發送請求
+        # 發送請求（共用連線池，重試與主機間隔由 http_client 處理）
         try:
-            response = requests.post(
+            response = http_client.post(
                 self.BASE_URL,
                 json=payload,
                 headers=self._get_headers(),
@@ -13,15 +13,19 @@ FRED 資料抓取模組
     data = fetcher.fetch_series(['CPIAUCSL', 'PCEPI'], '2020-01-01', '2024-12-01')
 """
 
-import requests
 import pandas as pd
 from datetime import datetime
 from typing import List, Dict, Optional, Union
 from io import StringIO
+import sys
 import time
 import random
 import json
 from pathlib import Path
+from urllib.parse import urlparse
+
+sys.path.insert(0, str(Path(__file__).parent))
+import http_client
 
 
 # FRED 系列代碼對照表
@@ -81,11 +85,8 @@ class FREDFetcher:
         self.cache_dir = Path(cache_dir) if cache_dir else None
         if self.cache_dir:
             self.cache_dir.mkdir(parents=True, exist_ok=True)
-
-    def _random_delay(self, min_sec: float = 0.3, max_sec: float = 1.0):
-        """模擬人類行為的隨機延遲"""
-        delay = random.uniform(min_sec, max_sec)
-        time.sleep(delay)
+        # 連續請求 FRED 之間的隨機間隔（由共用 HTTP 客戶端負責，第一次請求不等待）
+        http_client.limit_host(urlparse(self.BASE_URL).netloc, min_interval=0.3, max_interval=1.0)
 
     def _get_headers(self) -> Dict[str, str]:
         """取得隨機 headers"""
@@ -93,8 +94,6 @@ class FREDFetcher:
             'User-Agent': random.choice(self.USER_AGENTS),
             'Accept': 'text/csv,text/html,application/xhtml+xml',
             'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
         }
 
     def _get_cache_path(self, series_id: str, start_date: str, end_date: str) -> Path:
@@ -159,12 +158,9 @@ class FREDFetcher:
 
         url = f"{self.BASE_URL}?{'&'.join(f'{k}={v}' for k, v in params.items())}"
 
-        # 隨機延遲
-        self._random_delay()
-
-        # 發送請求
+        # 發送請求（共用連線池，重試與主機間隔由 http_client 處理）
         try:
-            response = requests.get(url, headers=self._get_headers(), timeout=30)
+            response = http_client.get(url, headers=self._get_headers(), timeout=30)
             response.raise_for_status()
 
             # 解析 CSV
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+HTTP Client Tests
+
+以本機 HTTP stub server 驗證 http_client：
+1. keep-alive：連續請求共用同一條 TCP 連線
+2. 重試：503 / 429 後成功、尊重 Retry-After、404 不重試、連線錯誤用盡後拋出
+3. gzip：伺服器壓縮回應自動解壓，計時紀錄含壓縮前後大小
+4. 主機限制：per_host 並行上限與最小請求間隔
+
+Usage:
+    cd skills/us-cpi-pce-comparator/scripts/tests
+    python -m pytest -q test_http_client.py
+"""
+
+import gzip
+import http.server
+import json
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+import requests
+
+# Add scripts directory to path (tests is inside scripts/)
+scripts_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(scripts_dir))
+
+from http_client import HostLimiter, HttpClient  # noqa: E402
+
+
+class StubState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.hits = {}
+        self.inflight = 0
+        self.max_inflight = 0
+
+    def hit(self, path: str) -> int:
+        with self.lock:
+            self.hits[path] = self.hits.get(path, 0) + 1
+            return self.hits[path]
+
+
+def _make_handler(state: StubState):
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            with state.lock:
+                state.connections += 1
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body: bytes, headers=None):
+            self.send_response(status)
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            count = state.hit(self.path)
+            if self.path == "/ok":
+                self._send(200, b"ok")
+            elif self.path == "/flaky":
+                # 前兩次 503，第三次成功
+                self._send(503, b"busy") if count <= 2 else self._send(200, b"recovered")
+            elif self.path == "/throttled":
+                if count == 1:
+                    self._send(429, b"slow down", {"Retry-After": "0.3"})
+                else:
+                    self._send(200, b"ok")
+            elif self.path == "/missing":
+                self._send(404, b"not found")
+            elif self.path == "/gzip":
+                body = json.dumps({"values": list(range(2000))}).encode()
+                if "gzip" in self.headers.get("Accept-Encoding", ""):
+                    self._send(200, gzip.compress(body), {"Content-Encoding": "gzip"})
+                else:
+                    self._send(200, body)
+            elif self.path == "/slow":
+                with state.lock:
+                    state.inflight += 1
+                    state.max_inflight = max(state.max_inflight, state.inflight)
+                time.sleep(0.15)
+                with state.lock:
+                    state.inflight -= 1
+                self._send(200, b"slow")
+            else:
+                self._send(404, b"")
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            self._send(200, json.dumps({"echo": payload}).encode(), {"Content-Type": "application/json"})
+
+    return Handler
+
+
+@pytest.fixture
+def stub():
+    state = StubState()
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", state
+    server.shutdown()
+    server.server_close()
+
+
+def _client(**kwargs) -> HttpClient:
+    kwargs.setdefault("backoff", 0.01)
+    return HttpClient(timeout=5, **kwargs)
+
+
+def test_keep_alive_reuses_connection(stub):
+    base, state = stub
+    client = _client()
+    for _ in range(5):
+        assert client.get(f"{base}/ok").text == "ok"
+    assert state.connections == 1
+    stats = client.stats()[base.split("//")[1]]
+    assert stats["requests"] == 5 and stats["failures"] == 0
+
+
+def test_retries_server_errors_then_succeeds(stub):
+    base, state = stub
+    client = _client(retries=3)
+    response = client.get(f"{base}/flaky")
+    assert response.status_code == 200 and response.text == "recovered"
+    assert state.hits["/flaky"] == 3
+    assert client.metrics()[-1].attempts == 3
+
+
+def test_retry_exhausted_returns_last_response(stub):
+    base, state = stub
+    response = _client(retries=1).get(f"{base}/flaky")
+    assert response.status_code == 503
+    assert state.hits["/flaky"] == 2
+
+
+def test_honours_retry_after(stub):
+    base, _ = stub
+    client = _client(retries=2)
+    t0 = time.perf_counter()
+    assert client.get(f"{base}/throttled").status_code == 200
+    assert time.perf_counter() - t0 >= 0.25
+
+
+def test_client_errors_are_not_retried(stub):
+    base, state = stub
+    client = _client(retries=3)
+    assert client.get(f"{base}/missing").status_code == 404
+    assert state.hits["/missing"] == 1
+    assert not client.metrics()[-1].ok
+
+
+def test_connection_error_raises_after_retries():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    client = _client(retries=2)
+    with pytest.raises(requests.ConnectionError):
+        client.get(f"http://127.0.0.1:{port}/ok")
+    metric = client.metrics()[-1]
+    assert metric.attempts == 3 and metric.status is None and metric.error
+
+
+def test_gzip_is_requested_and_decoded(stub):
+    base, _ = stub
+    client = _client()
+    assert client.get(f"{base}/gzip").json()["values"][-1] == 1999
+    metric = client.metrics()[-1]
+    assert metric.wire_bytes < metric.bytes
+
+
+def test_post_json(stub):
+    base, _ = stub
+    assert _client().post(f"{base}/echo", json={"seriesid": ["CUUR0000SA0"]}).json() == {
+        "echo": {"seriesid": ["CUUR0000SA0"]}
+    }
+
+
+def test_per_host_concurrency_limit(stub):
+    base, state = stub
+    client = _client(limiter=HostLimiter(per_host=1))
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda _: client.get(f"{base}/slow"), range(4)))
+    assert state.max_inflight == 1
+
+    state.max_inflight = 0
+    client = _client(limiter=HostLimiter(per_host=4), pool_size=4)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda _: client.get(f"{base}/slow"), range(4)))
+    assert state.max_inflight > 1
+
+
+def test_min_interval_between_requests(stub):
+    base, _ = stub
+    client = _client()
+    client.limit_host(base.split("//")[1], min_interval=0.2, max_interval=0.2)
+    t0 = time.perf_counter()
+    for _ in range(3):
+        client.get(f"{base}/ok")
+    # 第一次不等待，之後每次間隔 0.2 秒
+    assert time.perf_counter() - t0 >= 0.38
+    assert client.metrics()[0].wait_sec < 0.05
+    assert client.stats()[base.split("//")[1]]["wait_sec"] >= 0.3
@@ -17,11 +17,15 @@ from typing import Dict, List, Optional, Literal
 from datetime import datetime, date
 import json
 import argparse
+import sys
+from pathlib import Path
 import pandas as pd
 import numpy as np
 
+sys.path.insert(0, str(Path(__file__).parent))
+
 try:
-    import requests
+    import http_client
     HAS_REQUESTS = True
 except ImportError:
     HAS_REQUESTS = False
@@ -184,7 +188,7 @@ def fetch_gold_price_fred() -> Optional[float]:
             "cosd": (datetime.now() - pd.Timedelta(days=30)).strftime("%Y-%m-%d"),
             "coed": datetime.now().strftime("%Y-%m-%d")
         }
-        resp = requests.get(url, params=params, timeout=10)
+        resp = http_client.get(url, params=params, timeout=10)
         resp.raise_for_status()
 
         from io import StringIO
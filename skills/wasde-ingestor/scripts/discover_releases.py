@@ -5,11 +5,15 @@ Discovers WASDE report release dates and URLs from USDA sources.
 """
 
 import re
-import requests
+import sys
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Dict, List, Optional
 from bs4 import BeautifulSoup
 
+sys.path.insert(0, str(Path(__file__).parent))
+import http_client
+
 
 # USDA WASDE URLs
 WASDE_BASE_URL = "https://www.usda.gov/oce/commodity/wasde"
@@ -30,7 +34,7 @@ def discover_latest_release() -> Dict:
     """
     try:
         # Try to get from main WASDE page
-        response = requests.get(WASDE_BASE_URL, timeout=30)
+        response = http_client.get(WASDE_BASE_URL, timeout=30)
         response.raise_for_status()
 
         soup = BeautifulSoup(response.content, 'html.parser')
@@ -140,7 +144,7 @@ def verify_release_exists(release_info: Dict) -> bool:
         bool: True if release exists
     """
     try:
-        response = requests.head(release_info['pdf_url'], timeout=10)
+        response = http_client.head(release_info['pdf_url'], timeout=10)
         return response.status_code == 200
     except:
         return False
@@ -2,15 +2,19 @@
 WASDE Report Fetcher Script
 
 Downloads WASDE reports (PDF or HTML) with retry logic and fallback sources.
+Requests go through the shared http_client (pooled keep-alive connections,
+exponential backoff with jitter on connection errors, timeouts and 429/5xx).
 """
 
 import os
-import time
+import sys
 import hashlib
-import requests
 from typing import Dict, Optional, Tuple
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent))
+import http_client
+
 
 # Default configuration
 DEFAULT_TIMEOUT = 30
@@ -60,50 +64,43 @@ def fetch_pdf(
         print(f"File already exists: {output_path}")
         return output_path
 
-    # Attempt download with retries
-    last_error = None
-    for attempt in range(config["max_attempts"]):
-        try:
-            print(f"Downloading {url} (attempt {attempt + 1}/{config['max_attempts']})")
-
-            response = requests.get(
-                url,
-                timeout=DEFAULT_TIMEOUT,
-                verify=verify_ssl,
-                headers={"User-Agent": USER_AGENT},
-                stream=True
-            )
-            response.raise_for_status()
-
-            # Check content type
-            content_type = response.headers.get("Content-Type", "")
-            if "pdf" not in content_type.lower() and "octet-stream" not in content_type.lower():
-                raise ValueError(f"Unexpected content type: {content_type}")
-
-            # Write to file
-            with open(output_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-
-            # Verify file
-            if os.path.getsize(output_path) < 1000:  # PDF should be > 1KB
-                os.remove(output_path)
-                raise ValueError("Downloaded file too small")
-
-            print(f"Successfully downloaded: {output_path}")
-            return output_path
-
-        except Exception as e:
-            last_error = e
-            print(f"Attempt {attempt + 1} failed: {e}")
-
-            if attempt < config["max_attempts"] - 1:
-                backoff = config["backoff"][min(attempt, len(config["backoff"]) - 1)]
-                print(f"Waiting {backoff}s before retry...")
-                time.sleep(backoff)
+    # Transient failures (connection errors, timeouts, 429/5xx) are retried by
+    # the shared client; content checks below fail fast
+    try:
+        print(f"Downloading {url} (up to {config['max_attempts']} attempts)")
+
+        response = http_client.get(
+            url,
+            timeout=DEFAULT_TIMEOUT,
+            retries=max(0, config["max_attempts"] - 1),
+            backoff=config["backoff"][0],
+            verify=verify_ssl,
+            headers={"User-Agent": USER_AGENT},
+            stream=True
+        )
+        response.raise_for_status()
+
+        # Check content type
+        content_type = response.headers.get("Content-Type", "")
+        if "pdf" not in content_type.lower() and "octet-stream" not in content_type.lower():
+            raise ValueError(f"Unexpected content type: {content_type}")
+
+        # Write to file
+        with open(output_path, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=8192):
+                f.write(chunk)
+
+        # Verify file
+        if os.path.getsize(output_path) < 1000:  # PDF should be > 1KB
+            os.remove(output_path)
+            raise ValueError("Downloaded file too small")
+
+        print(f"Successfully downloaded: {output_path}")
+        return output_path
 
-    print(f"All attempts failed. Last error: {last_error}")
-    return None
+    except Exception as e:
+        print(f"Download failed: {e}")
+        return None
 
 
 def fetch_html(
@@ -125,30 +122,23 @@ def fetch_html(
         "backoff": DEFAULT_BACKOFF
     }
 
-    last_error = None
-    for attempt in range(config["max_attempts"]):
-        try:
-            print(f"Fetching HTML from {url} (attempt {attempt + 1})")
-
-            response = requests.get(
-                url,
-                timeout=DEFAULT_TIMEOUT,
-                headers={"User-Agent": USER_AGENT}
-            )
-            response.raise_for_status()
-
-            return response.text
-
-        except Exception as e:
-            last_error = e
-            print(f"Attempt {attempt + 1} failed: {e}")
-
-            if attempt < config["max_attempts"] - 1:
-                backoff = config["backoff"][min(attempt, len(config["backoff"]) - 1)]
-                time.sleep(backoff)
-
-    print(f"All attempts failed. Last error: {last_error}")
-    return None
+    try:
+        print(f"Fetching HTML from {url}")
+
+        response = http_client.get(
+            url,
+            timeout=DEFAULT_TIMEOUT,
+            retries=max(0, config["max_attempts"] - 1),
+            backoff=config["backoff"][0],
+            headers={"User-Agent": USER_AGENT}
+        )
+        response.raise_for_status()
+
+        return response.text
+
+    except Exception as e:
+        print(f"Fetch failed: {e}")
+        return None
 
 
 def fetch_with_fallback(
@@ -9,11 +9,15 @@ import json
 import sys
 from datetime import datetime, timedelta
 from io import StringIO
+from pathlib import Path
 from typing import Dict, List, Optional
 
 import pandas as pd
 import requests
 
+sys.path.insert(0, str(Path(__file__).parent))
+import http_client
+
 try:
     import yfinance as yf
 except ImportError:
@@ -44,7 +48,7 @@ def fetch_fred_series(
     }
 
     try:
-        response = requests.get(url, params=params, timeout=30)
+        response = http_client.get(url, params=params, timeout=30)
         response.raise_for_status()
 
         # FRED API uses "observation_date" as the date column